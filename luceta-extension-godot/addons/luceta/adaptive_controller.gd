@@ -0,0 +1,314 @@
+@tool
+extends RefCounted
+class_name AdaptiveController
+
+# Sizes ElevenLabs requests from what the API actually did instead of fixed
+# guesses. Every request's size (audio seconds or characters), latency, response
+# bytes, credits and status go into a small stats store; per endpoint, latency
+# and cost are fitted as lines over the request size. From those it picks the
+# requested duration (what the audible part of earlier sounds with the same hint
+# needed, never longer than the taxonomy guess), the concurrency (grows while
+# requests succeed, halves on a 429) and the retry backoff and spacing.
+# tests/adaptive_controller.py reads and writes the same store.
+
+const STATS_PATH = "res://.godot/luceta_cache/request_stats.json"
+const SOUND_ENDPOINT = "sound-generation"
+const CREDITS_PER_SECOND = 20.0  # ElevenLabs sound effects are billed per second of audio
+
+# Line fits until enough samples are measured: endpoint -> [base, per unit of size]
+const DEFAULT_LATENCY = {SOUND_ENDPOINT: [3.0, 0.4]}
+const DEFAULT_TEXT_LATENCY = [1.0, 0.01]
+const DEFAULT_CREDITS = {SOUND_ENDPOINT: [0.0, CREDITS_PER_SECOND]}
+const DEFAULT_TEXT_CREDITS = [0.0, 1.0]  # Speech is billed per character
+
+const MAX_SAMPLES = 200  # Per endpoint
+const MAX_DURATION_SAMPLES = 50  # Per sound hint
+const MIN_SAMPLES_FOR_FIT = 3
+const MIN_DURATION_SAMPLES = 5
+const DURATION_QUANTILE = 0.9
+const DURATION_MARGIN = 0.25  # Seconds kept after the last audible frame
+const MIN_AUDIBLE = 0.05  # Shorter than this the sound is broken, not short
+
+const RECENT_WINDOW = 20  # Requests considered for error and rate-limit rates
+const MIN_CONCURRENCY = 1
+const MAX_CONCURRENCY = 4
+const SUCCESSES_PER_STEP = 4  # Successes per slot before concurrency grows by one
+const DEFAULT_BACKOFF = 2.0
+const MIN_BACKOFF = 0.5
+const MAX_BACKOFF = 60.0
+
+# A Layer III granule (576 samples of one channel) coded in fewer bits is silence
+const SILENT_GRANULE_BITS = 64
+const MPEG1_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+const MPEG2_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+const SAMPLE_RATES = {0: [11025, 12000, 8000], 2: [22050, 24000, 16000], 3: [44100, 48000, 32000]}
+
+var stats_path: String = STATS_PATH
+var endpoints: Dictionary = {}  # endpoint -> {"samples": [[size, seconds, bytes, credits, status]], "concurrency", "streak"}
+var durations: Dictionary = {}  # sound hint -> [[requested, audible]]
+
+func _init(path: String = STATS_PATH):
+	stats_path = path
+	_load()
+
+func record(endpoint: String, size: float, seconds: float, status: int = 200, response_bytes: int = 0, credits: float = -1.0):
+	"""One finished request: size in audio seconds or characters, status 0 for network errors"""
+	if credits < 0.0:
+		credits = estimate_credits(endpoint, size) if status == 200 else 0.0
+	var state = _state(endpoint)
+	state.samples.append([size, seconds, response_bytes, credits, status])
+	if state.samples.size() > MAX_SAMPLES:
+		state.samples = state.samples.slice(state.samples.size() - MAX_SAMPLES)
+	if status == 429:
+		state.concurrency = maxi(MIN_CONCURRENCY, int(state.concurrency) / 2)
+		state.streak = 0
+	elif status == 200:
+		state.streak = int(state.streak) + 1
+		if state.streak >= SUCCESSES_PER_STEP * int(state.concurrency):
+			state.concurrency = mini(MAX_CONCURRENCY, int(state.concurrency) + 1)
+			state.streak = 0
+	else:
+		state.streak = 0
+	_save()
+
+func record_audible(text: String, requested: float, body: PackedByteArray) -> float:
+	"""Remember how much of a generated sound was audible, for choose_duration"""
+	var audible = audible_duration(body)
+	if audible < MIN_AUDIBLE:
+		return -1.0
+	var hint = SoundTaxonomy.classify(text).hint
+	if not durations.has(hint):
+		durations[hint] = []
+	durations[hint].append([requested, snappedf(audible, 0.001)])
+	if durations[hint].size() > MAX_DURATION_SAMPLES:
+		durations[hint] = durations[hint].slice(durations[hint].size() - MAX_DURATION_SAMPLES)
+	_save()
+	return audible
+
+func choose_duration(description: String, sound_name: String = "") -> float:
+	"""
+	Requested length for a sound: the taxonomy guess, shortened to what earlier
+	sounds with the same hint actually filled. Loops keep the guess.
+	"""
+	var guess = SoundTaxonomy.classify(description).duration
+	if guess >= SoundTaxonomy.get_section("priorities").get("background_min_duration", 10.0):
+		return guess
+	var needed = _needed_duration(SoundTaxonomy.classify(sound_name + " " + description).hint)
+	if needed < 0.0:
+		return guess
+	return minf(guess, maxf(SoundTaxonomy.get_section("min_duration", 0.5), ceil(needed * 10.0) / 10.0))
+
+func concurrency(endpoint: String) -> int:
+	return int(_state(endpoint).concurrency)
+
+func backoff(endpoint: String, attempt: int, retry_after: float = 0.0) -> float:
+	"""Seconds before retry number attempt (1-based); a server Retry-After wins"""
+	if retry_after > 0.0:
+		return maxf(MIN_BACKOFF, retry_after)
+	var delay = minf(MAX_BACKOFF, _backoff_base(endpoint) * pow(2.0, maxi(0, attempt - 1)))
+	return delay * randf_range(0.5, 1.0)  # Jitter so retries spread out
+
+func spacing(endpoint: String) -> float:
+	"""Pause between consecutive requests: none unless the endpoint recently rate-limited us"""
+	return _backoff_base(endpoint) if model(endpoint).rate_limited > 0.0 else 0.0
+
+func estimate_seconds(endpoint: String, size: float) -> float:
+	var line = fit_line(_points(endpoint, 1), DEFAULT_LATENCY.get(endpoint, DEFAULT_TEXT_LATENCY))
+	return line[0] + line[1] * size
+
+func estimate_credits(endpoint: String, size: float) -> float:
+	var line = fit_line(_points(endpoint, 3), DEFAULT_CREDITS.get(endpoint, DEFAULT_TEXT_CREDITS))
+	return line[0] + line[1] * size
+
+func model(endpoint: String) -> Dictionary:
+	"""Fitted models and recent rates of one endpoint"""
+	var state = _state(endpoint)
+	var latencies = []
+	for sample in state.samples:
+		if int(sample[4]) == 200:
+			latencies.append(sample[1])
+	var recent = state.samples.slice(maxi(0, state.samples.size() - RECENT_WINDOW))
+	var errors = 0
+	var rate_limited = 0
+	for sample in recent:
+		if int(sample[4]) != 200:
+			errors += 1
+		if int(sample[4]) == 429:
+			rate_limited += 1
+	var latency = fit_line(_points(endpoint, 1), DEFAULT_LATENCY.get(endpoint, DEFAULT_TEXT_LATENCY))
+	var response_bytes = fit_line(_points(endpoint, 2), [0.0, 0.0])
+	var credits = fit_line(_points(endpoint, 3), DEFAULT_CREDITS.get(endpoint, DEFAULT_TEXT_CREDITS))
+	return {
+		"unit": "audio second" if endpoint == SOUND_ENDPOINT else "character",
+		"samples": state.samples.size(),
+		"latency": {"base": latency[0], "per_unit": latency[1]},
+		"bytes": {"base": response_bytes[0], "per_unit": response_bytes[1]},
+		"credits": {"base": credits[0], "per_unit": credits[1]},
+		"p50": quantile(latencies, 0.5) if not latencies.is_empty() else -1.0,
+		"p95": quantile(latencies, 0.95) if not latencies.is_empty() else -1.0,
+		"error_rate": float(errors) / recent.size() if not recent.is_empty() else 0.0,
+		"rate_limited": float(rate_limited) / recent.size() if not recent.is_empty() else 0.0,
+		"concurrency": int(state.concurrency)
+	}
+
+func describe() -> String:
+	"""One line per endpoint with its fitted latency and cost, for the output log"""
+	var lines = []
+	for endpoint in endpoints.keys():
+		var m = model(endpoint)
+		lines.append("%s: %.2fs + %.3fs per %s (p50 %.2fs), %.1f credits per %s, %d%% rate limited, concurrency %d (%d requests)" % [
+			endpoint, m.latency.base, m.latency.per_unit, m.unit, m.p50, m.credits.per_unit, m.unit,
+			int(m.rate_limited * 100.0), m.concurrency, m.samples])
+	return "\n".join(lines)
+
+static func fit_line(points: Array, default: Array) -> Array:
+	"""
+	Least-squares [base, slope] through [x, y] points, both non-negative. The
+	default until there are enough points; with a single x value the default
+	slope is kept and the line moves through the mean.
+	"""
+	var slope: float = default[1]
+	if points.size() < MIN_SAMPLES_FOR_FIT:
+		return [default[0], slope]
+	var n = float(points.size())
+	var mean_x = 0.0
+	var mean_y = 0.0
+	for point in points:
+		mean_x += point[0] / n
+		mean_y += point[1] / n
+	var sxx = 0.0
+	var sxy = 0.0
+	for point in points:
+		sxx += (point[0] - mean_x) * (point[0] - mean_x)
+		sxy += (point[0] - mean_x) * (point[1] - mean_y)
+	if sxx >= 0.01:
+		slope = maxf(0.0, sxy / sxx)
+	if mean_y < slope * mean_x:
+		# A negative base would underestimate small requests: go through the origin and the mean
+		slope = mean_y / mean_x
+	return [mean_y - slope * mean_x, slope]
+
+static func quantile(values: Array, q: float) -> float:
+	"""Nearest-rank quantile of a non-empty array"""
+	var ordered = values.duplicate()
+	ordered.sort()
+	return ordered[maxi(0, int(ceil(q * ordered.size())) - 1)]
+
+static func audible_duration(data: PackedByteArray) -> float:
+	"""
+	End time of the last Layer III frame that isn't (near) silent, from the bits
+	its side info spends on samples. -1 for other layers or all-silent audio.
+	tests/mp3_frames.py (audible_duration) does the same.
+	"""
+	var offset = 0
+	if data.size() >= 10 and data[0] == 0x49 and data[1] == 0x44 and data[2] == 0x33:  # "ID3"
+		var tag_size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+		offset = 10 + tag_size + (10 if data[5] & 0x10 else 0)
+	var elapsed = 0.0
+	var end = -1.0
+	var first = true
+	while offset + 4 <= data.size():
+		var b1 = data[offset + 1]
+		var b2 = data[offset + 2]
+		var version = (b1 >> 3) & 0x03
+		var layer_bits = (b1 >> 1) & 0x03
+		var bitrate_index = (b2 >> 4) & 0x0F
+		var rate_index = (b2 >> 2) & 0x03
+		if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or layer_bits == 0 \
+				or bitrate_index == 0 or bitrate_index == 15 or rate_index == 3:
+			offset += 1
+			continue
+		if layer_bits != 1:
+			return -1.0  # Layer I/II carry no part2_3_length
+		var mpeg1 = version == 3
+		var bitrate = (MPEG1_BITRATES if mpeg1 else MPEG2_BITRATES)[bitrate_index] * 1000
+		var sample_rate = SAMPLE_RATES[version][rate_index]
+		var samples = 1152 if mpeg1 else 576
+		var length = (144 if mpeg1 else 72) * bitrate / sample_rate + ((b2 >> 1) & 0x01)
+		if offset + length > data.size():
+			offset += 1
+			continue
+
+		var channels = 1 if data[offset + 3] >> 6 == 3 else 2
+		var side_start = offset + 4 + (0 if b1 & 0x01 else 2)
+		var side_bytes = (17 if channels == 1 else 32) if mpeg1 else (9 if channels == 1 else 17)
+		var tag = data.slice(side_start + side_bytes, side_start + side_bytes + 4).get_string_from_ascii()
+		if not (first and (tag == "Xing" or tag == "Info")):
+			var position = side_start * 8
+			var granule_bits = 59 if mpeg1 else 63
+			if mpeg1:
+				position += 9 + (5 if channels == 1 else 3) + 4 * channels
+			else:
+				position += 8 + (1 if channels == 1 else 2)
+			var bits = 0
+			for i in range((2 if mpeg1 else 1) * channels):
+				bits += _read_bits(data, position, 12)
+				position += granule_bits
+			elapsed += float(samples) / sample_rate
+			if bits > SILENT_GRANULE_BITS * channels * (samples / 576):
+				end = elapsed
+		first = false
+		offset += length
+	return end
+
+static func _read_bits(data: PackedByteArray, position: int, count: int) -> int:
+	var value = 0
+	for bit in range(position, position + count):
+		value = (value << 1) | ((data[bit >> 3] >> (7 - (bit & 7))) & 1)
+	return value
+
+func _state(endpoint: String) -> Dictionary:
+	if not endpoints.has(endpoint):
+		endpoints[endpoint] = {"samples": [], "concurrency": MIN_CONCURRENCY, "streak": 0}
+	return endpoints[endpoint]
+
+func _points(endpoint: String, column: int) -> Array:
+	"""[size, column] of the endpoint's successful requests"""
+	var points = []
+	for sample in endpoints.get(endpoint, {}).get("samples", []):
+		if int(sample[4]) == 200:
+			points.append([sample[0], sample[column]])
+	return points
+
+func _backoff_base(endpoint: String) -> float:
+	"""Half the median latency: retrying sooner than a typical request takes only adds load"""
+	var p50 = model(endpoint).p50
+	return DEFAULT_BACKOFF if p50 < 0.0 else clampf(p50 / 2.0, MIN_BACKOFF, 10.0)
+
+func _needed_duration(hint: String) -> float:
+	"""
+	Seconds that held the audible part of DURATION_QUANTILE of earlier sounds with
+	this hint, or -1. A sound audible up to its end may have been cut off, so it
+	counts as needing the full taxonomy guess.
+	"""
+	var samples = durations.get(hint, [])
+	if samples.size() < MIN_DURATION_SAMPLES:
+		return -1.0
+	var needed = []
+	for sample in samples:
+		needed.append(sample[1] + DURATION_MARGIN if sample[1] < sample[0] - DURATION_MARGIN else INF)
+	var value = quantile(needed, DURATION_QUANTILE)
+	return -1.0 if is_inf(value) else value
+
+func _load():
+	if not FileAccess.file_exists(stats_path):
+		return
+	var file = FileAccess.open(stats_path, FileAccess.READ)
+	if not file:
+		return
+	var data = JSON.parse_string(file.get_as_text())
+	file.close()
+	if data is Dictionary:
+		endpoints = data.get("endpoints", {})
+		durations = data.get("durations", {})
+
+func _save():
+	var dir_path = stats_path.get_base_dir()
+	if not DirAccess.dir_exists_absolute(dir_path):
+		DirAccess.make_dir_recursive_absolute(ProjectSettings.globalize_path(dir_path))
+	var file = FileAccess.open(stats_path, FileAccess.WRITE)
+	if not file:
+		push_error("[AdaptiveController] Could not write " + stats_path)
+		return
+	file.store_string(JSON.stringify({"version": 1, "endpoints": endpoints, "durations": durations}))
+	file.close()
@@ -7,33 +7,70 @@ class_name AudioCache
 var cache_dir: String = "res://.godot/luceta_cache/"
 var analysis_cache_file: String = "analysis_cache.json"
 var audio_metadata_file: String = "audio_metadata.json"
+var log_file: String = "cache_log.jsonl"
+
+# Updates are appended to cache_log.jsonl (one JSON record per line) instead of
+# rewriting both JSON files. The JSON files are snapshots: the log is replayed
+# on top of them, and once it grows past the live entry count it is folded back
+# in. tests/audio_cache_store.py reads and writes the same layout.
+const COMPACT_MIN_RECORDS = 256
 
 var analysis_cache: Dictionary = {}
 var audio_metadata: Dictionary = {}
 
-func _init():
-	_load_cache()
-
-func _load_cache():
-	# Load analysis cache
-	var cache_path = cache_dir + analysis_cache_file
-	if FileAccess.file_exists(cache_path):
-		var file = FileAccess.open(cache_path, FileAccess.READ)
-		if file:
-			var json = JSON.parse_string(file.get_as_text())
-			if json:
-				analysis_cache = json
-			file.close()
+var _loaded: bool = false
+var _log_records: int = 0
+var _batch_depth: int = 0
+var _pending: Array = []
+
+func _ensure_loaded():
+	"""Load snapshots and replay the log on first use"""
+	if _loaded:
+		return
+	_loaded = true
+	analysis_cache = _read_snapshot(cache_dir + analysis_cache_file)
+	audio_metadata = _read_snapshot(cache_dir + audio_metadata_file)
+	
+	var log_path = cache_dir + log_file
+	if not FileAccess.file_exists(log_path):
+		return
+	var file = FileAccess.open(log_path, FileAccess.READ)
+	if not file:
+		return
+	var torn = false
+	while not file.eof_reached():
+		var line = file.get_line()
+		if line.is_empty():
+			continue
+		var record = JSON.parse_string(line)
+		if record is Dictionary:
+			_apply(record)
+			_log_records += 1
+		else:
+			# A crash mid-append leaves a partial last line
+			torn = true
+	file.close()
 	
-	# Load audio metadata
-	var metadata_path = cache_dir + audio_metadata_file
-	if FileAccess.file_exists(metadata_path):
-		var file = FileAccess.open(metadata_path, FileAccess.READ)
+	if torn:
+		compact()
+
+func _read_snapshot(path: String) -> Dictionary:
+	if FileAccess.file_exists(path):
+		var file = FileAccess.open(path, FileAccess.READ)
 		if file:
 			var json = JSON.parse_string(file.get_as_text())
-			if json:
-				audio_metadata = json
 			file.close()
+			if json is Dictionary:
+				return json
+	return {}
+
+func _apply(record: Dictionary):
+	var table = audio_metadata if record.get("table", "") == "audio" else analysis_cache
+	match record.get("op", ""):
+		"set":
+			table[record.key] = record.value
+		"erase":
+			table.erase(record.key)
 
 func get_file_hash(file_path: String) -> String:
 	# Get file modification time as a simple hash
@@ -60,32 +97,101 @@ func get_analysis_cache_key(project_path: String) -> String:
 	return str(key_string.hash())
 
 func get_cached_analysis(cache_key: String) -> Dictionary:
+	_ensure_loaded()
 	if analysis_cache.has(cache_key):
 		return analysis_cache[cache_key]
 	return {}
 
 func save_analysis_cache(cache_key: String, results: Dictionary):
+	_ensure_loaded()
 	analysis_cache[cache_key] = results
-	_save_cache()
+	_append({"table": "analysis", "op": "set", "key": cache_key, "value": results})
 
 func is_audio_generated(sound_name: String) -> bool:
+	_ensure_loaded()
 	return audio_metadata.has(sound_name)
 
 func get_audio_path(sound_name: String) -> String:
+	_ensure_loaded()
 	if audio_metadata.has(sound_name):
 		return audio_metadata[sound_name].get("path", "")
 	return ""
 
 func save_audio_metadata(sound_name: String, file_path: String, description: String):
+	_ensure_loaded()
 	audio_metadata[sound_name] = {
 		"path": file_path,
 		"description": description,
 		"generated_at": Time.get_unix_time_from_system()
 	}
-	_save_cache()
+	_append({"table": "audio", "op": "set", "key": sound_name, "value": audio_metadata[sound_name]})
+
+func begin_batch():
+	"""Buffer updates until the matching commit_batch(), then write them in one append"""
+	_batch_depth += 1
+
+func commit_batch():
+	_batch_depth = max(_batch_depth - 1, 0)
+	if _batch_depth == 0:
+		_flush_pending()
+
+func _append(record: Dictionary):
+	_pending.append(record)
+	if _batch_depth == 0:
+		_flush_pending()
+
+func _flush_pending():
+	if _pending.is_empty():
+		return
+	_ensure_cache_dir()
+	
+	var log_path = cache_dir + log_file
+	var file: FileAccess
+	if FileAccess.file_exists(log_path):
+		file = FileAccess.open(log_path, FileAccess.READ_WRITE)
+		if file:
+			file.seek_end()
+	else:
+		file = FileAccess.open(log_path, FileAccess.WRITE)
+	if not file:
+		push_error("[AudioCache] Could not write " + log_path)
+		return
+	
+	var lines = []
+	for record in _pending:
+		lines.append(JSON.stringify(record))
+	file.store_string("\n".join(lines) + "\n")
+	file.flush()
+	file.close()
+	
+	_log_records += _pending.size()
+	_pending.clear()
+	
+	if _log_records > max(COMPACT_MIN_RECORDS, analysis_cache.size() + audio_metadata.size()):
+		compact()
+
+func compact():
+	"""Fold the log into fresh snapshots and start an empty log"""
+	_ensure_loaded()
+	_ensure_cache_dir()
+	_write_snapshot(cache_dir + analysis_cache_file, analysis_cache)
+	_write_snapshot(cache_dir + audio_metadata_file, audio_metadata)
+	
+	var log_path = cache_dir + log_file
+	if FileAccess.file_exists(log_path):
+		DirAccess.remove_absolute(ProjectSettings.globalize_path(log_path))
+	_log_records = 0
+
+func _write_snapshot(path: String, data: Dictionary):
+	# Write next to the snapshot and rename so a crash never leaves it half-written
+	var tmp_path = path + ".tmp"
+	var file = FileAccess.open(tmp_path, FileAccess.WRITE)
+	if file:
+		file.store_string(JSON.stringify(data))
+		file.close()
+		DirAccess.rename_absolute(ProjectSettings.globalize_path(tmp_path), ProjectSettings.globalize_path(path))
 
-func _save_cache():
-	# Ensure cache directory exists
+func _ensure_cache_dir():
 	var cache_dir_path = cache_dir.trim_prefix("res://")
 	var dir = DirAccess.open("res://")
 	if dir and not dir.dir_exists(cache_dir_path):
@@ -97,20 +203,6 @@ func _save_cache():
 			current_path += part + "/"
 			if not dir.dir_exists(current_path):
 				dir.make_dir(current_path)
-	
-	# Save analysis cache
-	var analysis_cache_path = cache_dir + analysis_cache_file
-	var file = FileAccess.open(analysis_cache_path, FileAccess.WRITE)
-	if file:
-		file.store_string(JSON.stringify(analysis_cache))
-		file.close()
-	
-	# Save audio metadata
-	var metadata_path = cache_dir + audio_metadata_file
-	file = FileAccess.open(metadata_path, FileAccess.WRITE)
-	if file:
-		file.store_string(JSON.stringify(audio_metadata))
-		file.close()
 
 func _find_files(root: String, pattern: String) -> Array:
 	var files = []
@@ -133,24 +225,26 @@ func _find_files(root: String, pattern: String) -> Array:
 	return files
 
 func clear_cache():
+	_loaded = true
+	_pending.clear()
 	analysis_cache.clear()
 	audio_metadata.clear()
-	_save_cache()
+	compact()
 
 func clear_stale_entries():
 	"""Remove cache entries for files that no longer exist on disk"""
+	_ensure_loaded()
 	var stale_keys = []
 	for sound_name in audio_metadata.keys():
 		var path = audio_metadata[sound_name].get("path", "")
 		if not path.is_empty() and not FileAccess.file_exists(path):
 			stale_keys.append(sound_name)
 	
+	begin_batch()
 	for key in stale_keys:
 		audio_metadata.erase(key)
+		_append({"table": "audio", "op": "erase", "key": key})
 		print("[AudioCache] Cleared stale entry: ", key)
-	
-	if stale_keys.size() > 0:
-		_save_cache()
+	commit_batch()
 	
 	return stale_keys.size()
-
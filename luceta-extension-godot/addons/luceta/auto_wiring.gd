@@ -294,6 +294,11 @@ func generate_sfx_helper_code() -> String:
 	return """
 # === Agent SFX Helper Function ===
 func _play_sfx(sound: AudioStream):
+	# Pooled playback through the LucetaSfx autoload when the project has it
+	var sfx = get_node_or_null("/root/LucetaSfx")
+	if sfx:
+		sfx.play_stream(sound)
+		return
 	var player = AudioStreamPlayer.new()
 	add_child(player)
 	player.stream = sound
@@ -6,8 +6,16 @@ class_name BackupManager
 
 const BACKUP_DIR = "res://agent_sfx_generated/.backups/"
 const BACKUP_MANIFEST = "res://agent_sfx_generated/.backups/manifest.json"
+const BLOB_DIR = "res://agent_sfx_generated/.backups/blobs/"
+const MANIFEST_VERSION = 2
 
-var backups: Dictionary = {}  # file_path -> backup_path
+# Blobs are keyed by the sha256 of the original content and stored compressed,
+# so identical scripts are kept once. tests/backup_store.py restores the same
+# store headlessly. Entries from the old format (plain copies under a
+# timestamped name, "backup_path") are still restored.
+var backups: Dictionary = {}  # file_path -> {blob, size, compression, timestamp} or legacy {backup_path, ...}
+var _batch_depth: int = 0
+var _batch_dirty: bool = false
 
 func _init():
 	_ensure_backup_dir()
@@ -16,8 +24,8 @@ func _init():
 func _ensure_backup_dir():
 	var dir = DirAccess.open("res://")
 	if dir:
-		if not dir.dir_exists("agent_sfx_generated/.backups"):
-			dir.make_dir_recursive("agent_sfx_generated/.backups")
+		if not dir.dir_exists("agent_sfx_generated/.backups/blobs"):
+			dir.make_dir_recursive("agent_sfx_generated/.backups/blobs")
 
 func _load_manifest():
 	if FileAccess.file_exists(BACKUP_MANIFEST):
@@ -25,14 +33,44 @@ func _load_manifest():
 		if file:
 			var json = JSON.parse_string(file.get_as_text())
 			if json and json is Dictionary:
-				backups = json
+				if json.get("version", 1) >= MANIFEST_VERSION:
+					backups = json.get("files", {})
+				else:
+					backups = json  # Legacy manifest: file_path -> entry at the top level
 			file.close()
 
 func _save_manifest():
-	var file = FileAccess.open(BACKUP_MANIFEST, FileAccess.WRITE)
+	if _batch_depth > 0:
+		_batch_dirty = true
+		return
+	
+	# Write next to the manifest and rename so a crash never leaves it half-written
+	var tmp_path = BACKUP_MANIFEST + ".tmp"
+	var file = FileAccess.open(tmp_path, FileAccess.WRITE)
 	if file:
-		file.store_string(JSON.stringify(backups, "\t"))
+		file.store_string(JSON.stringify({"version": MANIFEST_VERSION, "files": backups}, "\t"))
 		file.close()
+		DirAccess.rename_absolute(ProjectSettings.globalize_path(tmp_path), ProjectSettings.globalize_path(BACKUP_MANIFEST))
+
+func begin_batch():
+	"""Defer manifest writes until the matching commit_batch()"""
+	_batch_depth += 1
+
+func commit_batch():
+	_batch_depth = max(_batch_depth - 1, 0)
+	if _batch_depth == 0 and _batch_dirty:
+		_batch_dirty = false
+		_save_manifest()
+
+func backup_files(file_paths: Array, force: bool = false) -> int:
+	"""Back up many files with a single manifest write. Returns how many are backed up."""
+	var count = 0
+	begin_batch()
+	for file_path in file_paths:
+		if backup_file(file_path, force):
+			count += 1
+	commit_batch()
+	return count
 
 func backup_file(file_path: String, force: bool = false) -> bool:
 	"""Create a backup of a file before modifying it. Set force=true to update existing backup."""
@@ -45,33 +83,75 @@ func backup_file(file_path: String, force: bool = false) -> bool:
 		return true
 	
 	# Read original content
-	var file = FileAccess.open(file_path, FileAccess.READ)
-	if not file:
+	var content = FileAccess.get_file_as_bytes(file_path)
+	if content.is_empty() and FileAccess.get_open_error() != OK:
 		return false
-	var content = file.get_as_text()
-	file.close()
-	
-	# Create backup filename
-	var timestamp = str(Time.get_unix_time_from_system())
-	var backup_name = file_path.get_file().get_basename() + "_" + timestamp + "." + file_path.get_extension()
-	var backup_path = BACKUP_DIR + backup_name
 	
-	# Write backup
-	var backup_file = FileAccess.open(backup_path, FileAccess.WRITE)
-	if not backup_file:
+	var blob = _store_blob(content)
+	if blob.is_empty():
 		return false
-	backup_file.store_string(content)
-	backup_file.close()
 	
 	# Record in manifest
 	backups[file_path] = {
-		"backup_path": backup_path,
-		"timestamp": timestamp,
-		"original_content_hash": content.hash()
+		"blob": blob,
+		"size": content.size(),
+		"compression": "deflate",
+		"timestamp": str(Time.get_unix_time_from_system())
 	}
 	_save_manifest()
 	
-	print("[BackupManager] Backed up: ", file_path, " -> ", backup_path)
+	print("[BackupManager] Backed up: ", file_path, " -> ", blob.substr(0, 12))
+	return true
+
+func _store_blob(content: PackedByteArray) -> String:
+	"""Store content under its sha256 unless an identical blob exists. Returns the hash."""
+	var ctx = HashingContext.new()
+	ctx.start(HashingContext.HASH_SHA256)
+	ctx.update(content)
+	var blob = ctx.finish().hex_encode()
+	
+	var blob_path = _blob_path(blob)
+	if FileAccess.file_exists(blob_path):
+		return blob
+	
+	var tmp_path = blob_path + ".tmp"
+	var file = FileAccess.open(tmp_path, FileAccess.WRITE)
+	if not file:
+		return ""
+	file.store_buffer(content.compress(FileAccess.COMPRESSION_DEFLATE))
+	file.close()
+	DirAccess.rename_absolute(ProjectSettings.globalize_path(tmp_path), ProjectSettings.globalize_path(blob_path))
+	return blob
+
+func _blob_path(blob: String) -> String:
+	return BLOB_DIR + blob + ".deflate"
+
+func _read_backup(backup_info: Dictionary) -> PackedByteArray:
+	"""Original bytes of a backup entry, empty on failure"""
+	if backup_info.has("backup_path"):
+		if not FileAccess.file_exists(backup_info.backup_path):
+			return PackedByteArray()
+		return FileAccess.get_file_as_bytes(backup_info.backup_path)
+	
+	var compressed = FileAccess.get_file_as_bytes(_blob_path(backup_info.get("blob", "")))
+	if compressed.is_empty():
+		return PackedByteArray()
+	var size = int(backup_info.get("size", 0))
+	if size == 0:
+		return PackedByteArray()
+	return compressed.decompress(size, FileAccess.COMPRESSION_DEFLATE)
+
+func _is_complete(backup_info: Dictionary, content: PackedByteArray) -> bool:
+	if backup_info.has("backup_path"):
+		return FileAccess.file_exists(backup_info.backup_path)
+	return content.size() == int(backup_info.get("size", -1))
+
+func _write_file(file_path: String, content: PackedByteArray) -> bool:
+	var file = FileAccess.open(file_path, FileAccess.WRITE)
+	if not file:
+		return false
+	file.store_buffer(content)
+	file.close()
 	return true
 
 func restore_file(file_path: String) -> bool:
@@ -80,24 +160,12 @@ func restore_file(file_path: String) -> bool:
 		return false
 	
 	var backup_info = backups[file_path]
-	var backup_path = backup_info.backup_path
-	
-	if not FileAccess.file_exists(backup_path):
-		return false
-	
-	# Read backup
-	var backup_file = FileAccess.open(backup_path, FileAccess.READ)
-	if not backup_file:
+	var content = _read_backup(backup_info)
+	if not _is_complete(backup_info, content):
 		return false
-	var content = backup_file.get_as_text()
-	backup_file.close()
 	
-	# Write to original location
-	var file = FileAccess.open(file_path, FileAccess.WRITE)
-	if not file:
+	if not _write_file(file_path, content):
 		return false
-	file.store_string(content)
-	file.close()
 	
 	# Remove from manifest
 	backups.erase(file_path)
@@ -116,14 +184,26 @@ func restore_all() -> Dictionary:
 	print("[BackupManager] Starting restore_all...")
 	print("[BackupManager] Files to restore: ", backups.keys())
 	
-	# Restore all script files
+	# Restore all script files in one pass - each blob is decompressed once
+	# and the manifest is written once at the end
+	var decompressed = {}  # blob -> content
+	begin_batch()
 	var files_to_restore = backups.keys().duplicate()
 	for file_path in files_to_restore:
+		var backup_info = backups[file_path]
+		var blob = backup_info.get("blob", "")
+		if not blob.is_empty() and not decompressed.has(blob):
+			decompressed[blob] = _read_backup(backup_info)
+		var content = decompressed[blob] if not blob.is_empty() else _read_backup(backup_info)
+		
 		print("[BackupManager] Restoring: ", file_path)
-		if restore_file(file_path):
+		if _is_complete(backup_info, content) and _write_file(file_path, content):
+			backups.erase(file_path)
+			_batch_dirty = true
 			report.restored.append(file_path)
 		else:
 			report.failed.append(file_path)
+	commit_batch()
 	
 	# Delete ALL generated sound files (mp3 and import files)
 	var gen_dir = DirAccess.open("res://agent_sfx_generated/")
@@ -163,28 +243,27 @@ func restore_all() -> Dictionary:
 	return report
 
 func _cleanup_orphan_backups():
-	"""Remove backup files that are no longer in the manifest"""
-	var dir = DirAccess.open(BACKUP_DIR)
-	if not dir:
-		return
+	"""Remove blobs and legacy backup files that are no longer in the manifest"""
+	var referenced = {}
+	for file_path in backups.keys():
+		var backup_info = backups[file_path]
+		if backup_info.has("backup_path"):
+			referenced[backup_info.backup_path.get_file()] = true
+		else:
+			referenced[backup_info.get("blob", "") + ".deflate"] = true
 	
-	dir.list_dir_begin()
-	var file_name = dir.get_next()
-	while file_name != "":
-		if not dir.current_is_dir() and file_name != "manifest.json":
-			# Check if this backup is still referenced
-			var is_referenced = false
-			for file_path in backups.keys():
-				var backup_info = backups[file_path]
-				if backup_info.backup_path.ends_with(file_name):
-					is_referenced = true
-					break
-			
-			if not is_referenced:
+	for dir_path in [BACKUP_DIR, BLOB_DIR]:
+		var dir = DirAccess.open(dir_path)
+		if not dir:
+			continue
+		dir.list_dir_begin()
+		var file_name = dir.get_next()
+		while file_name != "":
+			if not dir.current_is_dir() and file_name != "manifest.json" and not referenced.has(file_name):
 				dir.remove(file_name)
 				print("[BackupManager] Removed orphan backup: ", file_name)
-		file_name = dir.get_next()
-	dir.list_dir_end()
+			file_name = dir.get_next()
+		dir.list_dir_end()
 
 func has_backups() -> bool:
 	"""Check if there are any backups available"""
@@ -196,15 +275,6 @@ func get_backed_up_files() -> Array:
 
 func clear_backups():
 	"""Clear all backups (use after successful integration)"""
-	var dir = DirAccess.open(BACKUP_DIR)
-	if dir:
-		dir.list_dir_begin()
-		var file_name = dir.get_next()
-		while file_name != "":
-			if not dir.current_is_dir() and file_name != "manifest.json":
-				dir.remove(file_name)
-			file_name = dir.get_next()
-		dir.list_dir_end()
-	
 	backups.clear()
+	_cleanup_orphan_backups()
 	_save_manifest()
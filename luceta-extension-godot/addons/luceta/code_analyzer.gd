@@ -4,13 +4,39 @@ class_name CodeAnalyzer
 
 # Analyzes GDScript files and scene files to extract game events and actions
 # that would benefit from sound effects
+#
+# Every file is analyzed under per-file ceilings (bytes read, milliseconds spent,
+# items produced). A file over a ceiling is quarantined: it contributes no
+# results, is reported after the scan, and is skipped by later scans until it
+# changes. tests/test_analyzer_fuzz.py checks the same ceilings and the linear
+# scaling of the patterns against tests/test_analyzer.py.
 
 signal analysis_complete(results: Dictionary)
 
+const MAX_SCRIPT_BYTES = 4 * 1024 * 1024
+const MAX_SCENE_BYTES = 32 * 1024 * 1024
+const MAX_FILE_MSEC = 2000
+const MAX_ITEMS_PER_FILE = 5000
+const MAX_BODY_CHARS = 4000  # Function bodies never reach past the next function either
+const QUARANTINE_PATH = "res://.godot/luceta_cache/analyzer_quarantine.json"
+
+# Variable-length parts stop at their closing delimiter, at the next opening one,
+# or after a bounded length, so an unterminated "func _x(", "enum STATE {" or
+# name=" costs at most that bound instead of a scan to the end of the file.
+const FUNC_PATTERN = "func\\s+(_[a-zA-Z_][a-zA-Z0-9_]*|on_[a-zA-Z_][a-zA-Z0-9_]*)\\s*\\([^()]{0,1024}[()]"
+const SIGNAL_PATTERN = "signal\\s+([a-zA-Z_][a-zA-Z0-9_]*)"
+const STATE_PATTERN = "enum\\s+STATE\\s*\\{[^{}]{0,8192}\\}"
+const DIALOG_PATTERN = "\\[node name=\"([^\"\\n]{1,1024})\" type=\"RichTextLabel\""
+const DIALOG_TEXT_PATTERN = "text = \"([^\"]+)\""
+const CONNECTION_PATTERN = "\\[connection signal=\"([^\"\\n]{1,1024})\""
+
 var project_path: String
+var quarantined: Array = []  # {"file", "reason", "bytes", "msec", "mtime"} for files over a ceiling
 
 func analyze_project(project_root: String):
 	project_path = project_root
+	quarantined = []
+	var known = _load_quarantine()
 	var results = {
 		"events": [],
 		"actions": [],
@@ -22,6 +48,8 @@ func analyze_project(project_root: String):
 	# Scan all .gd files
 	var gd_files = _find_files(project_root, "*.gd")
 	for file_path in gd_files:
+		if _still_quarantined(file_path, known):
+			continue
 		var file_results = _analyze_gd_file(file_path)
 		results.events.append_array(file_results.events)
 		results.actions.append_array(file_results.actions)
@@ -31,10 +59,16 @@ func analyze_project(project_root: String):
 	# Scan all .tscn files
 	var tscn_files = _find_files(project_root, "*.tscn")
 	for file_path in tscn_files:
+		if _still_quarantined(file_path, known):
+			continue
 		var scene_results = _analyze_scene_file(file_path)
 		results.dialogs.append_array(scene_results.dialogs)
 		results.signals.append_array(scene_results.signals)
 	
+	_save_quarantine()
+	for entry in quarantined:
+		push_warning("[CodeAnalyzer] Quarantined %s: %s" % [entry.file, entry.reason])
+	
 	analysis_complete.emit(results)
 	return results
 
@@ -66,24 +100,23 @@ func _analyze_gd_file(file_path: String) -> Dictionary:
 		"signals": []
 	}
 	
-	var file = FileAccess.open(file_path, FileAccess.READ)
-	if not file:
+	var content = _read(file_path, MAX_SCRIPT_BYTES)
+	if content.is_empty():
 		return results
-	
-	var content = file.get_as_text()
-	file.close()
+	var started = Time.get_ticks_msec()
+	var items = 0
 	
 	# Extract function names that might need sounds
-	var regex = RegEx.new()
-	regex.compile("func\\s+(_[a-zA-Z_][a-zA-Z0-9_]*|on_[a-zA-Z_][a-zA-Z0-9_]*)\\([^)]*\\)")
+	var regex = RegEx.create_from_string(FUNC_PATTERN)
 	
 	var matches = regex.search_all(content)
-	for match in matches:
-		var func_name = match.get_string()
-		func_name = func_name.replace("func ", "").split("(")[0]
+	for i in matches.size():
+		var match = matches[i]
+		var func_name = match.get_string(1)
 		
 		# Check if function contains audio-related code
-		var func_body = _extract_function_body(content, func_name)
+		var end = matches[i + 1].get_start() if i + 1 < matches.size() else content.length()
+		var func_body = _extract_function_body(content, match.get_start(), mini(end, match.get_start() + MAX_BODY_CHARS))
 		if func_body:
 			if _has_audio_play(func_body) or _is_action_function(func_name, func_body):
 				var event = {
@@ -94,9 +127,12 @@ func _analyze_gd_file(file_path: String) -> Dictionary:
 					"sound_hint": _infer_sound_type(func_name, func_body)
 				}
 				results.events.append(event)
+				items += 1
+		if _over_ceiling(file_path, started, items):
+			return {"events": [], "actions": [], "interactions": [], "signals": []}
 	
 	# Extract signal connections
-	regex.compile("signal\\s+([a-zA-Z_][a-zA-Z0-9_]*)")
+	regex = RegEx.create_from_string(SIGNAL_PATTERN)
 	matches = regex.search_all(content)
 	for match in matches:
 		var signal_name = match.get_string(1)
@@ -105,10 +141,12 @@ func _analyze_gd_file(file_path: String) -> Dictionary:
 			"name": signal_name,
 			"file": file_path
 		})
+		items += 1
+		if _over_ceiling(file_path, started, items):
+			return {"events": [], "actions": [], "interactions": [], "signals": []}
 	
 	# Extract state machines
-	var state_pattern = RegEx.create_from_string("enum\\s+STATE\\s*\\{[^}]*\\}")
-	regex.compile("enum\\s+STATE\\s*\\{[^}]*\\}")
+	regex = RegEx.create_from_string(STATE_PATTERN)
 	matches = regex.search_all(content)
 	for match in matches:
 		var enum_content = match.get_string()
@@ -120,6 +158,9 @@ func _analyze_gd_file(file_path: String) -> Dictionary:
 				"file": file_path,
 				"sound_hint": _infer_sound_from_state(state)
 			})
+		items += states.size()
+		if _over_ceiling(file_path, started, items):
+			return {"events": [], "actions": [], "interactions": [], "signals": []}
 	
 	# Extract area/collision interactions
 	if "Area2D" in content or "CollisionShape2D" in content:
@@ -138,33 +179,28 @@ func _analyze_scene_file(file_path: String) -> Dictionary:
 		"signals": []
 	}
 	
-	var file = FileAccess.open(file_path, FileAccess.READ)
-	if not file:
+	var content = _read(file_path, MAX_SCENE_BYTES)
+	if content.is_empty():
 		return results
-	
-	var content = file.get_as_text()
-	file.close()
+	var started = Time.get_ticks_msec()
+	var items = 0
 	
 	# Extract RichTextLabel nodes (dialogs)
-	var regex = RegEx.new()
-	regex.compile("\\[node name=\"([^\"]+)\" type=\"RichTextLabel\"")
+	var regex = RegEx.create_from_string(DIALOG_PATTERN)
+	var text_match = RegEx.create_from_string(DIALOG_TEXT_PATTERN)
 	
 	var matches = regex.search_all(content)
 	for match in matches:
 		var node_name = match.get_string(1)
-		# Try to extract text content
-		var text_match = RegEx.new()
-		text_match.compile("text = \"([^\"]+)\"")
-		var text_matches = text_match.search_all(content)
+		# Try to extract text content from the section after this node definition
 		var dialog_text = ""
-		if text_matches.size() > 0:
-			# Find text after this node definition
-			var node_start = content.find("[node name=\"" + node_name + "\"")
-			if node_start >= 0:
-				var node_section = content.substr(node_start, 500)
-				var text_result = text_match.search(node_section)
-				if text_result:
-					dialog_text = text_result.get_string(1)
+		var node_section = content.substr(match.get_start(), 500)
+		var next_section = node_section.find("\n[")
+		if next_section != -1:
+			node_section = node_section.substr(0, next_section)
+		var text_result = text_match.search(node_section)
+		if text_result:
+			dialog_text = text_result.get_string(1)
 		
 		results.dialogs.append({
 			"type": "dialog",
@@ -172,10 +208,12 @@ func _analyze_scene_file(file_path: String) -> Dictionary:
 			"file": file_path,
 			"text": dialog_text
 		})
+		items += 1
+		if _over_ceiling(file_path, started, items):
+			return {"dialogs": [], "signals": []}
 	
 	# Extract signal connections
-	var connection_pattern = RegEx.create_from_string("\\[connection signal=\"([^\"]+)\"")
-	regex.compile("\\[connection signal=\"([^\"]+)\"")
+	regex = RegEx.create_from_string(CONNECTION_PATTERN)
 	matches = regex.search_all(content)
 	for match in matches:
 		var signal_name = match.get_string(1)
@@ -184,17 +222,105 @@ func _analyze_scene_file(file_path: String) -> Dictionary:
 			"name": signal_name,
 			"file": file_path
 		})
+		items += 1
+		if _over_ceiling(file_path, started, items):
+			return {"dialogs": [], "signals": []}
 	
 	return results
 
-func _extract_function_body(content: String, func_name: String) -> String:
-	var func_start = content.find("func " + func_name)
-	if func_start == -1:
+func _read(file_path: String, max_bytes: int) -> String:
+	"""File text, or "" when unreadable or over the byte ceiling (checked before reading)"""
+	var file = FileAccess.open(file_path, FileAccess.READ)
+	if not file:
 		return ""
-	
-	var start = content.find("{", func_start)
+	var size = file.get_length()
+	if size > max_bytes:
+		file.close()
+		_quarantine(file_path, "%d bytes, over the %d byte ceiling" % [size, max_bytes], 0)
+		return ""
+	var content = file.get_as_text()
+	file.close()
+	return content
+
+func _over_ceiling(file_path: String, started: int, items: int) -> bool:
+	var elapsed = Time.get_ticks_msec() - started
+	if items > MAX_ITEMS_PER_FILE:
+		_quarantine(file_path, "more than %d items" % MAX_ITEMS_PER_FILE, elapsed)
+		return true
+	if elapsed > MAX_FILE_MSEC:
+		_quarantine(file_path, "over the %d ms time ceiling" % MAX_FILE_MSEC, elapsed)
+		return true
+	return false
+
+func _quarantine(file_path: String, reason: String, msec: int):
+	quarantined.append({
+		"file": file_path,
+		"reason": reason,
+		"bytes": _file_size(file_path),
+		"msec": msec,
+		"mtime": FileAccess.get_modified_time(file_path)
+	})
+
+func _file_size(file_path: String) -> int:
+	var file = FileAccess.open(file_path, FileAccess.READ)
+	if not file:
+		return 0
+	var size = file.get_length()
+	file.close()
+	return size
+
+func _rel(file_path: String) -> String:
+	return file_path.trim_prefix(project_path).lstrip("/")
+
+func _load_quarantine() -> Dictionary:
+	"""Entries of earlier scans by project-relative path"""
+	if not FileAccess.file_exists(QUARANTINE_PATH):
+		return {}
+	var file = FileAccess.open(QUARANTINE_PATH, FileAccess.READ)
+	if not file:
+		return {}
+	var data = JSON.parse_string(file.get_as_text())
+	file.close()
+	if data is Dictionary and data.get("files") is Dictionary:
+		return data.files
+	return {}
+
+func _still_quarantined(file_path: String, known: Dictionary) -> bool:
+	"""Quarantined by an earlier scan and unchanged since; carried over without re-reading it"""
+	var entry = known.get(_rel(file_path))
+	if not entry is Dictionary:
+		return false
+	if int(entry.get("bytes", -1)) != _file_size(file_path) or int(entry.get("mtime", -1)) != FileAccess.get_modified_time(file_path):
+		return false
+	var carried = entry.duplicate()
+	carried["file"] = file_path
+	quarantined.append(carried)
+	return true
+
+func _save_quarantine():
+	if quarantined.is_empty() and not FileAccess.file_exists(QUARANTINE_PATH):
+		return
+	var files = {}
+	for entry in quarantined:
+		var stored = entry.duplicate()
+		stored.erase("file")
+		files[_rel(entry.file)] = stored
+	var dir_path = QUARANTINE_PATH.get_base_dir()
+	if not DirAccess.dir_exists_absolute(dir_path):
+		DirAccess.make_dir_recursive_absolute(ProjectSettings.globalize_path(dir_path))
+	var file = FileAccess.open(QUARANTINE_PATH, FileAccess.WRITE)
+	if not file:
+		push_error("[CodeAnalyzer] Could not write " + QUARANTINE_PATH)
+		return
+	file.store_string(JSON.stringify({"version": 1, "files": files}, "  "))
+	file.close()
+
+func _extract_function_body(content: String, func_start: int, end: int) -> String:
+	"""Body of the function declared at func_start, never read past end"""
+	var span = content.substr(func_start, end - func_start)
+	var start = span.find("{")
 	if start == -1:
-		start = content.find(":", func_start)
+		start = span.find(":")
 		if start == -1:
 			return ""
 		start += 1
@@ -204,8 +330,8 @@ func _extract_function_body(content: String, func_name: String) -> String:
 	var string_char = ""
 	var i = start
 	
-	while i < content.length():
-		var char = content[i]
+	while i < span.length():
+		var char = span[i]
 		
 		if not in_string:
 			if char == "\"" or char == "'":
@@ -215,15 +341,15 @@ func _extract_function_body(content: String, func_name: String) -> String:
 				depth += 1
 			elif char == "}":
 				if depth == 0:
-					return content.substr(start, i - start)
+					return span.substr(start, i - start)
 				depth -= 1
 		else:
-			if char == string_char and content[i-1] != "\\":
+			if char == string_char and span[i-1] != "\\":
 				in_string = false
 		
 		i += 1
 	
-	return content.substr(start)
+	return span.substr(start)
 
 func _has_audio_play(body: String) -> bool:
 	return ".play()" in body or "AudioStreamPlayer" in body or "SFX" in body or "play_sound" in body.to_lower()
@@ -252,23 +378,7 @@ func _extract_context(body: String) -> String:
 	return "\n".join(context_lines)
 
 func _infer_sound_type(func_name: String, body: String) -> String:
-	var name_lower = func_name.to_lower()
-	var body_lower = body.to_lower()
-	
-	if "walk" in name_lower or "step" in name_lower or "move" in name_lower:
-		return "footstep"
-	elif "jump" in name_lower:
-		return "jump"
-	elif "attack" in name_lower or "chop" in name_lower or "hit" in name_lower:
-		return "attack"
-	elif "collect" in name_lower or "pickup" in name_lower or "coin" in name_lower:
-		return "collect"
-	elif "area_entered" in name_lower or "body_entered" in name_lower:
-		return "interaction"
-	elif "dialog" in name_lower or "speak" in name_lower:
-		return "dialog"
-	else:
-		return "generic"
+	return SoundTaxonomy.classify(func_name).hint
 
 func _extract_enum_values(enum_content: String) -> Array:
 	var values = []
@@ -280,13 +390,4 @@ func _extract_enum_values(enum_content: String) -> Array:
 	return values
 
 func _infer_sound_from_state(state: String) -> String:
-	var state_lower = state.to_lower()
-	if "walk" in state_lower or "run" in state_lower:
-		return "footstep"
-	elif "attack" in state_lower or "chop" in state_lower:
-		return "attack"
-	elif "jump" in state_lower:
-		return "jump"
-	else:
-		return "state_transition"
-
+	return SoundTaxonomy.classify(state).state_hint
@@ -3,6 +3,8 @@ extends Control
 
 # Main editor dock for Luceta - Enhanced with retry, custom prompts, and revert
 
+const ATLAS_INDEX_PATH = "res://luceta_generated/atlas/sfx_atlas.json"  # Written by tests/sfx_atlas.py
+
 var analyze_button: Button
 var revert_button: Button
 var progress_label: Label
@@ -24,6 +26,11 @@ var audio_cache: AudioCache
 var auto_wiring: AutoWiring
 var sound_integrator: SoundIntegrator
 var backup_manager: BackupManager
+var generation_journal: GenerationJournal
+var generation_scheduler: GenerationScheduler
+var warm_pool: WarmPool
+var adaptive_controller: AdaptiveController
+var import_coordinator: ImportCoordinator
 
 var analysis_results: Dictionary = {}
 var sound_suggestions: Array = []
@@ -35,8 +42,7 @@ var generation_queue: Array = []
 var currently_generating: Dictionary = {}
 var generated_files: Array = []
 var is_generating: bool = false
-var retry_count: int = 0
-const MAX_RETRIES = 3
+var request_started_msec: int = 0
 
 func _initialize(p: EditorPlugin):
 	plugin = p
@@ -47,6 +53,10 @@ func _initialize(p: EditorPlugin):
 	auto_wiring = AutoWiring.new()
 	sound_integrator = SoundIntegrator.new()
 	backup_manager = BackupManager.new()
+	generation_journal = GenerationJournal.new()
+	adaptive_controller = AdaptiveController.new()
+	generation_scheduler = GenerationScheduler.new(adaptive_controller)
+	import_coordinator = ImportCoordinator.new()
 	
 	_setup_ui_references()
 	_setup_http_requests()
@@ -54,6 +64,8 @@ func _initialize(p: EditorPlugin):
 	_load_api_keys()
 	
 	audio_generator.set_output_directory("res://luceta_generated/")
+	audio_generator.import_coordinator = import_coordinator
+	audio_generator.adaptive_controller = adaptive_controller
 	
 	# Clear any stale cache entries for deleted files
 	var cleared = audio_cache.clear_stale_entries()
@@ -185,6 +197,7 @@ func _perform_revert():
 	
 	# Clear in-memory caches
 	audio_cache.clear_cache()
+	generation_journal.clear()
 	sound_suggestions.clear()
 	generated_files.clear()
 	generation_queue.clear()
@@ -204,8 +217,9 @@ func _perform_revert():
 	if review_panel:
 		review_panel.visible = false
 	
-	# Refresh filesystem
-	EditorInterface.get_resource_filesystem().scan()
+	# Restored scripts and deleted sounds: one full rescan
+	import_coordinator.queue_all(report.restored)
+	import_coordinator.request_scan()
 	
 	# Show success dialog
 	var dialog = AcceptDialog.new()
@@ -507,6 +521,14 @@ func _create_suggestion_item(suggestion: Dictionary, index: int) -> Control:
 		regen_btn.pressed.connect(func(): _regenerate_single(index))
 		btn_hbox.add_child(regen_btn)
 	
+	var pin_btn = Button.new()
+	pin_btn.text = "📌"
+	pin_btn.toggle_mode = true
+	pin_btn.button_pressed = suggestion.get("pinned", false)
+	pin_btn.tooltip_text = "Pin: generate before everything else"
+	pin_btn.toggled.connect(func(pressed): sound_suggestions[index]["pinned"] = pressed)
+	btn_hbox.add_child(pin_btn)
+	
 	var remove_btn = Button.new()
 	remove_btn.text = "🗑"
 	remove_btn.tooltip_text = "Remove"
@@ -543,10 +565,10 @@ func _regenerate_single(index: int):
 		if FileAccess.file_exists(old_path + ".import"):
 			DirAccess.remove_absolute(ProjectSettings.globalize_path(old_path + ".import"))
 	
-	# Add to queue and generate
+	# Add to queue with a fresh retry budget and generate
+	generation_journal.enqueue(suggestion, true)
 	generation_queue = [suggestion]
 	generated_files.clear()
-	retry_count = 0
 	progress_label.text = "🔄 Regenerating: " + sound_name
 	_generate_next_audio()
 
@@ -594,30 +616,58 @@ func _on_generate_pressed():
 	generation_queue.clear()
 	generated_files.clear()
 	is_generating = false  # Reset flag to ensure we can start fresh
-	retry_count = 0
 	
 	# Ensure output directory exists
 	var dir = DirAccess.open("res://")
 	if dir and not dir.dir_exists("luceta_generated"):
 		dir.make_dir("luceta_generated")
 	
-	# Check each suggestion - verify file actually exists on disk, not just in cache
+	# Resume from the journal - a sound only counts as generated if the file on
+	# disk still matches the hash recorded when it was written, and it was made
+	# from the description suggested now. Then the warm pool: a pre-generated
+	# take of the same (or nearly the same) description is copied instead
+	var pending = []
+	var pool_hits = 0
+	warm_pool = WarmPool.new()  # Re-read every run, warm_pool.py fills it in the background
 	for suggestion in sound_suggestions:
 		var sound_name = suggestion.get("name", "")
-		var audio_path = "res://luceta_generated/" + sound_name + ".mp3"
+		var pool_path = audio_generator.get_output_path(sound_name)
 		
-		# Check if file actually exists on disk (not just in cache)
-		if FileAccess.file_exists(audio_path):
-			generated_files.append(audio_path)
+		if generation_journal.is_done(sound_name, suggestion.get("description", "")):
+			generated_files.append(generation_journal.get_path(sound_name))
 			print("[Luceta] Skipping already generated: ", sound_name)
+		elif warm_pool.take(suggestion, pool_path):
+			generation_journal.enqueue(suggestion)
+			generation_journal.mark_done(sound_name, pool_path)
+			audio_cache.save_audio_metadata(sound_name, pool_path, suggestion.get("description", ""))
+			import_coordinator.queue(pool_path)
+			generated_files.append(pool_path)
+			pool_hits += 1
+			print("[Luceta] Warm pool hit: ", sound_name)
 		else:
 			# Clear stale cache entry if file doesn't exist
 			if audio_cache.is_audio_generated(sound_name):
 				print("[Luceta] Clearing stale cache for: ", sound_name)
-			generation_queue.append(suggestion)
+			pending.append(suggestion)
+	if pool_hits > 0:
+		warm_pool.save()
+	
+	# Pinned and gameplay-critical sounds first, long loops last; the credit
+	# budget (0 = none) defers the lowest-priority sounds
+	var schedule = generation_scheduler.plan(pending, float(ProjectSettings.get_setting("luceta/credit_budget", 0)))
+	for suggestion in schedule.queue:
+		generation_journal.enqueue(suggestion)
+		generation_queue.append(suggestion)
+	for suggestion in schedule.deferred:
+		print("[Luceta] Deferred by credit budget: ", suggestion.get("name", ""))
+	if progress_bar:
+		progress_bar.max_value = sound_suggestions.size() - schedule.deferred.size()
 	
 	if generation_queue.is_empty():
-		progress_label.text = "✅ All sounds already generated!"
+		if not schedule.deferred.is_empty():
+			progress_label.text = "⏸ " + str(schedule.deferred.size()) + " sounds deferred by the credit budget"
+		else:
+			progress_label.text = "✅ All sounds already generated!"
 		generate_button.disabled = false
 		if progress_bar:
 			progress_bar.visible = false
@@ -625,7 +675,9 @@ func _on_generate_pressed():
 			integrate_button.disabled = false
 		return
 	
-	print("[Luceta] Starting generation of ", generation_queue.size(), " sounds")
+	print("[Luceta] Starting generation of ", generation_queue.size(), " sounds (", schedule.critical, " critical, ~",
+		int(schedule.credits), " credits, critical sounds in ~", int(schedule.critical_seconds), "s, ",
+		schedule.deferred.size(), " deferred)")
 	_generate_next_audio()
 
 
@@ -645,7 +697,6 @@ func _generate_next_audio():
 	is_generating = true
 	var suggestion = generation_queue.pop_front()
 	currently_generating = suggestion
-	retry_count = 0
 	
 	var sound_name = suggestion.get("name", "unknown")
 	var description = suggestion.get("description", "")
@@ -653,79 +704,87 @@ func _generate_next_audio():
 	print("[Luceta] Generating: ", sound_name, " - ", description.substr(0, 50))
 	progress_label.text = "🎵 Generating: " + sound_name
 	if progress_bar:
-		progress_bar.value = sound_suggestions.size() - generation_queue.size()
+		progress_bar.value = progress_bar.max_value - generation_queue.size()
 	
-	audio_generator.generate_sound_effect(suggestion, elevenlabs_request)
+	_request_current_sound()
+
+func _request_current_sound():
+	var sound_name = currently_generating.get("name", "unknown")
+	generation_journal.mark_in_flight(sound_name, audio_generator.get_output_path(sound_name))
+	request_started_msec = Time.get_ticks_msec()
+	audio_generator.generate_sound_effect(currently_generating, elevenlabs_request)
+
+func _retry_or_skip(sound_name: String, error_message: String, retry_text: String, failed_text: String, retry_after: float = 0.0):
+	"""Record the failed attempt and retry while the journal allows it, else move on"""
+	generation_journal.mark_failed(sound_name, error_message)
+	var attempts = generation_journal.get_attempts(sound_name)
+	if generation_journal.should_retry(sound_name):
+		progress_label.text = "⚠️ " + retry_text + " " + sound_name + " (" + str(attempts) + "/" + str(GenerationJournal.MAX_ATTEMPTS) + ")"
+		await get_tree().create_timer(adaptive_controller.backoff(AdaptiveController.SOUND_ENDPOINT, attempts, retry_after)).timeout
+		_request_current_sound()
+	else:
+		push_error("[Luceta] Failed after " + str(GenerationJournal.MAX_ATTEMPTS) + " attempts: " + sound_name)
+		progress_label.text = "❌ " + failed_text + ": " + sound_name
+		is_generating = false
+		await get_tree().create_timer(adaptive_controller.spacing(AdaptiveController.SOUND_ENDPOINT)).timeout
+		_generate_next_audio()
 
 func _on_elevenlabs_request_completed(result: int, response_code: int, headers: PackedStringArray, body: PackedByteArray):
 	var sound_name = currently_generating.get("name", "unknown")
+	var status = response_code if result == HTTPRequest.RESULT_SUCCESS else 0
+	adaptive_controller.record(AdaptiveController.SOUND_ENDPOINT, audio_generator.request_duration,
+		(Time.get_ticks_msec() - request_started_msec) / 1000.0, status, body.size() if status == 200 else 0,
+		_header_float(headers, "character-cost", -1.0))
 	
 	# Check for errors and retry
-	if result != HTTPRequest.RESULT_SUCCESS or response_code != 200:
-		retry_count += 1
-		if retry_count < MAX_RETRIES:
-			progress_label.text = "⚠️ Retrying " + sound_name + " (" + str(retry_count) + "/" + str(MAX_RETRIES) + ")"
-			await get_tree().create_timer(2.0).timeout
-			audio_generator.generate_sound_effect(currently_generating, elevenlabs_request)
-			return
-		else:
-			push_error("[Luceta] Failed after " + str(MAX_RETRIES) + " retries: " + sound_name)
-			progress_label.text = "❌ Failed: " + sound_name
-			is_generating = false
-			await get_tree().create_timer(1.0).timeout
-			_generate_next_audio()
-			return
+	if status != 200:
+		_retry_or_skip(sound_name, "HTTP result " + str(result) + ", code " + str(response_code), "Retrying", "Failed",
+			_header_float(headers, "retry-after", 0.0))
+		return
 	
 	# Validate response body before saving
 	if body.size() < 100:
 		push_error("[Luceta] Response too small, likely corrupted: " + sound_name + " (" + str(body.size()) + " bytes)")
-		retry_count += 1
-		if retry_count < MAX_RETRIES:
-			progress_label.text = "⚠️ Corrupted response, retrying " + sound_name + " (" + str(retry_count) + "/" + str(MAX_RETRIES) + ")"
-			await get_tree().create_timer(2.0).timeout
-			audio_generator.generate_sound_effect(currently_generating, elevenlabs_request)
-			return
-		else:
-			progress_label.text = "❌ Failed (corrupted): " + sound_name
-			is_generating = false
-			await get_tree().create_timer(1.0).timeout
-			_generate_next_audio()
-			return
+		_retry_or_skip(sound_name, "Response too small (" + str(body.size()) + " bytes)", "Corrupted response, retrying", "Failed (corrupted)")
+		return
 	
 	# Check for valid MP3 header (ID3 tag or MP3 frame sync)
 	if not _is_valid_mp3(body):
 		push_error("[Luceta] Invalid MP3 data for: " + sound_name)
-		retry_count += 1
-		if retry_count < MAX_RETRIES:
-			progress_label.text = "⚠️ Invalid audio, retrying " + sound_name + " (" + str(retry_count) + "/" + str(MAX_RETRIES) + ")"
-			await get_tree().create_timer(2.0).timeout
-			audio_generator.generate_sound_effect(currently_generating, elevenlabs_request)
-			return
-		else:
-			progress_label.text = "❌ Failed (invalid audio): " + sound_name
-			is_generating = false
-			await get_tree().create_timer(1.0).timeout
-			_generate_next_audio()
-			return
+		_retry_or_skip(sound_name, "Invalid MP3 data", "Invalid audio, retrying", "Failed (invalid audio)")
+		return
 	
 	var file_path = audio_generator.handle_response(sound_name, response_code, body, "sfx")
 	
 	if not file_path.is_empty():
 		# Verify the file was written correctly
 		if _verify_saved_file(file_path, body.size()):
+			generation_journal.mark_done(sound_name, file_path)
+			adaptive_controller.record_audible(sound_name + " " + currently_generating.get("description", ""),
+				audio_generator.request_duration, body)
 			generated_files.append(file_path)
 			audio_cache.save_audio_metadata(sound_name, file_path, currently_generating.get("description", ""))
 			progress_label.text = "✅ Saved: " + sound_name
 		else:
+			generation_journal.mark_failed(sound_name, "File verification failed")
 			push_error("[Luceta] File verification failed: " + file_path)
 			progress_label.text = "⚠️ Save verification failed: " + sound_name
 	
-	# Wait longer between requests to ensure file is fully written and API rate limits are respected
-	progress_label.text = "⏳ Waiting before next sound..."
-	await get_tree().create_timer(1.5).timeout
+	# The file is verified above; only pause when the API recently rate-limited us
+	var spacing = adaptive_controller.spacing(AdaptiveController.SOUND_ENDPOINT)
+	if spacing > 0.0:
+		progress_label.text = "⏳ Waiting before next sound..."
+	await get_tree().create_timer(spacing).timeout
 	is_generating = false
 	_generate_next_audio()
 
+func _header_float(headers: PackedStringArray, header_name: String, default: float) -> float:
+	"""Numeric value of a response header (case-insensitive), or default"""
+	for header in headers:
+		if header.to_lower().begins_with(header_name + ":"):
+			return header.get_slice(":", 1).strip_edges().to_float()
+	return default
+
 func _is_valid_mp3(data: PackedByteArray) -> bool:
 	"""Check if the data starts with a valid MP3 header (ID3 tag or MP3 frame sync)"""
 	if data.size() < 3:
@@ -764,6 +823,10 @@ func _on_generation_progress(current: int, total: int, sound_name: String):
 	progress_label.text = "Generating: " + sound_name
 
 func _on_generation_complete(all_files: Array):
+	import_coordinator.flush()
+	var models = adaptive_controller.describe()
+	if not models.is_empty():
+		print("[Luceta] Request models:\n", models)
 	progress_label.text = "✅ Generated " + str(all_files.size()) + " sounds!"
 	generate_button.disabled = false
 	if progress_bar:
@@ -774,11 +837,26 @@ func _on_generation_complete(all_files: Array):
 
 func _on_generation_error(sound_name: String, error_message: String):
 	push_error("[Luceta] " + sound_name + ": " + error_message)
+	generation_journal.mark_failed(sound_name, error_message)
 	is_generating = false
-	await get_tree().create_timer(1.0).timeout
+	await get_tree().create_timer(adaptive_controller.spacing(AdaptiveController.SOUND_ENDPOINT)).timeout
 	_generate_next_audio()
 
 
+func _load_atlas_slices() -> Dictionary:
+	"""Original res:// path -> [atlas id, offset, length] for every sound packed into an atlas"""
+	if not FileAccess.file_exists(ATLAS_INDEX_PATH):
+		return {}
+	var file = FileAccess.open(ATLAS_INDEX_PATH, FileAccess.READ)
+	if not file:
+		return {}
+	var index = JSON.parse_string(file.get_as_text())
+	file.close()
+	if index is Dictionary and index.get("slices") is Dictionary:
+		return index.slices
+	return {}
+
+
 func _on_integrate_pressed():
 	if sound_suggestions.is_empty():
 		progress_label.text = "❌ No sounds to integrate"
@@ -789,15 +867,19 @@ func _on_integrate_pressed():
 		integrate_button.disabled = true
 	
 	var sound_mappings = []
+	var atlas_slices = _load_atlas_slices()
+	audio_cache.begin_batch()
 	for suggestion in sound_suggestions:
 		var sound_name = suggestion.get("name", "")
 		var audio_path = audio_cache.get_audio_path(sound_name)
 		
 		# Also check directly in the generated folder
-		if audio_path.is_empty() or not ResourceLoader.exists(audio_path):
+		if audio_path.is_empty() or not (ResourceLoader.exists(audio_path) or atlas_slices.has(audio_path)):
 			audio_path = "res://luceta_generated/" + sound_name + ".mp3"
 		
-		if ResourceLoader.exists(audio_path):
+		# One-shots packed by tests/sfx_atlas.py keep their original path; LucetaSfx
+		# resolves it to the atlas slice
+		if ResourceLoader.exists(audio_path) or atlas_slices.has(audio_path):
 			sound_mappings.append({
 				"name": sound_name,
 				"path": audio_path,
@@ -805,6 +887,7 @@ func _on_integrate_pressed():
 			})
 			# Update cache
 			audio_cache.save_audio_metadata(sound_name, audio_path, suggestion.get("description", ""))
+	audio_cache.commit_batch()
 	
 	if sound_mappings.is_empty():
 		progress_label.text = "❌ No generated sounds found to integrate"
@@ -814,15 +897,20 @@ func _on_integrate_pressed():
 	
 	# Backup files before modifying
 	var script_files = _find_script_files("res://")
-	for file_path in script_files:
-		backup_manager.backup_file(file_path)
+	backup_manager.backup_files(script_files)
 	
 	# Perform integration
 	var report = sound_integrator.integrate_sounds(sound_mappings, "res://")
+	if report.sfx_autoload:
+		SfxAutoload.register(plugin)
 	
 	if report.sounds_integrated.size() > 0:
 		progress_label.text = "✅ Integrated " + str(report.sounds_integrated.size()) + " sounds!"
-		EditorInterface.get_resource_filesystem().scan()
+		import_coordinator.queue_all(report.files_modified)
+		if report.sfx_autoload:
+			import_coordinator.queue(SfxAutoload.SCRIPT_PATH)
+			import_coordinator.queue(SfxAutoload.REGISTRY_PATH)
+		import_coordinator.flush()
 		_update_revert_button()
 		_show_integration_dialog(report)
 	elif report.skipped.size() > 0:
@@ -871,10 +959,10 @@ func _show_integration_dialog(report: Dictionary):
 func _show_manual_help(mappings: Array):
 	var dialog = AcceptDialog.new()
 	dialog.title = "Manual Integration"
-	var msg = "Add this code to your scripts:\n\n"
+	var msg = "Add these calls where the sounds should play:\n\n"
 	for m in mappings:
-		msg += "var " + m.name + "_sfx = load(\"" + m.path + "\")\n"
-	msg += "\nThen call: _play_sfx(sound_sfx)"
+		msg += SfxAutoload.play_call(m.name) + "\n"
+	msg += "\n" + SfxAutoload.AUTOLOAD_NAME + " pools the players and limits overlapping voices."
 	dialog.dialog_text = msg
 	dialog.confirmed.connect(func(): dialog.queue_free())
 	add_child(dialog)
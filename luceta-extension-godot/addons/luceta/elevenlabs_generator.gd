@@ -12,6 +12,11 @@ signal generation_error(sound_name: String, error_message: String)
 var api_key: String = ""
 var base_url: String = "https://api.elevenlabs.io/v1"
 var output_directory: String = "res://luceta_generated/"
+# Saved files reach the editor in debounced batches; the dock shares its coordinator
+var import_coordinator: ImportCoordinator = ImportCoordinator.new()
+# Picks request durations from recorded stats; the dock shares its controller
+var adaptive_controller: AdaptiveController = AdaptiveController.new()
+var request_duration: float = 0.0  # duration_seconds of the sound request in flight
 
 func set_api_key(key: String):
 	api_key = key
@@ -46,9 +51,10 @@ func generate_sound_effect(sound_data: Dictionary, http_request: HTTPRequest) ->
 		"Content-Type: application/json"
 	]
 	
+	request_duration = _estimate_duration(description, sound_name)
 	var request_data = {
 		"text": description,
-		"duration_seconds": _estimate_duration(description),
+		"duration_seconds": request_duration,
 		"prompt_influence": 0.3
 	}
 	
@@ -183,17 +189,7 @@ func handle_response(sound_name: String, response_code: int, body: PackedByteArr
 		generation_error.emit(sound_name, "Response too small - likely corrupted (" + str(body.size()) + " bytes)")
 		return ""
 	
-	# Determine file path based on audio type
-	var subdir = ""
-	match audio_type:
-		"dialog":
-			subdir = "dialog/"
-		"music", "bgm":
-			subdir = "music/"
-		_:
-			subdir = ""  # Sound effects go to root
-	
-	var file_path = output_directory + subdir + sound_name + ".mp3"
+	var file_path = get_output_path(sound_name, audio_type)
 	var global_path = ProjectSettings.globalize_path(file_path)
 	
 	print("[Luceta] Saving to res path: ", file_path)
@@ -247,43 +243,27 @@ func handle_response(sound_name: String, response_code: int, body: PackedByteArr
 	
 	print("[Luceta] Successfully saved: ", file_path)
 	
-	# Import the resource so Godot recognizes it
-	EditorInterface.get_resource_filesystem().scan()
+	# Queue the import; one batched update replaces a full rescan per sound
+	import_coordinator.queue(file_path)
 	
 	audio_generated.emit(sound_name, file_path)
 	return file_path
 
-func _estimate_duration(description: String) -> float:
-	# Estimate duration based on description keywords
-	# ElevenLabs requires duration between 0.5 and 22 seconds
-	var desc_lower = description.to_lower()
-	var duration: float = 1.5  # Default - slightly longer for more impact
-	
-	# Background/ambient sounds - longer duration
-	if "background" in desc_lower or "ambient" in desc_lower or "ambience" in desc_lower:
-		duration = 15.0
-	elif "loop" in desc_lower or "looping" in desc_lower:
-		duration = 12.0
-	elif "rain" in desc_lower or "thunder" in desc_lower or "weather" in desc_lower:
-		duration = 15.0
-	elif "music" in desc_lower or "bgm" in desc_lower or "melody" in desc_lower:
-		duration = 15.0
-	# Short, punchy sounds
-	elif "short" in desc_lower or "quick" in desc_lower or "brief" in desc_lower or "snappy" in desc_lower:
-		duration = 0.8
-	elif "footstep" in desc_lower or "step" in desc_lower:
-		duration = 0.5
-	elif "jump" in desc_lower or "whoosh" in desc_lower or "springy" in desc_lower:
-		duration = 0.8
-	elif "collect" in desc_lower or "pickup" in desc_lower or "coin" in desc_lower or "chime" in desc_lower:
-		duration = 0.8
-	# Medium sounds
-	elif "death" in desc_lower or "die" in desc_lower or "dramatic" in desc_lower:
-		duration = 1.5
-	elif "explosion" in desc_lower or "impact" in desc_lower or "hit" in desc_lower:
-		duration = 1.2
-	elif "punchy" in desc_lower or "powerful" in desc_lower:
-		duration = 1.0
-	
-	# Clamp to valid range (0.5 to 22 for sound effects)
-	return clampf(duration, 0.5, 22.0)
+func get_output_path(sound_name: String, audio_type: String = "sfx") -> String:
+	"""Where handle_response saves a sound of the given audio_type"""
+	var subdir = ""
+	match audio_type:
+		"dialog":
+			subdir = "dialog/"
+		"music", "bgm":
+			subdir = "music/"
+		_:
+			subdir = ""  # Sound effects go to root
+	
+	return output_directory + subdir + sound_name + ".mp3"
+
+func _estimate_duration(description: String, sound_name: String = "") -> float:
+	# Keyword-based duration from the shared sound taxonomy (clamped to the
+	# 0.5 - 22 second range ElevenLabs accepts), shortened to what earlier
+	# sounds of the same kind actually filled
+	return adaptive_controller.choose_duration(description, sound_name)
@@ -0,0 +1,163 @@
+@tool
+extends RefCounted
+class_name GenerationJournal
+
+# Append-only journal of sound generation jobs so an interrupted run can resume.
+# Every state change is one JSON line that is flushed before the request goes out;
+# the last line for a sound wins on replay. tests/generation_journal.py reads and
+# writes the same file, so the dock and the Python runner share progress.
+
+const JOURNAL_PATH = "res://.godot/luceta_cache/generation_journal.jsonl"
+const MAX_ATTEMPTS = 3
+
+const STATE_QUEUED = "queued"
+const STATE_IN_FLIGHT = "in-flight"
+const STATE_DONE = "done"
+const STATE_FAILED = "failed"
+
+var journal_path: String = JOURNAL_PATH
+var jobs: Dictionary = {}  # sound_name -> latest record
+
+func _init(path: String = JOURNAL_PATH):
+	journal_path = path
+	_replay()
+
+func _replay():
+	jobs.clear()
+	if not FileAccess.file_exists(journal_path):
+		return
+
+	var file = FileAccess.open(journal_path, FileAccess.READ)
+	if not file:
+		return
+	var text = file.get_as_text()
+	file.close()
+
+	var torn = false
+	for line in text.split("\n", false):
+		var record = JSON.parse_string(line)
+		if record is Dictionary and record.has("name"):
+			jobs[record.name] = record
+		else:
+			# A crash mid-append leaves a partial last line
+			torn = true
+
+	# Rewrite before appending so new records don't land on a torn line
+	if torn or not text.ends_with("\n"):
+		compact()
+
+	# Jobs that were in flight when the editor died may have left a half-written
+	# file. Drop it and queue the job again; the attempt still counts.
+	for sound_name in jobs.keys():
+		var job = jobs[sound_name]
+		if job.state == STATE_IN_FLIGHT:
+			_remove_output(job.get("path", ""))
+			_append(sound_name, STATE_QUEUED, {"error": "Interrupted while in flight"})
+
+func enqueue(suggestion: Dictionary, reset_attempts: bool = false):
+	"""
+	Queue a sound unless it's already done. A job that ran out of attempts gets a
+	fresh retry budget; an interrupted one keeps its count.
+	"""
+	var sound_name = suggestion.get("name", "")
+	if not reset_attempts and is_done(sound_name, suggestion.get("description", "")):
+		return
+	var fields = {"description": suggestion.get("description", "")}
+	if reset_attempts or get_state(sound_name) == STATE_FAILED:
+		fields["attempts"] = 0
+	_append(sound_name, STATE_QUEUED, fields)
+
+func mark_in_flight(sound_name: String, output_path: String = ""):
+	_append(sound_name, STATE_IN_FLIGHT, {
+		"attempts": get_attempts(sound_name) + 1,
+		"path": output_path
+	})
+
+func mark_done(sound_name: String, file_path: String):
+	_append(sound_name, STATE_DONE, {
+		"path": file_path,
+		"sha256": FileAccess.get_sha256(file_path),
+		"error": ""
+	})
+
+func mark_failed(sound_name: String, error_message: String):
+	_append(sound_name, STATE_FAILED, {"error": error_message})
+
+func should_retry(sound_name: String) -> bool:
+	return get_attempts(sound_name) < MAX_ATTEMPTS
+
+func get_attempts(sound_name: String) -> int:
+	return int(jobs.get(sound_name, {}).get("attempts", 0))
+
+func get_state(sound_name: String) -> String:
+	return jobs.get(sound_name, {}).get("state", "")
+
+func is_done(sound_name: String, description = null) -> bool:
+	"""
+	Done and the file on disk still matches the hash recorded when it was written.
+	With a description, the job must also have been generated from that description.
+	"""
+	var job = jobs.get(sound_name, {})
+	if job.get("state", "") != STATE_DONE:
+		return false
+	if description != null and job.get("description", description) != description:
+		return false
+	var path = job.get("path", "")
+	if path.is_empty() or not FileAccess.file_exists(path):
+		return false
+	return FileAccess.get_sha256(path) == job.get("sha256", "")
+
+func get_path(sound_name: String) -> String:
+	return jobs.get(sound_name, {}).get("path", "")
+
+func clear():
+	jobs.clear()
+	if FileAccess.file_exists(journal_path):
+		DirAccess.remove_absolute(ProjectSettings.globalize_path(journal_path))
+
+func compact():
+	"""Rewrite the journal with one line per job, atomically via a temp file"""
+	_ensure_dir()
+	var tmp_path = journal_path + ".tmp"
+	var file = FileAccess.open(tmp_path, FileAccess.WRITE)
+	if not file:
+		push_error("[GenerationJournal] Could not compact " + journal_path)
+		return
+	for sound_name in jobs.keys():
+		file.store_line(JSON.stringify(jobs[sound_name]))
+	file.flush()
+	file.close()
+	DirAccess.rename_absolute(ProjectSettings.globalize_path(tmp_path), ProjectSettings.globalize_path(journal_path))
+
+func _append(sound_name: String, state: String, fields: Dictionary = {}):
+	var record = jobs.get(sound_name, {"name": sound_name, "attempts": 0}).duplicate()
+	record.merge(fields, true)
+	record["state"] = state
+	record["time"] = Time.get_unix_time_from_system()
+	jobs[sound_name] = record
+
+	_ensure_dir()
+	var file: FileAccess
+	if FileAccess.file_exists(journal_path):
+		file = FileAccess.open(journal_path, FileAccess.READ_WRITE)
+		if file:
+			file.seek_end()
+	else:
+		file = FileAccess.open(journal_path, FileAccess.WRITE)
+	if not file:
+		push_error("[GenerationJournal] Could not write " + journal_path)
+		return
+	file.store_line(JSON.stringify(record))
+	file.flush()  # Handed to the OS before the caller moves on; FileAccess has no fsync, so a power loss can still drop it
+	file.close()
+
+func _remove_output(path: String):
+	if path.is_empty() or not FileAccess.file_exists(path):
+		return
+	DirAccess.remove_absolute(ProjectSettings.globalize_path(path))
+	print("[GenerationJournal] Removed partial file: ", path)
+
+func _ensure_dir():
+	var dir_path = journal_path.get_base_dir()
+	if not DirAccess.dir_exists_absolute(dir_path):
+		DirAccess.make_dir_recursive_absolute(ProjectSettings.globalize_path(dir_path))
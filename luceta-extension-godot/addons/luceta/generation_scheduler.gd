@@ -0,0 +1,106 @@
+@tool
+extends RefCounted
+class_name GenerationScheduler
+
+# Orders sound generation so short, gameplay-critical sounds don't wait behind
+# long ambience loops. Each suggestion gets a weight (taxonomy hint, hot gameplay
+# path, user pin; see "priorities" in sound_taxonomy.json) and an expected time
+# and credit cost from AdaptiveController's fitted models. Critical sounds go
+# first, then the rest; within each tier the queue runs in cost/weight order,
+# which minimizes the weighted time until sounds exist. An optional credit
+# budget defers the lowest-weight sounds. tests/generation_scheduler.py plans
+# the same way.
+
+var controller: AdaptiveController
+
+func _init(adaptive_controller: AdaptiveController = null):
+	controller = adaptive_controller if adaptive_controller else AdaptiveController.new()
+
+func plan(suggestions: Array, credit_budget: float = 0.0) -> Dictionary:
+	"""
+	Returns {"queue", "deferred", "critical", "credits", "first_seconds", "critical_seconds"}.
+	A credit_budget of 0 means no budget.
+	"""
+	var jobs = []
+	for suggestion in suggestions:
+		jobs.append(describe(suggestion))
+
+	# Budget: keep the heaviest sounds (cheapest first on ties) while they fit
+	var admitted = jobs
+	var deferred = []
+	if credit_budget > 0.0:
+		var by_weight = jobs.duplicate()
+		by_weight.sort_custom(func(a, b): return a.weight > b.weight or (a.weight == b.weight and a.credits < b.credits))
+		admitted = []
+		var spent = 0.0
+		for job in by_weight:
+			if spent + job.credits <= credit_budget:
+				admitted.append(job)
+				spent += job.credits
+			else:
+				deferred.append(job.suggestion)
+
+	admitted.sort_custom(_runs_before)
+
+	var queue = []
+	var credits = 0.0
+	var elapsed = 0.0
+	var first_seconds = 0.0
+	var critical_seconds = 0.0
+	var critical = 0
+	for job in admitted:
+		queue.append(job.suggestion)
+		credits += job.credits
+		elapsed += job.seconds
+		if queue.size() == 1:
+			first_seconds = elapsed
+		if job.critical:
+			critical += 1
+			critical_seconds = elapsed
+
+	return {
+		"queue": queue,
+		"deferred": deferred,
+		"critical": critical,
+		"credits": credits,
+		"first_seconds": first_seconds,
+		"critical_seconds": critical_seconds
+	}
+
+func describe(suggestion: Dictionary) -> Dictionary:
+	"""Weight, criticality and expected cost of one suggestion"""
+	var priorities = SoundTaxonomy.get_section("priorities")
+	var description = suggestion.get("description", "")
+	var duration = controller.choose_duration(description, suggestion.get("name", ""))
+	var hint = SoundTaxonomy.classify(suggestion.get("name", "") + " " + description).hint
+
+	var weight = float(priorities.get("hints", {}).get(hint, 1.0))
+	if duration >= priorities.get("background_min_duration", 10.0):
+		weight = priorities.get("background", 0.5)
+	if is_hot_path(suggestion.get("context", ""), priorities):
+		weight += priorities.get("hot_bonus", 2.0)
+	if suggestion.get("pinned", false):
+		weight += priorities.get("pin_bonus", 10.0)
+
+	return {
+		"suggestion": suggestion,
+		"weight": weight,
+		"critical": weight >= priorities.get("critical", 4.0),
+		"duration": duration,
+		"seconds": controller.estimate_seconds(AdaptiveController.SOUND_ENDPOINT, duration),
+		"credits": controller.estimate_credits(AdaptiveController.SOUND_ENDPOINT, duration)
+	}
+
+func is_hot_path(context: String, priorities: Dictionary = {}) -> bool:
+	"""Whether the event fires from a per-frame or input callback"""
+	if priorities.is_empty():
+		priorities = SoundTaxonomy.get_section("priorities")
+	for function_name in priorities.get("hot_functions", []):
+		if function_name in context:
+			return true
+	return false
+
+func _runs_before(a: Dictionary, b: Dictionary) -> bool:
+	if a.critical != b.critical:
+		return a.critical
+	return a.seconds / a.weight < b.seconds / b.weight
@@ -0,0 +1,100 @@
+@tool
+extends RefCounted
+class_name ImportCoordinator
+
+# Hands the files Luceta writes to the editor in batches. A full
+# EditorFileSystem.scan() walks every resource in the project, which takes
+# seconds on large projects, so written paths are queued and flushed once the
+# writes go quiet: update_file() per path plus a single reimport_files() for new
+# audio. A full scan only runs for very large batches, for paths in directories
+# the editor hasn't seen yet, or when request_scan() asked for one (e.g. after a
+# revert deleted files). tests/import_metadata.py pre-writes the .import files
+# for generated audio, so the editor imports each file once with its final uid
+# and loop settings.
+
+signal flushed(paths: Array)
+
+const DEBOUNCE_SECONDS = 0.5
+const MAX_DELAY_SECONDS = 5.0  # Flush even while writes keep coming
+const FULL_SCAN_THRESHOLD = 256
+const IMPORTED_EXTENSIONS = ["mp3", "wav", "ogg"]
+
+var pending: Dictionary = {}  # res:// path -> true, in queue order
+var needs_full_scan: bool = false
+
+var _first_queued_msec: int = 0
+var _serial: int = 0  # Bumped by every queue/flush so only the latest timer fires
+
+func queue(path: String):
+	"""Remember a written or deleted file; the editor learns about it on the next flush"""
+	if pending.is_empty() and not needs_full_scan:
+		_first_queued_msec = Time.get_ticks_msec()
+	pending[path] = true
+	_arm()
+
+func queue_all(paths: Array):
+	for path in paths:
+		queue(path)
+
+func request_scan():
+	"""Flush with a full scan, for changes that can't be listed file by file"""
+	if pending.is_empty() and not needs_full_scan:
+		_first_queued_msec = Time.get_ticks_msec()
+	needs_full_scan = true
+	_arm()
+
+func flush():
+	"""Tell the editor about everything queued now, without waiting for the debounce"""
+	_serial += 1
+	if pending.is_empty() and not needs_full_scan:
+		return
+
+	var filesystem = EditorInterface.get_resource_filesystem()
+	if filesystem.is_scanning():
+		# update_file() during a scan is lost when the scan finishes
+		_arm()
+		return
+
+	var paths = pending.keys()
+	pending.clear()
+	if needs_full_scan or paths.size() > FULL_SCAN_THRESHOLD or _has_unknown_directory(filesystem, paths):
+		needs_full_scan = false
+		print("[ImportCoordinator] Full scan for ", paths.size(), " files")
+		filesystem.scan()
+	else:
+		var to_import = PackedStringArray()
+		for path in paths:
+			filesystem.update_file(path)
+			if path.get_extension().to_lower() in IMPORTED_EXTENSIONS and FileAccess.file_exists(path):
+				to_import.append(path)
+		if not to_import.is_empty():
+			filesystem.reimport_files(to_import)
+		print("[ImportCoordinator] Updated ", paths.size(), " files, imported ", to_import.size())
+	flushed.emit(paths)
+
+func _arm():
+	"""(Re)start the debounce timer, never past MAX_DELAY_SECONDS after the first queued path"""
+	_serial += 1
+	var serial = _serial
+	var tree = Engine.get_main_loop() as SceneTree
+	if not tree:
+		flush()
+		return
+	var waited = (Time.get_ticks_msec() - _first_queued_msec) / 1000.0
+	var delay = clampf(MAX_DELAY_SECONDS - waited, 0.0, DEBOUNCE_SECONDS)
+	tree.create_timer(delay).timeout.connect(func():
+		if serial == _serial:
+			flush()
+	)
+
+func _has_unknown_directory(filesystem: EditorFileSystem, paths: Array) -> bool:
+	"""update_file() only works inside directories the editor already tracks"""
+	var checked = {}
+	for path in paths:
+		var dir_path = path.get_base_dir()
+		if checked.has(dir_path):
+			continue
+		checked[dir_path] = true
+		if filesystem.get_filesystem_path(dir_path) == null:
+			return true
+	return false
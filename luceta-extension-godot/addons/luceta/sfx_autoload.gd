@@ -0,0 +1,104 @@
+@tool
+extends RefCounted
+class_name SfxAutoload
+
+# Generates the LucetaSfx autoload: one pooled player node shared by every
+# integrated script, instead of an AudioStreamPlayer created per _play_sfx call.
+# luceta_sfx.json is the registry (sound -> path, limits and any variants from
+# tests/sfx_variations.py); the script is rendered from luceta_sfx.gd.template.
+# tests/sfx_autoload.py renders the same files.
+
+const TEMPLATE_PATH = "res://addons/luceta/luceta_sfx.gd.template"
+const SCRIPT_PATH = "res://luceta_generated/luceta_sfx.gd"
+const REGISTRY_PATH = "res://luceta_generated/luceta_sfx.json"
+const AUTOLOAD_NAME = "LucetaSfx"
+const POOL_SIZE = 16
+
+const DEFAULT_LIMITS = {"polyphony": 3, "min_interval": 0.05}
+
+# Sound hint (SoundTaxonomy) -> limits; footsteps can fire every physics frame
+const HINT_LIMITS = {
+	"footstep": {"polyphony": 2, "min_interval": 0.12},
+	"collect": {"polyphony": 4, "min_interval": 0.03},
+}
+
+static func limits_for(sound_name: String) -> Dictionary:
+	return HINT_LIMITS.get(SoundTaxonomy.classify(sound_name).hint, DEFAULT_LIMITS)
+
+static func play_call(sound_name: String) -> String:
+	"""The line integrated scripts use to trigger a sound"""
+	return AUTOLOAD_NAME + ".play(\"" + sound_name + "\")"
+
+static func update(mappings: Array) -> bool:
+	"""
+	Merge integrated one-shots ({"name", "path"}) into the registry and rewrite
+	the autoload script. Limits tuned by hand in luceta_sfx.json are kept.
+	"""
+	var registry = load_registry()
+	for mapping in mappings:
+		var sound_name = mapping.get("name", "")
+		if sound_name.is_empty():
+			continue
+		var entry = registry.get(sound_name, limits_for(sound_name).duplicate())
+		entry["path"] = mapping.get("path", "")
+		registry[sound_name] = entry
+
+	if not DirAccess.dir_exists_absolute(SCRIPT_PATH.get_base_dir()):
+		DirAccess.make_dir_recursive_absolute(SCRIPT_PATH.get_base_dir())
+
+	var file = FileAccess.open(REGISTRY_PATH, FileAccess.WRITE)
+	if not file:
+		push_error("[SfxAutoload] Cannot write: " + REGISTRY_PATH)
+		return false
+	file.store_string(JSON.stringify(registry, "\t"))
+	file.close()
+
+	var source = render(registry)
+	if source.is_empty():
+		return false
+	file = FileAccess.open(SCRIPT_PATH, FileAccess.WRITE)
+	if not file:
+		push_error("[SfxAutoload] Cannot write: " + SCRIPT_PATH)
+		return false
+	file.store_string(source)
+	file.close()
+	print("[SfxAutoload] ", registry.size(), " sounds in ", SCRIPT_PATH)
+	return true
+
+static func load_registry() -> Dictionary:
+	if not FileAccess.file_exists(REGISTRY_PATH):
+		return {}
+	var parsed = JSON.parse_string(FileAccess.get_file_as_string(REGISTRY_PATH))
+	return parsed if parsed is Dictionary else {}
+
+static func render(registry: Dictionary, pool_size: int = POOL_SIZE) -> String:
+	var template = FileAccess.get_file_as_string(TEMPLATE_PATH)
+	if template.is_empty():
+		push_error("[SfxAutoload] Missing template: " + TEMPLATE_PATH)
+		return ""
+
+	var names = registry.keys()
+	names.sort()
+	var sounds = "{\n"
+	for sound_name in names:
+		var entry = registry[sound_name]
+		sounds += "\t\"" + sound_name + "\": {\"path\": \"" + entry.get("path", "") + "\", "
+		sounds += "\"polyphony\": " + str(int(entry.get("polyphony", DEFAULT_LIMITS.polyphony))) + ", "
+		sounds += "\"min_interval\": " + str(float(entry.get("min_interval", DEFAULT_LIMITS.min_interval))) + ", "
+		var variants = []
+		for path in entry.get("variants", []):
+			variants.append(JSON.stringify(path))
+		sounds += "\"variants\": [" + ", ".join(variants) + "]},\n"
+	sounds += "}"
+	return template.replace("{{POOL_SIZE}}", str(pool_size)).replace("{{SOUNDS}}", sounds)
+
+static func register(plugin: EditorPlugin = null):
+	"""Add the autoload to the project (no-op if it is already there)"""
+	if ProjectSettings.has_setting("autoload/" + AUTOLOAD_NAME):
+		return
+	if plugin:
+		plugin.add_autoload_singleton(AUTOLOAD_NAME, SCRIPT_PATH)
+	else:
+		ProjectSettings.set_setting("autoload/" + AUTOLOAD_NAME, "*" + SCRIPT_PATH)
+		ProjectSettings.save()
+	print("[SfxAutoload] Registered autoload ", AUTOLOAD_NAME)
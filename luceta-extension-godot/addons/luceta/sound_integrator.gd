@@ -6,49 +6,12 @@ class_name SoundIntegrator
 
 signal integration_complete(report: Dictionary)
 
-# Map sound keywords to target scripts and functions
-const SOUND_TARGETS = {
-	# Player sounds
-	"jump": {"scripts": ["player"], "functions": ["_physics_process", "_process"], "pattern": "JUMP_VELOCITY"},
-	"land": {"scripts": ["player"], "functions": ["_physics_process", "_process"], "pattern": "is_on_floor"},
-	"walk": {"scripts": ["player"], "functions": ["_physics_process", "_process"], "pattern": "velocity"},
-	"footstep": {"scripts": ["player"], "functions": ["_physics_process", "_process"], "pattern": "velocity"},
-	"run": {"scripts": ["player"], "functions": ["_physics_process", "_process"], "pattern": "velocity"},
-	
-	# Death/damage sounds
-	"death": {"scripts": ["killzone", "player", "game_manager", "game"], "functions": ["_on_body_entered", "_on_area_entered", "die", "game_over"], "pattern": ""},
-	"die": {"scripts": ["killzone", "player", "game_manager", "game"], "functions": ["_on_body_entered", "_on_area_entered", "die", "game_over"], "pattern": ""},
-	"hurt": {"scripts": ["player", "killzone"], "functions": ["_on_body_entered", "take_damage", "hurt"], "pattern": ""},
-	"damage": {"scripts": ["player", "killzone"], "functions": ["_on_body_entered", "take_damage"], "pattern": ""},
-	"kill": {"scripts": ["killzone"], "functions": ["_on_body_entered", "_on_area_entered"], "pattern": ""},
-	"fall": {"scripts": ["killzone"], "functions": ["_on_body_entered"], "pattern": ""},
-	
-	# Collectible sounds
-	"coin": {"scripts": ["coin", "collectible", "pickup"], "functions": ["_on_body_entered", "_on_area_entered", "collect"], "pattern": ""},
-	"collect": {"scripts": ["coin", "collectible", "pickup", "item"], "functions": ["_on_body_entered", "_on_area_entered", "collect"], "pattern": ""},
-	"pickup": {"scripts": ["coin", "collectible", "pickup", "item"], "functions": ["_on_body_entered", "_on_area_entered"], "pattern": ""},
-	"item": {"scripts": ["coin", "collectible", "pickup", "item"], "functions": ["_on_body_entered", "_on_area_entered"], "pattern": ""},
-	"gem": {"scripts": ["coin", "collectible", "gem"], "functions": ["_on_body_entered", "_on_area_entered"], "pattern": ""},
-	"powerup": {"scripts": ["powerup", "item", "collectible"], "functions": ["_on_body_entered", "_on_area_entered"], "pattern": ""},
-	
-	# Enemy sounds
-	"enemy": {"scripts": ["enemy", "slime", "mob", "monster"], "functions": ["_on_body_entered", "_physics_process", "_process"], "pattern": ""},
-	"slime": {"scripts": ["slime", "enemy"], "functions": ["_on_body_entered", "_physics_process"], "pattern": ""},
-	"hit": {"scripts": ["enemy", "slime", "player"], "functions": ["_on_body_entered", "take_damage", "hit"], "pattern": ""},
-	"attack": {"scripts": ["enemy", "slime", "player"], "functions": ["attack", "_on_body_entered"], "pattern": ""},
-	
-	# UI sounds
-	"button": {"scripts": ["menu", "ui", "main_menu"], "functions": ["_on_button_pressed", "_pressed"], "pattern": ""},
-	"click": {"scripts": ["menu", "ui"], "functions": ["_on_button_pressed", "_pressed", "_gui_input"], "pattern": ""},
-	"menu": {"scripts": ["menu", "ui", "main_menu"], "functions": ["_ready", "_on_button_pressed"], "pattern": ""},
-	
-	# Background/ambient - goes to game_manager/game/main scene
-	"background": {"scripts": ["game_manager", "game", "main", "level", "world"], "functions": ["_ready"], "pattern": ""},
-	"ambient": {"scripts": ["game_manager", "game", "main", "level", "world"], "functions": ["_ready"], "pattern": ""},
-	"ambience": {"scripts": ["game_manager", "game", "main", "level", "world"], "functions": ["_ready"], "pattern": ""},
-	"music": {"scripts": ["game_manager", "game", "main", "level", "music"], "functions": ["_ready"], "pattern": ""},
-	"rain": {"scripts": ["game_manager", "game", "main", "level", "world"], "functions": ["_ready"], "pattern": ""},
-}
+# Sound keyword -> target scripts/functions come from the shared SoundTaxonomy
+# (sound_taxonomy.json "targets"), so analyzer, generator and wiring agree
+
+# One-shots play through the pooled LucetaSfx autoload (SfxAutoload), which
+# preloads every sound and also resolves SFX atlas slices. Scripts integrated
+# before it keep their own _play_sfx helper.
 
 func integrate_sounds(sound_mappings: Array, project_path: String = "res://") -> Dictionary:
 	var report = {
@@ -56,8 +19,10 @@ func integrate_sounds(sound_mappings: Array, project_path: String = "res://") ->
 		"files_modified": [],
 		"sounds_integrated": [],
 		"errors": [],
-		"skipped": []
+		"skipped": [],
+		"sfx_autoload": false
 	}
+	var one_shots = []
 	
 	var script_files = _find_script_files(project_path)
 	print("[SoundIntegrator] Found ", script_files.size(), " script files")
@@ -77,6 +42,9 @@ func integrate_sounds(sound_mappings: Array, project_path: String = "res://") ->
 		if target.is_empty():
 			print("[SoundIntegrator] No target found for: ", sound_name)
 			report.skipped.append({"sound": sound_name, "reason": "No target script found"})
+			# Still registered, so LucetaSfx.play() works when wired by hand
+			if not _is_background(sound_name):
+				one_shots.append({"name": sound_name, "path": sound_path})
 			continue
 		
 		print("[SoundIntegrator] Target: ", target.file_path, " -> ", target.function)
@@ -85,11 +53,17 @@ func integrate_sounds(sound_mappings: Array, project_path: String = "res://") ->
 		
 		if result.success:
 			report.sounds_integrated.append(sound_name)
+			if not _is_background(sound_name):
+				one_shots.append({"name": sound_name, "path": sound_path})
 			if not (target.file_path in report.files_modified):
 				report.files_modified.append(target.file_path)
 		else:
 			report.errors.append({"sound": sound_name, "error": result.error})
 	
+	# Regenerate the autoload; the caller registers it (SfxAutoload.register)
+	if not one_shots.is_empty():
+		report.sfx_autoload = SfxAutoload.update(one_shots)
+	
 	integration_complete.emit(report)
 	return report
 
@@ -119,29 +93,28 @@ func _find_target_script(sound_name: String, context: String, script_files: Arra
 	print("[SoundIntegrator] sound_lower: ", sound_lower)
 	print("[SoundIntegrator] context_lower: ", context_lower)
 	
-	# Check each keyword in SOUND_TARGETS
-	for keyword in SOUND_TARGETS.keys():
-		if keyword in sound_lower or keyword in context_lower:
-			print("[SoundIntegrator] Matched keyword: ", keyword)
-			var target = SOUND_TARGETS[keyword]
-			
-			# Try to find matching script
-			for script_name in target.scripts:
-				for file_path in script_files:
-					var file_name = file_path.get_file().to_lower()
-					print("[SoundIntegrator] Checking script_name '", script_name, "' in file '", file_name, "'")
-					if script_name in file_name:
-						print("[SoundIntegrator] Found script: ", file_path)
-						# Find the best matching function, or use _ready as default
-						var best_func = _find_best_function(file_path, target.functions)
-						if best_func.is_empty():
-							best_func = "_ready"  # Will be created if doesn't exist
-						print("[SoundIntegrator] Using function: ", best_func)
-						return {
-							"file_path": file_path,
-							"function": best_func,
-							"pattern": target.pattern
-						}
+	# Matched taxonomy targets, in priority order
+	var targets = SoundTaxonomy.targets_for([sound_name, context])
+	for target in targets:
+		print("[SoundIntegrator] Matched keyword: ", target.keyword)
+		
+		# Try to find matching script
+		for script_name in target.scripts:
+			for file_path in script_files:
+				var file_name = file_path.get_file().to_lower()
+				print("[SoundIntegrator] Checking script_name '", script_name, "' in file '", file_name, "'")
+				if script_name in file_name:
+					print("[SoundIntegrator] Found script: ", file_path)
+					# Find the best matching function, or use _ready as default
+					var best_func = _find_best_function(file_path, target.functions)
+					if best_func.is_empty():
+						best_func = "_ready"  # Will be created if doesn't exist
+					print("[SoundIntegrator] Using function: ", best_func)
+					return {
+						"file_path": file_path,
+						"function": best_func,
+						"pattern": target.pattern
+					}
 	
 	print("[SoundIntegrator] No keyword match, trying context fallback...")
 	
@@ -191,15 +164,15 @@ func _add_sound_to_script(file_path: String, sound_name: String, sound_path: Str
 	file.close()
 	
 	var var_name = sound_name.replace("-", "_").replace(" ", "_") + "_sfx"
+	var play_call = SfxAutoload.play_call(sound_name)
 	
 	# Already has this sound?
-	if var_name in content:
+	if var_name in content or play_call in content:
 		result.success = true
 		return result
 	
-	# Check if this is a background/ambient sound that should auto-play
-	var sound_lower = sound_name.to_lower()
-	var is_background = "background" in sound_lower or "ambient" in sound_lower or "ambience" in sound_lower or "music" in sound_lower
+	# Background/ambient sounds auto-play from the script; one-shots go through the autoload
+	var is_background = _is_background(sound_name)
 	
 	var lines = content.split("\n")
 	var new_content = ""
@@ -209,7 +182,6 @@ func _add_sound_to_script(file_path: String, sound_name: String, sound_path: Str
 	var target_func_idx = -1
 	var pattern_idx = -1
 	var has_ready = false
-	var has_helper = "func _play_sfx" in content
 	
 	# Find key lines
 	for i in range(lines.size()):
@@ -229,44 +201,26 @@ func _add_sound_to_script(file_path: String, sound_name: String, sound_path: Str
 		var line = lines[i]
 		new_content += line + "\n"
 		
-		# Add variable after extends
-		if i == extends_idx:
+		# Add variable after extends (background sounds only)
+		if is_background and i == extends_idx:
 			new_content += "\n# Luceta Audio\n"
 			new_content += "var " + var_name + ": AudioStream\n"
 		
-		# Add load in _ready (and auto-play for background sounds)
-		if has_ready and i == ready_idx:
-			new_content += "\tif ResourceLoader.exists(\"" + sound_path + "\"):\n"
-			new_content += "\t\t" + var_name + " = load(\"" + sound_path + "\")\n"
-			if is_background:
-				new_content += "\t\t_play_background_sfx(" + var_name + ")\n"
+		# Add load and auto-play in _ready for background sounds
+		if is_background and has_ready and i == ready_idx:
+			new_content += _background_load_code(var_name, sound_path)
 		
-		# Add play call for non-background sounds
+		# Add play call for one-shots
 		if not is_background:
 			if pattern_idx >= 0 and i == pattern_idx:
-				new_content += "\t\t_play_sfx(" + var_name + ")\n"
+				new_content += "\t\t" + play_call + "\n"
 			elif pattern_idx < 0 and target_func_idx >= 0 and i == target_func_idx:
-				new_content += "\t_play_sfx(" + var_name + ")\n"
+				new_content += "\t" + play_call + "\n"
 	
 	# Add _ready if missing
-	if not has_ready:
+	if is_background and not has_ready:
 		new_content += "\nfunc _ready():\n"
-		new_content += "\tif ResourceLoader.exists(\"" + sound_path + "\"):\n"
-		new_content += "\t\t" + var_name + " = load(\"" + sound_path + "\")\n"
-		if is_background:
-			new_content += "\t\t_play_background_sfx(" + var_name + ")\n"
-	
-	# Add helper if missing
-	if not has_helper:
-		new_content += "\n# === Luceta Audio Helper ===\n"
-		new_content += "func _play_sfx(sound: AudioStream):\n"
-		new_content += "\tif sound == null:\n"
-		new_content += "\t\treturn\n"
-		new_content += "\tvar player = AudioStreamPlayer.new()\n"
-		new_content += "\tadd_child(player)\n"
-		new_content += "\tplayer.stream = sound\n"
-		new_content += "\tplayer.play()\n"
-		new_content += "\tplayer.finished.connect(func(): player.queue_free())\n"
+		new_content += _background_load_code(var_name, sound_path)
 	
 	# Add background helper for looping music
 	if is_background and "func _play_background_sfx" not in content:
@@ -292,3 +246,14 @@ func _add_sound_to_script(file_path: String, sound_name: String, sound_path: Str
 	
 	result.success = true
 	return result
+
+func _is_background(sound_name: String) -> bool:
+	var sound_lower = sound_name.to_lower()
+	return "background" in sound_lower or "ambient" in sound_lower or "ambience" in sound_lower or "music" in sound_lower
+
+func _background_load_code(var_name: String, sound_path: String) -> String:
+	# Looping sounds are never packed into an atlas
+	var code = "\tif ResourceLoader.exists(\"" + sound_path + "\"):\n"
+	code += "\t\t" + var_name + " = load(\"" + sound_path + "\")\n"
+	code += "\t\t_play_background_sfx(" + var_name + ")\n"
+	return code
@@ -0,0 +1,189 @@
+@tool
+extends RefCounted
+class_name SoundTaxonomy
+
+# Shared keyword taxonomy for sound hints, durations and integration targets.
+# sound_taxonomy.json is compiled once into a single RegEx. The Python tools
+# (tests/sound_taxonomy.py) compile the same file, so both sides stay in sync.
+
+const TAXONOMY_PATH = "res://addons/luceta/sound_taxonomy.json"
+const ORDERED_SECTIONS = ["hints", "state_hints", "durations"]
+const MAX_CACHED_RESULTS = 4096
+
+static var _data: Dictionary = {}
+static var _regex: RegEx
+static var _keyword_rules: Dictionary = {}  # keyword -> {section: best rule index, "targets": [indices]}
+static var _results: Dictionary = {}  # normalized text -> classification
+
+static func classify(text: String) -> Dictionary:
+	"""
+	Classify a function/state/sound name or a description.
+	Returns {"hint", "state_hint", "duration", "targets"}
+	"""
+	_ensure_compiled()
+	var normalized = normalize(text)
+	if _results.has(normalized):
+		return _results[normalized]
+
+	var best = {}
+	var target_indices = {}
+	var offset = 0
+	while offset < normalized.length():
+		var m = _regex.search(normalized, offset)
+		if not m:
+			break
+		var rules = _keyword_rules[m.get_string(1)]
+		for section in ORDERED_SECTIONS:
+			if rules.has(section) and (not best.has(section) or rules[section] < best[section]):
+				best[section] = rules[section]
+		for index in rules.get("targets", []):
+			target_indices[index] = true
+		offset = m.get_start() + 1
+
+	var result = _resolve(best, target_indices)
+	if _results.size() >= MAX_CACHED_RESULTS:
+		_results.clear()
+	_results[normalized] = result
+	return result
+
+static func classify_batch(texts: Array) -> Array:
+	var results = []
+	for text in texts:
+		results.append(classify(text))
+	return results
+
+static func targets_for(texts: Array) -> Array:
+	"""
+	Targets matched by any of texts, each classified on its own so a keyword
+	can't match across the boundary between two of them. Table order.
+	"""
+	var matched = []
+	for text in texts:
+		for target in classify(text).targets:
+			if not (target in matched):
+				matched.append(target)
+	var targets = []
+	for target in _data.get("targets", []):
+		if target in matched:
+			targets.append(target)
+	return targets
+
+static func get_section(section: String, default = {}):
+	"""A raw section of sound_taxonomy.json (e.g. priorities for GenerationScheduler)"""
+	_ensure_compiled()
+	return _data.get(section, default)
+
+static func normalize(text: String) -> String:
+	return text.to_lower().replace("_", " ").replace("-", " ").replace("\n", " ")
+
+static func _resolve(best: Dictionary, target_indices: Dictionary) -> Dictionary:
+	var hint = _data.get("default_hint", "generic")
+	if best.has("hints"):
+		hint = _data.hints[best.hints].hint
+
+	var state_hint = _data.get("default_state_hint", "state_transition")
+	if best.has("state_hints"):
+		state_hint = _data.state_hints[best.state_hints].hint
+
+	var duration: float = _data.get("default_duration", 1.5)
+	if best.has("durations"):
+		duration = _data.durations[best.durations].seconds
+	duration = clampf(duration, _data.get("min_duration", 0.5), _data.get("max_duration", 22.0))
+
+	# Targets keep table order so the integrator tries them by priority
+	var targets = []
+	var all_targets = _data.get("targets", [])
+	for i in range(all_targets.size()):
+		if target_indices.has(i):
+			targets.append(all_targets[i])
+
+	return {
+		"hint": hint,
+		"state_hint": state_hint,
+		"duration": duration,
+		"targets": targets
+	}
+
+static func _ensure_compiled():
+	if _regex:
+		return
+
+	var file = FileAccess.open(TAXONOMY_PATH, FileAccess.READ)
+	if file:
+		var json = JSON.parse_string(file.get_as_text())
+		file.close()
+		if json is Dictionary:
+			_data = json
+	if _data.is_empty():
+		push_error("[SoundTaxonomy] Could not load " + TAXONOMY_PATH)
+
+	# keyword -> {section: [rule indices]}
+	var rules_by_keyword = {}
+	for section in ORDERED_SECTIONS + ["targets"]:
+		var rules = _data.get(section, [])
+		for i in range(rules.size()):
+			var keywords = rules[i].get("keywords", [rules[i].get("keyword", "")])
+			for keyword in keywords:
+				keyword = normalize(keyword)
+				if keyword.is_empty():
+					continue
+				if not rules_by_keyword.has(keyword):
+					rules_by_keyword[keyword] = {}
+				if not rules_by_keyword[keyword].has(section):
+					rules_by_keyword[keyword][section] = []
+				rules_by_keyword[keyword][section].append(i)
+
+	# The regex reports the longest keyword at each position, so a keyword
+	# also carries the rules of the shorter keywords it starts with
+	_keyword_rules.clear()
+	for keyword in rules_by_keyword.keys():
+		var merged = {"targets": []}
+		for other in rules_by_keyword.keys():
+			if not keyword.begins_with(other):
+				continue
+			var sections = rules_by_keyword[other]
+			for section in ORDERED_SECTIONS:
+				if sections.has(section):
+					var index = sections[section].min()
+					if not merged.has(section) or index < merged[section]:
+						merged[section] = index
+			for index in sections.get("targets", []):
+				if not (index in merged.targets):
+					merged.targets.append(index)
+		_keyword_rules[keyword] = merged
+
+	# Without keywords (missing or empty JSON) the group can never match,
+	# instead of matching the empty string at every position
+	var pattern = _trie_pattern(_keyword_rules.keys())
+	if pattern.is_empty():
+		pattern = "(?!)"
+	_regex = RegEx.new()
+	_regex.compile("(?=(" + pattern + "))")
+
+static func _trie_pattern(words: Array) -> String:
+	var trie = {}
+	for word in words:
+		var node = trie
+		for c in word:
+			if not node.has(c):
+				node[c] = {}
+			node = node[c]
+		node[""] = true
+	return _build_trie_node(trie)
+
+static func _build_trie_node(node: Dictionary) -> String:
+	var branches = []
+	var chars = node.keys()
+	chars.sort()
+	for c in chars:
+		if c.is_empty():
+			continue
+		var escaped = c if c.is_valid_identifier() or c.is_valid_int() else "\\" + c
+		branches.append(escaped + _build_trie_node(node[c]))
+	if branches.is_empty():
+		return ""
+	var body = branches[0] if branches.size() == 1 else "(?:" + "|".join(branches) + ")"
+	if node.has(""):
+		# Greedy optional: the longest keyword starting here wins
+		body = "(?:" + body + ")?"
+	return body
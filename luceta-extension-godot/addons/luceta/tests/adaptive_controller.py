@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Adaptive Controller
+Python side of AdaptiveController.gd - sizes ElevenLabs requests from what the
+API actually did instead of fixed guesses. Every request's size (audio seconds
+or characters), latency, response bytes, credits and status go into a small
+stats store shared with the editor (.godot/luceta_cache/request_stats.json).
+Per endpoint it fits latency and cost as lines over the request size, and it
+derives:
+  - duration: the shortest length that still holds the audible part of earlier
+    sounds with the same hint (measured from the returned mp3, see
+    mp3_frames.audible_duration), never longer than the taxonomy guess
+  - concurrency: additive increase while requests succeed, halved on a 429
+  - backoff and spacing: from the observed latency and recent rate limiting
+
+Usage:
+    adaptive_controller.py [--json]   print the fitted models
+"""
+
+import json
+import math
+import os
+import random
+import sys
+import threading
+from pathlib import Path
+
+from mp3_frames import audible_duration
+from sound_taxonomy import get_taxonomy
+
+STATS_PATH = ".godot/luceta_cache/request_stats.json"
+SOUND_ENDPOINT = "sound-generation"
+CREDITS_PER_SECOND = 20.0  # ElevenLabs sound effects are billed per second of audio
+
+# Line fits until enough samples are measured: endpoint -> (base, per unit of size)
+DEFAULT_LATENCY = {SOUND_ENDPOINT: (3.0, 0.4)}
+DEFAULT_TEXT_LATENCY = (1.0, 0.01)
+DEFAULT_CREDITS = {SOUND_ENDPOINT: (0.0, CREDITS_PER_SECOND)}
+DEFAULT_TEXT_CREDITS = (0.0, 1.0)  # Speech is billed per character
+
+MAX_SAMPLES = 200  # Per endpoint
+MAX_DURATION_SAMPLES = 50  # Per sound hint
+MIN_SAMPLES_FOR_FIT = 3
+MIN_DURATION_SAMPLES = 5
+DURATION_QUANTILE = 0.9
+DURATION_MARGIN = 0.25  # Seconds kept after the last audible frame
+MIN_AUDIBLE = 0.05  # Shorter than this the sound is broken, not short
+
+RECENT_WINDOW = 20  # Requests considered for error and rate-limit rates
+MIN_CONCURRENCY = 1
+MAX_CONCURRENCY = 4
+SUCCESSES_PER_STEP = 4  # Successes per slot before concurrency grows by one
+DEFAULT_BACKOFF = 2.0
+MIN_BACKOFF = 0.5
+MAX_BACKOFF = 60.0
+
+
+def fit_line(points, default):
+    """
+    Least-squares (base, slope) through (x, y) points, both non-negative. The
+    default until there are enough points; with a single x value the default
+    slope is kept and the line moves through the mean.
+    """
+    base, slope = default
+    if len(points) < MIN_SAMPLES_FOR_FIT:
+        return base, slope
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    if sxx >= 0.01:
+        slope = max(0.0, sxy / sxx)
+    if mean_y < slope * mean_x:
+        # A negative base would underestimate small requests: go through the origin and the mean
+        slope = mean_y / mean_x
+    return mean_y - slope * mean_x, slope
+
+
+def quantile(values, q):
+    """Nearest-rank quantile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class AdaptiveController:
+    """Per-endpoint request stats with fitted latency/cost models, thread-safe"""
+
+    def __init__(self, project_path):
+        self.stats_path = Path(project_path) / STATS_PATH
+        self.endpoints = {}  # endpoint -> {"samples": [[size, seconds, bytes, credits, status]], "concurrency", "streak"}
+        self.durations = {}  # sound hint -> [[requested, audible]]
+        self.lock = threading.Lock()
+        try:
+            data = json.loads(self.stats_path.read_text(encoding='utf-8'))
+            self.endpoints = data.get("endpoints", {})
+            self.durations = data.get("durations", {})
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    # -- Recording ---------------------------------------------------------
+
+    def record(self, endpoint, size, seconds, status=200, response_bytes=0, credits=None):
+        """One finished request: size in audio seconds or characters, status 0 for network errors"""
+        if credits is None:
+            credits = self.estimate_credits(endpoint, size) if status == 200 else 0.0
+        with self.lock:
+            state = self._state(endpoint)
+            state["samples"].append([size, seconds, response_bytes, credits, status])
+            del state["samples"][:-MAX_SAMPLES]
+            if status == 429:
+                state["concurrency"] = max(MIN_CONCURRENCY, state["concurrency"] // 2)
+                state["streak"] = 0
+            elif status == 200:
+                state["streak"] += 1
+                if state["streak"] >= SUCCESSES_PER_STEP * state["concurrency"]:
+                    state["concurrency"] = min(MAX_CONCURRENCY, state["concurrency"] + 1)
+                    state["streak"] = 0
+            else:
+                state["streak"] = 0
+
+    def record_audible(self, text, requested, body):
+        """Remember how much of a generated sound was audible, for choose_duration"""
+        audible = audible_duration(body)
+        if audible is None or audible < MIN_AUDIBLE:
+            return None
+        hint = get_taxonomy().classify(text)["hint"]
+        with self.lock:
+            samples = self.durations.setdefault(hint, [])
+            samples.append([requested, round(audible, 3)])
+            del samples[:-MAX_DURATION_SAMPLES]
+        return audible
+
+    # -- Decisions ---------------------------------------------------------
+
+    def choose_duration(self, description, sound_name=""):
+        """
+        Requested length for a sound: the taxonomy guess, shortened to what
+        earlier sounds with the same hint actually filled. Loops keep the guess.
+        """
+        taxonomy = get_taxonomy()
+        guess = taxonomy.classify(description)["duration"]
+        priorities = taxonomy.data.get("priorities", {})
+        if guess >= priorities.get("background_min_duration", 10.0):
+            return guess
+        needed = self._needed_duration(taxonomy.classify(f"{sound_name} {description}")["hint"])
+        if needed is None:
+            return guess
+        return min(guess, max(taxonomy.data.get("min_duration", 0.5), math.ceil(needed * 10) / 10))
+
+    def concurrency(self, endpoint):
+        with self.lock:
+            return self._state(endpoint)["concurrency"]
+
+    def backoff(self, endpoint, attempt, retry_after=None):
+        """Seconds before retry number attempt (1-based); a server Retry-After wins"""
+        if retry_after:
+            return max(MIN_BACKOFF, float(retry_after))
+        delay = min(MAX_BACKOFF, self._backoff_base(endpoint) * 2 ** max(0, attempt - 1))
+        return delay * random.uniform(0.5, 1.0)  # Jitter so parallel retries spread out
+
+    def spacing(self, endpoint):
+        """Pause between consecutive requests: none unless the endpoint recently rate-limited us"""
+        model = self.model(endpoint)
+        return self._backoff_base(endpoint) if model["rate_limited"] > 0 else 0.0
+
+    # -- Models ------------------------------------------------------------
+
+    def estimate_seconds(self, endpoint, size):
+        base, slope = self._latency_line(endpoint)
+        return base + slope * size
+
+    def estimate_credits(self, endpoint, size):
+        with self.lock:
+            samples = list(self.endpoints.get(endpoint, {}).get("samples", []))
+        base, slope = fit_line([(s[0], s[3]) for s in samples if s[4] == 200],
+                               DEFAULT_CREDITS.get(endpoint, DEFAULT_TEXT_CREDITS))
+        return base + slope * size
+
+    def model(self, endpoint):
+        """Fitted models and recent rates of one endpoint"""
+        with self.lock:
+            state = self._state(endpoint)
+            samples = list(state["samples"])
+            concurrency = state["concurrency"]
+        ok = [s for s in samples if s[4] == 200]
+        recent = samples[-RECENT_WINDOW:]
+        latency = fit_line([(s[0], s[1]) for s in ok], DEFAULT_LATENCY.get(endpoint, DEFAULT_TEXT_LATENCY))
+        response_bytes = fit_line([(s[0], s[2]) for s in ok], (0.0, 0.0))
+        credits = fit_line([(s[0], s[3]) for s in ok], DEFAULT_CREDITS.get(endpoint, DEFAULT_TEXT_CREDITS))
+        return {
+            "unit": "audio second" if endpoint == SOUND_ENDPOINT else "character",
+            "samples": len(samples),
+            "latency": {"base": latency[0], "per_unit": latency[1]},
+            "bytes": {"base": response_bytes[0], "per_unit": response_bytes[1]},
+            "credits": {"base": credits[0], "per_unit": credits[1]},
+            "p50": quantile([s[1] for s in ok], 0.5) if ok else None,
+            "p95": quantile([s[1] for s in ok], 0.95) if ok else None,
+            "error_rate": sum(1 for s in recent if s[4] != 200) / len(recent) if recent else 0.0,
+            "rate_limited": sum(1 for s in recent if s[4] == 429) / len(recent) if recent else 0.0,
+            "concurrency": concurrency,
+        }
+
+    def metrics(self):
+        """Every endpoint's model plus the learned duration per sound hint"""
+        with self.lock:
+            endpoints = sorted(self.endpoints)
+            hints = sorted(self.durations)
+        return {
+            "endpoints": {endpoint: self.model(endpoint) for endpoint in endpoints},
+            "durations": {hint: {"samples": len(self.durations[hint]), "needed": self._needed_duration(hint)}
+                          for hint in hints},
+        }
+
+    def save(self):
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.stats_path.with_name(self.stats_path.name + ".tmp")
+        with self.lock:
+            text = json.dumps({"version": 1, "endpoints": self.endpoints, "durations": self.durations})
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, self.stats_path)
+
+    def _state(self, endpoint):
+        """Caller holds the lock"""
+        return self.endpoints.setdefault(endpoint, {"samples": [], "concurrency": MIN_CONCURRENCY, "streak": 0})
+
+    def _latency_line(self, endpoint):
+        with self.lock:
+            samples = list(self.endpoints.get(endpoint, {}).get("samples", []))
+        return fit_line([(s[0], s[1]) for s in samples if s[4] == 200],
+                        DEFAULT_LATENCY.get(endpoint, DEFAULT_TEXT_LATENCY))
+
+    def _backoff_base(self, endpoint):
+        """Half the median latency: retrying sooner than a typical request takes only adds load"""
+        p50 = self.model(endpoint)["p50"]
+        return DEFAULT_BACKOFF if p50 is None else min(10.0, max(MIN_BACKOFF, p50 / 2))
+
+    def _needed_duration(self, hint):
+        """
+        Seconds that held the audible part of DURATION_QUANTILE of earlier sounds
+        with this hint, or None. A sound audible up to its end may have been cut
+        off, so it counts as needing the full taxonomy guess.
+        """
+        with self.lock:
+            samples = list(self.durations.get(hint, []))
+        if len(samples) < MIN_DURATION_SAMPLES:
+            return None
+        needed = [audible + DURATION_MARGIN if audible < requested - DURATION_MARGIN else math.inf
+                  for requested, audible in samples]
+        value = quantile(needed, DURATION_QUANTILE)
+        return None if math.isinf(value) else value
+
+
+def print_metrics(metrics):
+    for endpoint, model in metrics["endpoints"].items():
+        unit = model["unit"]
+        p50 = "-" if model["p50"] is None else f"{model['p50']:.2f}s"
+        p95 = "-" if model["p95"] is None else f"{model['p95']:.2f}s"
+        print(f"{endpoint} ({model['samples']} requests)")
+        print(f"  latency  {model['latency']['base']:.2f}s + {model['latency']['per_unit']:.3f}s per {unit}"
+              f"  (p50 {p50}, p95 {p95})")
+        print(f"  credits  {model['credits']['base']:.1f} + {model['credits']['per_unit']:.2f} per {unit}")
+        print(f"  bytes    {model['bytes']['base']:.0f} + {model['bytes']['per_unit']:.0f} per {unit}")
+        print(f"  recent   {model['error_rate']:.0%} errors, {model['rate_limited']:.0%} rate limited, "
+              f"concurrency {model['concurrency']}")
+    if metrics["durations"]:
+        print("durations (seconds needed per sound hint)")
+        for hint, entry in metrics["durations"].items():
+            needed = "taxonomy guess" if entry["needed"] is None else f"{entry['needed']:.2f}s"
+            print(f"  {hint:<14} {needed:<16} {entry['samples']} sounds")
+    if not metrics["endpoints"] and not metrics["durations"]:
+        print("No requests recorded yet")
+
+
+def main():
+    controller = AdaptiveController(Path(__file__).resolve().parent.parent.parent.parent)
+    if "--json" in sys.argv[1:]:
+        print(json.dumps(controller.metrics(), indent=2))
+    else:
+        print_metrics(controller.metrics())
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
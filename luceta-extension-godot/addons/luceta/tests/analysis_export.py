@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Analysis Export
+Writes analyzer findings of one or many projects as a columnar table: Parquet
+(dictionary-encoded) when pyarrow is installed, otherwise a NumPy .npz with a
+structured array of integer codes plus one category array per string column.
+Aggregating millions of findings is then a bincount instead of a JSON walk.
+
+Usage:
+    analysis_export.py export <out.parquet|out.npz> [project_root ...]
+    analysis_export.py summary <file> [--top 15]
+    analysis_export.py bench [rows]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from test_analyzer import CodeAnalyzerSimulator
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+STRING_COLUMNS = ("project", "file", "kind", "name", "hint")
+INT_COLUMNS = ("line_start", "line_end")
+RESULT_KEYS = ("events", "actions", "interactions", "dialogs", "signals")
+
+
+def _line_of(content, needle):
+    offset = content.find(needle) if needle else -1
+    return content.count("\n", 0, offset) + 1 if offset >= 0 else 0
+
+
+def _span(content, item):
+    """(first, last) line of the code a finding came from, 0 when it can't be located"""
+    kind = item.get("type", "")
+    name = item.get("name", "")
+    if kind == "function":
+        start = _line_of(content, f"func {name}")
+        if not start:
+            return 0, 0
+        # Up to the next top-level func (or the end of the file)
+        rest = content.split("\n")[start:]
+        end = start + next((i for i, line in enumerate(rest) if line.startswith("func ")), len(rest))
+        return start, end
+    if kind == "state":
+        line = _line_of(content, name)
+        return line, line
+    if kind == "collision":
+        line = _line_of(content, "_on_body_entered") or _line_of(content, "_on_area_entered")
+        return line, line
+    if kind == "signal":
+        line = _line_of(content, f"signal {name}")
+        return line, line
+    if kind == "signal_connection":
+        line = _line_of(content, f'[connection signal="{name}"')
+        return line, line
+    if kind == "dialog":
+        line = _line_of(content, f'[node name="{name}"')
+        return line, line
+    return 0, 0
+
+
+def collect_findings(project_root, project_name=None):
+    """One dict per finding: project, file (project-relative), kind, name, hint, line_start, line_end"""
+    root = Path(project_root).resolve()
+    project_name = project_name or root.name
+    analyzer = CodeAnalyzerSimulator(root)
+    rows = []
+    for suffix in ('.gd', '.tscn'):
+        for file_path in sorted(analyzer.find_files(root, suffix)):
+            content = file_path.read_text(encoding='utf-8', errors='replace')
+            if suffix == '.gd':
+                results = analyzer.analyze_gd_file(file_path)
+            else:
+                results = analyzer.analyze_scene_file(file_path)
+            rel = file_path.relative_to(root).as_posix()
+            for key in RESULT_KEYS:
+                for item in results.get(key, []):
+                    start, end = _span(content, item)
+                    rows.append({
+                        "project": project_name,
+                        "file": rel,
+                        "kind": item.get("type", key),
+                        "name": item.get("name", ""),
+                        "hint": item.get("sound_hint", ""),
+                        "line_start": start,
+                        "line_end": end,
+                    })
+    return rows
+
+
+class FindingsTable:
+    """Dictionary-encoded columns: int32 codes per string column plus its categories"""
+
+    def __init__(self, codes, categories, ints):
+        self.codes = codes            # column -> np.int32 array
+        self.categories = categories  # column -> np.str_ array
+        self.ints = ints              # column -> np.int32 array
+
+    def __len__(self):
+        return len(self.ints["line_start"])
+
+    @classmethod
+    def from_rows(cls, rows):
+        codes, categories = {}, {}
+        for column in STRING_COLUMNS:
+            values = [row[column] for row in rows]
+            uniques, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+            codes[column] = inverse.astype(np.int32)
+            categories[column] = uniques
+        ints = {column: np.array([row[column] for row in rows], dtype=np.int32) for column in INT_COLUMNS}
+        return cls(codes, categories, ints)
+
+    @classmethod
+    def concat(cls, tables):
+        """Merge tables, re-mapping codes onto the union of categories"""
+        codes, categories, ints = {}, {}, {}
+        for column in STRING_COLUMNS:
+            union = np.unique(np.concatenate([t.categories[column] for t in tables] or [np.array([], dtype=str)]))
+            categories[column] = union
+            codes[column] = np.concatenate(
+                [np.searchsorted(union, t.categories[column]).astype(np.int32)[t.codes[column]] for t in tables]
+                or [np.array([], dtype=np.int32)])
+        for column in INT_COLUMNS:
+            ints[column] = np.concatenate([t.ints[column] for t in tables] or [np.array([], dtype=np.int32)])
+        return cls(codes, categories, ints)
+
+    def column(self, name):
+        """Decoded values of one column"""
+        if name in self.ints:
+            return self.ints[name]
+        return self.categories[name][self.codes[name]]
+
+    def counts(self, column, where=None):
+        """[(value, count)] most common first, optionally over a boolean mask"""
+        codes = self.codes[column] if where is None else self.codes[column][where]
+        counts = np.bincount(codes, minlength=len(self.categories[column]))
+        order = np.argsort(counts, kind="stable")[::-1]
+        return [(str(self.categories[column][i]), int(counts[i])) for i in order if counts[i]]
+
+    def code_of(self, column, value):
+        index = int(np.searchsorted(self.categories[column], value))
+        if index < len(self.categories[column]) and self.categories[column][index] == value:
+            return index
+        return -1
+
+    # -- Storage ---------------------------------------------------------------
+
+    def save(self, path):
+        path = Path(path)
+        if path.suffix == ".parquet":
+            if pa is None:
+                raise RuntimeError("Parquet export needs pyarrow; use a .npz path instead")
+            arrays = {column: pa.DictionaryArray.from_arrays(pa.array(self.codes[column]),
+                                                             pa.array(self.categories[column].tolist()))
+                      for column in STRING_COLUMNS}
+            arrays.update({column: pa.array(self.ints[column]) for column in INT_COLUMNS})
+            pq.write_table(pa.table(arrays), path)
+            return path
+
+        dtype = [(column, np.int32) for column in STRING_COLUMNS + INT_COLUMNS]
+        findings = np.empty(len(self), dtype=dtype)
+        for column in STRING_COLUMNS:
+            findings[column] = self.codes[column]
+        for column in INT_COLUMNS:
+            findings[column] = self.ints[column]
+        np.savez_compressed(path, findings=findings,
+                            **{f"categories_{column}": self.categories[column] for column in STRING_COLUMNS})
+        return path
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        if path.suffix == ".parquet":
+            if pa is None:
+                raise RuntimeError("Reading Parquet needs pyarrow")
+            table = pq.read_table(path)
+            codes, categories = {}, {}
+            for column in STRING_COLUMNS:
+                chunked = table.column(column).combine_chunks()
+                if not pa.types.is_dictionary(chunked.type):
+                    chunked = chunked.dictionary_encode()
+                # Sorted categories, so code_of can binary-search them
+                dictionary = np.array(chunked.dictionary.to_pylist(), dtype=str)
+                order = np.argsort(dictionary)
+                remap = np.empty(len(order), dtype=np.int32)
+                remap[order] = np.arange(len(order), dtype=np.int32)
+                codes[column] = remap[chunked.indices.to_numpy(zero_copy_only=False)]
+                categories[column] = dictionary[order]
+            ints = {column: table.column(column).to_numpy().astype(np.int32) for column in INT_COLUMNS}
+            return cls(codes, categories, ints)
+
+        with np.load(path, allow_pickle=False) as data:
+            findings = data["findings"]
+            codes = {column: findings[column].copy() for column in STRING_COLUMNS}
+            ints = {column: findings[column].copy() for column in INT_COLUMNS}
+            categories = {column: data[f"categories_{column}"] for column in STRING_COLUMNS}
+        return cls(codes, categories, ints)
+
+
+def default_suffix():
+    return ".parquet" if pa is not None else ".npz"
+
+
+def print_summary(table, top=15):
+    print(f"{len(table)} findings in {len(table.categories['project'])} projects, "
+          f"{len(table.categories['file'])} files")
+    print("\nSound hints:")
+    for hint, count in table.counts("hint", table.codes["hint"] != table.code_of("hint", ""))[:top]:
+        print(f"  {hint:<20} {count}")
+    print("\nFinding kinds:")
+    for kind, count in table.counts("kind")[:top]:
+        print(f"  {kind:<20} {count}")
+
+    # Names the taxonomy couldn't place are where new keywords pay off
+    generic = table.code_of("hint", "generic")
+    if generic >= 0:
+        print("\nMost common names classified as 'generic' (taxonomy tuning candidates):")
+        for name, count in table.counts("name", table.codes["hint"] == generic)[:top]:
+            print(f"  {name:<30} {count}")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    command = sys.argv[1]
+
+    if command == "export":
+        if len(sys.argv) < 3:
+            print(__doc__)
+            return 1
+        output = Path(sys.argv[2])
+        roots = sys.argv[3:] or [str(Path(__file__).resolve().parent.parent.parent.parent)]
+        if output.suffix not in (".parquet", ".npz"):
+            output = output.with_suffix(default_suffix())
+        tables = [FindingsTable.from_rows(collect_findings(root)) for root in roots]
+        table = FindingsTable.concat(tables)
+        table.save(output)
+        print(f"Wrote {len(table)} findings from {len(roots)} projects to {output}")
+        return 0
+
+    if command == "summary":
+        if len(sys.argv) < 3:
+            print(__doc__)
+            return 1
+        top = int(sys.argv[sys.argv.index("--top") + 1]) if "--top" in sys.argv else 15
+        start = time.perf_counter()
+        table = FindingsTable.load(sys.argv[2])
+        print_summary(table, top)
+        print(f"\nLoaded and aggregated in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return 0
+
+    if command == "bench":
+        rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+        rng = np.random.default_rng(0)
+        hints = np.array(["footstep", "jump", "attack", "collect", "interaction", "generic", "ui_click", ""])
+        table = FindingsTable(
+            {"project": rng.integers(0, 40, rows, dtype=np.int32),
+             "file": rng.integers(0, 20000, rows, dtype=np.int32),
+             "kind": rng.integers(0, 3, rows, dtype=np.int32),
+             "name": rng.integers(0, 50000, rows, dtype=np.int32),
+             "hint": rng.integers(0, len(hints), rows, dtype=np.int32)},
+            {"project": np.array([f"project_{i:02d}" for i in range(40)]),
+             "file": np.array([f"scripts/file_{i:05d}.gd" for i in range(20000)]),
+             "kind": np.array(["function", "signal", "state"]),
+             "name": np.array([f"_name_{i:05d}" for i in range(50000)]),
+             "hint": np.sort(hints)},
+            {"line_start": rng.integers(1, 500, rows, dtype=np.int32),
+             "line_end": rng.integers(1, 500, rows, dtype=np.int32)})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = table.save(Path(tmp) / f"bench{default_suffix()}")
+            start = time.perf_counter()
+            loaded = FindingsTable.load(path)
+            per_hint = loaded.counts("hint")
+            per_project = loaded.counts("project")
+            elapsed = time.perf_counter() - start
+        print(f"{rows} findings: load + 2 aggregations in {elapsed * 1000:.0f} ms ({path.suffix})")
+        print(f"  top hint {per_hint[0]}, {len(per_project)} projects")
+        return 0
+
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+API Stub Server
+Local asyncio stand-in for the Groq and ElevenLabs endpoints the addon uses, with
+latency distributions, 429/5xx and truncated-body injection, and record/replay
+cassettes. Lets the generation, retry and caching paths be load-tested offline.
+
+Usage:
+    api_stub_server.py [--port 8765] [--latency lognormal:-2.5,0.6] [--rate-429 0.05]
+                       [--rate-5xx 0.02] [--rate-truncate 0.01] [--seed 1]
+                       [--record cassette.jsonl | --replay cassette.jsonl]
+
+Point the runners at it with GROQ_BASE_URL=http://127.0.0.1:8765 and
+ELEVENLABS_BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from async_http import end_event_stream, read_request, send_event, send_response, start_event_stream
+
+DEFAULT_PORT = 8765
+GROQ_UPSTREAM = "https://api.groq.com"
+ELEVENLABS_UPSTREAM = "https://api.elevenlabs.io"
+
+# One MPEG1 layer III frame: 128 kbps, 44.1 kHz, 1152 samples
+FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x44])
+FRAME_LENGTH = 417
+FRAME_SECONDS = 1152 / 44100
+SPEECH_CHARS_PER_SECOND = 15.0
+
+
+def synth_mp3(seconds):
+    """A parseable mp3 of roughly the requested length (silent frames)"""
+    frames = max(1, int(math.ceil(seconds / FRAME_SECONDS)))
+    frame = FRAME_HEADER + bytes(FRAME_LENGTH - len(FRAME_HEADER))
+    return b"ID3\x03\x00\x00\x00\x00\x00\x00" + frame * frames
+
+
+def speech_seconds(text):
+    return max(0.5, len(text) / SPEECH_CHARS_PER_SECOND)
+
+
+def parse_latency(spec):
+    """
+    'fixed:0.1', 'uniform:0.05,0.3', 'exponential:0.2' or 'lognormal:mu,sigma' (seconds).
+    Returns a function rng -> delay.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda rng: values[0] if values else 0.0
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exponential":
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class FaultConfig:
+    """Latency and failure injection. Draws are seeded per request content, so
+    the same request sequence sees the same faults regardless of interleaving."""
+
+    def __init__(self, latency="fixed:0", rate_429=0.0, rate_5xx=0.0, rate_truncate=0.0, seed=0):
+        self.latency = parse_latency(latency)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_truncate = rate_truncate
+        self.seed = seed
+
+    def rng_for(self, key, occurrence):
+        digest = hashlib.sha256(f"{self.seed}:{key}:{occurrence}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+class Cassette:
+    """Recorded request/response pairs, one JSON line each, matched by method, path and body"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding='utf-8').split('\n'):
+                if line:
+                    entry = json.loads(line)
+                    self.entries.setdefault(entry["key"], []).append(entry)
+        self._cursor = {}
+
+    @staticmethod
+    def key(method, path, body):
+        return f"{method} {path} {hashlib.sha256(body).hexdigest()}"
+
+    def next(self, key):
+        """Replay responses for a key in recorded order, repeating the last one"""
+        entries = self.entries.get(key)
+        if not entries:
+            return None
+        index = self._cursor.get(key, 0)
+        self._cursor[key] = index + 1
+        return entries[min(index, len(entries) - 1)]
+
+    def record(self, key, status, headers, body):
+        entry = {"key": key, "status": status, "headers": headers,
+                 "body": base64.b64encode(body).decode()}
+        self.entries.setdefault(key, []).append(entry)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+class StubServer:
+    """Asyncio HTTP/1.1 server speaking the Groq and ElevenLabs request shapes"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, faults=None, record=None, replay=None):
+        self.host = host
+        self.port = port
+        self.faults = faults or FaultConfig()
+        self.recording = Cassette(record) if record else None
+        self.replaying = Cassette(replay) if replay else None
+        self.stats = {"requests": 0, "by_route": {}, "injected": {"429": 0, "5xx": 0, "truncated": 0}}
+        self._occurrences = {}
+        self._server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # -- HTTP plumbing -----------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                keep_alive = await self._dispatch(writer, *request)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _send(self, writer, status, headers, body, truncate=False):
+        return await send_response(writer, status, headers, body, truncate)
+
+    async def _send_stream(self, writer, chunks, delay):
+        await start_event_stream(writer)
+        for chunk in chunks:
+            await send_event(writer, chunk)
+            await asyncio.sleep(delay)
+        await end_event_stream(writer)
+        return True
+
+    # -- Routing -----------------------------------------------------------
+
+    async def _dispatch(self, writer, method, target, headers, body):
+        path = target.split("?", 1)[0]
+        if path == "/__stats":
+            return await self._send(writer, 200, {"Content-Type": "application/json"},
+                                    json.dumps(self.stats).encode())
+
+        # Counted after the stats route, so polling the stats doesn't show up in them
+        route = self._route_name(path)
+        self.stats["requests"] += 1
+        self.stats["by_route"][route] = self.stats["by_route"].get(route, 0) + 1
+
+        key = Cassette.key(method, target, body)
+        occurrence = self._occurrences.get(key, 0)
+        self._occurrences[key] = occurrence + 1
+        rng = self.faults.rng_for(key, occurrence)
+
+        await asyncio.sleep(self.faults.latency(rng))
+
+        roll = rng.random()
+        if roll < self.faults.rate_429:
+            self.stats["injected"]["429"] += 1
+            return await self._send(writer, 429, {"Retry-After": "1", "Content-Type": "application/json"},
+                                    b'{"error": {"message": "Rate limit reached", "type": "rate_limit"}}')
+        if roll < self.faults.rate_429 + self.faults.rate_5xx:
+            self.stats["injected"]["5xx"] += 1
+            status = rng.choice([500, 502, 503])
+            return await self._send(writer, status, {"Content-Type": "application/json"},
+                                    b'{"error": {"message": "Injected server error"}}')
+        truncate = rng.random() < self.faults.rate_truncate
+        if truncate:
+            self.stats["injected"]["truncated"] += 1
+
+        if self.replaying:
+            entry = self.replaying.next(key)
+            if entry is None:
+                return await self._send(writer, 404, {"Content-Type": "application/json"},
+                                        b'{"error": {"message": "No cassette entry for request"}}')
+            return await self._send(writer, entry["status"], entry["headers"],
+                                    base64.b64decode(entry["body"]), truncate)
+
+        if self.recording:
+            status, response_headers, response_body = await asyncio.get_running_loop().run_in_executor(
+                None, self._forward, method, target, headers, body)
+            self.recording.record(key, status, response_headers, response_body)
+            return await self._send(writer, status, response_headers, response_body, truncate)
+
+        if method != "POST":
+            return await self._send(writer, 405, {}, b"")
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            payload = {}
+
+        if route == "chat" and payload.get("stream"):
+            content = self._chat_content(payload)
+            pieces = [content[i:i + 40] for i in range(0, len(content), 40)]
+            return await self._send_stream(writer, self._stream_chunks(payload, pieces), 0.0)
+
+        response = self._synthesize(route, path, payload)
+        if response is None:
+            return await self._send(writer, 404, {"Content-Type": "application/json"},
+                                    json.dumps({"error": {"message": f"Unknown route {path}"}}).encode())
+        content_type, response_body = response
+        return await self._send(writer, 200, {"Content-Type": content_type}, response_body, truncate)
+
+    @staticmethod
+    def _route_name(path):
+        if path.endswith("/chat/completions"):
+            return "chat"
+        if path.endswith("/sound-generation"):
+            return "sound-generation"
+        if "/text-to-speech/" in path:
+            return "text-to-speech"
+        if path.endswith("/text-to-dialogue/with-timestamps"):
+            return "text-to-dialogue-timestamps"
+        if path.endswith("/text-to-dialogue"):
+            return "text-to-dialogue"
+        return path
+
+    def _forward(self, method, target, headers, body):
+        """Record mode: pass the request on to the real API"""
+        upstream = GROQ_UPSTREAM if target.startswith("/openai/") else ELEVENLABS_UPSTREAM
+        forward_headers = {name: value for name, value in headers.items()
+                           if name in ("authorization", "xi-api-key", "content-type", "accept")}
+        req = urllib.request.Request(upstream + target, body or None, forward_headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=120) as response:
+                return response.status, {"Content-Type": response.headers.get("Content-Type", "")}, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, {"Content-Type": e.headers.get("Content-Type", "")}, e.read()
+
+    # -- Synthetic responses -----------------------------------------------
+
+    def _synthesize(self, route, path, payload):
+        if route == "chat":
+            completion = {
+                "id": f"chatcmpl-stub-{self.stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": payload.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self._chat_content(payload)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            }
+            return "application/json", json.dumps(completion).encode()
+        if route == "sound-generation":
+            return "audio/mpeg", synth_mp3(float(payload.get("duration_seconds") or 1.5))
+        if route == "text-to-speech":
+            return "audio/mpeg", synth_mp3(speech_seconds(payload.get("text", "")))
+        if route in ("text-to-dialogue", "text-to-dialogue-timestamps"):
+            return self._dialogue(route, payload)
+        return None
+
+    @staticmethod
+    def _chat_content(payload):
+        """fx suggestions for every '- name' line in the prompt, in the format the prompts ask for"""
+        prompt = " ".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        names = re.findall(r'^- ([A-Za-z_][\w]*)', prompt, re.MULTILINE)
+        fx = [{"name": f"{name.strip('_')}_sfx", "description": f"Short game sound for {name}",
+               "why": "Stub suggestion", "context": name} for name in dict.fromkeys(names)]
+        return json.dumps({"fx": fx, "bgm": []})
+
+    @staticmethod
+    def _stream_chunks(payload, pieces):
+        base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": payload.get("model", "stub")}
+        yield json.dumps({**base, "choices": [{"index": 0, "delta": {"role": "assistant"}, "finish_reason": None}]})
+        for piece in pieces:
+            yield json.dumps({**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+        yield json.dumps({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        yield "[DONE]"
+
+    @staticmethod
+    def _dialogue(route, payload):
+        inputs = payload.get("inputs") or [{"text": payload.get("text", ""), "voice_id": payload.get("voice_id", "")}]
+        segments = []
+        elapsed = 0.0
+        chars = 0
+        for index, line in enumerate(inputs):
+            seconds = speech_seconds(line.get("text", ""))
+            segments.append({
+                "voice_id": line.get("voice_id", ""),
+                "start_time_seconds": round(elapsed + 0.05, 3),
+                "end_time_seconds": round(elapsed + seconds - 0.05, 3),
+                "character_start_index": chars,
+                "character_end_index": chars + len(line.get("text", "")),
+                "dialogue_input_index": index
+            })
+            elapsed += seconds
+            chars += len(line.get("text", ""))
+
+        audio = synth_mp3(elapsed)
+        if route == "text-to-dialogue":
+            return "audio/mpeg", audio
+        return "application/json", json.dumps({
+            "audio_base64": base64.b64encode(audio).decode(),
+            "alignment": None,
+            "voice_segments": segments
+        }).encode()
+
+
+def run_in_thread(**kwargs):
+    """
+    Start a StubServer on a background event loop (port 0 picks a free port).
+    Returns (server, stop) where stop() shuts it down.
+    """
+    kwargs.setdefault("port", 0)
+    server = StubServer(**kwargs)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return server, stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Groq/ElevenLabs stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S | uniform:A,B | exponential:MEAN | lognormal:MU,SIGMA")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--rate-truncate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", help="Forward to the real APIs and append responses to this cassette")
+    group.add_argument("--replay", help="Serve responses from this cassette")
+    args = parser.parse_args()
+
+    faults = FaultConfig(args.latency, args.rate_429, args.rate_5xx, args.rate_truncate, args.seed)
+    server = StubServer(args.host, args.port, faults, args.record, args.replay)
+
+    print(f"API stub listening on {server.base_url}")
+    print(f"  GROQ_BASE_URL={server.base_url}")
+    print(f"  ELEVENLABS_BASE_URL={server.base_url}/v1")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Async HTTP Helpers
+Minimal HTTP/1.1 reading and writing on asyncio streams, shared by the local
+servers (api_stub_server.py, batch_service.py) so they need no web framework
+"""
+
+import json
+
+REASONS = {200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized",
+           404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+           429: "Too Many Requests", 500: "Internal Server Error", 502: "Bad Gateway",
+           503: "Service Unavailable"}
+
+MAX_BODY_SIZE = 256 * 1024 * 1024
+
+
+async def read_request(reader):
+    """
+    Read one request from the stream.
+    Returns (method, target, headers, body) or None when the client closed the connection.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, target, _version = request_line.decode('latin-1').split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY_SIZE:
+        raise ValueError(f"Request body too large: {length} bytes")
+    body = await reader.readexactly(length)
+    return method, target, headers, body
+
+
+async def send_response(writer, status, headers, body, truncate=False):
+    """
+    Write a complete response. With truncate only half of the body is sent
+    (fault injection). Returns whether the connection can be kept alive.
+    """
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}", f"Content-Length: {len(body)}"]
+    head += [f"{name}: {value}" for name, value in headers.items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode('latin-1'))
+    writer.write(body[:len(body) // 2] if truncate else body)
+    await writer.drain()
+    return not truncate  # A truncated response ends the connection
+
+
+async def send_json(writer, status, data, headers=None):
+    return await send_response(writer, status, {"Content-Type": "application/json", **(headers or {})},
+                               json.dumps(data).encode())
+
+
+async def start_event_stream(writer):
+    """Begin a chunked text/event-stream response"""
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                 b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n")
+    await writer.drain()
+
+
+async def send_event(writer, data, event=None):
+    """Send one server-sent event as its own chunk"""
+    text = (f"event: {event}\n" if event else "") + f"data: {data}\n\n"
+    payload = text.encode()
+    writer.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+    await writer.drain()
+
+
+async def end_event_stream(writer):
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Audio Cache Store
+Python side of AudioCache.gd - JSON snapshots plus an append-only update log,
+loaded lazily and compacted once the log outgrows the live entries
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+CACHE_DIR = ".godot/luceta_cache"
+ANALYSIS_CACHE_FILE = "analysis_cache.json"
+AUDIO_METADATA_FILE = "audio_metadata.json"
+LOG_FILE = "cache_log.jsonl"
+COMPACT_MIN_RECORDS = 256
+
+
+class AudioCacheStore:
+    """Python mirror of the GDScript AudioCache storage"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+        self.analysis_cache = {}
+        self.audio_metadata = {}
+        self._loaded = False
+        self._log_records = 0
+        self._batch_depth = 0
+        self._pending = []
+
+    @classmethod
+    def for_project(cls, project_path):
+        return cls(Path(project_path) / CACHE_DIR)
+
+    def _ensure_loaded(self):
+        """Load snapshots and replay the log on first use"""
+        if self._loaded:
+            return
+        self._loaded = True
+        self.analysis_cache = self._read_snapshot(ANALYSIS_CACHE_FILE)
+        self.audio_metadata = self._read_snapshot(AUDIO_METADATA_FILE)
+
+        log_path = self.cache_dir / LOG_FILE
+        if not log_path.exists():
+            return
+        torn = False
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append leaves a partial last line
+                    torn = True
+                    continue
+                self._apply(record)
+                self._log_records += 1
+        if torn:
+            self.compact()
+
+    def _read_snapshot(self, name):
+        path = self.cache_dir / name
+        if not path.exists():
+            return {}
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _apply(self, record):
+        table = self.audio_metadata if record.get("table") == "audio" else self.analysis_cache
+        if record.get("op") == "set":
+            table[record["key"]] = record["value"]
+        elif record.get("op") == "erase":
+            table.pop(record["key"], None)
+
+    def get_cached_analysis(self, cache_key):
+        self._ensure_loaded()
+        return self.analysis_cache.get(cache_key, {})
+
+    def save_analysis_cache(self, cache_key, results):
+        self._ensure_loaded()
+        self.analysis_cache[cache_key] = results
+        self._append({"table": "analysis", "op": "set", "key": cache_key, "value": results})
+
+    def is_audio_generated(self, sound_name):
+        self._ensure_loaded()
+        return sound_name in self.audio_metadata
+
+    def get_audio_path(self, sound_name):
+        self._ensure_loaded()
+        return self.audio_metadata.get(sound_name, {}).get("path", "")
+
+    def save_audio_metadata(self, sound_name, file_path, description):
+        self._ensure_loaded()
+        self.audio_metadata[sound_name] = {
+            "path": str(file_path),
+            "description": description,
+            "generated_at": time.time()
+        }
+        self._append({"table": "audio", "op": "set", "key": sound_name,
+                      "value": self.audio_metadata[sound_name]})
+
+    def erase_audio_metadata(self, sound_name):
+        self._ensure_loaded()
+        if self.audio_metadata.pop(sound_name, None) is not None:
+            self._append({"table": "audio", "op": "erase", "key": sound_name})
+
+    @contextmanager
+    def batch(self):
+        """Buffer updates and write them in one append when the block exits"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush_pending()
+
+    def _append(self, record):
+        self._pending.append(record)
+        if self._batch_depth == 0:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if not self._pending:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write("".join(json.dumps(record) + "\n" for record in self._pending))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._log_records += len(self._pending)
+        self._pending = []
+
+        if self._log_records > max(COMPACT_MIN_RECORDS, len(self.analysis_cache) + len(self.audio_metadata)):
+            self.compact()
+
+    def compact(self):
+        """Fold the log into fresh snapshots and start an empty log"""
+        self._ensure_loaded()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._write_snapshot(ANALYSIS_CACHE_FILE, self.analysis_cache)
+        self._write_snapshot(AUDIO_METADATA_FILE, self.audio_metadata)
+
+        log_path = self.cache_dir / LOG_FILE
+        if log_path.exists():
+            log_path.unlink()
+        self._log_records = 0
+
+    def _write_snapshot(self, name, data):
+        path = self.cache_dir / name
+        tmp_path = path.with_name(name + ".tmp")
+        tmp_path.write_text(json.dumps(data), encoding='utf-8')
+        os.replace(tmp_path, path)
+
+
+def main():
+    if len(sys.argv) > 1:
+        store = AudioCacheStore.for_project(sys.argv[1])
+        store._ensure_loaded()
+        print(f"Analysis entries: {len(store.analysis_cache)}")
+        print(f"Audio entries: {len(store.audio_metadata)}")
+        for sound_name, entry in sorted(store.audio_metadata.items()):
+            print(f"  {sound_name}: {entry.get('path', '')}")
+        return 0
+
+    # Benchmark: single updates against a 10k-entry library
+    with tempfile.TemporaryDirectory() as tmp:
+        store = AudioCacheStore(tmp)
+        with store.batch():
+            for i in range(10000):
+                store.save_audio_metadata(f"sound_{i}", f"res://luceta_generated/sound_{i}.mp3", "benchmark")
+
+        start = time.perf_counter()
+        for i in range(200):
+            store.save_audio_metadata(f"sound_{i}", f"res://luceta_generated/sound_{i}.mp3", "updated")
+        per_update = (time.perf_counter() - start) * 1000 / 200
+        print(f"Single update on 10k entries: {per_update:.2f} ms")
+
+        start = time.perf_counter()
+        reloaded = AudioCacheStore(tmp)
+        reloaded.is_audio_generated("sound_0")
+        print(f"Lazy load of 10k entries: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Backup Store CLI
+Headless restore of BackupManager.gd backups (for CI runs without the editor)
+
+Usage:
+    backup_store.py list
+    backup_store.py verify
+    backup_store.py restore [res://path.gd ...]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import zlib
+from pathlib import Path
+
+MANIFEST_VERSION = 2
+BACKUP_DIR = "agent_sfx_generated/.backups"
+
+
+def _decompress(data, compression):
+    if compression == "deflate":
+        # Godot's COMPRESSION_DEFLATE writes a zlib stream
+        return zlib.decompress(data)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd blob needs the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+class BackupStore:
+    """Python mirror of the GDScript BackupManager's content-addressed store"""
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        self.backup_dir = self.project_path / BACKUP_DIR
+        self.manifest_path = self.backup_dir / "manifest.json"
+        self.blob_dir = self.backup_dir / "blobs"
+        self.backups = self._load_manifest()
+
+    def _load_manifest(self):
+        if not self.manifest_path.exists():
+            return {}
+        data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        if data.get("version", 1) >= MANIFEST_VERSION:
+            return data.get("files", {})
+        return data  # Legacy manifest: file_path -> entry at the top level
+
+    def save_manifest(self):
+        """Atomic rewrite, same layout as BackupManager._save_manifest"""
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": MANIFEST_VERSION, "files": self.backups}, indent="\t"),
+                            encoding='utf-8')
+        os.replace(tmp_path, self.manifest_path)
+
+    def globalize(self, res_path):
+        return self.project_path / str(res_path).replace("res://", "", 1)
+
+    def read_backup(self, backup_info):
+        """Original bytes of a manifest entry; raises ValueError if the backup is damaged"""
+        if "backup_path" in backup_info:
+            path = self.globalize(backup_info["backup_path"])
+            if not path.exists():
+                raise ValueError(f"Missing legacy backup {backup_info['backup_path']}")
+            return path.read_bytes()
+
+        blob = backup_info.get("blob", "")
+        compression = backup_info.get("compression", "deflate")
+        blob_path = self.blob_dir / f"{blob}.{compression}"
+        if not blob_path.exists():
+            raise ValueError(f"Missing blob {blob}")
+
+        content = _decompress(blob_path.read_bytes(), compression)
+        if len(content) != backup_info.get("size", -1) or hashlib.sha256(content).hexdigest() != blob:
+            raise ValueError(f"Blob {blob} does not match its hash")
+        return content
+
+    def verify(self):
+        """Returns [(file_path, error)] for every entry that can't be restored"""
+        problems = []
+        for file_path, backup_info in self.backups.items():
+            try:
+                self.read_backup(backup_info)
+            except (ValueError, OSError, zlib.error) as e:
+                problems.append((file_path, str(e)))
+        return problems
+
+    def restore(self, file_paths=None):
+        """
+        Restore the given files (all by default) with one manifest write.
+        Each blob is decompressed once. Returns {"restored": [...], "failed": [(path, error)]}
+        """
+        report = {"restored": [], "failed": []}
+        decompressed = {}
+        for file_path in list(file_paths or self.backups.keys()):
+            backup_info = self.backups.get(file_path)
+            if backup_info is None:
+                report["failed"].append((file_path, "No backup"))
+                continue
+            try:
+                blob = backup_info.get("blob")
+                if blob and blob in decompressed:
+                    content = decompressed[blob]
+                else:
+                    content = self.read_backup(backup_info)
+                    if blob:
+                        decompressed[blob] = content
+                target = self.globalize(file_path)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(content)
+            except (ValueError, OSError, zlib.error) as e:
+                report["failed"].append((file_path, str(e)))
+                continue
+            del self.backups[file_path]
+            report["restored"].append(file_path)
+
+        if report["restored"]:
+            self.save_manifest()
+        return report
+
+
+def main():
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    store = BackupStore(base_path)
+
+    if command == "list":
+        blobs = {info.get("blob", info.get("backup_path")) for info in store.backups.values()}
+        print(f"{len(store.backups)} backed up files, {len(blobs)} unique blobs")
+        for file_path, info in sorted(store.backups.items()):
+            print(f"  {file_path} -> {info.get('blob', info.get('backup_path', ''))[:12]}")
+        return 0
+
+    if command == "verify":
+        problems = store.verify()
+        for file_path, error in problems:
+            print(f"  BROKEN {file_path}: {error}")
+        print(f"{len(store.backups) - len(problems)}/{len(store.backups)} backups restorable")
+        return 0 if not problems else 1
+
+    if command == "restore":
+        report = store.restore(sys.argv[2:] or None)
+        for file_path in report["restored"]:
+            print(f"  Restored {file_path}")
+        for file_path, error in report["failed"]:
+            print(f"  FAILED {file_path}: {error}")
+        print(f"Restored {len(report['restored'])}, failed {len(report['failed'])}")
+        return 0 if not report["failed"] else 1
+
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Batch Generation Service
+Long-running HTTP service that accepts batch jobs (a zipped Godot project or a
+list of fx specs), keeps them in a persistent SQLite queue and generates them
+with a bounded worker pool under per-tenant concurrency and rate limits.
+
+Usage:
+    batch_service.py [--port 8780] [--data-dir DIR] [--workers 8] [--tenants tenants.json]
+
+API (Authorization: Bearer <tenant key>):
+    POST   /v1/jobs                       {"fx": [...]} or {"project_archive": "<base64 zip>"}
+    GET    /v1/jobs                       jobs of the tenant
+    GET    /v1/jobs/<id>                  status counts
+    GET    /v1/jobs/<id>/events           progress as server-sent events
+    GET    /v1/jobs/<id>/results          per-sound state, hash and download path
+    GET    /v1/jobs/<id>/files/<name>.mp3 generated audio
+    DELETE /v1/jobs/<id>                  cancel queued sounds
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import sqlite3
+import tempfile
+import time
+import uuid
+import zipfile
+from pathlib import Path
+
+import luceta_config
+from async_http import end_event_stream, read_request, send_event, send_json, send_response, start_event_stream
+from generation_journal import MAX_ATTEMPTS, file_sha256
+from hedged_llm import LatencyHistogram, hedged_request
+from local_suggestions import suggest_locally
+from sfx_dedup import dedupe_suggestions
+from sfx_generator import SOUND_NAME_PATTERN, ElevenLabsGenerator, fx_spec_error, load_elevenlabs_key
+from test_analyzer import CodeAnalyzerSimulator
+from test_llm_workflow import build_prompt
+
+DEFAULT_PORT = 8780
+DEFAULT_WORKERS = 8
+DEFAULT_TENANT = {"concurrency": 2, "rate_per_minute": 60, "max_queued": 5000}
+MAX_ARCHIVE_MEMBERS = 20000
+MAX_ARCHIVE_BYTES = 512 * 1024 * 1024  # Uncompressed
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    state TEXT NOT NULL,
+    created REAL NOT NULL,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS items (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    tenant TEXT NOT NULL,
+    name TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    sha256 TEXT NOT NULL DEFAULT '',
+    error TEXT NOT NULL DEFAULT '',
+    UNIQUE (job_id, name)
+);
+CREATE INDEX IF NOT EXISTS items_queue ON items (tenant, state, seq);
+CREATE INDEX IF NOT EXISTS items_job ON items (job_id, state);
+"""
+
+
+class JobStore:
+    """Persistent job queue. Every state change is one short transaction (WAL mode)."""
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def recover(self):
+        """Sounds that were in flight when the service stopped go back to the queue"""
+        self.db.execute("UPDATE items SET state = 'queued' WHERE state = 'in-flight'")
+
+    def create_job(self, tenant, state):
+        job_id = uuid.uuid4().hex[:16]
+        self.db.execute("INSERT INTO jobs (id, tenant, state, created) VALUES (?, ?, ?, ?)",
+                        (job_id, tenant, state, time.time()))
+        return job_id
+
+    def add_items(self, job_id, tenant, specs):
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT OR IGNORE INTO items (job_id, tenant, name, spec, state) VALUES (?, ?, ?, ?, 'queued')",
+                [(job_id, tenant, spec["name"], json.dumps(spec)) for spec in specs])
+            self.db.execute("UPDATE jobs SET state = 'queued' WHERE id = ?", (job_id,))
+
+    def set_job_state(self, job_id, state, error=""):
+        self.db.execute("UPDATE jobs SET state = ?, error = ? WHERE id = ?", (state, error, job_id))
+
+    def job(self, job_id):
+        return self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def jobs_for(self, tenant):
+        return self.db.execute("SELECT * FROM jobs WHERE tenant = ? ORDER BY created", (tenant,)).fetchall()
+
+    def jobs_in_state(self, state):
+        return self.db.execute("SELECT * FROM jobs WHERE state = ?", (state,)).fetchall()
+
+    def counts(self, job_id):
+        rows = self.db.execute("SELECT state, COUNT(*) FROM items WHERE job_id = ? GROUP BY state", (job_id,))
+        return {state: count for state, count in rows}
+
+    def queued_count(self, tenant):
+        return self.db.execute("SELECT COUNT(*) FROM items WHERE tenant = ? AND state = 'queued'",
+                               (tenant,)).fetchone()[0]
+
+    def tenants_with_work(self):
+        return [row[0] for row in self.db.execute("SELECT DISTINCT tenant FROM items WHERE state = 'queued'")]
+
+    def claim(self, tenant):
+        """Oldest queued sound of a tenant, marked in flight; None if there is none"""
+        row = self.db.execute("SELECT * FROM items WHERE tenant = ? AND state = 'queued' ORDER BY seq LIMIT 1",
+                              (tenant,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE items SET state = 'in-flight', attempts = attempts + 1 WHERE seq = ?", (row["seq"],))
+        return dict(row, attempts=row["attempts"] + 1)
+
+    def finish(self, seq, state, sha256="", error=""):
+        self.db.execute("UPDATE items SET state = ?, sha256 = ?, error = ? WHERE seq = ?", (state, sha256, error, seq))
+
+    def items(self, job_id):
+        return self.db.execute("SELECT name, state, attempts, sha256, error FROM items WHERE job_id = ? ORDER BY seq",
+                               (job_id,)).fetchall()
+
+    def cancel(self, job_id):
+        self.db.execute("UPDATE items SET state = 'cancelled' WHERE job_id = ? AND state = 'queued'", (job_id,))
+
+
+class TokenBucket:
+    """Requests per minute with a burst of one minute's worth"""
+
+    def __init__(self, rate_per_minute):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, float(rate_per_minute))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self):
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self):
+        self._refill()
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class Scheduler:
+    """Hands queued sounds to workers, round-robin over tenants within their limits"""
+
+    def __init__(self, store, tenants):
+        self.store = store
+        self.tenants = tenants
+        self.in_flight = {}
+        self.buckets = {name: TokenBucket(cfg["rate_per_minute"]) for name, cfg in tenants.items()}
+        self._turn = 0
+        self._wakeup = asyncio.Event()
+
+    def notify(self):
+        self._wakeup.set()
+
+    def release(self, tenant):
+        self.in_flight[tenant] -= 1
+        self.notify()
+
+    async def acquire(self):
+        """Wait for the next sound any tenant is allowed to start"""
+        while True:
+            item, retry_in = self._pick()
+            if item is not None:
+                return item
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=retry_in)
+            except asyncio.TimeoutError:
+                pass
+
+    def _pick(self):
+        tenants = sorted(self.store.tenants_with_work())
+        retry_in = 1.0
+        for offset in range(len(tenants)):
+            tenant = tenants[(self._turn + offset) % len(tenants)]
+            cfg = self.tenants.get(tenant, DEFAULT_TENANT)
+            if self.in_flight.get(tenant, 0) >= cfg["concurrency"]:
+                continue
+            bucket = self.buckets.setdefault(tenant, TokenBucket(cfg["rate_per_minute"]))
+            if not bucket.try_take():
+                retry_in = min(retry_in, bucket.wait_time())
+                continue
+            item = self.store.claim(tenant)
+            if item is None:
+                continue
+            self.in_flight[tenant] = self.in_flight.get(tenant, 0) + 1
+            self._turn = (self._turn + offset + 1) % max(len(tenants), 1)
+            return item, 0.0
+        return None, retry_in
+
+
+class BatchService:
+    """HTTP front end, job preparation and the worker pool"""
+
+    def __init__(self, data_dir, tenants, workers=DEFAULT_WORKERS, host="127.0.0.1", port=DEFAULT_PORT,
+                 elevenlabs_key="", groq_key="", elevenlabs_url="https://api.elevenlabs.io/v1",
+                 groq_url="https://api.groq.com"):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.tenants_by_key = tenants
+        self.tenants = {cfg["name"]: cfg for cfg in tenants.values()}
+        self.store = JobStore(self.data_dir / "jobs.sqlite3")
+        self.scheduler = Scheduler(self.store, self.tenants)
+        self.elevenlabs_key = elevenlabs_key
+        self.elevenlabs_url = elevenlabs_url
+        self.groq_key = groq_key
+        self.groq_url = groq_url
+        self.llm_latency = LatencyHistogram(self.data_dir / "llm_latency.json")
+        self.subscribers = {}  # job_id -> set of asyncio.Queue
+        self._server = None
+        self._tasks = []
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self.store.recover()
+        for job in self.store.jobs_in_state("analyzing"):
+            self._tasks.append(asyncio.create_task(self._prepare_archive(job["id"], job["tenant"])))
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # -- Workers -------------------------------------------------------------
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.scheduler.acquire()
+            output_dir = self.data_dir / "results" / item["job_id"]
+            try:
+                spec = json.loads(item["spec"])
+                file_path = await loop.run_in_executor(None, self._generate, spec, output_dir)
+            except Exception as e:
+                # Anything a sound throws ends with that sound, never with the worker
+                retry = item["attempts"] < MAX_ATTEMPTS
+                self.store.finish(item["seq"], "queued" if retry else "failed", error=str(e))
+                self._publish(item["job_id"], {"sound": item["name"], "state": "retrying" if retry else "failed",
+                                               "attempts": item["attempts"], "error": str(e)})
+            else:
+                digest = file_sha256(file_path)
+                self.store.finish(item["seq"], "done", sha256=digest)
+                self._publish(item["job_id"], {"sound": item["name"], "state": "done", "sha256": digest})
+            finally:
+                self.scheduler.release(item["tenant"])
+            self._check_complete(item["job_id"])
+
+    def _generate(self, spec, output_dir):
+        generator = ElevenLabsGenerator(self.elevenlabs_key, output_dir, self.elevenlabs_url)
+        body = generator.generate_sound_effect(spec)
+        if len(body) < 100:
+            raise OSError(f"Response too small ({len(body)} bytes)")
+        return generator.handle_response(spec["name"], body)
+
+    def _check_complete(self, job_id):
+        counts = self.store.counts(job_id)
+        if counts.get("queued", 0) or counts.get("in-flight", 0):
+            return
+        job = self.store.job(job_id)
+        if job["state"] in ("done", "cancelled"):
+            return
+        self.store.set_job_state(job_id, "done")
+        self._publish(job_id, {"job": job_id, "state": "done", "counts": counts}, final=True)
+
+    def _publish(self, job_id, event, final=False):
+        for queue in self.subscribers.get(job_id, ()):
+            queue.put_nowait((event, final))
+
+    # -- Job preparation -----------------------------------------------------
+
+    async def _prepare_archive(self, job_id, tenant):
+        """Analyze an uploaded project and queue the resulting suggestions"""
+        archive = self.data_dir / "archives" / f"{job_id}.zip"
+        try:
+            specs = await asyncio.get_running_loop().run_in_executor(None, self._suggest_for_archive, archive)
+            limit = self.tenants.get(tenant, DEFAULT_TENANT).get("max_queued", DEFAULT_TENANT["max_queued"])
+            if self.store.queued_count(tenant) + len(specs) > limit:
+                raise ValueError(f"Queue limit reached: {len(specs)} sounds would exceed {limit} queued")
+            self._queue_specs(job_id, tenant, specs)
+        except Exception as e:
+            # A job must never stay "analyzing" because its preparation died
+            self.store.set_job_state(job_id, "failed", f"{type(e).__name__}: {e}")
+            self._publish(job_id, {"job": job_id, "state": "failed", "error": str(e)}, final=True)
+
+    def _suggest_for_archive(self, archive):
+        with tempfile.TemporaryDirectory() as tmp:
+            with zipfile.ZipFile(archive) as zf:
+                members = zf.infolist()
+                if len(members) > MAX_ARCHIVE_MEMBERS:
+                    raise ValueError(f"Archive has {len(members)} entries (limit {MAX_ARCHIVE_MEMBERS})")
+                if sum(member.file_size for member in members) > MAX_ARCHIVE_BYTES:
+                    raise ValueError(f"Archive unpacks to more than {MAX_ARCHIVE_BYTES} bytes")
+                for member in members:
+                    target = (Path(tmp) / member.filename).resolve()
+                    if not str(target).startswith(str(Path(tmp).resolve())):
+                        raise ValueError(f"Unsafe path in archive: {member.filename}")
+                zf.extractall(tmp)
+            code_results = CodeAnalyzerSimulator(tmp).analyze_project()
+
+        fx, unresolved = suggest_locally(code_results)
+        if self.groq_key and any(unresolved.get(key) for key in ("events", "actions", "interactions")):
+            fx.extend(self._ask_llm(build_prompt(unresolved)))
+        # LLM answers are untrusted: a spec without a name, or with a name like ../x, is dropped here
+        valid = []
+        for spec in fx:
+            error = fx_spec_error(spec)
+            if error:
+                print(f"[BatchService] Skipping suggestion: {error}")
+            else:
+                valid.append(spec)
+        return dedupe_suggestions(valid)
+
+    def _ask_llm(self, prompt):
+        # Hedged: a slow answer gets a backup request after the model's p95 latency
+        fx, _response, _report = hedged_request(self.groq_key, prompt, self.llm_latency, base_url=self.groq_url)
+        self.llm_latency.save()
+        return fx
+
+    def _queue_specs(self, job_id, tenant, specs):
+        self.store.add_items(job_id, tenant, specs)
+        self._publish(job_id, {"job": job_id, "state": "queued", "items": len(specs)})
+        self.scheduler.notify()
+        self._check_complete(job_id)
+
+    # -- HTTP ----------------------------------------------------------------
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                if not await self._dispatch(writer, *request):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            await send_json(writer, 413, {"error": str(e)})
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer, method, target, headers, body):
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        tenant_cfg = self.tenants_by_key.get(token)
+        if tenant_cfg is None:
+            return await send_json(writer, 401, {"error": "Unknown API key"})
+        tenant = tenant_cfg["name"]
+
+        parts = [p for p in target.split("?", 1)[0].split("/") if p]
+        if parts[:2] != ["v1", "jobs"]:
+            return await send_json(writer, 404, {"error": "Not found"})
+
+        if len(parts) == 2:
+            if method == "POST":
+                return await self._submit(writer, tenant, tenant_cfg, body)
+            jobs = [dict(job, counts=self.store.counts(job["id"])) for job in self.store.jobs_for(tenant)]
+            return await send_json(writer, 200, {"jobs": jobs})
+
+        job = self.store.job(parts[2])
+        if job is None or job["tenant"] != tenant:
+            return await send_json(writer, 404, {"error": "Unknown job"})
+        job_id = job["id"]
+
+        if len(parts) == 3 and method == "DELETE":
+            self.store.cancel(job_id)
+            self.store.set_job_state(job_id, "cancelled")
+            self._publish(job_id, {"job": job_id, "state": "cancelled"}, final=True)
+            return await send_json(writer, 200, {"job": job_id, "state": "cancelled"})
+        if len(parts) == 3:
+            return await send_json(writer, 200, dict(job, counts=self.store.counts(job_id)))
+        if parts[3] == "events":
+            return await self._stream_events(writer, job_id)
+        if parts[3] == "results":
+            results = [dict(row, url=f"/v1/jobs/{job_id}/files/{row['name']}.mp3" if row["state"] == "done" else "")
+                       for row in self.store.items(job_id)]
+            return await send_json(writer, 200, {"job": job_id, "state": job["state"], "results": results})
+        if parts[3] == "files" and len(parts) == 5:
+            name = parts[4].removesuffix(".mp3")
+            path = self.data_dir / "results" / job_id / f"{name}.mp3"
+            if not SOUND_NAME_PATTERN.match(name) or not path.exists():
+                return await send_json(writer, 404, {"error": "No such file"})
+            return await send_response(writer, 200, {"Content-Type": "audio/mpeg"}, path.read_bytes())
+        return await send_json(writer, 404, {"error": "Not found"})
+
+    async def _submit(self, writer, tenant, tenant_cfg, body):
+        try:
+            payload = json.loads(body)
+        except ValueError:  # JSONDecodeError, or UnicodeDecodeError for bytes that aren't UTF-8
+            return await send_json(writer, 400, {"error": "Body must be JSON"})
+        if not isinstance(payload, dict):
+            return await send_json(writer, 400, {"error": "Body must be a JSON object"})
+
+        max_queued = tenant_cfg.get("max_queued", DEFAULT_TENANT["max_queued"])
+        queued = self.store.queued_count(tenant)
+        if queued >= max_queued:
+            return await send_json(writer, 429, {"error": "Queue limit reached"}, {"Retry-After": "60"})
+
+        if "project_archive" in payload:
+            try:
+                archive = base64.b64decode(payload["project_archive"], validate=True)
+                zipfile.ZipFile(io.BytesIO(archive)).testzip()
+            except (ValueError, TypeError, zipfile.BadZipFile):
+                return await send_json(writer, 400, {"error": "project_archive must be a base64 zip"})
+            job_id = self.store.create_job(tenant, "analyzing")
+            archive_path = self.data_dir / "archives" / f"{job_id}.zip"
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            archive_path.write_bytes(archive)
+            self._tasks.append(asyncio.create_task(self._prepare_archive(job_id, tenant)))
+            return await send_json(writer, 202, {"job": job_id, "state": "analyzing"})
+
+        specs = payload.get("fx")
+        if not isinstance(specs, list) or not specs:
+            return await send_json(writer, 400, {"error": "Expected 'fx' list or 'project_archive'"})
+        for spec in specs:
+            error = fx_spec_error(spec)
+            if error:
+                return await send_json(writer, 400, {"error": f"Invalid fx spec: {error}"})
+        if queued + len(specs) > max_queued:
+            return await send_json(writer, 429, {"error": f"Queue limit reached: {len(specs)} sounds would exceed "
+                                                          f"{max_queued} queued"}, {"Retry-After": "60"})
+
+        job_id = self.store.create_job(tenant, "queued")
+        self._queue_specs(job_id, tenant, specs)
+        return await send_json(writer, 202, {"job": job_id, "state": "queued", "items": len(specs)})
+
+    async def _stream_events(self, writer, job_id):
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            await start_event_stream(writer)
+            job = self.store.job(job_id)
+            await send_event(writer, json.dumps({"job": job_id, "state": job["state"],
+                                                 "counts": self.store.counts(job_id)}), "snapshot")
+            if job["state"] in ("done", "failed", "cancelled"):
+                await end_event_stream(writer)
+                return True
+            while True:
+                event, final = await queue.get()
+                await send_event(writer, json.dumps(event), "progress")
+                if final:
+                    break
+            await end_event_stream(writer)
+            return True
+        finally:
+            self.subscribers[job_id].discard(queue)
+
+
+def load_tenants(path):
+    """
+    tenants.json: {"<api key>": {"name": "studio", "concurrency": 4, "rate_per_minute": 120, "max_queued": 10000}}
+    """
+    tenants = json.loads(Path(path).read_text(encoding='utf-8'))
+    return {key: {**DEFAULT_TENANT, "name": key[:8], **cfg} for key, cfg in tenants.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Luceta batch generation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--data-dir", default="batch_service_data")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--tenants", required=True, help="JSON file mapping API keys to tenant limits")
+    args = parser.parse_args()
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    service = BatchService(
+        args.data_dir, load_tenants(args.tenants), args.workers, args.host, args.port,
+        elevenlabs_key=load_elevenlabs_key(base_path) or "",
+        groq_key=luceta_config.groq_key(base_path) or "",
+        elevenlabs_url=luceta_config.base_url("elevenlabs", base_path),
+        groq_url=luceta_config.base_url("groq", base_path))
+
+    print(f"Batch service listening on {service.base_url} with {args.workers} workers")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
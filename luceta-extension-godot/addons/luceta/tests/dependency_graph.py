@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Dependency Graph
+Persists which source spans produced which analyzer events, which events became
+which fx suggestions (locally or through an LLM call), which audio file each
+suggestion generated and where that audio is wired into game scripts.
+After an edit only the nodes whose own hash changed - and what depends on
+them - are redone; an edit that doesn't change an event stops there.
+
+Usage:
+    dependency_graph.py [plan]   list the LLM calls and generations an update needs
+    dependency_graph.py run      run them and record the results
+    dependency_graph.py show     print the recorded graph
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import sys
+import urllib.error
+from pathlib import Path
+
+import luceta_config
+from generation_journal import GenerationJournal, file_sha256
+from local_suggestions import load_taxonomy, suggest_locally
+from test_analyzer import FUNC_PATTERN, STATE_PATTERN, CodeAnalyzerSimulator
+from test_llm_workflow import build_prompt
+
+GRAPH_PATH = ".godot/luceta_cache/dependency_graph.json"
+GRAPH_VERSION = 1
+SOUND_PATH_PATTERN = re.compile(r'res://luceta_generated/([A-Za-z0-9_\-]+)\.mp3')
+SPAN_CHARS = 500  # How much of a function body the analyzer reads
+
+
+def digest(value):
+    """Short stable hash of any JSON-serializable value"""
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def fx_digest(fx):
+    """What a generation depends on - the name and context don't change the audio"""
+    return digest({"description": fx.get("description", ""), "loop": bool(fx.get("loop", False))})
+
+
+class DependencyGraph:
+    """Typed nodes with a content hash each, and edges pointing downstream"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.nodes = {}
+        self.edges = {}
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == GRAPH_VERSION:
+                self.nodes = data.get("nodes", {})
+                self.edges = {node_id: list(targets) for node_id, targets in data.get("edges", {}).items()}
+
+    @classmethod
+    def for_project(cls, project_path):
+        return cls(Path(project_path) / GRAPH_PATH)
+
+    def set_node(self, node_id, kind, node_hash, **meta):
+        self.nodes[node_id] = {"kind": kind, "hash": node_hash, **meta}
+
+    def link(self, source, target):
+        targets = self.edges.setdefault(source, [])
+        if target not in targets:
+            targets.append(target)
+
+    def unlink_from(self, source, kind=None):
+        """Drop the outgoing edges of a node (only to nodes of one kind if given)"""
+        self.edges[source] = [target for target in self.edges.get(source, [])
+                              if kind is not None and self.nodes.get(target, {}).get("kind") != kind]
+
+    def remove(self, node_id):
+        self.nodes.pop(node_id, None)
+        self.edges.pop(node_id, None)
+        for targets in self.edges.values():
+            if node_id in targets:
+                targets.remove(node_id)
+
+    def upstream(self, node_id):
+        return [source for source, targets in self.edges.items() if node_id in targets]
+
+    def downstream(self, node_ids):
+        """Every node reachable from node_ids (excluding them)"""
+        seen = set()
+        stack = list(node_ids)
+        while stack:
+            for target in self.edges.get(stack.pop(), []):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen - set(node_ids)
+
+    def of_kind(self, kind):
+        return {node_id: node for node_id, node in self.nodes.items() if node["kind"] == kind}
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        edges = {source: sorted(targets) for source, targets in sorted(self.edges.items()) if targets}
+        tmp_path.write_text(json.dumps({"version": GRAPH_VERSION, "nodes": self.nodes, "edges": edges},
+                                       indent="\t", sort_keys=True), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+
+def _line_of(content, offset):
+    return content.count("\n", 0, offset) + 1
+
+
+def _function_spans(content):
+    """{function name: (text the analyzer read, first line, last line)}"""
+    spans = {}
+    for match in FUNC_PATTERN.finditer(content):
+        name = match.group(1)
+        text = content[match.start():match.start() + SPAN_CHARS]
+        spans.setdefault(name, (text, _line_of(content, match.start()), _line_of(content, match.start() + len(text))))
+    return spans
+
+
+def snapshot(project_path, taxonomy=None):
+    """
+    Analyze the project the way CodeAnalyzerSimulator does and describe the result
+    as graph nodes, without calling anything remote.
+    Returns (graph, unresolved_by_file): a fresh in-memory graph of spans, events,
+    local fx and LLM call nodes, plus the unresolved analysis of each file that an
+    LLM call would send.
+    """
+    project_path = Path(project_path)
+    analyzer = CodeAnalyzerSimulator(project_path)
+    graph = DependencyGraph(project_path / GRAPH_PATH)
+    graph.nodes, graph.edges = {}, {}
+    unresolved_by_file = {}
+
+    for file_path in sorted(analyzer.find_files(project_path, '.gd')):
+        rel = file_path.relative_to(project_path).as_posix()
+        content = file_path.read_text(encoding='utf-8', errors='replace')
+        results = analyzer.analyze_gd_file(file_path)
+        spans = _function_spans(content)
+
+        items = []  # (event id, analysis key, item, span id)
+        for event in results["events"]:
+            span_id = f"span:{rel}::{event['name']}"
+            text, first, last = spans.get(event["name"], ("", 0, 0))
+            graph.set_node(span_id, "span", digest(text), file=rel, lines=[first, last])
+            items.append((f"event:{rel}::{event['name']}", "events", event, span_id))
+
+        state_match = STATE_PATTERN.search(content)
+        if state_match:
+            span_id = f"span:{rel}::enum STATE"
+            graph.set_node(span_id, "span", digest(state_match.group()), file=rel,
+                           lines=[_line_of(content, state_match.start()), _line_of(content, state_match.end())])
+            for action in results["actions"]:
+                items.append((f"action:{rel}::{action['name']}", "actions", action, span_id))
+
+        for interaction in results["interactions"]:
+            span_id = f"span:{rel}::collision"
+            graph.set_node(span_id, "span", digest(content), file=rel, lines=[1, _line_of(content, len(content))])
+            items.append((f"interaction:{rel}", "interactions", interaction, span_id))
+
+        file_results = {key: [] for key in ("events", "actions", "interactions", "dialogs")}
+        event_ids = {}
+        for event_id, key, item, span_id in items:
+            # The absolute path isn't part of what the event means
+            graph.set_node(event_id, "event", digest({k: v for k, v in item.items() if k != "file"}), file=rel)
+            graph.link(span_id, event_id)
+            file_results[key].append(item)
+            event_ids[id(item)] = event_id
+
+        fx, unresolved = suggest_locally(file_results, taxonomy)
+        unresolved_ids = {id(item) for key in ("events", "actions", "interactions") for item in unresolved[key]}
+        for entry in fx:
+            fx_id = f"fx:{entry['name']}"
+            graph.set_node(fx_id, "fx", fx_digest(entry), source="local", fx=entry)
+            contexts = {part.strip() for part in entry["context"].split(",")}
+            for event_id, _key, item, _span_id in items:
+                if id(item) not in unresolved_ids and item.get("name", item.get("type")) in contexts:
+                    graph.link(event_id, fx_id)
+
+        if any(unresolved[key] for key in ("events", "actions", "interactions")):
+            llm_id = f"llm:{rel}"
+            graph.set_node(llm_id, "llm", digest(build_prompt(unresolved)), file=rel)
+            for item_id in unresolved_ids:
+                graph.link(event_ids[item_id], llm_id)
+            unresolved_by_file[rel] = unresolved
+
+    return graph, unresolved_by_file
+
+
+def integration_sites(project_path):
+    """{site id: (sound name, hash of the wired line)} for every script that references generated audio"""
+    project_path = Path(project_path)
+    sites = {}
+    for file_path in sorted(CodeAnalyzerSimulator(project_path).find_files(project_path, '.gd')):
+        rel = file_path.relative_to(project_path).as_posix()
+        if rel.startswith("luceta_generated/"):
+            continue
+        content = file_path.read_text(encoding='utf-8', errors='replace')
+        for line in content.split("\n"):
+            for match in SOUND_PATH_PATTERN.finditer(line):
+                sites[f"site:{rel}::{match.group(1)}"] = (match.group(1), digest(line.strip()))
+    return sites
+
+
+def audio_is_current(graph, fx_id, output_dir):
+    """Audio exists, still matches its recorded hash and was made from the current description"""
+    sound_name = fx_id.split(":", 1)[1]
+    audio = graph.nodes.get(f"audio:{sound_name}")
+    fx = graph.nodes.get(fx_id)
+    if audio is None or fx is None or audio.get("source") != fx["hash"]:
+        return False
+    path = Path(output_dir) / f"{sound_name}.mp3"
+    return path.exists() and file_sha256(path) == audio["hash"]
+
+
+def plan(project_path, graph=None, taxonomy=None):
+    """
+    Compare a fresh snapshot with the recorded graph.
+    Returns a dict:
+        changed      node ids whose own hash differs (or that are new)
+        invalidated  recorded nodes downstream of changed or removed ones
+        llm_calls    files whose prompt changed and need a new LLM call
+        generations  fx names to (re)generate now
+        removed      recorded span/event/fx/llm nodes that no longer exist
+    """
+    project_path = Path(project_path)
+    graph = graph or DependencyGraph.for_project(project_path)
+    fresh, unresolved_by_file = snapshot(project_path, taxonomy)
+    output_dir = project_path / "luceta_generated"
+
+    changed = sorted(node_id for node_id, node in fresh.nodes.items()
+                     if graph.nodes.get(node_id, {}).get("hash") != node["hash"])
+    removed = sorted(node_id for node_id, node in graph.nodes.items()
+                     if node["kind"] in ("span", "event", "llm") and node_id not in fresh.nodes
+                     or node["kind"] == "fx" and node.get("source") == "local" and node_id not in fresh.nodes)
+
+    llm_calls = sorted(node_id for node_id in changed if fresh.nodes[node_id]["kind"] == "llm")
+
+    generations = set()
+    for fx_id, node in fresh.of_kind("fx").items():
+        if fx_id in changed or not audio_is_current(graph, fx_id, output_dir):
+            generations.add(fx_id.split(":", 1)[1])
+    # LLM suggestions from calls that don't need redoing keep their audio unless it went missing
+    for fx_id, node in graph.of_kind("fx").items():
+        if node.get("source") != "llm" or fx_id in fresh.nodes:
+            continue
+        calls = [source for source in graph.upstream(fx_id) if graph.nodes.get(source, {}).get("kind") == "llm"]
+        if any(call in fresh.nodes and call not in llm_calls for call in calls):
+            if not audio_is_current(graph, fx_id, output_dir):
+                generations.add(fx_id.split(":", 1)[1])
+
+    invalidated = graph.downstream([node_id for node_id in changed + removed if node_id in graph.nodes])
+    return {
+        "changed": changed,
+        "invalidated": sorted(invalidated),
+        "llm_calls": llm_calls,
+        "generations": sorted(generations),
+        "removed": removed,
+        "unresolved": {call: unresolved_by_file[call.split(":", 1)[1]] for call in llm_calls},
+        "fresh": fresh,
+    }
+
+
+def record(graph, fresh, llm_results, generated, project_path):
+    """
+    Fold a finished update into the recorded graph.
+    llm_results: {llm id: [fx, ...]} for the calls that ran
+    generated: {sound name: file path} for the generations that ran
+    """
+    # Spans, events, local fx and LLM call nodes come straight from the snapshot;
+    # nodes that weren't produced again are dropped together with their edges
+    for node_id, node in list(graph.nodes.items()):
+        if node["kind"] in ("span", "event", "llm") and node_id not in fresh.nodes:
+            graph.remove(node_id)
+        elif node["kind"] == "fx" and node.get("source") == "local" and node_id not in fresh.nodes:
+            graph.remove(node_id)
+    for node_id, node in fresh.nodes.items():
+        # Edges to what the snapshot can't see (LLM suggestions, audio) survive,
+        # except for LLM calls that were just redone
+        kept = [target for target in graph.edges.get(node_id, [])
+                if graph.nodes.get(target, {}).get("kind") == "audio"
+                or graph.nodes.get(target, {}).get("source") == "llm" and node_id not in llm_results]
+        graph.nodes[node_id] = node
+        graph.edges[node_id] = list(fresh.edges.get(node_id, [])) + kept
+
+    for llm_id, fx_list in llm_results.items():
+        for old_fx in list(graph.edges.get(llm_id, [])):
+            if graph.nodes.get(old_fx, {}).get("source") == "llm" and len(graph.upstream(old_fx)) == 1:
+                graph.remove(old_fx)
+        graph.unlink_from(llm_id)
+        for fx in fx_list:
+            fx_id = f"fx:{fx.get('name', 'unnamed')}"
+            if graph.nodes.get(fx_id, {}).get("source") != "local":
+                graph.set_node(fx_id, "fx", fx_digest(fx), source="llm", fx=fx)
+            graph.link(llm_id, fx_id)
+
+    # LLM suggestions no call points to anymore
+    for fx_id, node in list(graph.of_kind("fx").items()):
+        if node.get("source") == "llm" and not graph.upstream(fx_id):
+            graph.remove(fx_id)
+
+    project_path = Path(project_path)
+    for sound_name, path in generated.items():
+        fx_id = f"fx:{sound_name}"
+        if fx_id not in graph.nodes:
+            continue
+        res_path = "res://" + Path(path).resolve().relative_to(project_path.resolve()).as_posix()
+        graph.set_node(f"audio:{sound_name}", "audio", file_sha256(path),
+                       source=graph.nodes[fx_id]["hash"], path=res_path)
+        graph.unlink_from(fx_id)
+        graph.link(fx_id, f"audio:{sound_name}")
+
+    for audio_id in list(graph.of_kind("audio")):
+        if f"fx:{audio_id.split(':', 1)[1]}" not in graph.nodes:
+            graph.remove(audio_id)
+
+    for site_id in list(graph.of_kind("site")):
+        graph.remove(site_id)
+    for site_id, (sound_name, site_hash) in integration_sites(project_path).items():
+        if f"audio:{sound_name}" in graph.nodes:
+            graph.set_node(site_id, "site", site_hash, file=site_id.split(":", 1)[1].split("::")[0])
+            graph.link(f"audio:{sound_name}", site_id)
+    return graph
+
+
+def run(project_path, update, ask_llm, generate):
+    """
+    Execute a plan. ask_llm(prompt) -> [fx, ...]; generate([fx, ...]) -> ({name: path}, errors).
+    Only suggestions whose description changed (or whose audio is stale) are generated.
+    """
+    project_path = Path(project_path)
+    graph = DependencyGraph.for_project(project_path)
+    fresh = update["fresh"]
+    llm_results = {}
+    for llm_id in update["llm_calls"]:
+        llm_results[llm_id] = ask_llm(build_prompt(update["unresolved"][llm_id]))
+
+    record(graph, fresh, llm_results, {}, project_path)
+    output_dir = project_path / "luceta_generated"
+    to_generate = [node["fx"] for fx_id, node in sorted(graph.of_kind("fx").items())
+                   if not audio_is_current(graph, fx_id, output_dir)]
+
+    generated, errors = generate(to_generate) if to_generate else ({}, [])
+    record(graph, fresh, {}, generated, project_path)
+    graph.save()
+    return to_generate, generated, errors
+
+
+def print_plan(update):
+    print(f"Changed nodes: {len(update['changed'])}")
+    for node_id in update["changed"]:
+        node = update["fresh"].nodes[node_id]
+        lines = f" (lines {node['lines'][0]}-{node['lines'][1]})" if "lines" in node else ""
+        print(f"  {node_id}{lines}")
+    if update["removed"]:
+        print(f"Removed nodes: {len(update['removed'])}")
+        for node_id in update["removed"]:
+            print(f"  {node_id}")
+    print(f"Invalidated downstream: {len(update['invalidated'])}")
+    print(f"\nLLM calls needed: {len(update['llm_calls'])}")
+    for llm_id in update["llm_calls"]:
+        print(f"  {llm_id}")
+    print(f"Generations needed: {len(update['generations'])}"
+          + (" (plus whatever the LLM calls return)" if update["llm_calls"] else ""))
+    for sound_name in update["generations"]:
+        print(f"  {sound_name}")
+
+
+def main():
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    command = sys.argv[1] if len(sys.argv) > 1 else "plan"
+
+    if command == "show":
+        graph = DependencyGraph.for_project(base_path)
+        for kind in ("span", "event", "llm", "fx", "audio", "site"):
+            nodes = graph.of_kind(kind)
+            print(f"{kind}: {len(nodes)}")
+            for node_id in sorted(nodes):
+                targets = graph.edges.get(node_id, [])
+                print(f"  {node_id}" + (f" -> {', '.join(sorted(targets))}" if targets else ""))
+        return 0
+
+    update = plan(base_path, taxonomy=load_taxonomy())
+    print_plan(update)
+    if command == "plan":
+        return 0
+
+    if command == "run":
+        from sfx_generator import ElevenLabsGenerator, generate_suggestions, load_elevenlabs_key
+        from test_llm_workflow import call_groq_api, load_api_key, parse_llm_response
+
+        groq_key = load_api_key() if update["llm_calls"] else None
+        if update["llm_calls"] and not groq_key:
+            print("ERROR: Could not load Groq API key from .env")
+            return 1
+        elevenlabs_key = load_elevenlabs_key(base_path)
+        if not elevenlabs_key:
+            print("ERROR: Could not find ELEVEN_LABS_API_KEY in .env")
+            return 1
+
+        def ask_llm(prompt):
+            fx, error = parse_llm_response(call_groq_api(groq_key, prompt))
+            if error:
+                raise ValueError(error)
+            return fx
+
+        generator = ElevenLabsGenerator(elevenlabs_key, base_path / "luceta_generated",
+                                        luceta_config.base_url("elevenlabs", base_path))
+        journal = GenerationJournal(base_path)
+
+        try:
+            to_generate, generated, errors = run(
+                base_path, update, ask_llm,
+                lambda fx_list: generate_suggestions(generator, fx_list, journal=journal))
+        except (ValueError, urllib.error.URLError, http.client.HTTPException, OSError) as e:
+            print(f"ERROR: {e}")
+            return 1
+        print(f"\nGenerated {len(generated)}/{len(to_generate)} sounds")
+        for sound_name, error in errors:
+            print(f"  ERROR {sound_name}: {error}")
+        return 0 if not errors else 1
+
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Dialog Batch Runner
+Synthesizes many dialog lines with few multi-turn text-to-dialogue requests,
+splits the audio back into one file per line and caches every utterance
+"""
+
+import base64
+import hashlib
+import http.client
+import json
+import re
+import shutil
+import sys
+import unicodedata
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import luceta_config
+import mp3_frames
+from sfx_generator import load_elevenlabs_key
+
+# Same default voice as ElevenLabsGenerator.generate_dialog; text-to-dialogue
+# only runs on the v3 model
+DEFAULT_VOICE_ID = "Xb7hH8MSUJpSbSDYk0k2"
+DEFAULT_MODEL_ID = "eleven_v3"
+
+# Keep each request well inside the text-to-dialogue limits
+MAX_BATCH_CHARS = 2000
+MAX_BATCH_LINES = 40
+
+BBCODE_PATTERN = re.compile(r'\[/?[a-zA-Z_]+(?:=[^\]]*)?\]')
+
+
+def normalize_line(text):
+    """
+    Text as it is sent to the API: BBCode tags from RichTextLabel stripped,
+    unicode normalized and whitespace collapsed. Case is kept - it changes delivery.
+    """
+    text = BBCODE_PATTERN.sub('', str(text))
+    text = unicodedata.normalize('NFC', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def cache_key(voice_id, model_id, text):
+    """Cache key for one utterance: (voice_id, model_id, normalized text)"""
+    raw = "\0".join((voice_id, model_id, normalize_line(text)))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def dialog_lines(code_results):
+    """
+    Turn analyzer dialogs into synthesis lines.
+    Each line is {name, text, voice_id, model_id, key}; dialogs without text are skipped.
+    """
+    lines = []
+    for dialog in code_results.get("dialogs", []):
+        text = normalize_line(dialog.get("dialog", dialog.get("text", "")))
+        if not text:
+            continue
+        scene = Path(dialog.get("file", "")).stem or "dialog"
+        voice_id = dialog.get("voice_id", DEFAULT_VOICE_ID)
+        model_id = dialog.get("model_id", DEFAULT_MODEL_ID)
+        lines.append({
+            "name": dialog.get("sound_name", f"{scene}_{dialog.get('name', 'line')}".lower()),
+            "text": text,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "key": cache_key(voice_id, model_id, text)
+        })
+    return lines
+
+
+class UtteranceCache:
+    """Content-addressed store of synthesized lines, one mp3 per cache key"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = Path(cache_dir)
+
+    def path_for(self, key):
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def get(self, key):
+        path = self.path_for(key)
+        return path if path.exists() else None
+
+    def put(self, key, data):
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".part")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        return path
+
+
+def plan_batches(lines, cache, max_chars=MAX_BATCH_CHARS, max_lines=MAX_BATCH_LINES):
+    """
+    Group uncached lines by (voice_id, model_id) and pack them into requests
+    within the size limits. Identical utterances are synthesized once.
+    Returns a list of batches; each batch is a list of unique lines.
+    """
+    groups = {}
+    seen = set()
+    for line in lines:
+        if line["key"] in seen or cache.get(line["key"]):
+            continue
+        seen.add(line["key"])
+        groups.setdefault((line["voice_id"], line["model_id"]), []).append(line)
+
+    batches = []
+    for group in groups.values():
+        batch = []
+        chars = 0
+        for line in group:
+            if batch and (chars + len(line["text"]) > max_chars or len(batch) >= max_lines):
+                batches.append(batch)
+                batch, chars = [], 0
+            batch.append(line)
+            chars += len(line["text"])
+        if batch:
+            batches.append(batch)
+    return batches
+
+
+def segment_cut_times(voice_segments, line_count):
+    """
+    Cut points between consecutive lines from the with-timestamps response.
+    Each cut sits halfway through the pause between two lines.
+    """
+    bounds = {}
+    for segment in voice_segments:
+        index = segment.get("dialogue_input_index", 0)
+        start, end = segment["start_time_seconds"], segment["end_time_seconds"]
+        if index in bounds:
+            start = min(start, bounds[index][0])
+            end = max(end, bounds[index][1])
+        bounds[index] = (start, end)
+
+    if len(bounds) != line_count:
+        raise ValueError(f"Expected {line_count} voice segments, got {len(bounds)}")
+    return [(bounds[i][1] + bounds[i + 1][0]) / 2 for i in range(line_count - 1)]
+
+
+class DialogBatchGenerator:
+    """Multi-turn text-to-dialogue requests against the ElevenLabs API"""
+
+    def __init__(self, api_key, base_url="https://api.elevenlabs.io/v1"):
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def synthesize_batch(self, batch):
+        """Synthesize one batch, returns one mp3 byte string per line in batch order"""
+        request_data = {
+            "inputs": [{"text": line["text"], "voice_id": line["voice_id"]} for line in batch],
+            "model_id": batch[0]["model_id"]
+        }
+        headers = {
+            "xi-api-key": self.api_key,
+            "Content-Type": "application/json"
+        }
+        url = f"{self.base_url}/text-to-dialogue/with-timestamps?output_format=mp3_44100_128"
+        req = urllib.request.Request(url, json.dumps(request_data).encode(), headers)
+        with urllib.request.urlopen(req, timeout=120) as response:
+            result = json.loads(response.read())
+
+        audio = base64.b64decode(result["audio_base64"])
+        if len(batch) == 1:
+            return [audio]
+        cuts = segment_cut_times(result.get("voice_segments", []), len(batch))
+        return mp3_frames.split_at_times(audio, cuts)
+
+
+def run_dialog_batch(generator, lines, output_dir, cache):
+    """
+    Synthesize every line that isn't cached yet and write <output_dir>/<name>.mp3
+    for all lines. Returns ({name: file_path}, [(name, error)], request_count)
+    """
+    batches = plan_batches(lines, cache)
+    errors = []
+
+    for i, batch in enumerate(batches, 1):
+        chars = sum(len(line["text"]) for line in batch)
+        print(f"  [{i}/{len(batches)}] {len(batch)} lines, {chars} chars, voice {batch[0]['voice_id']}")
+        try:
+            pieces = generator.synthesize_batch(batch)
+        except (urllib.error.URLError, http.client.HTTPException, OSError, KeyError, ValueError) as e:
+            errors.extend((line["name"], str(e)) for line in batch)
+            continue
+        for line, data in zip(batch, pieces):
+            if not data:
+                # Its cut fell on the previous line's boundary or past the end; not cached, so the next run retries it
+                errors.append((line["name"], "Batch response had no audio for this line"))
+                continue
+            cache.put(line["key"], data)
+
+    generated = {}
+    failed = {name for name, _ in errors}
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for line in lines:
+        cached = cache.get(line["key"])
+        if cached is None:
+            if line["name"] not in failed:
+                errors.append((line["name"], "No audio for line"))
+            continue
+        file_path = output_dir / f"{line['name']}.mp3"
+        shutil.copyfile(cached, file_path)
+        generated[line["name"]] = file_path
+
+    return generated, errors, len(batches)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: dialog_batch.py <analysis_results.json>")
+        return 1
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    api_key = load_elevenlabs_key(base_path)
+    if not api_key:
+        print("ERROR: Could not find ELEVEN_LABS_API_KEY in .env")
+        return 1
+
+    code_results = json.loads(Path(sys.argv[1]).read_text(encoding='utf-8'))
+    lines = dialog_lines(code_results)
+    cache = UtteranceCache(base_path / ".godot" / "luceta_cache" / "dialog")
+
+    generated, errors, requests = run_dialog_batch(
+        DialogBatchGenerator(api_key, luceta_config.base_url("elevenlabs", base_path)), lines, base_path / "luceta_generated" / "dialog", cache)
+
+    print("\n" + "=" * 60)
+    print(f"Dialog lines: {len(generated)}/{len(lines)} written, {requests} API requests")
+    for name, error in errors:
+        print(f"  ERROR {name}: {error}")
+    print("=" * 60)
+
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Fleet Runner
+Runs analysis, prompting and generation for many Godot projects at once with
+one worker pool and shared caches: analysis results keyed by file content, LLM
+responses keyed by prompt, and a content-addressed audio store keyed by what
+the generation depends on. A sound that several projects need is generated once.
+Projects take turns in the worker pool, so a huge project can't starve the rest.
+
+Usage:
+    fleet.py <manifest.json> [--workers 8] [--cache-dir DIR] [--report report.json] [--dry-run]
+
+manifest.json:
+    {"projects": [{"name": "forest", "root": "../forest"}, "../castle"], "cache_dir": ".luceta_fleet"}
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import threading
+import time
+import urllib.error
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import luceta_config
+from audio_cache_store import AudioCacheStore
+from dependency_graph import fx_digest
+from generation_journal import MAX_ATTEMPTS, GenerationJournal
+from hedged_llm import LatencyHistogram, hedged_request
+from local_suggestions import load_taxonomy, suggest_locally
+from sfx_dedup import dedupe_suggestions
+from sfx_generator import RETRY_DELAY, ElevenLabsGenerator, fx_spec_error, load_elevenlabs_key
+from test_analyzer import CodeAnalyzerSimulator
+from test_llm_workflow import build_prompt, load_api_key
+
+DEFAULT_WORKERS = 8
+DEFAULT_CACHE_DIR = ".luceta_fleet"
+ANALYSIS_KEYS = ("events", "actions", "interactions", "signals", "dialogs")
+
+
+def load_manifest(path):
+    """Returns (projects, cache_dir); projects is a list of {"name", "root"} with absolute roots"""
+    path = Path(path).resolve()
+    data = json.loads(path.read_text(encoding='utf-8'))
+    entries = data.get("projects", []) if isinstance(data, dict) else data
+    projects = []
+    names = set()
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"root": entry}
+        root = (path.parent / entry["root"]).resolve()
+        name = entry.get("name") or root.name
+        if name in names:
+            raise ValueError(f"Duplicate project name in manifest: {name}")
+        names.add(name)
+        projects.append({"name": name, "root": root})
+    cache_dir = data.get("cache_dir", DEFAULT_CACHE_DIR) if isinstance(data, dict) else DEFAULT_CACHE_DIR
+    return projects, (path.parent / cache_dir).resolve()
+
+
+class FairQueue:
+    """Per-project task queues served round-robin; tasks remember their put order"""
+
+    def __init__(self):
+        self.queues = {}
+        self.order = deque()
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def put(self, project, task):
+        with self.lock:
+            if project not in self.queues:
+                self.queues[project] = deque()
+                self.order.append(project)
+            self.queues[project].append((self.count, task))
+            self.count += 1
+
+    def get(self):
+        """(project, seq, task) of the next project in turn, or None when every queue is empty"""
+        with self.lock:
+            for _ in range(len(self.order)):
+                project = self.order[0]
+                self.order.rotate(-1)
+                if self.queues[project]:
+                    return (project, *self.queues[project].popleft())
+            return None
+
+
+class FleetRunner:
+    """Shared pool and caches for a manifest of projects"""
+
+    def __init__(self, projects, cache_dir, workers=DEFAULT_WORKERS, groq_key=None, generator=None):
+        self.projects = projects
+        self.cache_dir = Path(cache_dir)
+        self.workers = workers
+        self.groq_key = groq_key
+        self.generator = generator
+        self.analysis_cache = AudioCacheStore(self.cache_dir / "analysis")
+        self.llm_dir = self.cache_dir / "llm"
+        self.audio_dir = self.cache_dir / "audio"
+        self.llm_latency = LatencyHistogram(self.cache_dir / "llm_latency.json")
+        self.cache_lock = threading.Lock()
+        self.stats = {"analysis_hits": 0, "analysis_misses": 0, "llm_hits": 0, "llm_calls": 0,
+                      "audio_hits": 0, "generated": 0}
+        self.errors = []
+        self.quarantined = []  # analyzer quarantine entries plus "project"
+
+    def _run_fair(self, queue, fn, label):
+        """
+        Drain a FairQueue with the shared pool; fn(project, task) -> result.
+        A task that raises is recorded in errors under label(task) and gets no
+        result, so one bad file or sound doesn't stop the other projects.
+        Returns [(project, task, result)] in put order, so reports and prompts are deterministic.
+        """
+        results = []
+        results_lock = threading.Lock()
+
+        def worker():
+            while True:
+                picked = queue.get()
+                if picked is None:
+                    return
+                project, seq, task = picked
+                try:
+                    result = fn(project, task)
+                except Exception as e:
+                    self.errors.append((project, label(task), f"{type(e).__name__}: {e}"))
+                    continue
+                with results_lock:
+                    results.append((seq, project, task, result))
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            for future in [pool.submit(worker) for _ in range(self.workers)]:
+                future.result()
+        return [(project, task, result) for _seq, project, task, result in sorted(results, key=lambda r: r[0])]
+
+    def _count(self, key):
+        with self.cache_lock:
+            self.stats[key] += 1
+
+    # -- Analysis --------------------------------------------------------------
+
+    def analyze(self):
+        """Analyze every project; unchanged files (by content) come from the shared cache"""
+        queue = FairQueue()
+        for project in self.projects:
+            analyzer = CodeAnalyzerSimulator(project["root"])
+            for file_path in sorted(analyzer.find_files(project["root"], '.gd')):
+                queue.put(project["name"], ("gd", file_path))
+            for file_path in sorted(analyzer.find_files(project["root"], '.tscn')):
+                queue.put(project["name"], ("tscn", file_path))
+
+        with self.analysis_cache.batch():
+            results = self._run_fair(queue, self._analyze_file, lambda task: str(task[1]))
+
+        by_project = {project["name"]: {key: [] for key in ANALYSIS_KEYS} for project in self.projects}
+        for project_name, _task, file_results in results:
+            for key, items in file_results.items():
+                by_project[project_name][key].extend(items)
+        return by_project
+
+    def _analyze_file(self, project_name, task):
+        kind, file_path = task
+        content = file_path.read_bytes()
+        cache_key = f"{kind}:{hashlib.sha256(content).hexdigest()}"
+        with self.cache_lock:
+            cached = self.analysis_cache.get_cached_analysis(cache_key)
+        if cached:
+            self._count("analysis_hits")
+            # Cached entries are stored without paths, so identical files in two projects share them
+            return {key: [{**item, "file": str(file_path)} for item in items] for key, items in cached.items()}
+
+        self._count("analysis_misses")
+        analyzer = CodeAnalyzerSimulator(file_path.parent)
+        results = analyzer.analyze_gd_file(file_path) if kind == "gd" else analyzer.analyze_scene_file(file_path)
+        if analyzer.quarantined:
+            # Not cached: the empty result says nothing about the file, and the next run should report it again
+            with self.cache_lock:
+                self.quarantined += [{"project": project_name, **entry} for entry in analyzer.quarantined]
+            return results
+        stored = {key: [{k: v for k, v in item.items() if k != "file"} for item in items]
+                  for key, items in results.items()}
+        with self.cache_lock:
+            self.analysis_cache.save_analysis_cache(cache_key, stored)
+        return results
+
+    # -- Prompting -------------------------------------------------------------
+
+    def suggest(self, analysis):
+        """Local suggestions plus one (cached) LLM call per project for what's left"""
+        taxonomy = load_taxonomy()
+        suggestions = {}
+        queue = FairQueue()
+        for project_name, code_results in analysis.items():
+            fx, unresolved = suggest_locally(code_results, taxonomy)
+            suggestions[project_name] = fx
+            if any(unresolved[key] for key in ("events", "actions", "interactions")):
+                queue.put(project_name, build_prompt(unresolved))
+
+        for project_name, _prompt, fx in self._run_fair(queue, self._ask_llm, lambda _prompt: "llm"):
+            suggestions[project_name] += fx
+        return {name: dedupe_suggestions(fx) for name, fx in suggestions.items()}
+
+    def _ask_llm(self, project_name, prompt):
+        path = self.llm_dir / f"{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}.json"
+        if path.exists():
+            self._count("llm_hits")
+            return self._valid_specs(project_name, json.loads(path.read_text(encoding='utf-8')))
+        if not self.groq_key:
+            self.errors.append((project_name, "llm", "No Groq API key, unresolved events skipped"))
+            return []
+        try:
+            fx, _response, _report = hedged_request(self.groq_key, prompt, self.llm_latency)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            self.errors.append((project_name, "llm", str(e)))
+            return []
+        self._count("llm_calls")
+        fx = self._valid_specs(project_name, fx)
+        self.llm_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(fx), encoding='utf-8')
+        os.replace(tmp_path, path)
+        return fx
+
+    def _valid_specs(self, project_name, fx):
+        """
+        The LLM's fx entries that can be generated; the name becomes a file name
+        in every project that uses the sound, so a bad one is dropped and reported
+        """
+        if not isinstance(fx, list):
+            self.errors.append((project_name, "llm", f"fx must be a list, got {type(fx).__name__}"))
+            return []
+        valid = []
+        for spec in fx:
+            error = fx_spec_error(spec)
+            if error:
+                self.errors.append((project_name, "llm", f"Skipping suggestion: {error}"))
+            else:
+                valid.append(spec)
+        return valid
+
+    # -- Generation ------------------------------------------------------------
+
+    def plan_generations(self, suggestions):
+        """
+        Group every project's suggestions by fx_digest.
+        Returns {digest: {"fx": leader fx, "users": [(project, name), ...]}} in first-seen order.
+        """
+        plan = {}
+        for project in self.projects:
+            for fx in suggestions.get(project["name"], []):
+                entry = plan.setdefault(fx_digest(fx), {"fx": fx, "project": project["name"], "users": []})
+                for name in [fx.get("name", "unnamed")] + fx.get("aliases", []):
+                    entry["users"].append((project["name"], name))
+        return plan
+
+    def generate(self, plan):
+        """Generate each digest missing from the audio store once, projects taking turns"""
+        queue = FairQueue()
+        for audio_digest, entry in plan.items():
+            if (self.audio_dir / f"{audio_digest}.mp3").exists():
+                self._count("audio_hits")
+                continue
+            queue.put(entry["project"], (audio_digest, entry["fx"]))
+        self._run_fair(queue, self._generate_one, lambda task: task[1].get("name", "unnamed"))
+
+    def _generate_one(self, project_name, task):
+        audio_digest, fx = task
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                body = self.generator.generate_sound_effect(fx)
+                break
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                if attempt == MAX_ATTEMPTS:
+                    self.errors.append((project_name, fx.get("name", "unnamed"), str(e)))
+                    return None
+                time.sleep(RETRY_DELAY)
+
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        path = self.audio_dir / f"{audio_digest}.mp3"
+        tmp_path = path.with_name(path.name + f".{threading.get_ident()}.part")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+        self._count("generated")
+        return path
+
+    def materialize(self, plan):
+        """Copy store audio into each project's luceta_generated/ and record it in its journal"""
+        roots = {project["name"]: project["root"] for project in self.projects}
+        journals = {}
+        placed = {}
+        for audio_digest, entry in plan.items():
+            source = self.audio_dir / f"{audio_digest}.mp3"
+            if not source.exists():
+                continue
+            for project_name, sound_name in entry["users"]:
+                target = roots[project_name] / "luceta_generated" / f"{sound_name}.mp3"
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if not target.exists() or target.read_bytes() != source.read_bytes():
+                    shutil.copyfile(source, target)
+                journal = journals.setdefault(project_name, GenerationJournal(roots[project_name]))
+                if not journal.is_done(sound_name):
+                    journal.mark_done(sound_name, target)
+                placed.setdefault(project_name, []).append(sound_name)
+        return placed
+
+    def run(self, dry_run=False):
+        started = time.monotonic()
+        analysis = self.analyze()
+        suggestions = self.suggest(analysis)
+        plan = self.plan_generations(suggestions)
+        if not dry_run:
+            self.generate(plan)
+            placed = self.materialize(plan)
+        else:
+            placed = {}
+        return self.report(analysis, suggestions, plan, placed, time.monotonic() - started)
+
+    def report(self, analysis, suggestions, plan, placed, elapsed):
+        requested = sum(len(entry["users"]) for entry in plan.values())
+        shared = {audio_digest: entry for audio_digest, entry in plan.items()
+                  if len({project for project, _name in entry["users"]}) > 1}
+        return {
+            "elapsed": round(elapsed, 2),
+            "projects": {
+                project["name"]: {
+                    "root": str(project["root"]),
+                    "events": sum(len(analysis[project["name"]][key]) for key in ("events", "actions", "interactions")),
+                    "suggestions": len(suggestions.get(project["name"], [])),
+                    "placed": len(placed.get(project["name"], [])),
+                }
+                for project in self.projects
+            },
+            "sounds_requested": requested,
+            "unique_generations": len(plan),
+            "cross_project_shared": [
+                {"digest": audio_digest, "name": entry["fx"].get("name", ""),
+                 "projects": sorted({project for project, _name in entry["users"]})}
+                for audio_digest, entry in shared.items()
+            ],
+            "stats": dict(self.stats),
+            "errors": [{"project": project, "sound": sound, "error": error} for project, sound, error in self.errors],
+            "quarantined": sorted(self.quarantined, key=lambda entry: (entry["project"], entry["file"])),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze and generate SFX for a fleet of Godot projects")
+    parser.add_argument("manifest")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--cache-dir", help="overrides the manifest's cache_dir")
+    parser.add_argument("--report", help="write the consolidated report as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="analyze and prompt, but don't generate")
+    args = parser.parse_args()
+
+    projects, cache_dir = load_manifest(args.manifest)
+    if args.cache_dir:
+        cache_dir = Path(args.cache_dir).resolve()
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    generator = None
+    if not args.dry_run:
+        api_key = load_elevenlabs_key(base_path)
+        if not api_key:
+            print("ERROR: Could not find ELEVEN_LABS_API_KEY in .env")
+            return 1
+        generator = ElevenLabsGenerator(api_key, cache_dir / "audio",
+                                        luceta_config.base_url("elevenlabs", base_path))
+    groq_key = load_api_key()
+
+    runner = FleetRunner(projects, cache_dir, args.workers, groq_key, generator)
+    report = runner.run(dry_run=args.dry_run)
+    runner.llm_latency.save()
+
+    print("=" * 60)
+    print(f"Fleet of {len(projects)} projects in {report['elapsed']}s")
+    print("=" * 60)
+    for name, info in report["projects"].items():
+        print(f"  {name}: {info['events']} events, {info['suggestions']} suggestions, {info['placed']} placed")
+    print(f"\n{report['sounds_requested']} sounds requested -> {report['unique_generations']} unique generations")
+    print(f"Shared across projects: {len(report['cross_project_shared'])}")
+    stats = report["stats"]
+    print(f"Analysis cache {stats['analysis_hits']} hits / {stats['analysis_misses']} misses, "
+          f"LLM {stats['llm_hits']} cached / {stats['llm_calls']} calls, "
+          f"audio {stats['audio_hits']} stored / {stats['generated']} generated")
+    for entry in report["quarantined"]:
+        print(f"  QUARANTINED {entry['project']}/{entry['file']}: {entry['reason']}")
+    for error in report["errors"]:
+        print(f"  ERROR {error['project']}/{error['sound']}: {error['error']}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent="\t"), encoding='utf-8')
+    return 0 if not report["errors"] else 1
+
+
+if __name__ == "__main__":
+    exit(main())
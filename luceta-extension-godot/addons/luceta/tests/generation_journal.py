@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Generation Job Journal
+Python side of GenerationJournal.gd - append-only, fsync'd JSONL journal of
+generation jobs so the dock and the Python runner resume where either stopped
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+JOURNAL_RES_PATH = "res://.godot/luceta_cache/generation_journal.jsonl"
+MAX_ATTEMPTS = 3
+
+STATE_QUEUED = "queued"
+STATE_IN_FLIGHT = "in-flight"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+def file_sha256(path):
+    """Same hex digest as FileAccess.get_sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class GenerationJournal:
+    """Python mirror of the GDScript GenerationJournal"""
+
+    def __init__(self, project_path, journal_path=None):
+        self.project_path = Path(project_path)
+        self.journal_path = Path(journal_path) if journal_path else self.globalize(JOURNAL_RES_PATH)
+        self.jobs = {}
+        self._replay()
+
+    def globalize(self, res_path):
+        """res:// path -> filesystem path inside the project"""
+        return self.project_path / str(res_path).replace("res://", "", 1)
+
+    def localize(self, path):
+        """Filesystem path inside the project -> res:// path (what the dock records)"""
+        path = Path(path).resolve()
+        try:
+            return "res://" + path.relative_to(self.project_path.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _replay(self):
+        self.jobs = {}
+        if not self.journal_path.exists():
+            return
+
+        text = self.journal_path.read_text(encoding='utf-8')
+        torn = False
+        for line in text.split('\n'):
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-append leaves a partial last line
+                torn = True
+                continue
+            if isinstance(record, dict) and "name" in record:
+                self.jobs[record["name"]] = record
+
+        # Rewrite before appending so new records don't land on a torn line
+        if torn or (text and not text.endswith('\n')):
+            self.compact()
+
+        # Jobs that were in flight when the run died may have left a half-written file
+        for sound_name, job in list(self.jobs.items()):
+            if job["state"] == STATE_IN_FLIGHT:
+                self._remove_output(job.get("path", ""))
+                self._append(sound_name, STATE_QUEUED, error="Interrupted while in flight")
+
+    def enqueue(self, suggestion, reset_attempts=False):
+        """
+        Queue a sound unless it's already done. A job that ran out of attempts gets a
+        fresh retry budget; an interrupted one keeps its count.
+        """
+        sound_name = suggestion.get("name", "")
+        if not reset_attempts and self.is_done(sound_name, suggestion.get("description", "")):
+            return
+        fields = {"description": suggestion.get("description", "")}
+        if reset_attempts or self.get_state(sound_name) == STATE_FAILED:
+            fields["attempts"] = 0
+        self._append(sound_name, STATE_QUEUED, **fields)
+
+    def mark_in_flight(self, sound_name, output_path=""):
+        self._append(sound_name, STATE_IN_FLIGHT,
+                     attempts=self.get_attempts(sound_name) + 1,
+                     path=self.localize(output_path) if output_path else "")
+
+    def mark_done(self, sound_name, file_path):
+        self._append(sound_name, STATE_DONE,
+                     path=self.localize(file_path), sha256=file_sha256(file_path), error="")
+
+    def mark_failed(self, sound_name, error_message):
+        self._append(sound_name, STATE_FAILED, error=str(error_message))
+
+    def should_retry(self, sound_name):
+        return self.get_attempts(sound_name) < MAX_ATTEMPTS
+
+    def get_attempts(self, sound_name):
+        return int(self.jobs.get(sound_name, {}).get("attempts", 0))
+
+    def get_state(self, sound_name):
+        return self.jobs.get(sound_name, {}).get("state", "")
+
+    def get_path(self, sound_name):
+        """Filesystem path of a job's output, or None"""
+        path = self.jobs.get(sound_name, {}).get("path", "")
+        return self.globalize(path) if path else None
+
+    def is_done(self, sound_name, description=None):
+        """
+        Done and the file on disk still matches the hash recorded when it was written.
+        With a description, the job must also have been generated from that description.
+        """
+        job = self.jobs.get(sound_name, {})
+        if job.get("state") != STATE_DONE:
+            return False
+        if description is not None and job.get("description", description) != description:
+            return False
+        path = self.get_path(sound_name)
+        if path is None or not path.exists():
+            return False
+        return file_sha256(path) == job.get("sha256", "")
+
+    def summary(self):
+        """Count of jobs per state"""
+        counts = {}
+        for job in self.jobs.values():
+            counts[job["state"]] = counts.get(job["state"], 0) + 1
+        return counts
+
+    def compact(self):
+        """Rewrite the journal with one line per job, atomically via a temp file"""
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self.jobs.values():
+                f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def _append(self, sound_name, state, **fields):
+        record = dict(self.jobs.get(sound_name, {"name": sound_name, "attempts": 0}))
+        record.update(fields)
+        record["state"] = state
+        record["time"] = time.time()
+        self.jobs[sound_name] = record
+
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())  # Durable before the caller moves on
+
+    def _remove_output(self, path):
+        if not path:
+            return
+        file_path = self.globalize(path)
+        if file_path.exists():
+            file_path.unlink()
+            print(f"[GenerationJournal] Removed partial file: {path}")
+
+
+def main():
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    journal_path = Path(sys.argv[1]) if len(sys.argv) > 1 else None
+    journal = GenerationJournal(base_path, journal_path)
+
+    print("=" * 60)
+    print(f"Journal: {journal.journal_path}")
+    print("=" * 60)
+    for sound_name, job in journal.jobs.items():
+        status = "ok" if job["state"] != STATE_DONE or journal.is_done(sound_name) else "hash mismatch"
+        error = f" - {job['error']}" if job.get("error") else ""
+        print(f"  {sound_name}: {job['state']} (attempts {job.get('attempts', 0)}, {status}){error}")
+    print(f"\n{journal.summary()}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Generation Scheduler
+Python side of GenerationScheduler.gd - orders suggestions so pinned and
+gameplay-critical sounds are generated before long ambience loops, weighing
+priority ("priorities" in sound_taxonomy.json) against the expected request
+time and credits from AdaptiveController's fitted models. Within each tier jobs
+run in cost/weight order, which minimizes the weighted time until sounds exist.
+An optional credit budget defers the lowest-weight sounds.
+
+Usage:
+    generation_scheduler.py <fx.json> [--budget CREDITS]   show the plan
+"""
+
+import json
+import sys
+from pathlib import Path
+
+from adaptive_controller import SOUND_ENDPOINT, AdaptiveController
+from sound_taxonomy import get_taxonomy
+
+
+class GenerationScheduler:
+    """Priority/cost ordering of generation jobs"""
+
+    def __init__(self, project_path, controller=None):
+        self.controller = controller or AdaptiveController(project_path)
+
+    def describe(self, suggestion):
+        """Weight, criticality and expected cost of one suggestion"""
+        taxonomy = get_taxonomy()
+        priorities = taxonomy.data.get("priorities", {})
+        description = suggestion.get("description", "")
+        duration = self.controller.choose_duration(description, suggestion.get("name", ""))
+        hint = taxonomy.classify(f"{suggestion.get('name', '')} {description}")["hint"]
+
+        weight = float(priorities.get("hints", {}).get(hint, 1.0))
+        if duration >= priorities.get("background_min_duration", 10.0):
+            weight = priorities.get("background", 0.5)
+        if self.is_hot_path(suggestion.get("context", ""), priorities):
+            weight += priorities.get("hot_bonus", 2.0)
+        if suggestion.get("pinned"):
+            weight += priorities.get("pin_bonus", 10.0)
+
+        return {
+            "suggestion": suggestion,
+            "weight": weight,
+            "critical": weight >= priorities.get("critical", 4.0),
+            "duration": duration,
+            "seconds": self.controller.estimate_seconds(SOUND_ENDPOINT, duration),
+            "credits": self.controller.estimate_credits(SOUND_ENDPOINT, duration),
+        }
+
+    @staticmethod
+    def is_hot_path(context, priorities=None):
+        """Whether the event fires from a per-frame or input callback"""
+        if priorities is None:
+            priorities = get_taxonomy().data.get("priorities", {})
+        return any(function in context for function in priorities.get("hot_functions", ()))
+
+    def plan(self, suggestions, credit_budget=None):
+        """
+        {"queue", "deferred", "critical", "credits", "first_seconds", "critical_seconds"}
+        A credit_budget of None or 0 means no budget.
+        """
+        jobs = [self.describe(fx) for fx in suggestions]
+
+        # Budget: keep the heaviest sounds (cheapest first on ties) while they fit
+        admitted = jobs
+        deferred = []
+        if credit_budget:
+            admitted = []
+            spent = 0.0
+            for job in sorted(jobs, key=lambda job: (-job["weight"], job["credits"])):
+                if spent + job["credits"] <= credit_budget:
+                    admitted.append(job)
+                    spent += job["credits"]
+                else:
+                    deferred.append(job["suggestion"])
+
+        admitted.sort(key=lambda job: (not job["critical"], job["seconds"] / job["weight"]))
+
+        elapsed = first_seconds = critical_seconds = 0.0
+        for i, job in enumerate(admitted):
+            elapsed += job["seconds"]
+            if i == 0:
+                first_seconds = elapsed
+            if job["critical"]:
+                critical_seconds = elapsed
+
+        return {
+            "queue": [job["suggestion"] for job in admitted],
+            "deferred": deferred,
+            "critical": sum(1 for job in admitted if job["critical"]),
+            "credits": sum(job["credits"] for job in admitted),
+            "first_seconds": first_seconds,
+            "critical_seconds": critical_seconds,
+        }
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return 1
+    budget = float(sys.argv[sys.argv.index("--budget") + 1]) if "--budget" in sys.argv else None
+    data = json.loads(Path(sys.argv[1]).read_text(encoding='utf-8'))
+    suggestions = data.get('fx', data) if isinstance(data, dict) else data
+
+    scheduler = GenerationScheduler(Path(__file__).resolve().parent.parent.parent.parent)
+    schedule = scheduler.plan(suggestions, budget)
+    model = scheduler.controller.model(SOUND_ENDPOINT)
+    print(f"Latency model: {model['latency']['base']:.2f}s + {model['latency']['per_unit']:.2f}s "
+          f"per audio second ({model['samples']} requests)")
+    for i, fx in enumerate(schedule["queue"], 1):
+        job = scheduler.describe(fx)
+        marker = "*" if job["critical"] else " "
+        print(f"  {i:>3}. {marker} {fx.get('name', ''):<28} weight {job['weight']:<5.1f} "
+              f"{job['duration']:>5.1f}s audio ~{job['seconds']:.1f}s {job['credits']:.0f} credits")
+    for fx in schedule["deferred"]:
+        print(f"  deferred   {fx.get('name', '')}")
+    print(f"\n{len(schedule['queue'])} queued ({schedule['critical']} critical, * above), "
+          f"{len(schedule['deferred'])} deferred, ~{schedule['credits']:.0f} credits")
+    print(f"First sound in ~{schedule['first_seconds']:.1f}s, "
+          f"all critical sounds in ~{schedule['critical_seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Hedged LLM Requests
+Sends the suggestion prompt to Groq and, if no answer has arrived by the
+primary model's latency percentile, fires a backup request (optionally to a
+faster fallback model). The first response that passes parse_llm_response
+wins and the other request is cancelled by closing its connection.
+Per-model latency histograms are kept so the hedge delay tunes itself.
+
+Usage:
+    hedged_llm.py [requests] [--fallback MODEL] [--percentile 0.9]
+    (point GROQ_BASE_URL at api_stub_server.py with a latency spec to benchmark)
+"""
+
+import argparse
+import bisect
+import http.client
+import json
+import math
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+import luceta_config
+from test_llm_workflow import build_prompt, load_api_key, parse_llm_response, simulate_code_analysis
+
+PRIMARY_MODEL = "openai/gpt-oss-120b"
+FALLBACK_MODEL = "openai/gpt-oss-20b"
+HISTOGRAM_PATH = ".godot/luceta_cache/llm_latency.json"
+CHAT_PATH = "/openai/v1/chat/completions"
+
+DEFAULT_PERCENTILE = 0.95
+DEFAULT_HEDGE_DELAY = 8.0   # Until a model has enough samples
+MIN_HEDGE_DELAY = 0.25
+MIN_SAMPLES = 20
+REQUEST_TIMEOUT = 120.0
+
+# Log-spaced bucket upper bounds from 50ms to ~200s, about 12% apart
+BUCKETS = [0.05 * 1.12 ** i for i in range(74)]
+
+
+def chat_request_body(model, prompt):
+    """JSON body of a chat completion request for the suggestion prompt"""
+    return json.dumps({
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.6,
+        "max_completion_tokens": 4096,
+        "top_p": 0.95,
+    }).encode()
+
+
+class LatencyHistogram:
+    """Per-model latency counts over fixed log-spaced buckets, persisted as JSON"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.counts = {}
+        self.lock = threading.Lock()
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding='utf-8'))
+            except json.JSONDecodeError:
+                data = {}
+            for model, counts in data.get("models", {}).items():
+                if len(counts) == len(BUCKETS) + 1:
+                    self.counts[model] = counts
+
+    @classmethod
+    def for_project(cls, project_path):
+        return cls(Path(project_path) / HISTOGRAM_PATH)
+
+    def record(self, model, seconds):
+        with self.lock:
+            counts = self.counts.setdefault(model, [0] * (len(BUCKETS) + 1))
+            counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def samples(self, model):
+        return sum(self.counts.get(model, []))
+
+    def percentile(self, model, p):
+        """Upper bound of the bucket holding the p-th latency, or None without enough samples"""
+        counts = self.counts.get(model)
+        total = sum(counts) if counts else 0
+        if total < MIN_SAMPLES:
+            return None
+        target = math.ceil(p * total)
+        running = 0
+        for index, count in enumerate(counts):
+            running += count
+            if running >= target:
+                return BUCKETS[index] if index < len(BUCKETS) else REQUEST_TIMEOUT
+        return REQUEST_TIMEOUT
+
+    def hedge_delay(self, model, p=DEFAULT_PERCENTILE):
+        delay = self.percentile(model, p)
+        return DEFAULT_HEDGE_DELAY if delay is None else max(MIN_HEDGE_DELAY, delay)
+
+    def save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with self.lock:
+            tmp_path.write_text(json.dumps({"buckets": BUCKETS, "models": self.counts}), encoding='utf-8')
+        os.replace(tmp_path, self.path)
+
+
+class _Attempt(threading.Thread):
+    """One chat completion request on its own connection, so it can be cancelled"""
+
+    def __init__(self, base_url, api_key, model, prompt, results):
+        super().__init__(daemon=True)
+        self.url = urllib.parse.urlsplit(base_url)
+        self.api_key = api_key
+        self.model = model
+        self.prompt = prompt
+        self.results = results
+        self.connection = None
+        self.cancelled = False
+        self.finished = False
+        self.started = 0.0
+
+    def run(self):
+        self.started = time.monotonic()
+        body = chat_request_body(self.model, self.prompt)
+        connection_class = http.client.HTTPSConnection if self.url.scheme == "https" else http.client.HTTPConnection
+        try:
+            self.connection = connection_class(self.url.netloc, timeout=REQUEST_TIMEOUT)
+            self.connection.request("POST", self.url.path.rstrip("/") + CHAT_PATH, body,
+                                    {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"})
+            response = self.connection.getresponse()
+            payload = response.read()
+            if response.status != 200:
+                raise ValueError(f"HTTP {response.status}: {payload[:200].decode('utf-8', 'replace')}")
+            parsed = json.loads(payload)
+            fx, error = parse_llm_response(parsed)
+            if error:
+                raise ValueError(error)
+            self.results.put((self, parsed, fx, None))
+        except Exception as e:
+            # A malformed 200 (e.g. a choice without content) raises from
+            # parse_llm_response; it still has to be posted or the caller waits
+            # out the whole timeout
+            if not self.cancelled:
+                self.results.put((self, None, None, e))
+        finally:
+            if self.connection is not None:
+                self.connection.close()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def cancel(self):
+        """Closing the socket makes the blocked read fail; the thread then exits quietly"""
+        self.cancelled = True
+        connection = self.connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(2)
+            except OSError:
+                pass
+
+
+def hedged_request(api_key, prompt, histogram, base_url=None, model=PRIMARY_MODEL,
+                   fallback_model=None, percentile=DEFAULT_PERCENTILE, max_attempts=2):
+    """
+    Send prompt, hedging once the primary is slower than its percentile latency.
+    An attempt that fails validation fires the next one right away.
+    Returns (fx, response, report) where report has winner model, attempt count,
+    hedge delay and elapsed seconds. Raises the last error if every attempt failed.
+    Attempts still in flight at the end are recorded as censored latencies.
+    """
+    base_url = base_url or luceta_config.base_url("groq")
+    results = queue.Queue()
+    delay = histogram.hedge_delay(model, percentile)
+    started = time.monotonic()
+    attempts = []
+    last_error = None
+
+    def launch():
+        attempt_model = model if not attempts or fallback_model is None else fallback_model
+        attempt = _Attempt(base_url, api_key, attempt_model, prompt, results)
+        attempts.append(attempt)
+        attempt.start()
+
+    launch()
+    pending = 1
+    try:
+        while pending:
+            hedge_at = started + delay if len(attempts) < max_attempts else None
+            timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at else REQUEST_TIMEOUT
+            try:
+                attempt, response, fx, error = results.get(timeout=timeout)
+            except queue.Empty:
+                if hedge_at is None:
+                    break
+                launch()
+                pending += 1
+                continue
+
+            pending -= 1
+            attempt.finished = True
+            if error is None:
+                histogram.record(attempt.model, attempt.elapsed())
+                return fx, response, {"model": attempt.model, "attempts": len(attempts), "hedge_delay": delay,
+                                      "elapsed": time.monotonic() - started}
+            last_error = error
+            if len(attempts) < max_attempts:
+                launch()
+                pending += 1
+    finally:
+        for attempt in attempts:
+            attempt.cancel()
+            if not attempt.finished:
+                # Censored sample: the attempt took at least this long. Leaving
+                # cancelled losers out would keep only the fast side of the tail
+                # and pull the hedge delay down with every hedge
+                histogram.record(attempt.model, max(attempt.elapsed(), delay))
+
+    raise last_error or TimeoutError(f"No response within {REQUEST_TIMEOUT}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedged LLM requests against Groq (or the stub server)")
+    parser.add_argument("requests", nargs="?", type=int, default=1)
+    parser.add_argument("--fallback", default=None, help=f"backup model, e.g. {FALLBACK_MODEL}")
+    parser.add_argument("--percentile", type=float, default=DEFAULT_PERCENTILE)
+    parser.add_argument("--no-hedge", action="store_true", help="single requests, for comparison")
+    args = parser.parse_args()
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    api_key = load_api_key()
+    if not api_key:
+        print("ERROR: Could not load Groq API key from .env")
+        return 1
+
+    histogram = LatencyHistogram.for_project(base_path)
+    prompt = build_prompt(simulate_code_analysis())
+    latencies = []
+    hedged = 0
+    for i in range(args.requests):
+        try:
+            fx, _response, report = hedged_request(api_key, prompt, histogram, fallback_model=args.fallback,
+                                                   percentile=args.percentile,
+                                                   max_attempts=1 if args.no_hedge else 2)
+        except Exception as e:
+            print(f"  [{i + 1}] ERROR: {e}")
+            continue
+        latencies.append(report["elapsed"])
+        hedged += report["attempts"] > 1
+        print(f"  [{i + 1}] {len(fx)} fx from {report['model']} in {report['elapsed']:.2f}s "
+              f"(hedge at {report['hedge_delay']:.2f}s, {report['attempts']} attempts)")
+    histogram.save()
+
+    if latencies:
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"\np50 {p50:.2f}s, p99 {p99:.2f}s, hedged {hedged}/{len(latencies)}")
+    return 0 if latencies else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Import Metadata Writer
+Pre-writes the Godot 4 .import file for audio written outside the editor
+(sfx_generator.py, warm pool copies, sfx_variations.py). The editor then imports
+each new file once, with its uid and loop settings fixed up front, instead of
+discovering a batch of unknown files in one big rescan. The .import files hold
+the same [remap]/[deps]/[params] sections the editor writes; the imported
+resource under .godot/imported/ is still produced by the editor.
+Existing .import files are never touched, so settings changed in the editor stay.
+
+Usage:
+    import_metadata.py [files...]   default: every audio file in luceta_generated/
+"""
+
+import hashlib
+import random
+import sys
+from pathlib import Path
+
+from sfx_atlas import LOOPING_KEYWORDS, OUTPUT_DIR
+
+# extension -> (importer, resource type, imported file extension, [params])
+IMPORTERS = {
+    ".mp3": ("mp3", "AudioStreamMP3", "mp3str",
+             ["loop={loop}", "loop_offset=0", "bpm=0", "beat_count=0", "bar_beats=4"]),
+    ".ogg": ("oggvorbisstr", "AudioStreamOggVorbis", "oggvorbisstr",
+             ["loop={loop}", "loop_offset=0", "bpm=0", "beat_count=0", "bar_beats=4"]),
+    ".wav": ("wav", "AudioStreamWAV", "sample",
+             ["force/8_bit=false", "force/mono=false", "force/max_rate=false", "force/max_rate_hz=44100",
+              "edit/trim=false", "edit/normalize=false", "edit/loop_mode={wav_loop_mode}", "edit/loop_begin=0",
+              "edit/loop_end=-1", "compress/mode=2"]),
+}
+WAV_LOOP_DISABLED = 1
+WAV_LOOP_FORWARD = 2
+
+UID_CHARS = "abcdefghijklmnopqrstuvwxyz01234567"  # ResourceUID text encoding, base 34
+
+
+def new_uid(rng=random):
+    value = rng.getrandbits(63)
+    text = ""
+    while True:
+        text = UID_CHARS[value % len(UID_CHARS)] + text
+        value //= len(UID_CHARS)
+        if value == 0:
+            return "uid://" + text
+
+
+def is_looping(path):
+    return any(keyword in Path(path).stem.lower() for keyword in LOOPING_KEYWORDS)
+
+
+def import_text(res_path, uid, loop=False):
+    """Contents of the .import file for an audio file at res_path"""
+    importer, resource_type, imported_extension, params = IMPORTERS[Path(res_path).suffix.lower()]
+    # The editor names imported files <file>-<md5 of the res:// path>.<ext>
+    dest = (f"res://.godot/imported/{Path(res_path).name}-"
+            f"{hashlib.md5(res_path.encode('utf-8')).hexdigest()}.{imported_extension}")
+    values = {"loop": "true" if loop else "false",
+              "wav_loop_mode": WAV_LOOP_FORWARD if loop else WAV_LOOP_DISABLED}
+    lines = [
+        "[remap]", "",
+        f'importer="{importer}"',
+        f'type="{resource_type}"',
+        f'uid="{uid}"',
+        f'path="{dest}"', "",
+        "[deps]", "",
+        f'source_file="{res_path}"',
+        f'dest_files=["{dest}"]', "",
+        "[params]", "",
+    ] + [param.format(**values) for param in params]
+    return "\n".join(lines) + "\n"
+
+
+def write_import_metadata(project_path, path, loop=None):
+    """Write <path>.import unless it exists or the format isn't imported; returns the .import path or None"""
+    project_path = Path(project_path).resolve()
+    path = Path(path).resolve()
+    import_path = path.with_name(path.name + ".import")
+    if path.suffix.lower() not in IMPORTERS or import_path.exists() or not path.exists():
+        return None
+    res_path = "res://" + path.relative_to(project_path).as_posix()
+    if loop is None:
+        loop = is_looping(path)
+    tmp_path = import_path.with_name(import_path.name + ".tmp")
+    tmp_path.write_text(import_text(res_path, new_uid(), loop), encoding='utf-8')
+    tmp_path.replace(import_path)
+    return import_path
+
+
+def prepare(project_path, paths=None):
+    """.import files for the given audio files (default: all of luceta_generated/); returns those written"""
+    project_path = Path(project_path)
+    if paths is None:
+        output_dir = project_path / OUTPUT_DIR
+        paths = sorted(p for p in output_dir.rglob("*") if p.suffix.lower() in IMPORTERS) if output_dir.exists() else []
+    written = []
+    for path in paths:
+        import_path = write_import_metadata(project_path, path)
+        if import_path is not None:
+            written.append(import_path)
+    return written
+
+
+def main():
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    paths = [Path(arg) for arg in sys.argv[1:]] or None
+    written = prepare(base_path, paths)
+    for import_path in written:
+        print(f"Wrote {import_path.relative_to(base_path.resolve()).as_posix()}")
+    print(f"{len(written)} .import files written")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Local Suggestion Engine
+Resolves well-known sound hints from the steering tables without calling the LLM
+"""
+
+import json
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+STEERING_PATH = Path(__file__).resolve().parents[4] / 'luceta-power-mcp' / 'steering' / 'game-sfx.md'
+
+# Analyzer sound hints -> "Game Request" row in the steering tables
+HINT_REQUESTS = {
+    "footstep": "footsteps grass",
+    "jump": "jump",
+    "attack": "sword hit",
+    "collect": "coin collect",
+    "interaction": "interaction",
+}
+
+ROW_PATTERN = re.compile(r'^\|\s*"([^"]+)"\s*\|\s*"([^"]+)"\s*\|(?:\s*(true|false)\s*\|)?\s*$')
+
+
+@lru_cache(maxsize=None)
+def load_steering_rows(steering_path=STEERING_PATH):
+    """
+    Every row of the steering tables as {request: entry}.
+    Each entry has the ElevenLabs prompt, its table category and loop flag.
+    """
+    rows = {}
+    category = ""
+    for line in Path(steering_path).read_text(encoding='utf-8').split('\n'):
+        if line.startswith('### '):
+            category = line[4:].strip()
+            continue
+        match = ROW_PATTERN.match(line.strip())
+        if match:
+            request, prompt, loop = match.groups()
+            rows[request.lower()] = {
+                "prompt": prompt,
+                "category": category,
+                "loop": loop == "true"
+            }
+    return rows
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(steering_path=STEERING_PATH):
+    """Compile the steering tables into {hint: entry} (see load_steering_rows)"""
+    rows = load_steering_rows(steering_path)
+    return {hint: rows[request] for hint, request in HINT_REQUESTS.items() if request in rows}
+
+
+def _sound_prefix(item):
+    file_path = item.get("file", "")
+    return Path(file_path).stem if file_path else "game"
+
+
+def suggest_locally(code_results, taxonomy=None):
+    """
+    Build fx entries for every event whose hint the taxonomy knows, one per
+    script and hint, marked "source": "local".
+    Returns (fx, unresolved) where unresolved has the same shape as
+    code_results and only holds what still needs the LLM.
+    """
+    if taxonomy is None:
+        taxonomy = load_taxonomy()
+
+    fx_by_name = {}
+    unresolved = {key: [] for key in ("events", "actions", "interactions", "dialogs")}
+
+    for key in ("events", "actions", "interactions"):
+        for item in code_results.get(key, []):
+            hint = item.get("sound_hint", "generic")
+            entry = taxonomy.get(hint)
+            if entry is None:
+                unresolved[key].append(item)
+                continue
+
+            sound_name = f"{_sound_prefix(item)}_{hint}"
+            event_name = item.get("name", item.get("type", key))
+            if sound_name in fx_by_name:
+                fx_by_name[sound_name]["context"] += f", {event_name}"
+                continue
+
+            fx = {
+                "name": sound_name,
+                "description": entry["prompt"],
+                "why": f"Known '{hint}' event: {event_name} ({entry['category']})",
+                "context": event_name,
+                "source": "local"
+            }
+            if entry["loop"]:
+                fx["loop"] = True
+            fx_by_name[sound_name] = fx
+
+    unresolved["dialogs"] = list(code_results.get("dialogs", []))
+    return list(fx_by_name.values()), unresolved
+
+
+def count_items(code_results):
+    """Number of events, actions and interactions in an analysis result"""
+    return sum(len(code_results.get(key, [])) for key in ("events", "actions", "interactions"))
+
+
+def local_share(code_results, unresolved):
+    """Fraction of analyzed items resolved without the LLM"""
+    total = count_items(code_results)
+    if total == 0:
+        return 1.0
+    return (total - count_items(unresolved)) / total
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: local_suggestions.py <analysis_results.json>")
+        return 1
+
+    code_results = json.loads(Path(sys.argv[1]).read_text(encoding='utf-8'))
+    fx, unresolved = suggest_locally(code_results)
+
+    print("=" * 60)
+    print(f"Resolved locally: {local_share(code_results, unresolved):.0%} "
+          f"({count_items(code_results) - count_items(unresolved)}/{count_items(code_results)})")
+    print("=" * 60)
+    for entry in fx:
+        print(f"  {entry['name']}: {entry['description']}")
+    print(f"\nLeft for the LLM: {count_items(unresolved)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
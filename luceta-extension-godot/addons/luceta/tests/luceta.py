@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Luceta CLI
+One entry point for the Python tools. Each subcommand imports what it needs
+when it runs, so `luceta.py <command> --help` and cheap commands start in a few
+tens of milliseconds; NumPy and the HTTP clients load only for suggest/generate.
+Keys and settings come from luceta_config, parsed once per process.
+
+Usage:
+    luceta.py scan [--json]                      analyze the project's scripts and scenes
+    luceta.py suggest [--no-llm] [-o fx.json]     local + Groq suggestions, deduplicated
+    luceta.py generate <fx.json> [--budget C]     generate suggestions, critical sounds first
+    luceta.py audit                              journal state and what an update would redo
+    luceta.py metrics [--json]                   fitted request latency/cost models
+    luceta.py integrate [--atlas] [--variants N]  (re)build the pooled SFX autoload
+Every command accepts --project <path> (default: this project).
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import luceta_config
+
+
+def _analyze(project_path):
+    """Analyzer results; its progress output goes to stderr so stdout stays machine-readable"""
+    from contextlib import redirect_stdout
+    from test_analyzer import CodeAnalyzerSimulator
+
+    with redirect_stdout(sys.stderr):
+        return CodeAnalyzerSimulator(project_path).analyze_project()
+
+
+def cmd_scan(args):
+    results = _analyze(args.project)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for key in ("events", "actions", "interactions", "dialogs", "signals"):
+        print(f"{key}: {len(results[key])}")
+        if key in ("events", "actions"):
+            for item in results[key]:
+                print(f"  {item['name']:<32} {item.get('sound_hint', '')}")
+    return 0
+
+
+def cmd_suggest(args):
+    from local_suggestions import count_items, suggest_locally
+    from sfx_dedup import dedupe_suggestions
+
+    results = _analyze(args.project)
+    suggestions, unresolved = suggest_locally(results)
+    print(f"{len(suggestions)} suggestions resolved locally, {count_items(unresolved)} events left",
+          file=sys.stderr)
+
+    if count_items(unresolved) and not args.no_llm:
+        from hedged_llm import LatencyHistogram, hedged_request
+        from test_llm_workflow import build_prompt
+
+        api_key = luceta_config.groq_key(args.project)
+        if not api_key:
+            print("ERROR: Could not load Groq API key (use --no-llm for local suggestions only)", file=sys.stderr)
+            return 1
+        histogram = LatencyHistogram.for_project(args.project)
+        try:
+            fx, _response, report = hedged_request(api_key, build_prompt(unresolved), histogram,
+                                                   base_url=luceta_config.base_url("groq", args.project))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}", file=sys.stderr)
+            return 1
+        finally:
+            histogram.save()
+        print(f"{len(fx)} suggestions from {report['model']} in {report['elapsed']:.1f}s", file=sys.stderr)
+        suggestions += fx
+
+    deduped = dedupe_suggestions(suggestions)
+    output = json.dumps({"fx": deduped}, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        print(f"Wrote {len(deduped)} suggestions to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+def cmd_generate(args):
+    from adaptive_controller import AdaptiveController
+    from generation_journal import GenerationJournal
+    from generation_scheduler import GenerationScheduler
+    from sfx_dedup import DEFAULT_THRESHOLD
+    from sfx_generator import ElevenLabsGenerator, generate_suggestions
+    from warm_pool import WarmPool
+
+    api_key = luceta_config.elevenlabs_key(args.project)
+    if not api_key:
+        print("ERROR: Could not find ELEVEN_LABS_API_KEY")
+        return 1
+    data = json.loads(Path(args.suggestions).read_text(encoding='utf-8'))
+    suggestions = data.get('fx', data) if isinstance(data, dict) else data
+
+    controller = AdaptiveController(args.project)
+    generator = ElevenLabsGenerator(api_key, Path(args.project) / "luceta_generated",
+                                    luceta_config.base_url("elevenlabs", args.project), controller)
+    threshold = DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+    budget = luceta_config.credit_budget(args.project) if args.budget is None else args.budget
+    generated, errors = generate_suggestions(generator, suggestions, threshold, GenerationJournal(args.project),
+                                             GenerationScheduler(args.project, controller), budget,
+                                             None if args.no_warm_pool else WarmPool.default(args.project))
+    print(f"Generated {len(generated)}/{len(suggestions)} sounds")
+    for sound_name, error in errors:
+        print(f"  ERROR {sound_name}: {error}")
+    return 0 if not errors else 1
+
+
+def cmd_audit(args):
+    from dependency_graph import plan, print_plan
+    from generation_journal import STATE_DONE, GenerationJournal
+    from local_suggestions import load_taxonomy
+
+    journal = GenerationJournal(args.project)
+    problems = 0
+    for sound_name, job in sorted(journal.jobs.items()):
+        if job["state"] == STATE_DONE and not journal.is_done(sound_name):
+            print(f"  {sound_name}: audio missing or changed since it was generated")
+            problems += 1
+        elif job["state"] != STATE_DONE:
+            error = f" - {job['error']}" if job.get("error") else ""
+            print(f"  {sound_name}: {job['state']}{error}")
+            problems += 1
+    print(journal.summary())
+    print()
+
+    update = plan(args.project, taxonomy=load_taxonomy())
+    print_plan(update)
+    stale = len(update["llm_calls"]) + len(update["generations"])
+    return 0 if not problems and not stale else 1
+
+
+def cmd_metrics(args):
+    from adaptive_controller import AdaptiveController, print_metrics
+
+    metrics = AdaptiveController(args.project).metrics()
+    if args.json:
+        print(json.dumps(metrics, indent=2))
+    else:
+        print_metrics(metrics)
+    return 0
+
+
+def cmd_integrate(args):
+    from sfx_autoload import SCRIPT_FILE, SfxAutoloadGenerator
+
+    if args.atlas:
+        from sfx_atlas import SfxAtlasPacker
+        report = SfxAtlasPacker(args.project).pack()
+        print(f"Atlas: moved {len(report['moved'])} sounds, rebuilt {len(report['rebuilt'])} atlases")
+    if args.variants:
+        from sfx_variations import VariationEngine
+        variants, skipped = VariationEngine(args.project).generate(count=args.variants, seed=args.seed)
+        print(f"Variants: {sum(len(paths) for paths in variants.values())} for {len(variants)} sounds"
+              + (f", {len(skipped)} skipped (first: {skipped[0][1]})" if skipped else ""))
+    registry, registered = SfxAutoloadGenerator(args.project).generate()
+    print(f"Wrote {SCRIPT_FILE} with {len(registry)} sounds"
+          + (", registered the autoload in project.godot" if registered else ""))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="luceta", description="Luceta sound tools for Godot projects")
+    project = argparse.ArgumentParser(add_help=False)
+    project.add_argument("--project", type=Path, default=luceta_config.PROJECT_ROOT,
+                         help="Godot project root (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", parents=[project], help="analyze scripts and scenes for sound events")
+    scan.add_argument("--json", action="store_true", help="print the full analyzer results as JSON")
+    scan.set_defaults(handler=cmd_scan)
+
+    suggest = commands.add_parser("suggest", parents=[project], help="suggest sound effects for the project")
+    suggest.add_argument("--no-llm", action="store_true", help="only what the taxonomy resolves locally")
+    suggest.add_argument("-o", "--output", help="write {\"fx\": [...]} here instead of stdout")
+    suggest.set_defaults(handler=cmd_suggest)
+
+    generate = commands.add_parser("generate", parents=[project], help="generate suggestions with ElevenLabs")
+    generate.add_argument("suggestions", help="JSON file from `suggest`")
+    generate.add_argument("--threshold", type=float, help="near-duplicate threshold (default: sfx_dedup's)")
+    generate.add_argument("--budget", type=float,
+                          help="ElevenLabs credits to spend; low-priority sounds beyond it are deferred "
+                               "(default: luceta/credit_budget, none)")
+    generate.add_argument("--no-warm-pool", action="store_true", help="don't reuse pre-generated sounds (warm_pool.py)")
+    generate.set_defaults(handler=cmd_generate)
+
+    audit = commands.add_parser("audit", parents=[project],
+                                help="report failed/missing audio and stale suggestions (exit 1 if any)")
+    audit.set_defaults(handler=cmd_audit)
+
+    metrics = commands.add_parser("metrics", parents=[project],
+                                  help="fitted ElevenLabs latency/cost models and learned sound durations")
+    metrics.add_argument("--json", action="store_true", help="print the models as JSON")
+    metrics.set_defaults(handler=cmd_metrics)
+
+    integrate = commands.add_parser("integrate", parents=[project], help="rebuild the LucetaSfx autoload")
+    integrate.add_argument("--atlas", action="store_true", help="pack short one-shots into SFX atlases first")
+    integrate.add_argument("--variants", type=int, default=0, metavar="N",
+                           help="render N local variants per one-shot, played at random (sfx_variations.py)")
+    integrate.add_argument("--seed", type=int, default=0, help="variation seed")
+    integrate.set_defaults(handler=cmd_integrate)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.project = args.project.resolve()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Luceta Config
+The one place the Python tools read settings and API keys from. Sources are
+parsed once per process, in the order the editor dock uses: environment
+variables, the project .env, the [luceta] section of project.godot, then the
+<KEY>.txt files next to project.godot. Standard library only, so importing it
+adds nothing to start-up time.
+
+Usage:
+    luceta_config.py    show where each key comes from (values masked)
+"""
+
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+
+# Setting -> (project.godot luceta/ setting, key file) fallbacks
+KEY_SOURCES = {
+    "GROQ_API_KEY": ("groq_api_key", "GROQ_API_KEY.txt"),
+    "ELEVEN_LABS_API_KEY": ("elevenlabs_api_key", "ELEVEN_LABS_API_KEY.txt"),
+    "LUCETA_CREDIT_BUDGET": ("credit_budget", None),
+    "LUCETA_WARM_POOL_BUDGET": ("warm_pool_budget", None),
+    "LUCETA_WARM_POOL_DIR": ("warm_pool_dir", None),
+}
+
+DEFAULTS = {
+    "ELEVENLABS_BASE_URL": "https://api.elevenlabs.io/v1",
+    "GROQ_BASE_URL": "https://api.groq.com",
+}
+
+_ENV_LINE = re.compile(r'^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*?)\s*$')
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value.split(" #", 1)[0].strip()
+
+
+@lru_cache(maxsize=None)
+def load_env(project_path=PROJECT_ROOT):
+    """KEY -> value from <project>/.env (KEY=value, KEY="value", export KEY='value')"""
+    env_path = Path(project_path) / ".env"
+    values = {}
+    try:
+        content = env_path.read_text(encoding='utf-8')
+    except OSError:
+        return values
+    for line in content.splitlines():
+        match = _ENV_LINE.match(line)
+        if match and not line.lstrip().startswith("#"):
+            values[match.group(1)] = _unquote(match.group(2))
+    return values
+
+
+@lru_cache(maxsize=None)
+def load_project_settings(project_path=PROJECT_ROOT):
+    """setting -> value from the [luceta] section of project.godot"""
+    settings = {}
+    try:
+        content = (Path(project_path) / "project.godot").read_text(encoding='utf-8')
+    except OSError:
+        return settings
+    section = None
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("["):
+            section = line.strip("[]")
+        elif section == "luceta" and "=" in line:
+            name, value = line.split("=", 1)
+            settings[name.strip()] = _unquote(value.strip())
+    return settings
+
+
+def _lookup(name, project_path):
+    """(value, source) for a setting, first source wins"""
+    if os.environ.get(name):
+        return os.environ[name], "environment"
+    value = load_env(project_path).get(name)
+    if value:
+        return value, ".env"
+    setting, key_file = KEY_SOURCES.get(name, (None, None))
+    if setting and load_project_settings(project_path).get(setting):
+        return load_project_settings(project_path)[setting], "project.godot"
+    if key_file:
+        try:
+            value = (Path(project_path) / key_file).read_text(encoding='utf-8').strip()
+        except OSError:
+            value = ""
+        if value:
+            return value, key_file
+    if name in DEFAULTS:
+        return DEFAULTS[name], "default"
+    return None, None
+
+
+def get(name, project_path=PROJECT_ROOT):
+    """Value of a setting or API key, None if no source has it"""
+    return _lookup(name, Path(project_path).resolve())[0]
+
+
+def groq_key(project_path=PROJECT_ROOT):
+    return get("GROQ_API_KEY", project_path)
+
+
+def elevenlabs_key(project_path=PROJECT_ROOT):
+    return get("ELEVEN_LABS_API_KEY", project_path)
+
+
+def credit_budget(project_path=PROJECT_ROOT):
+    """ElevenLabs credits one generation run may spend, None for no budget"""
+    try:
+        budget = float(get("LUCETA_CREDIT_BUDGET", project_path) or 0)
+    except ValueError:
+        return None
+    return budget if budget > 0 else None
+
+
+def base_url(service, project_path=PROJECT_ROOT):
+    """API base URL for "groq" or "elevenlabs" (overridable to point at api_stub_server.py)"""
+    return get(f"{service.upper()}_BASE_URL", project_path)
+
+
+def reload():
+    """Forget cached sources, e.g. after a test rewrites .env"""
+    load_env.cache_clear()
+    load_project_settings.cache_clear()
+
+
+def main():
+    for name in list(KEY_SOURCES) + list(DEFAULTS):
+        value, source = _lookup(name, PROJECT_ROOT)
+        if value is None:
+            print(f"  {name:<22} not set")
+        elif name.endswith("_API_KEY"):
+            print(f"  {name:<22} {value[:6]}... ({source})")
+        else:
+            print(f"  {name:<22} {value} ({source})")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
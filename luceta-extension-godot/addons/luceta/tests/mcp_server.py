@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Luceta MCP Server
+Long-lived Model Context Protocol server (JSON-RPC over stdio) exposing the
+project analyzer and generator as scan, suggest, generate, audit and metrics
+tools.
+It stays warm between calls: an in-memory project index re-analyzes only
+files whose mtime/size changed, LLM answers are cached by prompt, and HTTP
+connections to Groq and ElevenLabs are kept alive and reused.
+
+Usage:
+    mcp_server.py [--project PATH]     serve on stdin/stdout (what mcp.json launches)
+    mcp_server.py bench [--project PATH]   time cold vs warm tool calls in-process
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+
+import luceta_config
+from adaptive_controller import AdaptiveController
+from generation_journal import STATE_DONE, GenerationJournal
+from hedged_llm import CHAT_PATH, PRIMARY_MODEL, chat_request_body
+from local_suggestions import count_items, load_taxonomy, suggest_locally
+from generation_scheduler import GenerationScheduler
+from sfx_generator import ElevenLabsGenerator, fx_spec_error, generate_suggestions
+from warm_pool import WarmPool
+from test_analyzer import CodeAnalyzerSimulator
+from test_llm_workflow import build_prompt, parse_llm_response
+
+SERVER_INFO = {"name": "luceta", "version": "1.0.0"}
+PROTOCOL_VERSIONS = ("2025-06-18", "2025-03-26", "2024-11-05")
+RESULT_KEYS = ("events", "actions", "interactions", "dialogs", "signals")
+
+MAX_IDLE_PER_HOST = 4
+REQUEST_TIMEOUT = 120.0
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections per host, reused across tool calls"""
+
+    def __init__(self, max_idle_per_host=MAX_IDLE_PER_HOST, timeout=REQUEST_TIMEOUT):
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.idle = {}  # (scheme, netloc) -> [connection]
+        self.lock = threading.Lock()
+        self.opened = 0
+
+    def _connect(self, key):
+        connection_class = http.client.HTTPSConnection if key[0] == "https" else http.client.HTTPConnection
+        self.opened += 1
+        return connection_class(key[1], timeout=self.timeout)
+
+    def request(self, method, url, body=None, headers=None):
+        """(status, body bytes); a stale kept-alive connection is retried once on a fresh one"""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        with self.lock:
+            idle = self.idle.get(key, [])
+            connection = idle.pop() if idle else None
+        reused = connection is not None
+        if connection is None:
+            connection = self._connect(key)
+
+        while True:
+            try:
+                connection.request(method, path, body, headers or {})
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.RemoteDisconnected, http.client.CannotSendRequest):
+                connection.close()
+                if not reused:
+                    raise
+                reused = False
+                connection = self._connect(key)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            with self.lock:
+                idle = self.idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(connection)
+                else:
+                    connection.close()
+        return response.status, data
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
+class PooledElevenLabsGenerator(ElevenLabsGenerator):
+    """ElevenLabsGenerator whose requests go through the server's connection pool"""
+
+    def __init__(self, pool, api_key, output_directory, base_url, controller=None):
+        super().__init__(api_key, output_directory, base_url, controller)
+        self.pool = pool
+
+    def generate_sound_effect(self, sound_data):
+        url, body, headers = self.sound_request(sound_data)
+        start = time.monotonic()
+        try:
+            status, data = self.pool.request("POST", url, body, headers)
+        except (http.client.HTTPException, OSError):
+            self.record_request(sound_data, body, time.monotonic() - start, 0)
+            raise
+        if status != 200:
+            self.record_request(sound_data, body, time.monotonic() - start, status)
+            raise http.client.HTTPException(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}")
+        self.record_request(sound_data, body, time.monotonic() - start, status, data)
+        return data
+
+
+class ProjectIndex:
+    """Analyzer results per file, kept in memory; a refresh re-reads only files whose mtime or size changed"""
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        self.analyzer = CodeAnalyzerSimulator(self.project_path)
+        self.controller = AdaptiveController(self.project_path)
+        self.files = {}  # path -> ((mtime_ns, size), results)
+        self.quarantined = {}  # path -> analyzer quarantine entry, for files over the per-file ceilings
+        self.last_suggestions = []
+
+    def refresh(self):
+        """Returns how many files were (re)analyzed"""
+        seen = set()
+        analyzed = 0
+        for suffix in ('.gd', '.tscn'):
+            for file_path in self.analyzer.find_files(self.project_path, suffix):
+                seen.add(file_path)
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    continue
+                signature = (stat.st_mtime_ns, stat.st_size)
+                cached = self.files.get(file_path)
+                if cached and cached[0] == signature:
+                    continue
+                self.analyzer.quarantined = []
+                if suffix == '.gd':
+                    results = self.analyzer.analyze_gd_file(file_path)
+                else:
+                    results = self.analyzer.analyze_scene_file(file_path)
+                self.files[file_path] = (signature, results)
+                if self.analyzer.quarantined:
+                    self.quarantined[file_path] = self.analyzer.quarantined[-1]
+                else:
+                    self.quarantined.pop(file_path, None)
+                analyzed += 1
+        for file_path in set(self.files) - seen:
+            del self.files[file_path]
+            self.quarantined.pop(file_path, None)
+        return analyzed
+
+    def results(self):
+        """Merged results in the same shape as CodeAnalyzerSimulator.analyze_project"""
+        merged = {key: [] for key in RESULT_KEYS}
+        for file_path in sorted(self.files):
+            for key, items in self.files[file_path][1].items():
+                merged[key].extend(items)
+        return merged
+
+
+class LucetaServer:
+    """Tool implementations plus the JSON-RPC dispatch; one instance lives for the whole session"""
+
+    def __init__(self, project_path):
+        self.default_project = Path(project_path).resolve()
+        self.pool = ConnectionPool()
+        self.indexes = {}    # project path -> ProjectIndex
+        self.llm_cache = {}  # prompt sha256 -> fx list
+        self.tools = {
+            "scan": (self.scan, "Analyze the Godot project's scripts and scenes for sound events. "
+                                "Only files changed since the last call are re-read.",
+                     {"details": {"type": "boolean", "description": "include every event, not just counts"}}),
+            "suggest": (self.suggest, "Suggest sound effects for the project: taxonomy matches locally, "
+                                      "the rest through Groq (answers cached per prompt).",
+                        {"use_llm": {"type": "boolean", "description": "ask Groq for unresolved events (default true)"}}),
+            "generate": (self.generate, "Generate sound effects with ElevenLabs into luceta_generated/. "
+                                        "Defaults to the last suggest result; finished sounds are skipped.",
+                         {"fx": {"type": "array", "items": {"type": "object"},
+                                 "description": "[{name, description}] to generate"}}),
+            "audit": (self.audit, "Report failed or missing generated audio and what an update would redo.", {}),
+            "metrics": (self.metrics, "Fitted ElevenLabs latency/cost models, concurrency and learned "
+                                      "sound durations from recorded requests.", {}),
+        }
+
+    def index(self, project=None):
+        path = Path(project).resolve() if project else self.default_project
+        if path not in self.indexes:
+            self.indexes[path] = ProjectIndex(path)
+        return self.indexes[path]
+
+    # -- Tools -----------------------------------------------------------------
+
+    def scan(self, project=None, details=False):
+        index = self.index(project)
+        analyzed = index.refresh()
+        results = index.results()
+        report = {"files": len(index.files), "reanalyzed": analyzed,
+                  "counts": {key: len(results[key]) for key in RESULT_KEYS}}
+        if index.quarantined:
+            report["quarantined"] = [{"file": path.relative_to(index.project_path).as_posix(), "reason": entry["reason"]}
+                                     for path, entry in sorted(index.quarantined.items())]
+        if details:
+            report["events"] = [{"name": e["name"], "hint": e.get("sound_hint", ""),
+                                 "file": Path(e["file"]).relative_to(index.project_path).as_posix()}
+                                for e in results["events"] + results["actions"]]
+        return report
+
+    def suggest(self, project=None, use_llm=True):
+        from sfx_dedup import dedupe_suggestions
+
+        index = self.index(project)
+        index.refresh()
+        suggestions, unresolved = suggest_locally(index.results())
+        report = {"local": len(suggestions), "llm": 0, "llm_cached": False}
+
+        if count_items(unresolved) and use_llm:
+            prompt = build_prompt(unresolved)
+            key = hashlib.sha256(prompt.encode()).hexdigest()
+            fx = self.llm_cache.get(key)
+            report["llm_cached"] = fx is not None
+            if fx is None:
+                fx = self._ask_llm(index.project_path, prompt)
+                self.llm_cache[key] = fx
+            report["llm"] = len(fx)
+            suggestions = suggestions + fx
+
+        index.last_suggestions = dedupe_suggestions(suggestions)
+        report["fx"] = index.last_suggestions
+        return report
+
+    def generate(self, project=None, fx=None):
+        index = self.index(project)
+        if fx is not None and not isinstance(fx, list):
+            raise ValueError("fx must be a list of {name, description} objects")
+        for spec in fx or []:
+            error = fx_spec_error(spec)
+            if error:
+                raise ValueError(error)
+        suggestions = fx if fx is not None else index.last_suggestions
+        if not suggestions:
+            raise ValueError("Nothing to generate: pass fx or call suggest first")
+        api_key = luceta_config.elevenlabs_key(index.project_path)
+        if not api_key:
+            raise ValueError("ELEVEN_LABS_API_KEY is not configured")
+
+        generator = PooledElevenLabsGenerator(self.pool, api_key, index.project_path / "luceta_generated",
+                                              luceta_config.base_url("elevenlabs", index.project_path),
+                                              index.controller)
+        generated, errors = generate_suggestions(generator, suggestions, journal=GenerationJournal(index.project_path),
+                                                 scheduler=GenerationScheduler(index.project_path, index.controller),
+                                                 credit_budget=luceta_config.credit_budget(index.project_path),
+                                                 warm_pool=WarmPool.default(index.project_path))
+        return {"generated": {name: "res://" + Path(path).relative_to(index.project_path).as_posix()
+                              for name, path in generated.items()},
+                "errors": [{"sound": name, "error": error} for name, error in errors]}
+
+    def audit(self, project=None):
+        from dependency_graph import plan
+
+        index = self.index(project)
+        journal = GenerationJournal(index.project_path)
+        problems = []
+        for sound_name, job in sorted(journal.jobs.items()):
+            if job["state"] == STATE_DONE and not journal.is_done(sound_name):
+                problems.append({"sound": sound_name, "problem": "audio missing or changed since generation"})
+            elif job["state"] != STATE_DONE:
+                problems.append({"sound": sound_name, "problem": job["state"], "error": job.get("error", "")})
+        update = plan(index.project_path, taxonomy=load_taxonomy())
+        return {"journal": journal.summary(), "problems": problems,
+                "changed": sorted(update["changed"]), "llm_calls": update["llm_calls"],
+                "generations": update["generations"]}
+
+    def metrics(self, project=None):
+        return self.index(project).controller.metrics()
+
+    def _ask_llm(self, project_path, prompt):
+        api_key = luceta_config.groq_key(project_path)
+        if not api_key:
+            raise ValueError("GROQ_API_KEY is not configured (call suggest with use_llm=false)")
+        url = luceta_config.base_url("groq", project_path).rstrip("/") + CHAT_PATH
+        status, data = self.pool.request("POST", url, chat_request_body(PRIMARY_MODEL, prompt),
+                                         {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+        if status != 200:
+            raise ValueError(f"Groq HTTP {status}: {data[:200].decode('utf-8', 'replace')}")
+        fx, error = parse_llm_response(json.loads(data))
+        if error:
+            raise ValueError(error)
+        return fx
+
+    # -- JSON-RPC --------------------------------------------------------------
+
+    def tool_list(self):
+        tools = []
+        for name, (_handler, description, properties) in self.tools.items():
+            schema = {"type": "object", "properties": dict(properties, project={
+                "type": "string", "description": "Godot project root (default: the server's project)"})}
+            tools.append({"name": name, "description": description, "inputSchema": schema})
+        return tools
+
+    def call_tool(self, name, arguments):
+        """Tool result; any exception inside a tool becomes an isError result so the server keeps serving"""
+        start = time.perf_counter()
+        try:
+            result = self.tools[name][0](**(arguments or {}))
+        except Exception as e:
+            return {"content": [{"type": "text", "text": f"{type(e).__name__}: {e}"}], "isError": True}
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return {"content": [{"type": "text", "text": json.dumps(result, indent=2, default=str)}],
+                "structuredContent": result, "isError": False}
+
+    def handle(self, message):
+        """Response dict for a request, None for notifications"""
+        method = message.get("method")
+        request_id = message.get("id")
+        params = message.get("params") or {}
+        if request_id is None:
+            return None
+
+        if method == "initialize":
+            requested = params.get("protocolVersion")
+            result = {"protocolVersion": requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0],
+                      "capabilities": {"tools": {"listChanged": False}},
+                      "serverInfo": SERVER_INFO}
+        elif method == "ping":
+            result = {}
+        elif method == "tools/list":
+            result = {"tools": self.tool_list()}
+        elif method == "tools/call":
+            if not isinstance(params.get("name"), str) or params.get("name") not in self.tools:
+                return _error(request_id, -32602, f"Unknown tool: {params.get('name')}")
+            result = self.call_tool(params.get("name"), params.get("arguments"))
+        else:
+            return _error(request_id, -32601, f"Method not found: {method}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    def serve(self, stdin, stdout):
+        for line in stdin:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError as e:
+                response = _error(None, -32700, f"Parse error: {e}")
+            else:
+                response = self.handle(message) if isinstance(message, dict) else _error(None, -32600, "Invalid request")
+            if response is not None:
+                stdout.write(json.dumps(response) + "\n")
+                stdout.flush()
+        self.pool.close()
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Luceta MCP server")
+    parser.add_argument("command", nargs="?", default="serve", choices=("serve", "bench"))
+    parser.add_argument("--project", type=Path, default=luceta_config.PROJECT_ROOT)
+    args = parser.parse_args()
+    server = LucetaServer(args.project)
+
+    if args.command == "bench":
+        for name, arguments in (("scan", {}), ("suggest", {"use_llm": False}), ("audit", {})):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                server.call_tool(name, arguments)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"  {name:<8} cold {timings[0]:7.1f} ms, warm {min(timings[1:]):7.1f} ms")
+        return 0
+
+    # stdout carries the protocol; everything the tools print goes to stderr
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+    server.serve(sys.stdin, protocol_out)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
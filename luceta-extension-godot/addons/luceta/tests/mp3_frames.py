@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+MP3 Frame Utilities
+Walks MPEG audio frame headers so generated mp3 files can be cut and joined
+at frame boundaries without decoding
+"""
+
+import sys
+from pathlib import Path
+
+# Bitrates in kbps, indexed by [version is MPEG1][layer][bitrate index]
+_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# A granule (576 samples of one channel) coded in fewer bits is treated as silence
+SILENT_GRANULE_BITS = 64
+
+# Sample rates indexed by the 2-bit version field (1 is reserved)
+_SAMPLE_RATES = {
+    0: [11025, 12000, 8000],   # MPEG 2.5
+    2: [22050, 24000, 16000],  # MPEG 2
+    3: [44100, 48000, 32000],  # MPEG 1
+}
+
+
+def parse_frame_header(data, offset):
+    """
+    Parse the 4-byte frame header at offset.
+    Returns (frame_length, samples, sample_rate) or None if it isn't a valid header.
+    """
+    if offset + 4 > len(data):
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    if data[offset] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = (b2 >> 4) & 0x0F
+    rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    if layer == 3 and not mpeg1:
+        return 72 * bitrate // sample_rate + padding, 576, sample_rate
+    return 144 * bitrate // sample_rate + padding, 1152, sample_rate
+
+
+def skip_id3v2(data):
+    """Offset of the first byte after a leading ID3v2 tag (0 if there is none)"""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def is_info_frame(data, offset, length):
+    """Xing/Info/VBRI header frames describe the whole file and carry no audio"""
+    frame = data[offset:offset + length]
+    return b"Xing" in frame[:64] or b"Info" in frame[:64] or b"VBRI" in frame[:64]
+
+
+def iter_frames(data):
+    """
+    Yield (offset, length, start_time) for every audio frame.
+    Resynchronizes over junk bytes and stops at a trailing ID3v1 tag.
+    """
+    offset = skip_id3v2(data)
+    elapsed = 0.0
+    first = True
+    while offset + 4 <= len(data):
+        if data[offset:offset + 3] == b"TAG" and len(data) - offset == 128:
+            break
+        header = parse_frame_header(data, offset)
+        if header is None or offset + header[0] > len(data):
+            offset += 1
+            continue
+        length, samples, sample_rate = header
+        if not (first and is_info_frame(data, offset, length)):
+            yield offset, length, elapsed
+            elapsed += samples / sample_rate
+        first = False
+        offset += length
+
+
+def duration(data):
+    """Duration in seconds, from frame headers"""
+    last = None
+    for last in iter_frames(data):
+        pass
+    if last is None:
+        return 0.0
+    offset, _length, start = last
+    _, samples, sample_rate = parse_frame_header(data, offset)
+    return start + samples / sample_rate
+
+
+def main_data_bits(data, offset):
+    """
+    Bits a Layer III frame spends on scale factors and Huffman-coded samples
+    (part2_3_length summed over its granules and channels, from the side info).
+    Silence costs next to nothing, so quiet frames show up without decoding.
+    None for Layer I/II frames.
+    """
+    b1, b3 = data[offset + 1], data[offset + 3]
+    if (b1 >> 1) & 0x03 != 1:
+        return None
+    mpeg1 = (b1 >> 3) & 0x03 == 3
+    channels = 1 if b3 >> 6 == 3 else 2
+    position = (offset + 4 + (0 if b1 & 0x01 else 2)) * 8  # Side info follows the header and optional CRC
+    if mpeg1:
+        position += 9 + (5 if channels == 1 else 3) + 4 * channels
+        granules, granule_bits = 2, 59
+    else:
+        position += 8 + (1 if channels == 1 else 2)
+        granules, granule_bits = 1, 63
+    total = 0
+    for _ in range(granules * channels):
+        total += _read_bits(data, position, 12)
+        position += granule_bits
+    return total
+
+
+def _read_bits(data, position, count):
+    value = 0
+    for bit in range(position, position + count):
+        value = (value << 1) | ((data[bit >> 3] >> (7 - (bit & 7))) & 1)
+    return value
+
+
+def audible_duration(data, silent_bits=SILENT_GRANULE_BITS):
+    """
+    End time of the last frame that isn't (near) silent, in seconds.
+    None if the stream isn't Layer III or has no audible frame.
+    """
+    end = None
+    for offset, _length, start in iter_frames(data):
+        bits = main_data_bits(data, offset)
+        if bits is None:
+            return None
+        _, samples, sample_rate = parse_frame_header(data, offset)
+        channels = 1 if data[offset + 3] >> 6 == 3 else 2
+        if bits > silent_bits * channels * (samples // 576):
+            end = start + samples / sample_rate
+    return end
+
+
+def split_at_times(data, cut_times):
+    """
+    Cut an mp3 into len(cut_times) + 1 pieces at the frame boundaries closest
+    to each cut time (seconds). Each piece is a valid mp3 stream on its own, or
+    empty when two cuts share a boundary or a cut lies past the end of the stream.
+    """
+    frames = list(iter_frames(data))
+    # Frame starts plus the end of the last frame: the places a cut can go
+    boundaries = [start for _offset, _length, start in frames]
+    if frames:
+        offset, _length, start = frames[-1]
+        _, samples, sample_rate = parse_frame_header(data, offset)
+        boundaries.append(start + samples / sample_rate)
+
+    pieces = []
+    index = 0
+    for cut in list(cut_times) + [float("inf")]:
+        end = index
+        while end < len(frames) and boundaries[end] < cut:
+            end += 1
+        # The boundary before the cut may be nearer than the one after it
+        if end > index and end < len(boundaries) and cut - boundaries[end - 1] < boundaries[end] - cut:
+            end -= 1
+        pieces.append(b"".join(data[offset:offset + length] for offset, length, _start in frames[index:end]))
+        index = end
+    return pieces
+
+
+def concat(streams):
+    """Join mp3 streams frame by frame, dropping tags and info frames"""
+    joined = bytearray()
+    for data in streams:
+        for offset, length, _start in iter_frames(data):
+            joined += data[offset:offset + length]
+    return bytes(joined)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: mp3_frames.py <file.mp3> [...]")
+        return 1
+
+    for path in sys.argv[1:]:
+        data = Path(path).read_bytes()
+        frames = sum(1 for _ in iter_frames(data))
+        audible = audible_duration(data)
+        audible = "n/a" if audible is None else f"{audible:.3f}s"
+        print(f"{path}: {frames} frames, {duration(data):.3f}s, audible until {audible}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Addon Rule Engine
+Runs the checks from addon_rules.json (the data behind verify_logic.py and
+validate_structure.py) against one or more addon folders. Every file is read
+and indexed once (functions and their bodies, class_name, emitted signals,
+instantiated classes); the rules for a file then run against that index on a
+thread pool. Results are cached per file hash and rule set, so an unchanged
+addon is checked without evaluating anything.
+
+A rule is {"id", "suite", "group", "file", "check", "severity", "message", ...}:
+    exists                          the file exists
+    contains     value | all | any  substrings, optionally "ignore_case"
+    regex        value              re.search on the file
+    function     value              `func <value>(` is defined
+    class_name   value              the script's class_name
+    emits        value              `<value>.emit(` appears
+    instantiates value              `<value>.new()` appears
+    calls        function, value    the body of `function` mentions value
+"{addon}" in values and messages is replaced with the addon folder name.
+
+Usage:
+    rule_engine.py [addon_dir ...] [--suite logic|structure] [--no-cache]
+    rule_engine.py bench [variants] [rules]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+RULES_PATH = Path(__file__).resolve().parent / "addon_rules.json"
+CACHE_PATH = ".godot/luceta_cache/rule_results.json"
+CACHE_VERSION = 1
+MAX_CACHE_ENTRIES = 20000  # Beyond this only the entries of the last run are kept
+DEFAULT_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+FUNC_PATTERN = re.compile(r'^func\s+([A-Za-z_]\w*)\s*\(', re.MULTILINE)
+CLASS_NAME_PATTERN = re.compile(r'^class_name\s+(\w+)', re.MULTILINE)
+EMIT_PATTERN = re.compile(r'(\w+)\.emit\(')
+NEW_PATTERN = re.compile(r'(\w+)\.new\(\)')
+
+
+class FileIndex:
+    """One file, read once, with the lookups rules need"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            data = None
+        self.exists = data is not None
+        self.text = data.decode('utf-8', errors='replace') if data is not None else ""
+        self.sha = hashlib.sha256(data).hexdigest() if data is not None else "missing"
+        self._lower = None
+        self._functions = None
+        self._class_name = None
+        self._emits = None
+        self._instantiates = None
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def functions(self):
+        """name -> body text (up to the next top-level func)"""
+        if self._functions is None:
+            self._functions = {}
+            matches = list(FUNC_PATTERN.finditer(self.text))
+            for i, match in enumerate(matches):
+                end = matches[i + 1].start() if i + 1 < len(matches) else len(self.text)
+                self._functions.setdefault(match.group(1), self.text[match.end():end])
+        return self._functions
+
+    @property
+    def class_name(self):
+        if self._class_name is None:
+            match = CLASS_NAME_PATTERN.search(self.text)
+            self._class_name = match.group(1) if match else ""
+        return self._class_name
+
+    @property
+    def emits(self):
+        if self._emits is None:
+            self._emits = set(EMIT_PATTERN.findall(self.text))
+        return self._emits
+
+    @property
+    def instantiates(self):
+        if self._instantiates is None:
+            self._instantiates = set(NEW_PATTERN.findall(self.text))
+        return self._instantiates
+
+
+def _contains(index, rule, addon):
+    text = index.lower if rule.get("ignore_case") else index.text
+
+    def found(value):
+        value = value.format(addon=addon)
+        return (value.lower() if rule.get("ignore_case") else value) in text
+
+    if "all" in rule:
+        return all(found(value) for value in rule["all"])
+    if "any" in rule:
+        return any(found(value) for value in rule["any"])
+    return found(rule["value"])
+
+
+CHECKS = {
+    "exists": lambda index, rule, addon: index.exists,
+    "contains": _contains,
+    "regex": lambda index, rule, addon: re.search(rule["value"].format(addon=addon), index.text) is not None,
+    "function": lambda index, rule, addon: rule["value"] in index.functions,
+    "class_name": lambda index, rule, addon: index.class_name == rule["value"],
+    "emits": lambda index, rule, addon: rule["value"] in index.emits,
+    "instantiates": lambda index, rule, addon: rule["value"] in index.instantiates,
+    "calls": lambda index, rule, addon: rule["value"] in index.functions.get(rule["function"], ""),
+}
+
+
+def load_rules(path=RULES_PATH, suite=None):
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    rules = [rule for rule in data["rules"] if suite is None or rule["suite"] == suite]
+    for rule in rules:
+        if rule["check"] not in CHECKS:
+            raise ValueError(f"Rule {rule['id']}: unknown check '{rule['check']}'")
+    return rules
+
+
+def find_addons(project_path):
+    """addons/<name>/ folders that have a plugin.cfg"""
+    addons_dir = Path(project_path) / "addons"
+    return sorted(p.parent for p in addons_dir.glob("*/plugin.cfg")) if addons_dir.exists() else []
+
+
+def rules_fingerprint(rules):
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class RuleEngine:
+    """Evaluates rules per (addon, file) unit in parallel, with results cached by file hash"""
+
+    def __init__(self, rules, cache_path=None, workers=DEFAULT_WORKERS):
+        self.rules = rules
+        self.workers = workers
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache = {}
+        self.by_file = {}
+        for rule in rules:
+            self.by_file.setdefault(rule["file"], []).append(rule)
+        self.fingerprints = {file: rules_fingerprint(file_rules) for file, file_rules in self.by_file.items()}
+        if self.cache_path and self.cache_path.exists():
+            try:
+                data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == CACHE_VERSION:
+                self.cache = data.get("results", {})
+        self.used = set()
+        self.evaluated = 0
+
+    def _check_file(self, addon_dir, file):
+        """[(rule, passed)] for one file of one addon"""
+        addon = addon_dir.name
+        index = FileIndex(addon_dir / file)
+        key = f"{addon}:{file}:{index.sha}:{self.fingerprints[file]}"
+        self.used.add(key)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = [bool(CHECKS[rule["check"]](index, rule, addon)) for rule in self.by_file[file]]
+            self.cache[key] = cached
+            self.evaluated += len(cached)
+        return list(zip(self.by_file[file], cached))
+
+    def run(self, addon_dirs):
+        """
+        One result dict per (addon, rule) in rule order:
+        {"addon", "id", "group", "file", "severity", "message", "passed"}
+        """
+        units = [(Path(addon_dir), file) for addon_dir in addon_dirs for file in self.by_file]
+        with ThreadPoolExecutor(self.workers) as pool:
+            outcomes = list(pool.map(lambda unit: self._check_file(*unit), units))
+
+        passed_by_rule = {}
+        for (addon_dir, _file), pairs in zip(units, outcomes):
+            for rule, passed in pairs:
+                passed_by_rule[(addon_dir.name, rule["id"])] = passed
+
+        results = []
+        for addon_dir in addon_dirs:
+            addon_dir = Path(addon_dir)
+            for rule in self.rules:
+                results.append({
+                    "addon": addon_dir.name,
+                    "id": rule["id"],
+                    "group": rule["group"],
+                    "file": rule["file"],
+                    "severity": rule["severity"],
+                    "message": rule["message"].format(addon=addon_dir.name),
+                    "passed": passed_by_rule[(addon_dir.name, rule["id"])],
+                })
+        return results
+
+    def save(self):
+        if self.cache_path is None:
+            return
+        if len(self.cache) > MAX_CACHE_ENTRIES:
+            self.cache = {key: value for key, value in self.cache.items() if key in self.used}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        tmp_path.write_text(json.dumps({"version": CACHE_VERSION, "results": self.cache}), encoding='utf-8')
+        os.replace(tmp_path, self.cache_path)
+
+
+def summarize(results):
+    """(errors, warnings, passed)"""
+    errors = sum(1 for r in results if not r["passed"] and r["severity"] == "error")
+    warnings = sum(1 for r in results if not r["passed"] and r["severity"] != "error")
+    return errors, warnings, sum(1 for r in results if r["passed"])
+
+
+def print_results(results, show_passed=True):
+    current = None
+    for result in results:
+        heading = (result["addon"], result["group"])
+        if heading != current:
+            current = heading
+            print(f"\n[{result['addon']}] {result['group']}:")
+        if result["passed"]:
+            if show_passed:
+                print(f"  PASS: {result['message']}")
+        else:
+            print(f"  {'FAIL' if result['severity'] == 'error' else 'WARN'}: {result['message']}")
+
+
+def _bench(variants, rule_count):
+    """Check `variants` mutated copies of this addon against `rule_count` rules, cold and cached"""
+    addon = Path(__file__).resolve().parent.parent
+    base_rules = load_rules()
+    rules = []
+    for i in range(rule_count):
+        rule = dict(base_rules[i % len(base_rules)])
+        rule["id"] = f"{rule['id']}#{i // len(base_rules)}"
+        if i >= len(base_rules) and rule["check"] == "contains" and "value" in rule:
+            rule["value"] = rule["value"] + ("" if i % 2 else " ")
+        rules.append(rule)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        addon_dirs = []
+        for i in range(variants):
+            variant = Path(tmp) / f"variant_{i:03d}"
+            shutil.copytree(addon, variant, ignore=shutil.ignore_patterns("tests", "*.png", "*.import", "*.md"))
+            # Every variant differs somewhere, so nothing is shared through the cache
+            with open(variant / "dock.gd", "a", encoding='utf-8') as f:
+                f.write(f"\n# variant {i}\n")
+            addon_dirs.append(variant)
+
+        cache_path = Path(tmp) / "cache.json"
+        timings = []
+        for _ in range(2):
+            engine = RuleEngine(rules, cache_path)
+            start = time.perf_counter()
+            results = engine.run(addon_dirs)
+            engine.save()
+            timings.append((time.perf_counter() - start, engine.evaluated))
+
+    print(f"{variants} addon variants x {len(rules)} rules = {len(results)} results")
+    print(f"  cold:   {timings[0][0] * 1000:.0f} ms ({timings[0][1]} rule evaluations)")
+    print(f"  cached: {timings[1][0] * 1000:.0f} ms ({timings[1][1]} rule evaluations)")
+    return 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        variants = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+        rule_count = int(sys.argv[3]) if len(sys.argv) > 3 else 400
+        return _bench(variants, rule_count)
+
+    parser = argparse.ArgumentParser(description="Run addon rules")
+    parser.add_argument("addons", nargs="*", type=Path, help="addon folders (default: every addon with a plugin.cfg)")
+    parser.add_argument("--suite", choices=("logic", "structure"))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--failures-only", action="store_true")
+    args = parser.parse_args()
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    addon_dirs = args.addons or find_addons(base_path)
+    engine = RuleEngine(load_rules(suite=args.suite), None if args.no_cache else base_path / CACHE_PATH)
+    start = time.perf_counter()
+    results = engine.run(addon_dirs)
+    engine.save()
+    print_results(results, show_passed=not args.failures_only)
+
+    errors, warnings, passed = summarize(results)
+    print(f"\nPassed: {passed}  Failed: {errors}  Warnings: {warnings}  "
+          f"({len(addon_dirs)} addons, {(time.perf_counter() - start) * 1000:.0f} ms)")
+    return 0 if errors == 0 else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Scan Cluster
+Coordinator/worker mode for the code analyzer. The coordinator shards the
+project's .gd/.tscn files by path hash and hands shards to workers over TCP
+(one JSON object per line). Workers stream a result per file back; the
+coordinator merges them into the same shape CodeAnalyzerSimulator returns.
+A worker that disconnects or misses heartbeats loses its shard, and the files
+it hadn't reported yet go back to the queue for the others.
+
+Workers read files from their own --root (shared or mirrored checkout), or get
+the file contents inline with --send-content when they have no copy.
+
+Usage:
+    scan_cluster.py coordinator --root DIR [--port 8790] [--spawn 4] [--output results.json]
+    scan_cluster.py worker --host HOST --port 8790 [--root DIR]
+    scan_cluster.py selftest [--root DIR] [--workers 3]
+
+Set LUCETA_CLUSTER_TOKEN (or --token) on both sides when workers run on other hosts.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from test_analyzer import CodeAnalyzerSimulator
+
+DEFAULT_PORT = 8790
+SHARDS_PER_WORKER = 4
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 10.0
+RESULT_KEYS = ("events", "actions", "interactions", "dialogs", "signals")
+
+
+def shard_of(rel_path, shard_count):
+    """Stable shard of a project-relative path"""
+    return int.from_bytes(hashlib.sha1(rel_path.encode('utf-8')).digest()[:8], "big") % shard_count
+
+
+def list_files(root):
+    """
+    Project-relative .gd and .tscn paths, skipping what the analyzer skips, in the
+    order analyze_project visits them (.gd files first, then .tscn)
+    """
+    analyzer = CodeAnalyzerSimulator(root)
+    files = analyzer.find_files(root, '.gd') + analyzer.find_files(root, '.tscn')
+    return [path.relative_to(root).as_posix() for path in files]
+
+
+def analyze_file(path, rel_path):
+    """Per-file analyzer results with project-relative file fields"""
+    analyzer = CodeAnalyzerSimulator(path.parent)
+    if rel_path.endswith(".gd"):
+        results = analyzer.analyze_gd_file(path)
+    else:
+        results = analyzer.analyze_scene_file(path)
+    return {key: [{**item, "file": rel_path} if "file" in item else item for item in items]
+            for key, items in results.items()}
+
+
+def send_message(stream, lock, message):
+    with lock:
+        stream.write(json.dumps(message) + "\n")
+        stream.flush()
+
+
+class Coordinator:
+    """Hands out shards, tracks which files each worker still owes, merges results"""
+
+    def __init__(self, root, host="127.0.0.1", port=DEFAULT_PORT, shard_count=None, token="",
+                 send_content=False):
+        self.root = Path(root).resolve()
+        self.files = list_files(self.root)
+        self.token = token
+        self.send_content = send_content
+        self.shard_count = shard_count or 16
+        self.pending = {}    # shard -> set of files not reported yet
+        for rel_path in self.files:
+            self.pending.setdefault(shard_of(rel_path, self.shard_count), set()).add(rel_path)
+        self.queue = sorted(self.pending)
+        self.results = {}    # file -> per-file results
+        self.assigned = {}   # shard -> worker name
+        self.reassigned = 0
+        self.workers_seen = set()
+        self.condition = threading.Condition()
+
+        self.server = socket.create_server((host, port), reuse_port=False)
+        self.host, self.port = self.server.getsockname()[:2]
+
+    @property
+    def done(self):
+        return len(self.results) == len(self.files)
+
+    def serve(self, timeout=None):
+        """Accept workers until every file has a result. Returns the merged results."""
+        self.server.settimeout(0.5)
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            while not self.done:
+                if deadline and time.monotonic() > deadline:
+                    raise TimeoutError(f"{len(self.files) - len(self.results)} files still unanalyzed")
+                try:
+                    connection, _address = self.server.accept()
+                except socket.timeout:
+                    continue
+                threading.Thread(target=self._handle_worker, args=(connection,), daemon=True).start()
+        finally:
+            self.server.close()
+        return self.merged()
+
+    def _next_shard(self):
+        with self.condition:
+            while True:
+                if self.done:
+                    return None
+                if self.queue:
+                    return self.queue.pop(0)
+                # Everything is assigned; wait in case a worker dies and its shard comes back
+                self.condition.wait(timeout=1.0)
+
+    def _handle_worker(self, connection):
+        connection.settimeout(HEARTBEAT_TIMEOUT)
+        stream = connection.makefile("rw", encoding='utf-8', newline="\n")
+        write_lock = threading.Lock()
+        name = "?"
+        shard = None
+        try:
+            hello = json.loads(stream.readline() or "{}")
+            if hello.get("type") != "hello" or hello.get("token", "") != self.token:
+                send_message(stream, write_lock, {"type": "error", "error": "Bad hello or token"})
+                return
+            if not hello.get("has_root") and not self.send_content:
+                send_message(stream, write_lock, {"type": "error",
+                                                  "error": "Worker has no --root and the coordinator doesn't --send-content"})
+                return
+            name = hello.get("worker", "?")
+            with self.condition:
+                self.workers_seen.add(name)
+
+            while True:
+                shard = self._next_shard()
+                if shard is None:
+                    send_message(stream, write_lock, {"type": "bye"})
+                    return
+                with self.condition:
+                    files = sorted(self.pending.get(shard, ()))
+                    self.assigned[shard] = name
+                message = {"type": "shard", "shard": shard, "files": files}
+                if self.send_content:
+                    message["contents"] = {rel: (self.root / rel).read_text(encoding='utf-8', errors='replace')
+                                           for rel in files}
+                send_message(stream, write_lock, message)
+                self._receive_shard(stream, shard)
+                shard = None
+        except (OSError, ValueError) as e:
+            print(f"[Coordinator] Worker {name} lost: {e}")
+        finally:
+            if shard is not None:
+                self._requeue(shard, name)
+            connection.close()
+
+    def _receive_shard(self, stream, shard):
+        while True:
+            line = stream.readline()
+            if not line:
+                raise ConnectionError("connection closed mid-shard")
+            message = json.loads(line)
+            kind = message.get("type")
+            if kind == "heartbeat":
+                continue
+            if kind == "result":
+                with self.condition:
+                    self.results[message["file"]] = message["results"]
+                    self.pending.get(shard, set()).discard(message["file"])
+                    self.condition.notify_all()
+            elif kind == "shard_done":
+                with self.condition:
+                    self.assigned.pop(shard, None)
+                    if self.pending.get(shard):
+                        # Files the worker couldn't do go round again
+                        self.queue.append(shard)
+                    self.condition.notify_all()
+                return
+            elif kind == "error":
+                raise ValueError(message.get("error", "worker error"))
+
+    def _requeue(self, shard, name):
+        with self.condition:
+            self.assigned.pop(shard, None)
+            if self.pending.get(shard):
+                print(f"[Coordinator] Reassigning shard {shard} ({len(self.pending[shard])} files) from {name}")
+                self.queue.append(shard)
+                self.reassigned += 1
+            self.condition.notify_all()
+
+    def merged(self):
+        """Same layout as CodeAnalyzerSimulator.analyze_project, with absolute file paths, in file order"""
+        merged = {key: [] for key in RESULT_KEYS}
+        for rel_path in self.files:
+            for key, items in self.results.get(rel_path, {}).items():
+                merged.setdefault(key, []).extend(
+                    {**item, "file": str(self.root / rel_path)} if "file" in item else item for item in items)
+        return merged
+
+
+def run_worker(host, port, root=None, token="", name=None, die_after=None):
+    """
+    Connect, analyze shards until the coordinator says bye. die_after is for
+    testing failover: the worker crashes at the first point after that many
+    results where the current shard still has files left.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    root = Path(root).resolve() if root else None
+    connection = socket.create_connection((host, port))
+    stream = connection.makefile("rw", encoding='utf-8', newline="\n")
+    write_lock = threading.Lock()
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                send_message(stream, write_lock, {"type": "heartbeat"})
+            except (OSError, ValueError):
+                return
+
+    send_message(stream, write_lock, {"type": "hello", "worker": name, "token": token, "has_root": root is not None})
+    threading.Thread(target=heartbeat, daemon=True).start()
+    analyzed = 0
+    try:
+        for line in stream:
+            message = json.loads(line)
+            if message.get("type") in ("bye", "error"):
+                if message.get("type") == "error":
+                    print(f"[Worker {name}] {message.get('error')}")
+                    return 1
+                return 0
+            if message.get("type") != "shard":
+                continue
+            if "contents" not in message and root is None:
+                send_message(stream, write_lock, {"type": "error", "error": f"Worker {name} has no --root"})
+                return 1
+
+            with tempfile.TemporaryDirectory() as tmp:
+                for index, rel_path in enumerate(message["files"]):
+                    if "contents" in message:
+                        path = Path(tmp) / rel_path
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        path.write_text(message["contents"][rel_path], encoding='utf-8')
+                    else:
+                        path = root / rel_path
+                    results = analyze_file(path, rel_path) if path.exists() else {}
+                    send_message(stream, write_lock, {"type": "result", "file": rel_path, "results": results})
+                    analyzed += 1
+                    if die_after is not None and analyzed >= die_after and index + 1 < len(message["files"]):
+                        os._exit(3)  # Simulated crash mid-shard: no goodbye, no shard_done
+            send_message(stream, write_lock, {"type": "shard_done", "shard": message["shard"]})
+    finally:
+        stop.set()
+        connection.close()
+    return 0
+
+
+def spawn_workers(count, host, port, root, token, die_after=None, first=0):
+    """Start local worker processes; the first one crashes after die_after files if given"""
+    processes = []
+    for i in range(count):
+        command = [sys.executable, str(Path(__file__).resolve()), "worker", "--host", host, "--port", str(port),
+                   "--name", f"local-{first + i}"]
+        if root:
+            command += ["--root", str(root)]
+        if die_after is not None and i == 0:
+            command += ["--die-after", str(die_after)]
+        env = dict(os.environ, LUCETA_CLUSTER_TOKEN=token)
+        processes.append(subprocess.Popen(command, env=env))
+    return processes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded analyzer coordinator and workers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    token_default = os.environ.get("LUCETA_CLUSTER_TOKEN", "")
+    project_root = Path(__file__).resolve().parent.parent.parent.parent
+
+    coordinator = sub.add_parser("coordinator")
+    coordinator.add_argument("--root", default=str(project_root))
+    coordinator.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to accept workers on other hosts")
+    coordinator.add_argument("--port", type=int, default=DEFAULT_PORT)
+    coordinator.add_argument("--shards", type=int, default=None)
+    coordinator.add_argument("--spawn", type=int, default=0, help="start this many local worker processes")
+    coordinator.add_argument("--send-content", action="store_true", help="ship file contents to workers")
+    coordinator.add_argument("--token", default=token_default)
+    coordinator.add_argument("--output")
+
+    worker = sub.add_parser("worker")
+    worker.add_argument("--host", default="127.0.0.1")
+    worker.add_argument("--port", type=int, default=DEFAULT_PORT)
+    worker.add_argument("--root", help="local checkout of the project (not needed with --send-content)")
+    worker.add_argument("--token", default=token_default)
+    worker.add_argument("--name")
+    worker.add_argument("--die-after", type=int, help=argparse.SUPPRESS)
+
+    selftest = sub.add_parser("selftest", help="local processes, one of which crashes; compares with a single scan")
+    selftest.add_argument("--root", default=str(project_root))
+    selftest.add_argument("--workers", type=int, default=3)
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        return run_worker(args.host, args.port, args.root, args.token, args.name, args.die_after)
+
+    if args.command == "coordinator":
+        shards = args.shards or max(1, args.spawn) * SHARDS_PER_WORKER
+        coord = Coordinator(args.root, args.host, args.port, shards, args.token, args.send_content)
+        print(f"Coordinator on {coord.host}:{coord.port}: {len(coord.files)} files in {shards} shards")
+        processes = spawn_workers(args.spawn, coord.host, coord.port, None if args.send_content else coord.root,
+                                  args.token)
+        start = time.perf_counter()
+        results = coord.serve()
+        for process in processes:
+            process.wait()
+        print(f"Analyzed {len(coord.files)} files with {len(coord.workers_seen)} workers "
+              f"in {time.perf_counter() - start:.2f}s ({coord.reassigned} shards reassigned)")
+        print(", ".join(f"{key}: {len(results[key])}" for key in RESULT_KEYS))
+        if args.output:
+            Path(args.output).write_text(json.dumps(results, indent="\t"), encoding='utf-8')
+        return 0
+
+    # selftest
+    root = Path(args.root).resolve()
+    # One shard per worker, so shards hold several files and the crash lands mid-shard
+    coord = Coordinator(root, "127.0.0.1", 0, args.workers, token="selftest")
+    processes = []
+
+    def launch():
+        # The crashing worker runs alone first, so it is sure to own a shard when it dies
+        crasher = spawn_workers(1, coord.host, coord.port, root, "selftest", die_after=1)[0]
+        crasher.wait()
+        processes.append(crasher)
+        if not coord.done:
+            processes.extend(spawn_workers(max(1, args.workers - 1), coord.host, coord.port, root, "selftest",
+                                           first=1))
+
+    launcher = threading.Thread(target=launch, daemon=True)
+    launcher.start()
+    results = coord.serve(timeout=120)
+    launcher.join()
+    for process in processes:
+        process.wait()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = CodeAnalyzerSimulator(root).analyze_project()
+    matches = all(results[key] == expected.get(key, []) for key in RESULT_KEYS)
+    print(f"{len(coord.files)} files, {coord.reassigned} shards reassigned after a crash, "
+          f"results {'match' if matches else 'DIFFER FROM'} a single-process scan")
+    if coord.reassigned == 0:
+        print("The crashing worker never died mid-shard, so failover wasn't exercised")
+    return 0 if matches and coord.reassigned > 0 else 1
+
+if __name__ == "__main__":
+    exit(main())
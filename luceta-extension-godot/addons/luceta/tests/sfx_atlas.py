@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+SFX Atlas Packer
+Concatenates short generated SFX into a few atlas mp3 files with an
+offset/duration index and a GDScript accessor that plays the slices.
+Packed sources move to a .gdignore'd folder so the editor stops importing them.
+Repacking is incremental: only atlases whose members changed are rebuilt.
+
+Usage:
+    sfx_atlas.py [pack]
+    sfx_atlas.py list
+    sfx_atlas.py unpack
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from generation_journal import GenerationJournal, STATE_DONE, file_sha256
+from mp3_frames import iter_frames, parse_frame_header
+
+INDEX_VERSION = 1
+OUTPUT_DIR = "luceta_generated"
+ATLAS_DIR = "luceta_generated/atlas"
+SOURCES_DIR = "luceta_generated/atlas/.sources"
+INDEX_FILE = "sfx_atlas.json"
+ACCESSOR_FILE = "sfx_atlas.gd"
+
+MAX_MEMBER_SECONDS = 2.5    # Longer sounds stay standalone files
+MAX_ATLAS_SECONDS = 60.0    # Keeps each atlas quick to load
+GAP_FRAMES = 2              # Silent frames between slices absorb timer overshoot on stop
+LOOPING_KEYWORDS = ("background", "ambient", "ambience", "music", "loop")
+
+
+def format_key(data):
+    """MPEG version/layer, sample rate and channel mode of the first frame; atlases never mix these"""
+    for offset, _length, _start in iter_frames(data):
+        return f"{data[offset + 1] & 0xFE:02x}{data[offset + 2] & 0x0C:02x}{data[offset + 3] & 0xC0:02x}"
+    return ""
+
+
+def silent_frame(data):
+    """A zero-payload frame with the first frame's format (decodes to silence)"""
+    for offset, _length, _start in iter_frames(data):
+        header = bytearray(data[offset:offset + 4])
+        header[1] |= 0x01   # No CRC
+        header[2] &= 0xFD   # No padding
+        length = parse_frame_header(header + bytes(4), 0)[0]
+        return bytes(header) + bytes(length - 4)
+    return b""
+
+
+def frame_seconds(data):
+    """Audio frames of an mp3 as (bytes, duration)"""
+    frames = []
+    for offset, length, _start in iter_frames(data):
+        _, samples, sample_rate = parse_frame_header(data, offset)
+        frames.append((data[offset:offset + length], samples / sample_rate))
+    return frames
+
+
+def is_packable(sound_name, seconds):
+    """Short one-shots only - looping sounds need their own stream"""
+    name = sound_name.lower()
+    return 0.0 < seconds <= MAX_MEMBER_SECONDS and not any(keyword in name for keyword in LOOPING_KEYWORDS)
+
+
+def build_atlas(member_data):
+    """
+    Join members (list of (name, bytes)) with silent gaps.
+    Returns (atlas bytes, {name: (offset, duration)}) with frame-exact times.
+    """
+    atlas = bytearray()
+    slices = {}
+    elapsed = 0.0
+    for name, data in member_data:
+        frames = frame_seconds(data)
+        start = elapsed
+        for frame, seconds in frames:
+            atlas += frame
+            elapsed += seconds
+        slices[name] = (round(start, 6), round(elapsed - start, 6))
+
+        gap = silent_frame(data)
+        if gap:
+            gap_seconds = frame_seconds(gap)[0][1]
+            for _ in range(GAP_FRAMES):
+                atlas += gap
+                elapsed += gap_seconds
+    return bytes(atlas), slices
+
+
+def _write_atomic(path, data):
+    tmp_path = path.with_name(path.name + ".part")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class SfxAtlasPacker:
+    """Packs luceta_generated/*.mp3 one-shots into luceta_generated/atlas/"""
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        self.output_dir = self.project_path / OUTPUT_DIR
+        self.atlas_dir = self.project_path / ATLAS_DIR
+        self.sources_dir = self.project_path / SOURCES_DIR
+        self.index_path = self.atlas_dir / INDEX_FILE
+        self.index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_path.exists():
+            return {"version": INDEX_VERSION, "atlases": {}, "slices": {}}
+        try:
+            index = json.loads(self.index_path.read_text(encoding='utf-8'))
+        except json.JSONDecodeError:
+            index = {}
+        if index.get("version") != INDEX_VERSION:
+            # Unknown layout: forget it, every atlas gets rebuilt
+            return {"version": INDEX_VERSION, "atlases": {}, "slices": {}}
+        return index
+
+    def res_path(self, path):
+        return "res://" + Path(path).relative_to(self.project_path).as_posix()
+
+    def collect(self):
+        """
+        Move new short one-shots from luceta_generated/ into the sources folder.
+        A sound regenerated since the last pack replaces its packed source.
+        Returns the names that were moved.
+        """
+        self.sources_dir.mkdir(parents=True, exist_ok=True)
+        (self.sources_dir / ".gdignore").touch()
+
+        journal = GenerationJournal(self.project_path)
+        moved = []
+        for path in sorted(self.output_dir.glob("*.mp3")):
+            frames = frame_seconds(path.read_bytes())
+            if not is_packable(path.stem, sum(seconds for _frame, seconds in frames)):
+                continue
+            target = self.sources_dir / path.name
+            os.replace(path, target)
+            import_file = path.with_name(path.name + ".import")
+            if import_file.exists():
+                import_file.unlink()
+
+            # Keep resume from regenerating sounds that were only moved
+            if journal.get_state(path.stem) == STATE_DONE and journal.get_path(path.stem) == path:
+                journal.mark_done(path.stem, target)
+            moved.append(path.stem)
+        return moved
+
+    def _assign(self, members):
+        """
+        Map member name -> atlas id. Members stay in their previous atlas so
+        one new sound only touches the atlas it lands in.
+        """
+        assignment = {}
+        load = {}
+        formats = {}
+        for atlas_id, atlas in self.index.get("atlases", {}).items():
+            formats[atlas_id] = atlas.get("format", "")
+            load.setdefault(atlas_id, 0.0)
+            for name in atlas.get("members", {}):
+                if name in members:
+                    assignment[name] = atlas_id
+                    load[atlas_id] += members[name]["seconds"]
+
+        for name in sorted(members):
+            if name in assignment:
+                continue
+            member = members[name]
+            atlas_id = next((atlas_id for atlas_id in sorted(load)
+                             if formats[atlas_id] == member["format"]
+                             and load[atlas_id] + member["seconds"] <= MAX_ATLAS_SECONDS), None)
+            if atlas_id is None:
+                number = 0
+                while f"sfx_atlas_{number}" in load:
+                    number += 1
+                atlas_id = f"sfx_atlas_{number}"
+                formats[atlas_id] = member["format"]
+                load[atlas_id] = 0.0
+            assignment[name] = atlas_id
+            load[atlas_id] += member["seconds"]
+        return assignment
+
+    def pack(self):
+        """
+        Collect new sounds and rebuild changed atlases.
+        Returns {"moved", "rebuilt", "unchanged", "removed"} lists.
+        """
+        moved = self.collect()
+
+        members = {}
+        for path in sorted(self.sources_dir.glob("*.mp3")):
+            data = path.read_bytes()
+            members[path.stem] = {
+                "path": path,
+                "sha256": file_sha256(path),
+                "seconds": sum(seconds for _frame, seconds in frame_seconds(data)),
+                "format": format_key(data),
+            }
+
+        assignment = self._assign(members)
+        old_atlases = self.index.get("atlases", {})
+        old_slices = self.index.get("slices", {})
+        atlases = {}
+        slices = {}
+        report = {"moved": moved, "rebuilt": [], "unchanged": [], "removed": []}
+
+        for atlas_id in sorted(set(assignment.values())):
+            names = sorted(name for name, owner in assignment.items() if owner == atlas_id)
+            hashes = {name: members[name]["sha256"] for name in names}
+            atlas_path = self.atlas_dir / f"{atlas_id}.mp3"
+            old = old_atlases.get(atlas_id, {})
+
+            if old.get("members") == hashes and atlas_path.exists():
+                atlases[atlas_id] = old
+                for name in names:
+                    key = self.res_path(self.output_dir / f"{name}.mp3")
+                    slices[key] = old_slices[key]
+                report["unchanged"].append(atlas_id)
+                continue
+
+            data, atlas_slices = build_atlas([(name, members[name]["path"].read_bytes()) for name in names])
+            _write_atomic(atlas_path, data)
+            atlases[atlas_id] = {
+                "path": self.res_path(atlas_path),
+                "format": members[names[0]]["format"],
+                "members": hashes,
+            }
+            for name, (offset, length) in atlas_slices.items():
+                slices[self.res_path(self.output_dir / f"{name}.mp3")] = [atlas_id, offset, length]
+            report["rebuilt"].append(atlas_id)
+
+        for atlas_id in old_atlases:
+            if atlas_id not in atlases:
+                self._remove_atlas(atlas_id)
+                report["removed"].append(atlas_id)
+
+        self.index = {"version": INDEX_VERSION, "atlases": atlases, "slices": slices}
+        if report["rebuilt"] or report["removed"] or not self.index_path.exists():
+            self.atlas_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.index_path, json.dumps(self.index, indent="\t", sort_keys=True).encode())
+            _write_atomic(self.atlas_dir / ACCESSOR_FILE, generate_accessor(self.index).encode())
+        return report
+
+    def unpack(self):
+        """Move every packed source back to luceta_generated/ and delete the atlases"""
+        journal = GenerationJournal(self.project_path)
+        restored = []
+        for path in sorted(self.sources_dir.glob("*.mp3")):
+            target = self.output_dir / path.name
+            os.replace(path, target)
+            if journal.get_state(path.stem) == STATE_DONE and journal.get_path(path.stem) == path:
+                journal.mark_done(path.stem, target)
+            restored.append(path.stem)
+        if self.atlas_dir.exists():
+            shutil.rmtree(self.atlas_dir)
+        self.index = {"version": INDEX_VERSION, "atlases": {}, "slices": {}}
+        return restored
+
+    def _remove_atlas(self, atlas_id):
+        for name in (f"{atlas_id}.mp3", f"{atlas_id}.mp3.import"):
+            path = self.atlas_dir / name
+            if path.exists():
+                path.unlink()
+
+
+def generate_accessor(index):
+    """GDScript that plays an atlas slice for the res:// path a sound had before packing"""
+    atlases = "".join(f'\t"{atlas_id}": "{atlas["path"]}",\n' for atlas_id, atlas in sorted(index["atlases"].items()))
+    slices = "".join(f'\t"{sound_path}": {json.dumps(entry)},\n' for sound_path, entry in sorted(index["slices"].items()))
+    return f'''extends RefCounted
+
+# Generated by sfx_atlas.py - re-run the packer instead of editing
+# Short SFX packed into atlas files; each slice is [atlas, offset, duration] in seconds
+
+const ATLASES = {{
+{atlases}}}
+
+const SLICES = {{
+{slices}}}
+
+static var _streams = {{}}
+
+static func has_slice(sound_path: String) -> bool:
+	return SLICES.has(sound_path)
+
+static func play(owner: Node, sound_path: String, bus: String = "Master") -> AudioStreamPlayer:
+	var slice = SLICES.get(sound_path)
+	if slice == null:
+		return null
+	var stream = _streams.get(slice[0])
+	if stream == null:
+		stream = load(ATLASES[slice[0]])
+		_streams[slice[0]] = stream
+	var player = AudioStreamPlayer.new()
+	player.stream = stream
+	player.bus = bus
+	owner.add_child(player)
+	player.play(slice[1])
+	owner.get_tree().create_timer(slice[2]).timeout.connect(player.queue_free)
+	return player
+'''
+
+
+def main():
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    command = sys.argv[1] if len(sys.argv) > 1 else "pack"
+    packer = SfxAtlasPacker(base_path)
+
+    if command == "pack":
+        report = packer.pack()
+        print(f"Moved {len(report['moved'])} new sounds into atlases")
+        print(f"Rebuilt: {', '.join(report['rebuilt']) or 'none'}")
+        print(f"Unchanged: {', '.join(report['unchanged']) or 'none'}")
+        if report["removed"]:
+            print(f"Removed: {', '.join(report['removed'])}")
+        print(f"{len(packer.index['slices'])} slices in {len(packer.index['atlases'])} atlases")
+        return 0
+
+    if command == "list":
+        for atlas_id, atlas in sorted(packer.index["atlases"].items()):
+            print(f"{atlas['path']}: {len(atlas['members'])} sounds")
+        for sound_path, (atlas_id, offset, length) in sorted(packer.index["slices"].items()):
+            print(f"  {sound_path} -> {atlas_id} @ {offset:.3f}s ({length:.3f}s)")
+        return 0
+
+    if command == "unpack":
+        restored = packer.unpack()
+        print(f"Restored {len(restored)} sounds to {OUTPUT_DIR}/")
+        return 0
+
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+SFX Autoload Generator
+Renders the pooled LucetaSfx autoload (luceta_sfx.gd.template) for every
+one-shot in luceta_generated/, including sounds packed into SFX atlases and
+the variants sfx_variations.py rendered, and registers it in project.godot.
+Produces the same files as SfxAutoload.update() in the editor; limits tuned
+by hand in luceta_sfx.json are kept.
+
+Usage:
+    sfx_autoload.py [generate]
+    sfx_autoload.py list
+"""
+
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+from sfx_atlas import ATLAS_DIR, INDEX_FILE, LOOPING_KEYWORDS, OUTPUT_DIR
+from sound_taxonomy import get_taxonomy
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "luceta_sfx.gd.template"
+SCRIPT_FILE = "luceta_generated/luceta_sfx.gd"
+REGISTRY_FILE = "luceta_generated/luceta_sfx.json"
+AUTOLOAD_NAME = "LucetaSfx"
+POOL_SIZE = 16
+
+# Keep in sync with sfx_autoload.gd
+DEFAULT_LIMITS = {"polyphony": 3, "min_interval": 0.05}
+HINT_LIMITS = {
+    "footstep": {"polyphony": 2, "min_interval": 0.12},
+    "collect": {"polyphony": 4, "min_interval": 0.03},
+}
+
+
+def limits_for(sound_name):
+    return dict(HINT_LIMITS.get(get_taxonomy().classify(sound_name)["hint"], DEFAULT_LIMITS))
+
+
+def _gd_float(value):
+    """GDScript's str(float): always has a decimal point"""
+    text = repr(float(value))
+    return text if "." in text or "e" in text else text + ".0"
+
+
+def render(registry, pool_size=POOL_SIZE):
+    lines = ["{"]
+    for name in sorted(registry):
+        entry = registry[name]
+        lines.append(f'\t"{name}": {{"path": "{entry.get("path", "")}", '
+                     f'"polyphony": {int(entry.get("polyphony", DEFAULT_LIMITS["polyphony"]))}, '
+                     f'"min_interval": {_gd_float(entry.get("min_interval", DEFAULT_LIMITS["min_interval"]))}, '
+                     f'"variants": [{", ".join(json.dumps(path) for path in entry.get("variants", []))}]}},')
+    lines.append("}")
+    template = TEMPLATE_PATH.read_text(encoding='utf-8')
+    return template.replace("{{POOL_SIZE}}", str(pool_size)).replace("{{SOUNDS}}", "\n".join(lines))
+
+
+class SfxAutoloadGenerator:
+    """Keeps luceta_generated/luceta_sfx.{json,gd} and the [autoload] entry up to date"""
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        self.registry_path = self.project_path / REGISTRY_FILE
+        self.script_path = self.project_path / SCRIPT_FILE
+
+    def load_registry(self):
+        if not self.registry_path.exists():
+            return {}
+        try:
+            registry = json.loads(self.registry_path.read_text(encoding='utf-8'))
+        except json.JSONDecodeError:
+            return {}
+        return registry if isinstance(registry, dict) else {}
+
+    def one_shots(self):
+        """{name: res path} of generated one-shots, standalone or packed into an atlas"""
+        paths = [f"res://{OUTPUT_DIR}/{p.name}" for pattern in ("*.mp3", "*.wav")
+                 for p in (self.project_path / OUTPUT_DIR).glob(pattern)]
+        index_path = self.project_path / ATLAS_DIR / INDEX_FILE
+        if index_path.exists():
+            try:
+                paths.extend(json.loads(index_path.read_text(encoding='utf-8')).get("slices", {}))
+            except json.JSONDecodeError:
+                pass
+        sounds = {}
+        for path in paths:
+            name = path.rsplit("/", 1)[-1].rsplit(".", 1)[0]
+            if not any(keyword in name.lower() for keyword in LOOPING_KEYWORDS):
+                sounds[name] = path
+        return sounds
+
+    def generate(self):
+        """Merge current one-shots into the registry, render the script, register the autoload"""
+        registry = self.load_registry()
+        for name, path in self.one_shots().items():
+            entry = registry.get(name) or limits_for(name)
+            entry["path"] = path
+            registry[name] = entry
+
+        self.script_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_text(self.registry_path, json.dumps(registry, indent="\t", sort_keys=True))
+        _write_text(self.script_path, render(registry))
+        registered = self.register()
+        return registry, registered
+
+    def register(self):
+        """Add LucetaSfx to project.godot's [autoload] section; False if it was already there"""
+        project_file = self.project_path / "project.godot"
+        content = project_file.read_text(encoding='utf-8')
+        line = f'{AUTOLOAD_NAME}="*res://{SCRIPT_FILE}"'
+        if re.search(rf"^{AUTOLOAD_NAME}=", content, re.MULTILINE):
+            return False
+        match = re.search(r"^\[autoload\]\n(?:\n)?", content, re.MULTILINE)
+        if match:
+            content = content[:match.end()] + line + "\n" + content[match.end():]
+        else:
+            content = content.rstrip("\n") + f"\n\n[autoload]\n\n{line}\n"
+        _write_text(project_file, content)
+        return True
+
+
+def _write_text(path, text):
+    tmp_path = path.with_name(path.name + ".part")
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def main():
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    command = sys.argv[1] if len(sys.argv) > 1 else "generate"
+    generator = SfxAutoloadGenerator(base_path)
+
+    if command == "generate":
+        registry, registered = generator.generate()
+        print(f"Wrote {SCRIPT_FILE} with {len(registry)} sounds")
+        print(f"Autoload {AUTOLOAD_NAME}: {'registered in project.godot' if registered else 'already registered'}")
+        return 0
+
+    if command == "list":
+        for name, entry in sorted(generator.load_registry().items()):
+            print(f"  {name:<30} polyphony {entry.get('polyphony')}, every {entry.get('min_interval')}s "
+                  f"<- {entry.get('path')}")
+        return 0
+
+    print(__doc__)
+    return 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Suggestion Deduplication
+Collapses near-duplicate LLM "fx" suggestions into one generation per cluster
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Tuned with test_sfx_dedup.py: names like walk_step / player_footstep share few
+# n-grams, so descriptions carry most of the weight
+DEFAULT_THRESHOLD = 0.45
+NAME_WEIGHT = 0.25
+NGRAM_SIZE = 3
+
+
+def normalize_text(text):
+    """Lowercase and turn identifier separators into spaces"""
+    text = str(text).lower().replace("_", " ").replace("-", " ")
+    return re.sub(r'[^a-z0-9 ]+', ' ', re.sub(r'\s+', ' ', text)).strip()
+
+
+def char_ngrams(text, n=NGRAM_SIZE):
+    """Character n-grams of each word, padded so short words still count"""
+    grams = []
+    for word in normalize_text(text).split():
+        padded = f" {word} "
+        if len(padded) <= n:
+            grams.append(padded)
+            continue
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+def tfidf_vectors(texts, n=NGRAM_SIZE):
+    """Build L2-normalized TF-IDF vectors over character n-grams"""
+    vocab = {}
+    rows = []
+    for text in texts:
+        counts = {}
+        for gram in char_ngrams(text, n):
+            idx = vocab.setdefault(gram, len(vocab))
+            counts[idx] = counts.get(idx, 0) + 1
+        rows.append(counts)
+
+    matrix = np.zeros((len(texts), max(len(vocab), 1)), dtype=np.float64)
+    for row, counts in enumerate(rows):
+        if counts:
+            matrix[row, list(counts.keys())] = list(counts.values())
+
+    doc_freq = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1.0 + len(texts)) / (1.0 + doc_freq)) + 1.0
+    matrix *= idf
+
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def similarity_matrix(suggestions, name_weight=NAME_WEIGHT):
+    """Weighted cosine similarity of names and descriptions"""
+    names = [fx.get("name", "") for fx in suggestions]
+    descriptions = [fx.get("description", "") for fx in suggestions]
+
+    name_vecs = tfidf_vectors(names)
+    desc_vecs = tfidf_vectors(descriptions)
+
+    return name_weight * (name_vecs @ name_vecs.T) + (1.0 - name_weight) * (desc_vecs @ desc_vecs.T)
+
+
+def cluster_suggestions(suggestions, threshold=DEFAULT_THRESHOLD, name_weight=NAME_WEIGHT):
+    """
+    Group suggestions whose similarity to any member of a cluster reaches the
+    threshold. Clusters are opened in LLM output order, so the first suggestion
+    of each cluster is the one that gets generated. Two local suggestions
+    (suggest_locally) with different names are never grouped.
+    Returns a list of index lists.
+    """
+    if not suggestions:
+        return []
+
+    sim = similarity_matrix(suggestions, name_weight)
+    # Local suggestions reuse the same steering prompt for every script with
+    # that hint, so their similarity says nothing; suggest_locally already
+    # merged the events of one script, and different ones never share a cluster
+    local = np.array([fx.get("source") == "local" for fx in suggestions])
+    names = np.array([fx.get("name", "") for fx in suggestions], dtype=object)
+    apart = np.outer(local, local) & (names[:, None] != names[None, :])
+    clusters = []
+
+    for i in range(len(suggestions)):
+        if clusters:
+            scores = [-1.0 if apart[i, members].any() else sim[i, members].max() for members in clusters]
+            best = int(np.argmax(scores))
+            if scores[best] >= threshold:
+                clusters[best].append(i)
+                continue
+        clusters.append([i])
+
+    return clusters
+
+
+def dedupe_suggestions(suggestions, threshold=DEFAULT_THRESHOLD, name_weight=NAME_WEIGHT):
+    """
+    Collapse each cluster into its leader suggestion.
+    The leader gets an "aliases" list with the names of the collapsed entries,
+    so the generated file can be shared with all of them.
+    """
+    deduped = []
+    for cluster in cluster_suggestions(suggestions, threshold, name_weight):
+        leader = dict(suggestions[cluster[0]])
+        aliases = [suggestions[i].get("name", "") for i in cluster[1:]]
+        aliases = [a for a in aliases if a and a != leader.get("name")]
+        if aliases:
+            leader["aliases"] = aliases
+        deduped.append(leader)
+    return deduped
+
+
+def expand_aliases(generated, suggestions):
+    """
+    Map every alias to its leader's generated file.
+    generated: {sound_name: file_path} for the leaders that were generated
+    """
+    expanded = dict(generated)
+    for fx in suggestions:
+        path = generated.get(fx.get("name", ""))
+        if not path:
+            continue
+        for alias in fx.get("aliases", []):
+            expanded[alias] = path
+    return expanded
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: sfx_dedup.py <suggestions.json> [threshold]")
+        return 1
+
+    data = json.loads(Path(sys.argv[1]).read_text(encoding='utf-8'))
+    suggestions = data.get('fx', data) if isinstance(data, dict) else data
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THRESHOLD
+
+    deduped = dedupe_suggestions(suggestions, threshold)
+
+    print("=" * 60)
+    print(f"Suggestions: {len(suggestions)}  ->  Generations: {len(deduped)}")
+    print("=" * 60)
+    for fx in deduped:
+        print(f"  {fx.get('name', 'unnamed')}")
+        for alias in fx.get('aliases', []):
+            print(f"    = {alias}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+ElevenLabs Generation Runner
+Python port of ElevenLabsGenerator.gd for generating suggestions outside the editor
+"""
+
+import http.client
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import luceta_config
+from adaptive_controller import MAX_CONCURRENCY, SOUND_ENDPOINT, AdaptiveController
+from generation_journal import MAX_ATTEMPTS, GenerationJournal
+from generation_scheduler import GenerationScheduler
+from import_metadata import prepare as prepare_imports
+from warm_pool import WarmPool
+from sfx_dedup import DEFAULT_THRESHOLD, dedupe_suggestions, expand_aliases
+from sound_taxonomy import get_taxonomy
+
+RETRY_DELAY = 2.0  # Without an AdaptiveController
+SOUND_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_\-]{1,96}$')  # The name is also the file name
+
+
+def fx_spec_error(spec):
+    """Why an fx spec from outside (MCP client, batch API, LLM) can't be generated, or "" if it can"""
+    if not isinstance(spec, dict):
+        return f"fx entries must be objects, got {type(spec).__name__}"
+    name = spec.get("name")
+    if not isinstance(name, str) or not SOUND_NAME_PATTERN.match(name):
+        return f"invalid sound name {name!r}: use letters, digits, '_' and '-' (at most 96)"
+    description = spec.get("description")
+    if not isinstance(description, str) or not description.strip():
+        return f"{name}: missing description"
+    return ""
+
+
+def load_elevenlabs_key(project_path):
+    """ElevenLabs API key from the shared config (environment, .env, project settings)"""
+    return luceta_config.elevenlabs_key(project_path)
+
+
+class ElevenLabsGenerator:
+    """Python mirror of the GDScript ElevenLabsGenerator"""
+
+    def __init__(self, api_key, output_directory, base_url="https://api.elevenlabs.io/v1", controller=None):
+        self.api_key = api_key
+        self.output_directory = Path(output_directory)
+        self.base_url = base_url
+        self.controller = controller
+
+    def estimate_duration(self, description, sound_name=""):
+        """Duration from the shared sound taxonomy (0.5 - 22 seconds), shortened by the AdaptiveController"""
+        if self.controller is not None:
+            return self.controller.choose_duration(description, sound_name)
+        return get_taxonomy().classify(description)["duration"]
+
+    def sound_request(self, sound_data):
+        """(url, body, headers) of a sound-generation request"""
+        request_data = {
+            "text": sound_data.get("description", ""),
+            "duration_seconds": self.estimate_duration(sound_data.get("description", ""), sound_data.get("name", "")),
+            "prompt_influence": 0.3
+        }
+        headers = {
+            "xi-api-key": self.api_key,
+            "Content-Type": "application/json"
+        }
+        return f"{self.base_url}/sound-generation", json.dumps(request_data).encode(), headers
+
+    def generate_sound_effect(self, sound_data):
+        """Call the sound-generation endpoint and return the audio bytes"""
+        url, body, headers = self.sound_request(sound_data)
+        start = time.monotonic()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, body, headers), timeout=60) as response:
+                data = response.read()
+                credits = response.headers.get("character-cost")
+        except urllib.error.HTTPError as e:
+            self.record_request(sound_data, body, time.monotonic() - start, e.code)
+            raise
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
+            self.record_request(sound_data, body, time.monotonic() - start, 0)
+            raise
+        self.record_request(sound_data, body, time.monotonic() - start, 200, data, credits)
+        return data
+
+    def record_request(self, sound_data, request_body, seconds, status, data=b"", credits=None):
+        """Feed a finished request (and the audible length of its audio) to the AdaptiveController"""
+        if self.controller is None:
+            return
+        duration = json.loads(request_body)["duration_seconds"]
+        self.controller.record(SOUND_ENDPOINT, duration, seconds, status, len(data),
+                               None if credits is None else float(credits))
+        if data:
+            self.controller.record_audible(f"{sound_data.get('name', '')} {sound_data.get('description', '')}",
+                                           duration, data)
+
+    def get_output_path(self, sound_name, audio_type="sfx"):
+        """Where handle_response saves a sound of the given audio_type"""
+        subdir = {"dialog": "dialog", "music": "music", "bgm": "music"}.get(audio_type, "")
+        out_dir = self.output_directory / subdir if subdir else self.output_directory
+        return out_dir / f"{sound_name}.mp3"
+
+    def handle_response(self, sound_name, body, audio_type="sfx"):
+        """Save audio bytes the same way the editor does, returns the file path"""
+        file_path = self.get_output_path(sound_name, audio_type)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write next to the target and rename, so a crash never leaves a partial mp3
+        tmp_path = file_path.with_name(file_path.name + ".part")
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        return file_path
+
+
+def generate_suggestions(generator, suggestions, threshold=DEFAULT_THRESHOLD, journal=None,
+                         scheduler=None, credit_budget=None, warm_pool=None):
+    """
+    Generate every suggestion, paying for one generation per near-duplicate cluster.
+    With a journal, sounds that are already done (still matching their hash and
+    description) are skipped and the journal decides how often a failed sound is retried.
+    With a GenerationScheduler, critical sounds go first and the credit budget
+    defers low-priority ones. A generator with an AdaptiveController picks
+    durations, concurrency and retry backoff from the recorded request stats.
+    With a WarmPool, matching pre-generated sounds are copied instead of
+    generated, and what is generated is remembered for future pool fills.
+    Every new file gets its .import metadata (import_metadata.py).
+    Returns ({sound_name: file_path}, [(sound_name, error)])
+    """
+    deduped = dedupe_suggestions(suggestions, threshold)
+    generated = {}
+    errors = []
+
+    pending = []
+    for fx in deduped:
+        sound_name = fx.get("name", "unnamed")
+        if journal is not None and journal.is_done(sound_name, fx.get("description", "")):
+            print(f"  Skipping already generated: {sound_name}")
+            generated[sound_name] = journal.get_path(sound_name)
+        elif warm_pool is not None and warm_pool.take(fx, generator.get_output_path(sound_name)):
+            print(f"  Warm pool hit: {sound_name}")
+            generated[sound_name] = generator.get_output_path(sound_name)
+            if journal is not None:
+                journal.enqueue(fx)
+                journal.mark_done(sound_name, generated[sound_name])
+        else:
+            pending.append(fx)
+
+    if scheduler is not None:
+        schedule = scheduler.plan(pending, credit_budget)
+        pending = schedule["queue"]
+        for fx in schedule["deferred"]:
+            print(f"  Deferred by credit budget: {fx.get('name', 'unnamed')}")
+
+    for fx in pending:
+        if journal is not None:
+            journal.enqueue(fx)
+    for fx, file_path in _generate_pending(generator, pending, journal, errors):
+        generated[fx.get("name", "unnamed")] = file_path
+        if warm_pool is not None:
+            warm_pool.record_accepted(fx, str(generator.output_directory.resolve().parent))
+    if generator.controller is not None:
+        generator.controller.save()
+    if warm_pool is not None:
+        warm_pool.save()
+
+    # Aliases share the leader's audio - copy it under each alias name
+    for alias, path in expand_aliases(generated, deduped).items():
+        if alias not in generated:
+            alias_path = path.with_name(f"{alias}.mp3")
+            shutil.copyfile(path, alias_path)
+            generated[alias] = alias_path
+            if journal is not None:
+                journal.mark_done(alias, alias_path)
+
+    # .import files up front, so the editor imports the batch once with final uids
+    prepare_imports(generator.output_directory.resolve().parent, generated.values())
+    return generated, errors
+
+
+def _generate_pending(generator, pending, journal, errors):
+    """
+    Generate the queue in order with up to the controller's concurrency in flight
+    (one without a controller). Failed sounds are retried while the journal
+    allows it. Yields (fx, file_path) for every saved sound.
+    """
+    controller = generator.controller
+    queue = deque((fx, 0.0) for fx in pending)
+    in_flight = {}
+    started = 0
+    with ThreadPoolExecutor(MAX_CONCURRENCY if controller is not None else 1) as pool:
+        while queue or in_flight:
+            limit = controller.concurrency(SOUND_ENDPOINT) if controller is not None else 1
+            while queue and len(in_flight) < limit:
+                fx, delay = queue.popleft()
+                sound_name = fx.get("name", "unnamed")
+                if journal is not None:
+                    journal.mark_in_flight(sound_name, generator.get_output_path(sound_name))
+                if delay == 0.0:
+                    started += 1
+                    print(f"  [{started}/{len(pending)}] Generating: {sound_name}")
+                in_flight[pool.submit(_fetch, generator, fx, delay)] = fx
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                fx = in_flight.pop(future)
+                sound_name = fx.get("name", "unnamed")
+                try:
+                    file_path = generator.handle_response(sound_name, future.result())
+                except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                    if journal is not None:
+                        journal.mark_failed(sound_name, e)
+                        if journal.should_retry(sound_name):
+                            attempts = journal.get_attempts(sound_name)
+                            print(f"    Retrying {sound_name} ({attempts}/{MAX_ATTEMPTS})")
+                            queue.appendleft((fx, _retry_delay(controller, attempts, e)))
+                            continue
+                    errors.append((sound_name, str(e)))
+                    continue
+
+                if journal is not None:
+                    journal.mark_done(sound_name, file_path)
+                yield fx, file_path
+
+
+def _fetch(generator, fx, delay):
+    """Worker: wait out a retry backoff, then request the audio"""
+    if delay:
+        time.sleep(delay)
+    return generator.generate_sound_effect(fx)
+
+
+def _retry_delay(controller, attempts, error):
+    if controller is None:
+        return RETRY_DELAY
+    headers = getattr(error, "headers", None)
+    return controller.backoff(SOUND_ENDPOINT, attempts, headers.get("Retry-After") if headers else None)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: sfx_generator.py <suggestions.json> [threshold] [credit budget]")
+        return 1
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    api_key = load_elevenlabs_key(base_path)
+    if not api_key:
+        print("ERROR: Could not find ELEVEN_LABS_API_KEY in .env")
+        return 1
+
+    data = json.loads(Path(sys.argv[1]).read_text(encoding='utf-8'))
+    suggestions = data.get('fx', data) if isinstance(data, dict) else data
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THRESHOLD
+    credit_budget = float(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    controller = AdaptiveController(base_path)
+    generator = ElevenLabsGenerator(api_key, base_path / "luceta_generated",
+                                    luceta_config.base_url("elevenlabs", base_path), controller)
+    journal = GenerationJournal(base_path)
+    generated, errors = generate_suggestions(generator, suggestions, threshold, journal,
+                                             GenerationScheduler(base_path, controller), credit_budget,
+                                             WarmPool.default(base_path))
+
+    print("\n" + "=" * 60)
+    print(f"Generated {len(generated)}/{len(suggestions)} sounds")
+    for sound_name, error in errors:
+        print(f"  ERROR {sound_name}: {error}")
+    print("=" * 60)
+
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,111 @@
+extends Node
+
+# Headless benchmark: footsteps triggered every physics frame by many emitters,
+# first through the old per-call helper (AudioStreamPlayer.new + queue_free),
+# then through the pooled LucetaSfx autoload script.
+#
+# Run with:
+#   godot --headless --path <project> res://addons/luceta/tests/sfx_pool_benchmark.tscn
+
+const EMITTERS = 24
+const PHASE_SECONDS = 3.0
+
+var stream: AudioStreamWAV
+var emitters: Array[Node] = []
+var pool: Node
+
+var phase = ""
+var phase_started = 0
+var nodes_added = 0
+var peak_nodes = 0
+var frames = 0
+var max_physics_ms = 0.0
+var results = {}
+
+func _ready():
+	stream = _make_stream(0.25)
+	for i in EMITTERS:
+		var emitter = Node.new()
+		emitter.name = "Emitter%d" % i
+		add_child(emitter)
+		emitters.append(emitter)
+	get_tree().node_added.connect(func(_node): nodes_added += 1)
+	_start_phase("legacy")
+
+func _physics_process(_delta):
+	for emitter in emitters:
+		if phase == "legacy":
+			_legacy_play_sfx(emitter, stream)
+		else:
+			pool.play("footstep")
+
+	frames += 1
+	peak_nodes = max(peak_nodes, Performance.get_monitor(Performance.OBJECT_NODE_COUNT))
+	max_physics_ms = max(max_physics_ms, Performance.get_monitor(Performance.TIME_PHYSICS_PROCESS) * 1000.0)
+
+	var elapsed = (Time.get_ticks_msec() - phase_started) / 1000.0
+	if elapsed < PHASE_SECONDS:
+		return
+	results[phase] = {
+		"nodes_per_second": nodes_added / elapsed,
+		"peak_nodes": peak_nodes,
+		"max_physics_ms": max_physics_ms,
+		"frames": frames,
+	}
+	if phase == "legacy":
+		_start_phase("pool")
+	else:
+		_report()
+		get_tree().quit()
+
+func _start_phase(phase_name: String):
+	if phase_name == "pool":
+		# Let queued players from the legacy phase go before counting
+		for emitter in emitters:
+			for child in emitter.get_children():
+				child.queue_free()
+		pool = _make_pool()
+		add_child(pool)
+		pool.register_stream("footstep", stream, SfxAutoload.HINT_LIMITS.footstep.polyphony, SfxAutoload.HINT_LIMITS.footstep.min_interval)
+	phase = phase_name
+	phase_started = Time.get_ticks_msec()
+	nodes_added = 0
+	peak_nodes = 0
+	frames = 0
+	max_physics_ms = 0.0
+
+func _legacy_play_sfx(owner_node: Node, sound: AudioStream):
+	# Same body as the helper integrated scripts used to get
+	var player = AudioStreamPlayer.new()
+	owner_node.add_child(player)
+	player.stream = sound
+	player.play()
+	player.finished.connect(func(): player.queue_free())
+
+func _make_pool() -> Node:
+	# The autoload script exactly as SfxAutoload renders it, with no registered sounds
+	var script = GDScript.new()
+	script.source_code = SfxAutoload.render({})
+	script.reload()
+	var node = Node.new()
+	node.set_script(script)
+	return node
+
+func _make_stream(seconds: float) -> AudioStreamWAV:
+	var wav = AudioStreamWAV.new()
+	wav.format = AudioStreamWAV.FORMAT_16_BITS
+	wav.mix_rate = 22050
+	var data = PackedByteArray()
+	data.resize(int(seconds * wav.mix_rate) * 2)
+	wav.data = data
+	return wav
+
+func _report():
+	print("[SfxPoolBenchmark] %d emitters, one footstep per emitter per physics frame" % EMITTERS)
+	for phase_name in ["legacy", "pool"]:
+		var r = results[phase_name]
+		print("  %-6s %8.1f nodes allocated/s  peak %5d nodes  worst physics frame %.2f ms  (%d frames)" % [
+			phase_name, r.nodes_per_second, r.peak_nodes, r.max_physics_ms, r.frames])
+	var before = results.legacy.nodes_per_second
+	var after = results.pool.nodes_per_second
+	print("  allocations/s: %.1f -> %.1f" % [before, after])
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+SFX Variation Engine
+Turns each generated one-shot into several variants locally, so footsteps,
+hits and pickups don't repeat without paying for more generations. Works on
+PCM with NumPy: pitch shift, time stretch, EQ tilt, a crossfaded layer of
+another sound with the same hint, and gain jitter. Every variant's parameters
+come from (seed, sound name, variant number), so a rerun reproduces the same
+files whatever the worker count. Sources are spread over a process pool.
+
+Variants are written as 16-bit WAV to luceta_generated/variants/ and listed
+under "variants" in luceta_sfx.json; LucetaSfx.play() then picks one at random
+(never the same one twice in a row), so the integrated scripts don't change.
+WAV sources are read directly; mp3 sources are decoded with ffmpeg if it is
+on PATH and skipped otherwise.
+
+Usage:
+    sfx_variations.py [sound ...] [--count 4] [--seed 0] [--workers N]
+    sfx_variations.py bench [sources] [count]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from import_metadata import prepare as prepare_imports
+from sfx_autoload import SfxAutoloadGenerator, _write_text, limits_for
+from sound_taxonomy import get_taxonomy
+
+OUTPUT_DIR = "luceta_generated"
+VARIANTS_DIR = "luceta_generated/variants"
+DEFAULT_COUNT = 4
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+SAMPLE_RATE = 44100  # What mp3 sources are decoded to
+
+FRAME = 1024  # Overlap-add window for time stretching
+PEAK_LIMIT = 0.98
+
+# Ranges each variant's parameters are drawn from
+RANGES = {
+    "semitones": (-1.5, 1.5),
+    "stretch": (0.92, 1.08),
+    "tilt_db_per_octave": (-2.5, 2.5),
+    "layer_probability": 0.5,
+    "layer_gain_db": (-15.0, -8.0),
+    "layer_offset": (0.0, 0.25),  # Fraction of the source before the layer starts
+    "gain_db": (-1.5, 1.5),
+}
+
+
+def read_pcm(path):
+    """(samples as float32 [frames, channels] in -1..1, sample rate)"""
+    path = Path(path)
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "rb") as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{path.name}: only 16-bit WAV is supported")
+            rate, channels = f.getframerate(), f.getnchannels()
+            data = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+        return (data.reshape(-1, channels).astype(np.float32) / 32768.0), rate
+
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise ValueError(f"{path.name}: decoding {path.suffix} needs ffmpeg on PATH")
+    result = subprocess.run([ffmpeg, "-v", "error", "-i", str(path), "-f", "s16le", "-acodec", "pcm_s16le",
+                             "-ac", "2", "-ar", str(SAMPLE_RATE), "-"], capture_output=True, check=True)
+    data = np.frombuffer(result.stdout, dtype="<i2")
+    return data.reshape(-1, 2).astype(np.float32) / 32768.0, SAMPLE_RATE
+
+
+def write_wav(path, samples, rate):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    tmp_path = path.with_name(path.name + ".part")
+    with wave.open(str(tmp_path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm.tobytes())
+    os.replace(tmp_path, path)
+
+
+def time_stretch(samples, factor, frame=FRAME):
+    """
+    WSOLA: overlap-add Hann windows, each taken from near its nominal input position
+    where it lines up best with what the previous window continued into, so the
+    pitch stays put. factor > 1 makes the sound longer.
+    """
+    hop_out = frame // 2
+    hop_in = hop_out / factor
+    tolerance = frame // 4
+    channels = samples.shape[1]
+    padding = np.zeros((frame + tolerance, channels), dtype=np.float32)
+    padded = np.concatenate([padding, samples.astype(np.float32), padding, padding])
+    mono = padded.mean(axis=1)
+    base = len(padding)
+
+    count = max(1, int(len(samples) * factor / hop_out) + 1)
+    window = np.hanning(frame).astype(np.float32)
+    out = np.zeros(((count + 1) * hop_out + frame, channels), dtype=np.float32)
+    norm = np.zeros(len(out), dtype=np.float32)
+    # Windows start half a hop early so the first samples get a full overlap too
+    position = base - hop_out
+    for k in range(count):
+        if k > 0:
+            nominal = base - hop_out + int(k * hop_in)
+            natural = position + hop_out  # Where the previous window would have continued
+            region = mono[nominal - tolerance:nominal + tolerance + hop_out]
+            template = mono[natural:natural + hop_out]
+            position = nominal - tolerance + int(np.argmax(np.correlate(region, template, "valid")))
+        start = k * hop_out
+        out[start:start + frame] += padded[position:position + frame] * window[:, None]
+        norm[start:start + frame] += window
+    out = out[hop_out:] / np.maximum(norm[hop_out:], 1e-3)[:, None]
+    return out[:max(1, int(round(len(samples) * factor)))]
+
+
+def resample(samples, length):
+    """Linear interpolation to a new length"""
+    positions = np.linspace(0, len(samples) - 1, length)
+    return np.stack([np.interp(positions, np.arange(len(samples)), samples[:, c])
+                     for c in range(samples.shape[1])], axis=1).astype(np.float32)
+
+
+def pitch_shift(samples, semitones):
+    """Stretch by the pitch ratio, then resample back to the original length"""
+    ratio = 2.0 ** (semitones / 12.0)
+    return resample(time_stretch(samples, ratio), len(samples))
+
+
+def eq_tilt(samples, rate, db_per_octave, pivot=1000.0):
+    """Tilt the spectrum around pivot Hz: positive is brighter, negative darker"""
+    spectrum = np.fft.rfft(samples, axis=0)
+    freqs = np.fft.rfftfreq(len(samples), 1.0 / rate)
+    octaves = np.log2(np.maximum(freqs, 20.0) / pivot)
+    gains = 10.0 ** (db_per_octave * octaves / 20.0)
+    return np.fft.irfft(spectrum * gains[:, None], n=len(samples), axis=0).astype(np.float32)
+
+
+def layer(samples, other, gain_db, offset):
+    """Mix other under samples from offset, with raised-cosine fades so it crossfades in and out"""
+    start = int(offset * len(samples))
+    length = min(len(other), len(samples) - start)
+    if length <= 1:
+        return samples
+    fade = max(1, min(length // 4, 2048))
+    envelope = np.ones(length, dtype=np.float32)
+    ramp = 0.5 - 0.5 * np.cos(np.linspace(0.0, np.pi, fade, dtype=np.float32))
+    envelope[:fade] = ramp
+    envelope[-fade:] = np.minimum(envelope[-fade:], ramp[::-1])
+    other = other[:length]
+    if other.shape[1] != samples.shape[1]:
+        other = np.repeat(other.mean(axis=1, keepdims=True), samples.shape[1], axis=1)
+    mixed = samples.copy()
+    mixed[start:start + length] += other * envelope[:, None] * 10.0 ** (gain_db / 20.0)
+    return mixed
+
+
+def variant_params(seed, sound_name, index, can_layer):
+    """Parameters of one variant, reproducible from (seed, sound, index)"""
+    rng = np.random.default_rng([seed, zlib.crc32(sound_name.encode("utf-8")), index])
+    params = {key: float(rng.uniform(*RANGES[key]))
+              for key in ("semitones", "stretch", "tilt_db_per_octave", "gain_db")}
+    if can_layer and rng.random() < RANGES["layer_probability"]:
+        params["layer_gain_db"] = float(rng.uniform(*RANGES["layer_gain_db"]))
+        params["layer_offset"] = float(rng.uniform(*RANGES["layer_offset"]))
+    return params
+
+
+def render_variant(samples, rate, params, layer_samples=None):
+    out = pitch_shift(samples, params["semitones"])
+    out = time_stretch(out, params["stretch"])
+    out = eq_tilt(out, rate, params["tilt_db_per_octave"])
+    if layer_samples is not None and "layer_gain_db" in params:
+        out = layer(out, layer_samples, params["layer_gain_db"], params["layer_offset"])
+    out *= 10.0 ** (params["gain_db"] / 20.0)
+    peak = float(np.max(np.abs(out))) if len(out) else 0.0
+    if peak > PEAK_LIMIT:
+        out *= PEAK_LIMIT / peak
+    return out
+
+
+@lru_cache(maxsize=32)
+def _load(path):
+    return read_pcm(path)
+
+
+def _variant_job(job):
+    """Worker: every variant of one source. Returns (sound, [(path, params)], error)"""
+    sound_name, source, layer_source, output_dir, count, seed = job
+    try:
+        samples, rate = _load(source)
+        layer_samples = None
+        if layer_source:
+            layer_samples, layer_rate = _load(layer_source)
+            if layer_rate != rate:
+                layer_samples = resample(layer_samples, int(len(layer_samples) * rate / layer_rate))
+    except (OSError, ValueError, subprocess.CalledProcessError, wave.Error) as e:
+        return sound_name, [], str(e)
+
+    written = []
+    for index in range(1, count + 1):
+        params = variant_params(seed, sound_name, index, layer_samples is not None)
+        path = Path(output_dir) / f"{sound_name}_v{index}.wav"
+        write_wav(path, render_variant(samples, rate, params, layer_samples), rate)
+        written.append((str(path), params))
+    # Variants left over from a run with a higher count
+    for path in Path(output_dir).glob(f"{sound_name}_v*.wav"):
+        suffix = path.stem[len(sound_name) + 2:]
+        if suffix.isdigit() and int(suffix) > count:
+            path.unlink()
+            path.with_name(path.name + ".import").unlink(missing_ok=True)
+    return sound_name, written, None
+
+
+class VariationEngine:
+    """Variants for a project's one-shots, recorded in the LucetaSfx registry"""
+
+    def __init__(self, project_path, workers=DEFAULT_WORKERS):
+        self.project_path = Path(project_path)
+        self.workers = workers
+        self.autoload = SfxAutoloadGenerator(self.project_path)
+
+    def sources(self):
+        """{name: file} of one-shots whose audio is a standalone file (atlas slices are skipped)"""
+        sources = {}
+        for name, res_path in self.autoload.one_shots().items():
+            path = self.project_path / res_path.replace("res://", "", 1)
+            if path.exists():
+                sources[name] = path
+        return sources
+
+    def jobs(self, sources, count, seed):
+        """One job per source; its layer is the next sound with the same hint, if any"""
+        by_hint = {}
+        for name in sorted(sources):
+            by_hint.setdefault(get_taxonomy().classify(name)["hint"], []).append(name)
+        jobs = []
+        for names in by_hint.values():
+            for i, name in enumerate(names):
+                partner = names[(i + 1) % len(names)] if len(names) > 1 else None
+                jobs.append((name, str(sources[name]), str(sources[partner]) if partner else None,
+                             str(self.project_path / VARIANTS_DIR), count, seed))
+        return jobs
+
+    def generate(self, names=None, count=DEFAULT_COUNT, seed=0):
+        """
+        Render variants and add them to luceta_sfx.json, then re-render the autoload.
+        Returns ({sound: [res paths]}, [(sound, error)])
+        """
+        sources = self.sources()
+        if names:
+            sources = {name: path for name, path in sources.items() if name in names}
+        jobs = self.jobs(sources, count, seed)
+
+        if self.workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(min(self.workers, len(jobs))) as pool:
+                results = list(pool.map(_variant_job, jobs))
+        else:
+            results = [_variant_job(job) for job in jobs]
+
+        variants = {}
+        errors = []
+        for sound_name, written, error in results:
+            if error:
+                errors.append((sound_name, error))
+                continue
+            variants[sound_name] = ["res://" + Path(path).relative_to(self.project_path).as_posix()
+                                    for path, _params in written]
+            prepare_imports(self.project_path, [path for path, _params in written])
+
+        if variants:
+            registry = self.autoload.load_registry()
+            for sound_name, paths in variants.items():
+                entry = registry.get(sound_name) or limits_for(sound_name)
+                entry["variants"] = paths
+                registry[sound_name] = entry
+            self.autoload.registry_path.parent.mkdir(parents=True, exist_ok=True)
+            _write_text(self.autoload.registry_path, json.dumps(registry, indent="\t", sort_keys=True))
+            self.autoload.generate()
+        return variants, errors
+
+
+def _bench(source_count, count):
+    """Variants for synthetic one-shots: one worker vs the pool"""
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        (project / "project.godot").write_text("[application]\n", encoding='utf-8')
+        for i in range(source_count):
+            t = np.arange(int(SAMPLE_RATE * 0.6)) / SAMPLE_RATE
+            tone = np.sin(2 * np.pi * (220 + 40 * i) * t) * np.exp(-6 * t) + 0.05 * rng.standard_normal(len(t))
+            write_wav(project / OUTPUT_DIR / f"player_step_{i}.wav", np.stack([tone, tone], axis=1) * 0.5,
+                      SAMPLE_RATE)
+
+        timings = {}
+        for workers in sorted({1, DEFAULT_WORKERS}):
+            engine = VariationEngine(project, workers)
+            start = time.perf_counter()
+            variants, errors = engine.generate(count=count)
+            timings[workers] = time.perf_counter() - start
+        first = sorted((project / VARIANTS_DIR).glob("*.wav"))[0].read_bytes()
+
+        # Same seed, same bytes
+        engine.generate(count=count)
+        repeatable = sorted((project / VARIANTS_DIR).glob("*.wav"))[0].read_bytes() == first
+
+    total = sum(len(paths) for paths in variants.values())
+    print(f"{source_count} sources x {count} variants = {total} files, {len(errors)} errors")
+    for workers, seconds in timings.items():
+        print(f"  {workers} worker{'s' if workers > 1 else ''}: {seconds * 1000:.0f} ms")
+    print(f"  deterministic: {'yes' if repeatable else 'NO'}")
+    return 0 if repeatable and not errors else 1
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        return _bench(int(sys.argv[2]) if len(sys.argv) > 2 else 8, int(sys.argv[3]) if len(sys.argv) > 3 else 4)
+
+    parser = argparse.ArgumentParser(description="Local variants of generated one-shots")
+    parser.add_argument("sounds", nargs="*", help="sound names (default: every standalone one-shot)")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    base_path = Path(__file__).resolve().parent.parent.parent.parent
+    start = time.perf_counter()
+    variants, errors = VariationEngine(base_path, args.workers).generate(args.sounds, args.count, args.seed)
+    print(f"Wrote {sum(len(paths) for paths in variants.values())} variants of {len(variants)} sounds "
+          f"in {time.perf_counter() - start:.1f}s")
+    for sound_name, error in errors:
+        print(f"  SKIPPED {sound_name}: {error}")
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Sound Taxonomy Classifier
+Python side of SoundTaxonomy.gd - compiles sound_taxonomy.json into one regex
+and classifies names/descriptions into hint, state hint, duration and wiring targets
+"""
+
+import json
+import re
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+TAXONOMY_PATH = Path(__file__).resolve().parent.parent / 'sound_taxonomy.json'
+
+# Sections whose rules are tried in order; the first matching rule wins
+ORDERED_SECTIONS = ("hints", "state_hints", "durations")
+NO_MATCH = 1 << 30
+EMPTY_SIGNATURE = (NO_MATCH, NO_MATCH, NO_MATCH, 0)
+# Joins texts for the batch pass; normalize leaves it alone and it's never part of a keyword
+BATCH_SEPARATOR = "\x1e"
+
+
+def normalize(text):
+    """Same normalization as SoundTaxonomy.gd: lowercase, separators to spaces"""
+    return str(text).lower().replace("_", " ").replace("-", " ").replace("\n", " ")
+
+
+def _rule_keywords(rule):
+    return rule.get("keywords", [rule.get("keyword", "")])
+
+
+def _trie_pattern(words):
+    """Build a prefix-trie regex so alternation cost doesn't grow with keyword count"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node):
+        terminal = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Greedy optional: the longest keyword starting here wins
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SoundTaxonomy:
+    """Single compiled automaton over every keyword in the taxonomy"""
+
+    def __init__(self, path=TAXONOMY_PATH):
+        self.data = json.loads(Path(path).read_text(encoding='utf-8'))
+
+        # keyword -> {section: [rule indices]}
+        rules_by_keyword = {}
+        for section in ORDERED_SECTIONS + ("targets",):
+            for index, rule in enumerate(self.data.get(section, [])):
+                for keyword in _rule_keywords(rule):
+                    keyword = normalize(keyword)
+                    if not keyword:
+                        continue
+                    rules_by_keyword.setdefault(keyword, {}).setdefault(section, []).append(index)
+
+        # The regex reports the longest keyword at each position, so every
+        # keyword also carries the rules of the shorter keywords it starts with.
+        # Rules are packed into a signature: the best index of each ordered
+        # section plus a bitmask of matched targets.
+        self.keyword_signatures = {}
+        for keyword in rules_by_keyword:
+            signature = [NO_MATCH] * len(ORDERED_SECTIONS) + [0]
+            for other, sections in rules_by_keyword.items():
+                if not keyword.startswith(other):
+                    continue
+                for i, section in enumerate(ORDERED_SECTIONS):
+                    if section in sections:
+                        signature[i] = min(signature[i], min(sections[section]))
+                for index in sections.get("targets", ()):
+                    signature[-1] |= 1 << index
+            self.keyword_signatures[keyword] = tuple(signature)
+
+        # Without keywords the group can never match, instead of matching the empty string everywhere
+        pattern = "(?=(" + (_trie_pattern(self.keyword_signatures.keys()) or "(?!)") + "))"
+        self.regex = re.compile(pattern)
+        self.batch_regex = re.compile(pattern + "|\n")
+        # Swapping one character that's in no keyword for another can't change
+        # what matches, so the batch pass maps those (the digits of
+        # "_on_coin_123") to one placeholder and names that differ only there
+        # classify once
+        keyword_chars = set("".join(self.keyword_signatures)) | {BATCH_SEPARATOR}
+        self.barrier_table = str.maketrans({chr(c): "\0" for c in range(128) if chr(c) not in keyword_chars})
+        self._results = {}
+        self._empty = self._resolve(EMPTY_SIGNATURE)
+
+    def _resolve(self, signature):
+        """Turn a rule signature into the classification result (memoized)"""
+        result = self._results.get(signature)
+        if result is not None:
+            return result
+
+        hint, state, duration_rule, target_mask = signature
+        data = self.data
+        result = {
+            "hint": data["hints"][hint]["hint"] if hint != NO_MATCH else data.get("default_hint", "generic"),
+            "state_hint": (data["state_hints"][state]["hint"]
+                           if state != NO_MATCH else data.get("default_state_hint", "state_transition")),
+        }
+
+        duration = (data["durations"][duration_rule]["seconds"]
+                    if duration_rule != NO_MATCH else data.get("default_duration", 1.5))
+        result["duration"] = min(max(duration, data.get("min_duration", 0.5)), data.get("max_duration", 22.0))
+
+        result["targets"] = [target for i, target in enumerate(data.get("targets", [])) if target_mask >> i & 1]
+        self._results[signature] = result
+        return result
+
+    def _signature(self, keywords):
+        hint = state = duration = NO_MATCH
+        mask = 0
+        signatures = self.keyword_signatures
+        for keyword in keywords:
+            h, s, d, m = signatures[keyword]
+            hint = min(hint, h)
+            state = min(state, s)
+            duration = min(duration, d)
+            mask |= m
+        return hint, state, duration, mask
+
+    def classify(self, text):
+        """Classify a single name or description"""
+        keywords = self.regex.findall(normalize(text))
+        return self._resolve(self._signature(keywords)) if keywords else self._empty
+
+    def classify_batch(self, texts):
+        """
+        Classify many names/descriptions with a single regex pass over one
+        newline-joined buffer. Returns a list of results in input order.
+        """
+        if not texts:
+            return []
+        try:
+            joined = BATCH_SEPARATOR.join(texts)
+        except TypeError:
+            texts = [str(t) for t in texts]
+            joined = BATCH_SEPARATOR.join(texts)
+        if joined.count(BATCH_SEPARATOR) == len(texts) - 1:
+            # Normalize the whole buffer at once
+            normalized = normalize(joined).translate(self.barrier_table).split(BATCH_SEPARATOR)
+        else:
+            normalized = [normalize(t).translate(self.barrier_table) for t in texts]
+        unique = list(dict.fromkeys(normalized))
+
+        # Separators show up as empty keywords, so results stay aligned with texts
+        results = []
+        by_keywords = {}
+        keywords = []
+        for keyword in self.batch_regex.findall("\n".join(unique) + "\n"):
+            if keyword:
+                keywords.append(keyword)
+                continue
+            if not keywords:
+                results.append(self._empty)
+                continue
+            key = tuple(keywords)
+            result = by_keywords.get(key)
+            if result is None:
+                result = by_keywords[key] = self._resolve(self._signature(keywords))
+            results.append(result)
+            keywords = []
+
+        by_text = dict(zip(unique, results))
+        return [by_text[text] for text in normalized]
+
+    def targets_for(self, texts):
+        """
+        Targets matched by any of texts, each classified on its own so a keyword
+        can't match across the boundary between two of them. Table order.
+        """
+        matched = [target for result in self.classify_batch(texts) for target in result["targets"]]
+        return [target for target in self.data.get("targets", []) if target in matched]
+
+
+@lru_cache(maxsize=None)
+def get_taxonomy(path=TAXONOMY_PATH):
+    """Shared taxonomy instance, compiled once per process"""
+    return SoundTaxonomy(path)
+
+
+def main():
+    taxonomy = get_taxonomy()
+
+    if len(sys.argv) > 1:
+        for text in sys.argv[1:]:
+            result = taxonomy.classify(text)
+            targets = ", ".join(t["keyword"] for t in result["targets"]) or "-"
+            print(f"{text}: hint={result['hint']} state={result['state_hint']} "
+                  f"duration={result['duration']} targets={targets}")
+        return 0
+
+    # Benchmark: classify 100k synthetic identifiers in one call
+    words = ["player", "enemy", "coin", "jump", "walk", "attack", "menu", "door", "slime", "idle"]
+    names = [f"_on_{words[i % 10]}_{words[(i // 10) % 10]}_{i}" for i in range(100000)]
+    start = time.perf_counter()
+    taxonomy.classify_batch(names)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Classified {len(names)} identifiers in {elapsed:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
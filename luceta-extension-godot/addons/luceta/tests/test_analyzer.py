@@ -2,12 +2,21 @@
 """
 Code Analyzer Logic Test
 Simulates the CodeAnalyzer.gd logic in Python to verify it works correctly
+
+Every file is analyzed under per-file ceilings (bytes read, seconds spent, items
+produced). A file over a ceiling is quarantined: it contributes no results, is
+reported at the end of analyze_project(), and is skipped by later scans until it
+changes (.godot/luceta_cache/analyzer_quarantine.json).
 """
 
+import json
 import os
 import re
+import time
 from pathlib import Path
 
+from sound_taxonomy import get_taxonomy
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -20,11 +29,65 @@ class Colors:
 def sep(char="=", length=60):
     return char * length
 
+# Per-file ceilings. Real scripts and scenes are far below them; generated or
+# corrupt files above them are quarantined instead of stalling the scan.
+MAX_SCRIPT_BYTES = 4 * 1024 * 1024
+MAX_SCENE_BYTES = 32 * 1024 * 1024
+MAX_FILE_SECONDS = 2.0
+MAX_ITEMS_PER_FILE = 5000
+QUARANTINE_PATH = ".godot/luceta_cache/analyzer_quarantine.json"
+
+# Every variable-length part of a pattern stops at its closing delimiter, at the
+# next opening one, or after a bounded length, so an unterminated "func _x(",
+# "enum STATE {" or name=" costs at most that bound instead of a scan to the end
+# of the file for every occurrence.
+FUNC_PATTERN = re.compile(r'func\s+(_[a-zA-Z_][a-zA-Z0-9_]*|on_[a-zA-Z_][a-zA-Z0-9_]*)\s*\([^()]{0,1024}[()]')
+SIGNAL_PATTERN = re.compile(r'signal\s+([a-zA-Z_][a-zA-Z0-9_]*)')
+STATE_PATTERN = re.compile(r'enum\s+STATE\s*\{([^{}]{0,8192})\}')
+STATE_VALUE_PATTERN = re.compile(r'([A-Z_][A-Z0-9_]*)')
+DIALOG_PATTERN = re.compile(r'\[node name="([^"\n]{1,1024})" type="RichTextLabel"')
+DIALOG_TEXT_PATTERN = re.compile(r'text = "([^"]+)"')
+# The text property is looked for in this many characters after the node header,
+# up to the next section, like code_analyzer.gd
+DIALOG_SECTION_CHARS = 500
+CONNECTION_PATTERN = re.compile(r'\[connection signal="([^"\n]{1,1024})"')
+
+
+class _CeilingExceeded(Exception):
+    pass
+
+
+class _Budget:
+    """Time and item allowance for one file, checked between matches"""
+
+    def __init__(self, seconds, max_items):
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+        self.seconds = seconds
+        self.items_left = max_items
+        self.max_items = max_items
+
+    def check(self, new_items=0):
+        self.items_left -= new_items
+        if self.items_left < 0:
+            raise _CeilingExceeded(f"more than {self.max_items} items")
+        if time.monotonic() > self.deadline:
+            raise _CeilingExceeded(f"over the {self.seconds:g}s time ceiling")
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
 class CodeAnalyzerSimulator:
     """Python simulation of the GDScript CodeAnalyzer"""
     
-    def __init__(self, project_path):
+    def __init__(self, project_path, max_script_bytes=MAX_SCRIPT_BYTES, max_scene_bytes=MAX_SCENE_BYTES,
+                 max_file_seconds=MAX_FILE_SECONDS, max_items=MAX_ITEMS_PER_FILE):
         self.project_path = Path(project_path)
+        self.max_script_bytes = max_script_bytes
+        self.max_scene_bytes = max_scene_bytes
+        self.max_file_seconds = max_file_seconds
+        self.max_items = max_items
+        self.quarantined = []  # {"file", "reason", "bytes", "seconds", "mtime"} for files over a ceiling
         self.results = {
             "events": [],
             "actions": [],
@@ -59,18 +122,28 @@ class CodeAnalyzerSimulator:
             "signals": []
         }
         
-        try:
-            content = file_path.read_text(encoding='utf-8')
-        except:
+        content = self._read(file_path, self.max_script_bytes)
+        if content is None:
             return results
         
+        budget = _Budget(self.max_file_seconds, self.max_items)
+        try:
+            self._analyze_gd_content(content, file_path, results, budget)
+        except _CeilingExceeded as e:
+            self._quarantine(file_path, str(e), budget.elapsed())
+            return {key: [] for key in results}
+        return results
+    
+    def _analyze_gd_content(self, content, file_path, results, budget):
+        taxonomy = get_taxonomy()
+        
         # Extract functions starting with _ or on_
-        func_pattern = r'func\s+(_[a-zA-Z_][a-zA-Z0-9_]*|on_[a-zA-Z_][a-zA-Z0-9_]*)\s*\([^)]*\)'
-        for match in re.finditer(func_pattern, content):
-            func_name = match.group().replace('func ', '').split('(')[0]
+        for match in FUNC_PATTERN.finditer(content):
+            budget.check()
+            func_name = match.group(1)
             
             # Extract function body (simplified)
-            func_start = content.find(match.group())
+            func_start = match.start()
             func_body = content[func_start:func_start+500]  # Get next 500 chars
             
             if self.has_audio_play(func_body) or self.is_action_function(func_name, func_body):
@@ -78,33 +151,39 @@ class CodeAnalyzerSimulator:
                     "type": "function",
                     "name": func_name,
                     "file": str(file_path),
-                    "context": func_body[:200],
-                    "sound_hint": self.infer_sound_type(func_name, func_body)
+                    "context": func_body[:200]
                 }
                 results["events"].append(event)
+                budget.check(1)
+        
+        # Hints for the whole file in one taxonomy pass
+        hints = taxonomy.classify_batch([event["name"] for event in results["events"]])
+        for event, hint in zip(results["events"], hints):
+            event["sound_hint"] = hint["hint"]
         
         # Extract signals
-        signal_pattern = r'signal\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        for match in re.finditer(signal_pattern, content):
+        for match in SIGNAL_PATTERN.finditer(content):
             signal_name = match.group(1)
             results["signals"].append({
                 "type": "signal",
                 "name": signal_name,
                 "file": str(file_path)
             })
+            budget.check(1)
         
         # Extract state machines
-        state_pattern = r'enum\s+STATE\s*\{([^}]*)\}'
-        for match in re.finditer(state_pattern, content):
+        for match in STATE_PATTERN.finditer(content):
+            budget.check()
             enum_content = match.group(1)
-            states = re.findall(r'([A-Z_][A-Z0-9_]*)', enum_content)
-            for state in states:
+            states = STATE_VALUE_PATTERN.findall(enum_content)
+            for state, hint in zip(states, taxonomy.classify_batch(states)):
                 results["actions"].append({
                     "type": "state",
                     "name": state,
                     "file": str(file_path),
-                    "sound_hint": self.infer_sound_from_state(state)
+                    "sound_hint": hint["state_hint"]
                 })
+            budget.check(len(states))
         
         # Check for Area2D interactions
         if 'Area2D' in content or 'CollisionShape2D' in content:
@@ -114,8 +193,6 @@ class CodeAnalyzerSimulator:
                     "file": str(file_path),
                     "sound_hint": "interaction"
                 })
-        
-        return results
     
     def analyze_scene_file(self, file_path):
         """Analyze a scene file for dialogs and signals"""
@@ -124,34 +201,68 @@ class CodeAnalyzerSimulator:
             "signals": []
         }
         
-        try:
-            content = file_path.read_text(encoding='utf-8')
-        except:
+        content = self._read(file_path, self.max_scene_bytes)
+        if content is None:
             return results
         
-        # Find RichTextLabel nodes (potential dialogs)
-        dialog_pattern = r'\[node name="([^"]+)" type="RichTextLabel"'
-        for match in re.finditer(dialog_pattern, content):
-            node_name = match.group(1)
-            results["dialogs"].append({
-                "type": "dialog",
-                "name": node_name,
-                "file": str(file_path),
-                "text": ""
-            })
-        
-        # Find signal connections
-        connection_pattern = r'\[connection signal="([^"]+)"'
-        for match in re.finditer(connection_pattern, content):
-            signal_name = match.group(1)
-            results["signals"].append({
-                "type": "signal_connection",
-                "name": signal_name,
-                "file": str(file_path)
-            })
+        budget = _Budget(self.max_file_seconds, self.max_items)
+        try:
+            # Find RichTextLabel nodes (potential dialogs)
+            for match in DIALOG_PATTERN.finditer(content):
+                node_name = match.group(1)
+                node_section = content[match.start():match.start() + DIALOG_SECTION_CHARS]
+                next_section = node_section.find("\n[")
+                if next_section != -1:
+                    node_section = node_section[:next_section]
+                text_match = DIALOG_TEXT_PATTERN.search(node_section)
+                results["dialogs"].append({
+                    "type": "dialog",
+                    "name": node_name,
+                    "file": str(file_path),
+                    "text": text_match.group(1) if text_match else ""
+                })
+                budget.check(1)
+            
+            # Find signal connections
+            for match in CONNECTION_PATTERN.finditer(content):
+                signal_name = match.group(1)
+                results["signals"].append({
+                    "type": "signal_connection",
+                    "name": signal_name,
+                    "file": str(file_path)
+                })
+                budget.check(1)
+        except _CeilingExceeded as e:
+            self._quarantine(file_path, str(e), budget.elapsed())
+            return {key: [] for key in results}
         
         return results
     
+    def _read(self, file_path, max_bytes):
+        """File text, or None when unreadable or over the byte ceiling (checked before reading)"""
+        try:
+            size = file_path.stat().st_size
+            if size > max_bytes:
+                self._quarantine(file_path, f"{size} bytes, over the {max_bytes} byte ceiling", 0.0)
+                return None
+            return file_path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            return None
+    
+    def _quarantine(self, file_path, reason, seconds):
+        try:
+            stat = file_path.stat()
+            size, mtime = stat.st_size, int(stat.st_mtime)
+        except OSError:
+            size, mtime = 0, 0
+        self.quarantined.append({
+            "file": str(file_path),
+            "reason": reason,
+            "bytes": size,
+            "seconds": round(seconds, 3),
+            "mtime": mtime
+        })
+    
     def has_audio_play(self, body):
         """Check if function body contains audio playback"""
         body_lower = body.lower()
@@ -169,45 +280,24 @@ class CodeAnalyzerSimulator:
     
     def infer_sound_type(self, func_name, body):
         """Infer what type of sound this event would need"""
-        name_lower = func_name.lower()
-        
-        if any(x in name_lower for x in ['walk', 'step', 'move']):
-            return "footstep"
-        elif 'jump' in name_lower:
-            return "jump"
-        elif any(x in name_lower for x in ['attack', 'chop', 'hit']):
-            return "attack"
-        elif any(x in name_lower for x in ['collect', 'pickup', 'coin']):
-            return "collect"
-        elif any(x in name_lower for x in ['area_entered', 'body_entered']):
-            return "interaction"
-        elif any(x in name_lower for x in ['dialog', 'speak']):
-            return "dialog"
-        else:
-            return "generic"
+        return get_taxonomy().classify(func_name)["hint"]
     
     def infer_sound_from_state(self, state):
         """Infer sound type from state name"""
-        state_lower = state.lower()
-        
-        if any(x in state_lower for x in ['walk', 'run']):
-            return "footstep"
-        elif any(x in state_lower for x in ['attack', 'chop']):
-            return "attack"
-        elif 'jump' in state_lower:
-            return "jump"
-        else:
-            return "state_transition"
+        return get_taxonomy().classify(state)["state_hint"]
     
     def analyze_project(self):
         """Run full project analysis"""
         print(f"\n{Colors.CYAN}Scanning project: {self.project_path}{Colors.END}\n")
+        known = self._load_quarantine()
         
         # Find and analyze GD files
         gd_files = self.find_files(self.project_path, '.gd')
         print(f"Found {len(gd_files)} .gd files to analyze")
         
         for file_path in gd_files:
+            if self._still_quarantined(file_path, known):
+                continue
             print(f"  Analyzing: {file_path.relative_to(self.project_path)}")
             file_results = self.analyze_gd_file(file_path)
             self.results["events"].extend(file_results["events"])
@@ -220,13 +310,62 @@ class CodeAnalyzerSimulator:
         print(f"\nFound {len(tscn_files)} .tscn files to analyze")
         
         for file_path in tscn_files:
+            if self._still_quarantined(file_path, known):
+                continue
             print(f"  Analyzing: {file_path.relative_to(self.project_path)}")
             scene_results = self.analyze_scene_file(file_path)
             self.results["dialogs"].extend(scene_results["dialogs"])
             self.results["signals"].extend(scene_results["signals"])
         
+        self._save_quarantine()
+        if self.quarantined:
+            print(f"\n{Colors.YELLOW}Quarantined {len(self.quarantined)} files over the analyzer ceilings:{Colors.END}")
+            for entry in self.quarantined:
+                print(f"  {self._rel(entry['file'])}: {entry['reason']}")
+        
         return self.results
-
+    
+    def _rel(self, file_path):
+        try:
+            return Path(file_path).relative_to(self.project_path).as_posix()
+        except ValueError:
+            return str(file_path)
+    
+    def _load_quarantine(self):
+        """Entries of earlier runs by project-relative path"""
+        try:
+            data = json.loads((self.project_path / QUARANTINE_PATH).read_text(encoding='utf-8'))
+            return data.get("files", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _still_quarantined(self, file_path, known):
+        """Quarantined by an earlier run and unchanged since; carried over without re-reading it"""
+        entry = known.get(self._rel(file_path))
+        if not entry:
+            return False
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return False
+        if entry.get("bytes") != stat.st_size or entry.get("mtime") != int(stat.st_mtime):
+            return False
+        self.quarantined.append({**entry, "file": str(file_path)})
+        return True
+    
+    def _save_quarantine(self):
+        quarantine_path = self.project_path / QUARANTINE_PATH
+        if not self.quarantined and not quarantine_path.exists():
+            return
+        files = {self._rel(entry["file"]): {key: value for key, value in entry.items() if key != "file"}
+                 for entry in self.quarantined}
+        try:
+            quarantine_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = quarantine_path.with_name(quarantine_path.name + ".tmp")
+            tmp_path.write_text(json.dumps({"version": 1, "files": files}, indent=2), encoding='utf-8')
+            os.replace(tmp_path, quarantine_path)
+        except OSError:
+            pass
 
 def main():
     print(sep('='))
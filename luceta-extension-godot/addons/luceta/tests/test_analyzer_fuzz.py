@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Analyzer Fuzz and Scale Test
+Runs CodeAnalyzerSimulator (the Python mirror of code_analyzer.gd) on seeded
+random scripts and scenes built from GDScript fragments and hostile mutations
+(unterminated parens, braces and strings, huge single lines, NUL bytes), and
+checks properties that must hold for any input: no exception, the usual result
+shape, only identifiers (scripts) or quoted values (scenes) as names, the same answer twice, the per-file time
+ceiling, and unchanged results for well-formed code.
+
+The scale part times each worst-case shape from 1 KB up to --max-size with the
+ceilings lifted and fails when time grows faster than linearly, or when memory
+at the largest size goes beyond a small multiple of the file with the item
+ceiling in place. Last, with the default ceilings, oversized and flooding files
+must be quarantined and reported by analyze_project() instead of stalling it.
+
+Usage:
+    test_analyzer_fuzz.py [--seed 1] [--cases 300] [--max-size 1M]   the full sweep is --max-size 100M
+"""
+
+import math
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from test_analyzer import MAX_FILE_SECONDS, MAX_ITEMS_PER_FILE, MAX_SCRIPT_BYTES, QUARANTINE_PATH, CodeAnalyzerSimulator
+
+DEFAULT_SEED = 1
+DEFAULT_CASES = 300
+SCALE_SIZES = [1024 * 10 ** power for power in range(3)] + [1024 ** 2 * 10 ** power for power in range(3)]
+DEFAULT_MAX_SIZE = 1024 ** 2
+MAX_EXPONENT = 1.25  # log-log slope of time over size; 1.0 is linear
+MIN_TIMED_SIZE = 100 * 1024  # Below this, start-up noise swamps the slope
+MEMORY_FACTOR = 3  # Peak traced memory per byte of input: the file's bytes, its text, and capped results
+MEMORY_SLACK = 4 * 1024 * 1024
+
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+RESULT_SHAPES = {".gd": {"events", "actions", "interactions", "signals"}, ".tscn": {"dialogs", "signals"}}
+
+SCRIPT_FRAGMENTS = [
+    "extends CharacterBody2D\n",
+    "signal {name}_finished\n",
+    "enum STATE {{ IDLE, {upper}, FALLING }}\n",
+    "func _{name}():\n\tvelocity.y = -400\n\t$SFX.play()\n\n",
+    "func on_{name}_pressed(button: Button, amount := Vector2(0, 0)):\n\tpass\n\n",
+    "func _on_body_entered(body):\n\tif body is Area2D:\n\t\tplay_sound(\"{name}\")\n\n",
+    "var {name} = {{\"a\": 1, \"b\": [1, 2, {{}}]}}\n",
+    "# func _commented_{name}() -> void:\n",
+    "const TEXT = \"func _not_a_{name}(x)\"\n",
+]
+HOSTILE_FRAGMENTS = [
+    "func _{name}(", "func on_{name}(a, b", "const TEXT = \"func _not_a_{name}(\"\n", "enum STATE {{",
+    "enum STATE {{ {upper},", "{{" * 50, "}}" * 50,
+    "\"unterminated string", "'", "\\", "(" * 50, ")" * 50, "func ", "func\t\t_{name}\t(", "signal ",
+    "\x00\x01\x02", "é漢字🙂", "\r\n", " " * 200,
+]
+SCENE_FRAGMENTS = [
+    "[gd_scene load_steps=3 format=3]\n\n",
+    "[node name=\"{name}\" type=\"RichTextLabel\" parent=\".\"]\ntext = \"Hello {name}\"\n\n",
+    "[node name=\"{name}\" type=\"Button\" parent=\".\"]\n\n",
+    "[connection signal=\"{name}_pressed\" from=\"{name}\" to=\".\" method=\"_on_{name}\"]\n",
+]
+HOSTILE_SCENE_FRAGMENTS = [
+    "[node name=\"", "[node name=\"{name}\" type=\"RichTextLabel", "[connection signal=\"", "\"" * 20,
+    "[node name=\"{name}\n\" type=\"RichTextLabel\"]", "\x00", "[" * 40,
+]
+WORDS = ["jump", "attack", "coin", "door", "hit", "menu", "walk", "heal", "x", "a1", "_"]
+
+
+def fill(fragment, rng):
+    name = f"{rng.choice(WORDS)}_{rng.randrange(10000)}"
+    return fragment.format(name=name, upper=name.upper())
+
+
+def random_source(rng, fragments, hostile, hostile_rate):
+    parts = []
+    for _ in range(rng.randrange(1, 60)):
+        pool = hostile if rng.random() < hostile_rate else fragments
+        parts.append(fill(rng.choice(pool), rng))
+    text = "".join(parts)
+    if hostile_rate and rng.random() < 0.3:
+        text = text[:rng.randrange(len(text) + 1)]  # Truncated mid-token
+    if hostile_rate and rng.random() < 0.2:
+        text = text.replace("\n", " ")  # Minified onto one line
+    return text
+
+
+def well_formed_script(rng):
+    """Script with unique function names, no hostile fragments"""
+    parts = []
+    for index in range(rng.randrange(1, 30)):
+        fragment = rng.choice(SCRIPT_FRAGMENTS)
+        name = f"{rng.choice(WORDS)}_{index}"
+        parts.append(fragment.format(name=name, upper=name.upper()))
+    return "".join(parts)
+
+
+def reference_gd(content):
+    """Names the unbounded patterns the analyzer used before its ceilings, for well-formed input"""
+    functions = [m.group(1) for m in re.finditer(
+        r'func\s+(_[a-zA-Z_][a-zA-Z0-9_]*|on_[a-zA-Z_][a-zA-Z0-9_]*)\s*\([^)]*\)', content)]
+    states = [state for m in re.finditer(r'enum\s+STATE\s*\{([^}]*)\}', content)
+              for state in re.findall(r'([A-Z_][A-Z0-9_]*)', m.group(1))]
+    signals = re.findall(r'signal\s+([a-zA-Z_][a-zA-Z0-9_]*)', content)
+    return functions, states, signals
+
+
+def analyze(analyzer, path):
+    return analyzer.analyze_gd_file(path) if path.suffix == ".gd" else analyzer.analyze_scene_file(path)
+
+
+def check_properties(path, content, results, again, seconds, quarantined):
+    """Failure messages for one analyzed file"""
+    failures = []
+    if set(results) != RESULT_SHAPES[path.suffix]:
+        failures.append(f"result keys {sorted(results)}")
+    if results != again:
+        failures.append("different results on the second run")
+    if seconds > MAX_FILE_SECONDS + 0.5:
+        failures.append(f"took {seconds:.2f}s, over the {MAX_FILE_SECONDS}s ceiling")
+    if quarantined and any(results.values()):
+        failures.append("quarantined but still returned results")
+    if sum(len(items) for items in results.values()) > MAX_ITEMS_PER_FILE + 1:
+        failures.append("more items than the ceiling")
+    for key, items in results.items():
+        for item in items:
+            name = item.get("name")
+            if name is None:
+                continue
+            if path.suffix == ".gd" and not IDENTIFIER.match(name):
+                failures.append(f"{key} name {name!r} is not an identifier")
+            elif path.suffix == ".tscn" and (not name or '"' in name or "\n" in name):
+                failures.append(f"{key} name {name!r} runs past its quotes")
+            elif name not in content:
+                failures.append(f"{key} name {name!r} is not in the file")
+    for event in results.get("events", []):
+        if not event["name"].startswith(("_", "on_")):
+            failures.append(f"event {event['name']!r} is neither _private nor on_handler")
+    return failures
+
+
+def run_fuzz(seed, cases, work_dir):
+    rng = random.Random(seed)
+    failures = []
+    for case in range(cases):
+        kind = rng.choice(["gd", "gd", "tscn", "well_formed"])
+        if kind == "tscn":
+            content = random_source(rng, SCENE_FRAGMENTS, HOSTILE_SCENE_FRAGMENTS, rng.choice([0.0, 0.3, 0.8]))
+        elif kind == "gd":
+            content = random_source(rng, SCRIPT_FRAGMENTS, HOSTILE_FRAGMENTS, rng.choice([0.0, 0.3, 0.8]))
+        else:
+            content = well_formed_script(rng)
+        path = work_dir / f"case_{case}.{'tscn' if kind == 'tscn' else 'gd'}"
+        path.write_text(content, encoding='utf-8')
+
+        analyzer = CodeAnalyzerSimulator(work_dir)
+        start = time.perf_counter()
+        try:
+            results = analyze(analyzer, path)
+            again = analyze(analyzer, path)
+        except Exception as e:
+            failures.append(f"case {case} ({kind}): raised {type(e).__name__}: {e}")
+            continue
+        seconds = (time.perf_counter() - start) / 2
+        problems = check_properties(path, content, results, again, seconds, bool(analyzer.quarantined))
+
+        if kind == "well_formed":
+            functions, states, signals = reference_gd(content)
+            remaining = iter(functions)
+            if not all(event["name"] in remaining for event in results["events"]):
+                problems.append("events the unbounded patterns don't find, or out of source order")
+            if [a["name"] for a in results["actions"]] != states:
+                problems.append(f"states {[a['name'] for a in results['actions']]} != {states}")
+            if [s["name"] for s in results["signals"]] != signals:
+                problems.append("signals differ from the unbounded patterns")
+        failures.extend(f"case {case} ({kind}, seed {seed}): {problem}" for problem in problems)
+        path.unlink()
+    return failures
+
+
+def _repeat(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+# name -> (suffix, content of about `size` characters)
+SHAPES = {
+    "script": (".gd", lambda size: _repeat(
+        "func _on_jump_pressed(button):\n\tvelocity.y = -400\n\t$SFX.play()\n\nsignal landed\n"
+        "var data = {\"a\": [1, 2, 3]}\n\n", size)),
+    "unterminated_parens": (".gd", lambda size: _repeat("func _a(", size)),
+    "unterminated_enum": (".gd", lambda size: _repeat("enum STATE { IDLE, ", size)),
+    "single_line": (".gd", lambda size: _repeat("func _hit(a) : var x = {1: (2, 3)}; ", size)),
+    "nested_braces": (".gd", lambda size: "func _open():" + _repeat("{", size)),
+    "unclosed_string": (".gd", lambda size: "func _say(): var s = \"" + _repeat("func _x ( ", size)),
+    "scene_labels": (".tscn", lambda size: _repeat(
+        "[node name=\"Line\" type=\"RichTextLabel\" parent=\".\"]\ntext = \"Hi\"\n\n"
+        "[node name=\"Box\" type=\"Panel\" parent=\".\"]\n\n", size)),
+    "scene_unterminated": (".tscn", lambda size: _repeat("[node name=\"", size)),
+}
+
+
+def measure(path, trace_memory=False, **ceilings):
+    """(seconds, peak traced bytes or 0) for one file"""
+    analyzer = CodeAnalyzerSimulator(path.parent, **ceilings)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    analyze(analyzer, path)
+    seconds = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run_scale(max_size, work_dir):
+    """Time with every ceiling lifted; memory at the largest size with only the item ceiling kept"""
+    failures = []
+    unlimited = {"max_script_bytes": float("inf"), "max_scene_bytes": float("inf"), "max_file_seconds": float("inf")}
+    sizes = [size for size in SCALE_SIZES if size < max_size] + [max_size]
+
+    print(f"  {'shape':<20}" + "".join(f"{_human(size):>10}" for size in sizes) + "   exponent   memory")
+    for name, (suffix, make) in SHAPES.items():
+        path = work_dir / f"{name}{suffix}"
+        timings = []
+        for size in sizes:
+            path.write_text(make(size), encoding='utf-8')
+            timings.append(measure(path, max_items=float("inf"), **unlimited)[0])
+        _, peak = measure(path, trace_memory=True, **unlimited)
+        path.unlink()
+        if peak > MEMORY_FACTOR * sizes[-1] + MEMORY_SLACK:
+            failures.append(f"{name} at {_human(sizes[-1])}: {peak / 2 ** 20:.1f} MB peak memory")
+
+        timed = [(s, t) for s, t in zip(sizes, timings) if s >= MIN_TIMED_SIZE]
+        exponent = None
+        if len(timed) >= 2:
+            (s0, t0), (s1, t1) = timed[0], timed[-1]
+            # A run too short to time says nothing about the slope
+            exponent = math.log(max(t1, 1e-4) / max(t0, 1e-4)) / math.log(s1 / s0)
+            if exponent > MAX_EXPONENT:
+                failures.append(f"{name}: time grows as size^{exponent:.2f}")
+        print(f"  {name:<20}" + "".join(f"{t * 1000:>8.1f}ms" for t in timings)
+              + (f"   {exponent:8.2f}" if exponent is not None else f"   {'-':>8}")
+              + f"   {peak / 2 ** 20:5.1f} MB")
+    return failures
+
+
+def run_quarantine(work_dir):
+    """Default ceilings on a project with one normal, one oversized and one flooding script"""
+    failures = []
+    project = work_dir / "project"
+    (project / "scripts").mkdir(parents=True)
+    (project / "scripts" / "player.gd").write_text(SHAPES["script"][1](2000), encoding='utf-8')
+    (project / "scripts" / "generated.gd").write_text(SHAPES["single_line"][1](MAX_SCRIPT_BYTES + 1), encoding='utf-8')
+    (project / "scripts" / "signals.gd").write_text("signal s\n" * (MAX_ITEMS_PER_FILE + 10), encoding='utf-8')
+
+    for run in ("first", "second"):
+        analyzer = CodeAnalyzerSimulator(project)
+        output = StringIO()
+        start = time.perf_counter()
+        with redirect_stdout(output):
+            results = analyzer.analyze_project()
+        seconds = time.perf_counter() - start
+        reported = {Path(entry["file"]).name: entry["reason"] for entry in analyzer.quarantined}
+        print(f"  {run} scan: {seconds * 1000:.0f} ms, quarantined {reported}")
+        if set(reported) != {"generated.gd", "signals.gd"}:
+            failures.append(f"{run} scan quarantined {sorted(reported)}")
+        if "Quarantined 2 files" not in output.getvalue():
+            failures.append(f"{run} scan didn't report the quarantined files")
+        if not results["events"] or any(Path(e["file"]).name != "player.gd" for e in results["events"]):
+            failures.append(f"{run} scan lost or mixed up the normal file's events")
+    if not (project / QUARANTINE_PATH).exists():
+        failures.append("quarantine wasn't persisted")
+
+    (project / "scripts" / "signals.gd").write_text("signal s\n", encoding='utf-8')
+    analyzer = CodeAnalyzerSimulator(project)
+    with redirect_stdout(StringIO()):
+        results = analyzer.analyze_project()
+    if [Path(entry["file"]).name for entry in analyzer.quarantined] != ["generated.gd"]:
+        failures.append("a fixed file stayed quarantined")
+    if not any(Path(signal["file"]).name == "signals.gd" for signal in results["signals"]):
+        failures.append("the fixed file wasn't analyzed again")
+    return failures
+
+
+def _human(size):
+    for unit in ("B", "K", "M"):
+        if size < 1024:
+            return f"{size:g}{unit}"
+        size /= 1024
+    return f"{size:g}G"
+
+
+def _parse_size(text):
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def main():
+    seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else DEFAULT_SEED
+    cases = int(sys.argv[sys.argv.index("--cases") + 1]) if "--cases" in sys.argv else DEFAULT_CASES
+    max_size = (_parse_size(sys.argv[sys.argv.index("--max-size") + 1]) if "--max-size" in sys.argv
+                else DEFAULT_MAX_SIZE)
+    failures = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        print(f"Fuzz: {cases} cases, seed {seed}")
+        fuzz_failures = run_fuzz(seed, cases, work_dir)
+        print(f"  {len(fuzz_failures)} property violations")
+        failures.extend(fuzz_failures)
+
+        print(f"\nScale: {_human(SCALE_SIZES[0])} to {_human(max_size)}")
+        failures.extend(run_scale(max_size, work_dir))
+
+        print("\nQuarantine: default ceilings")
+        failures.extend(run_quarantine(work_dir))
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures[:50]:
+            print(f"  {failure}")
+        if len(failures) > 50:
+            print(f"  ... and {len(failures) - 50} more")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Dependency Graph Update Test
+Runs plan -> run -> plan on a throwaway project against the local API stub, then
+edits the description a sound is generated from and checks that the next plan
+regenerates it, that the run really does (instead of the journal reporting the
+old audio as done), and that the plan after that is empty again.
+
+Usage:
+    test_dependency_graph.py
+"""
+
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from api_stub_server import FaultConfig, run_in_thread
+from dependency_graph import plan, run
+from generation_journal import GenerationJournal
+from local_suggestions import load_taxonomy
+from sfx_generator import ElevenLabsGenerator, generate_suggestions
+
+PLAYER_SCRIPT = "extends CharacterBody2D\n\nfunc _jump():\n\tvelocity.y = -400\n\t$SFX.play()\n"
+SOUND_NAME = "player_jump"
+
+
+def update(project, taxonomy, base_url):
+    """One plan + run; returns (planned generations, generated names, errors)"""
+    update_plan = plan(project, taxonomy=taxonomy)
+    generator = ElevenLabsGenerator("stub-key", project / "luceta_generated", base_url)
+    journal = GenerationJournal(project)
+    with redirect_stdout(StringIO()):
+        _, generated, errors = run(project, update_plan, lambda prompt: [],
+                                   lambda fx_list: generate_suggestions(generator, fx_list, journal=journal))
+    return update_plan["generations"], sorted(generated), errors
+
+
+def main():
+    failures = []
+    server, stop = run_in_thread(faults=FaultConfig(seed=1))
+    base_url = server.base_url + "/v1"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            (project / "scripts").mkdir()
+            (project / "scripts" / "player.gd").write_text(PLAYER_SCRIPT, encoding='utf-8')
+            taxonomy = dict(load_taxonomy())
+
+            planned, generated, errors = update(project, taxonomy, base_url)
+            print(f"  first run: planned {planned}, generated {generated}, errors {errors}")
+            if SOUND_NAME not in planned or SOUND_NAME not in generated or errors:
+                failures.append("the first run didn't generate the sound")
+
+            planned, generated, _ = update(project, taxonomy, base_url)
+            print(f"  unchanged: planned {planned}, generated {generated}")
+            if planned:
+                failures.append(f"an unchanged project planned {planned}")
+
+            taxonomy["jump"] = {**taxonomy["jump"], "prompt": "Heavy armored knight jump with metal clank"}
+            requests_before = server.stats["requests"]
+            planned, generated, _ = update(project, taxonomy, base_url)
+            requests = server.stats["requests"] - requests_before
+            print(f"  edited description: planned {planned}, generated {generated}, {requests} API requests")
+            if SOUND_NAME not in planned:
+                failures.append("an edited description wasn't planned")
+            if requests == 0:
+                failures.append("the edited description was planned but not regenerated")
+            journal = GenerationJournal(project)
+            if journal.jobs.get(SOUND_NAME, {}).get("description") != taxonomy["jump"]["prompt"]:
+                failures.append("the journal still records the old description")
+
+            planned, _, _ = update(project, taxonomy, base_url)
+            print(f"  after regenerating: planned {planned}")
+            if planned:
+                failures.append(f"the plan after regenerating isn't empty: {planned}")
+    finally:
+        stop()
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
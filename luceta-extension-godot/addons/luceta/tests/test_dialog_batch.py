@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Dialog Batch Lines Test
+Analyzes a throwaway project with a dialog scene and checks that the analyzer
+picks up each RichTextLabel's text and that batch mode turns it into lines to
+synthesize - a label without text stays out, and one label's text is never
+borrowed by the next.
+
+Usage:
+    test_dialog_batch.py
+"""
+
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from dialog_batch import dialog_lines, plan_batches, UtteranceCache
+from test_analyzer import CodeAnalyzerSimulator
+
+DIALOG_SCENE = """[gd_scene load_steps=2 format=3]
+
+[node name="Intro" type="Control"]
+
+[node name="Greeting" type="RichTextLabel" parent="."]
+bbcode_enabled = true
+text = "Welcome to the [b]castle[/b], traveler."
+
+[node name="Empty" type="RichTextLabel" parent="."]
+
+[node name="Farewell" type="RichTextLabel" parent="."]
+text = "Safe travels!"
+"""
+
+EXPECTED_LINES = {
+    "intro_greeting": "Welcome to the castle, traveler.",
+    "intro_farewell": "Safe travels!"
+}
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        (project / "intro.tscn").write_text(DIALOG_SCENE, encoding='utf-8')
+        with redirect_stdout(StringIO()):
+            results = CodeAnalyzerSimulator(project).analyze_project()
+
+        texts = {dialog["name"]: dialog["text"] for dialog in results["dialogs"]}
+        print(f"  analyzer dialogs: {texts}")
+        if texts.get("Empty") != "":
+            failures.append(f"a label without text got {texts.get('Empty')!r}")
+
+        lines = dialog_lines(results)
+        got = {line["name"]: line["text"] for line in lines}
+        print(f"  batch lines: {got}")
+        if got != EXPECTED_LINES:
+            failures.append(f"expected lines {EXPECTED_LINES}, got {got}")
+
+        batches = plan_batches(lines, UtteranceCache(project / "cache"))
+        print(f"  batches: {len(batches)}")
+        if not batches:
+            failures.append("batch mode planned no requests")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,27 +3,19 @@
 ElevenLabs Audio Generation Test
 Tests the sound effect generation using ElevenLabs API
 """
-import os
-import re
 import json
+import urllib.error
 import urllib.request
 from pathlib import Path
 
-# Load ElevenLabs API key from .env
-env_path = Path(__file__).parent.parent.parent.parent / '.env'
-content = env_path.read_text()
-elevenlabs_key = None
-for line in content.split('\n'):
-    if 'ELEVEN_LABS_API_KEY' in line:
-        match = re.search(r'["\'](sk_[^"\']+)["\']', line)
-        if match:
-            elevenlabs_key = match.group(1)
-            print(f"ElevenLabs API key loaded: {elevenlabs_key[:15]}...")
-            break
+import luceta_config
 
+# Load ElevenLabs API key (environment, .env or project settings)
+elevenlabs_key = luceta_config.elevenlabs_key()
 if not elevenlabs_key:
     print("ERROR: Could not find ELEVEN_LABS_API_KEY in .env")
     exit(1)
+print(f"ElevenLabs API key loaded: {elevenlabs_key[:15]}...")
 
 # Test sound effect description (from LLM suggestions)
 sound_data = {
@@ -35,7 +27,7 @@ print(f"\nGenerating sound effect: {sound_data['name']}")
 print(f"Description: {sound_data['description']}")
 
 # Call ElevenLabs Sound Generation API
-url = "https://api.elevenlabs.io/v1/sound-generation"
+url = luceta_config.base_url("elevenlabs") + "/sound-generation"
 headers = {
     "xi-api-key": elevenlabs_key,
     "Content-Type": "application/json"
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Fleet Runner Test
+Runs two throwaway projects through FleetRunner offline with a fake generator:
+projects take turns in the fair queue, the script both projects share is
+analyzed once and its sound generated once and placed in each, and a file that
+can't be read or a sound whose generation raises is reported without stopping
+the rest of the fleet. A script over the analyzer's byte ceiling shows up as
+quarantined in the report and isn't cached, so the next run reports it again.
+
+Usage:
+    test_fleet.py
+"""
+
+import tempfile
+from pathlib import Path
+
+from fleet import FairQueue, FleetRunner
+from test_analyzer import MAX_SCRIPT_BYTES
+
+PLAYER_SCRIPT = "extends CharacterBody2D\n\nfunc _jump():\n\tvelocity.y = -400\n\t$SFX.play()\n"
+COIN_SCRIPT = "extends Area2D\n\nfunc _collect_coin():\n\t$SFX.play()\n\tqueue_free()\n"
+
+
+class FakeGenerator:
+    """Returns a tiny MP3 body; sounds named in failing raise instead"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def generate_sound_effect(self, fx):
+        self.calls.append(fx["name"])
+        if fx["name"] in self.failing:
+            raise RuntimeError("generator exploded")
+        return b"ID3" + bytes(200)
+
+
+def check_fair_order(failures):
+    queue = FairQueue()
+    for project, count in (("big", 3), ("small", 1), ("medium", 2)):
+        for i in range(count):
+            queue.put(project, f"{project}-{i}")
+    order = []
+    while (picked := queue.get()) is not None:
+        order.append(picked[2])
+    expected = ["big-0", "small-0", "medium-0", "big-1", "medium-1", "big-2"]
+    print(f"  fair order: {order}")
+    if order != expected:
+        failures.append(f"expected round-robin order {expected}, got {order}")
+
+
+def check_run(failures):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        projects = []
+        for name, scripts in (("forest", {"player.gd": PLAYER_SCRIPT}),
+                              ("castle", {"coin.gd": COIN_SCRIPT, "player.gd": PLAYER_SCRIPT})):
+            root = tmp / name
+            root.mkdir()
+            for file_name, content in scripts.items():
+                (root / file_name).write_text(content, encoding='utf-8')
+            projects.append({"name": name, "root": root})
+        # Listed like any script, but reading it fails
+        (tmp / "forest" / "broken.gd").symlink_to(tmp / "missing.gd")
+        (tmp / "castle" / "generated.gd").write_text("#" * (MAX_SCRIPT_BYTES + 1), encoding='utf-8')
+
+        generator = FakeGenerator(failing={"coin_collect"})
+        runner = FleetRunner(projects, tmp / "cache", workers=1, generator=generator)
+        report = runner.run()
+
+        print(f"  generator calls: {generator.calls}")
+        print(f"  report: {report['sounds_requested']} requested, {report['unique_generations']} unique, "
+              f"stats {report['stats']}")
+        print(f"  errors: {report['errors']}")
+
+        if generator.calls.count("player_jump") != 1:
+            failures.append(f"the shared sound wasn't generated exactly once: {generator.calls}")
+        if [entry["projects"] for entry in report["cross_project_shared"]] != [["castle", "forest"]]:
+            failures.append(f"expected player_jump shared by both projects: {report['cross_project_shared']}")
+        if report["sounds_requested"] != 3 or report["unique_generations"] != 2:
+            failures.append("expected 3 sounds requested and 2 unique generations")
+        expected_stats = {"analysis_hits": 1, "analysis_misses": 3, "generated": 1}
+        if any(report["stats"][key] != value for key, value in expected_stats.items()):
+            failures.append(f"expected stats {expected_stats}, got {report['stats']}")
+        placed = {name: info["placed"] for name, info in report["projects"].items()}
+        if placed != {"forest": 1, "castle": 1}:
+            failures.append(f"expected one placed sound per project, got {placed}")
+        for project_name in ("forest", "castle"):
+            if not (tmp / project_name / "luceta_generated" / "player_jump.mp3").exists():
+                failures.append(f"player_jump.mp3 missing from {project_name}")
+        errors = {(error["project"], Path(error["sound"]).name) for error in report["errors"]}
+        if errors != {("forest", "broken.gd"), ("castle", "coin_collect")}:
+            failures.append(f"expected the unreadable file and the failed sound as errors, got {errors}")
+
+        quarantined = [(entry["project"], Path(entry["file"]).name) for entry in report["quarantined"]]
+        print(f"  quarantined: {quarantined}")
+        if quarantined != [("castle", "generated.gd")]:
+            failures.append(f"expected generated.gd quarantined, got {quarantined}")
+        rerun = FleetRunner(projects, tmp / "cache", workers=1, generator=generator)
+        rerun.analyze()
+        if [Path(entry["file"]).name for entry in rerun.quarantined] != ["generated.gd"]:
+            failures.append(f"the quarantined file was cached as an empty result: {rerun.quarantined}")
+
+
+def main():
+    failures = []
+    check_fair_order(failures)
+    check_run(failures)
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
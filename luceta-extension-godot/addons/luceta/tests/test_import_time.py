@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+CLI Start-up Regression Test
+Runs `luceta.py <command> --help` in fresh interpreters and fails if the cold
+start takes longer than the budget, or if any command pulls in NumPy, an SDK or
+an HTTP client before it actually runs.
+
+Usage:
+    test_import_time.py [--budget-ms 100] [--runs 7]
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+CLI = Path(__file__).resolve().parent / "luceta.py"
+COMMANDS = ("scan", "suggest", "generate", "audit", "metrics", "integrate")
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_RUNS = 7
+
+# Nothing here may be imported just to print help
+HEAVY_MODULES = ("numpy", "groq", "pyarrow", "zstandard", "http.client", "urllib.request", "sqlite3",
+                 "test_analyzer", "sfx_dedup", "sfx_generator", "hedged_llm", "dependency_graph",
+                 "adaptive_controller")
+
+
+def imported_modules(command):
+    """Top-level names of every module imported while running `<command> --help`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", str(CLI), command, "--help"],
+                            capture_output=True, text=True, check=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+
+def cold_start_ms(command, runs):
+    """Best of several wall-clock runs, so a busy machine doesn't fail the test"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(CLI), command, "--help"], capture_output=True, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    budget = float(sys.argv[sys.argv.index("--budget-ms") + 1]) if "--budget-ms" in sys.argv else DEFAULT_BUDGET_MS
+    runs = int(sys.argv[sys.argv.index("--runs") + 1]) if "--runs" in sys.argv else DEFAULT_RUNS
+    failures = []
+
+    for command in COMMANDS:
+        heavy = sorted(imported_modules(command).intersection(HEAVY_MODULES))
+        if heavy:
+            failures.append(f"{command} --help imports {', '.join(heavy)}")
+        print(f"  {command:<10} {'eager imports: ' + ', '.join(heavy) if heavy else 'ok'}")
+
+    # Baseline: the bare interpreter, so the budget is about our code rather than the machine
+    start_ms = cold_start_ms("scan", runs)
+    bare = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], capture_output=True, check=True)
+        bare = min(bare, (time.perf_counter() - start) * 1000)
+    print(f"\nluceta scan --help: {start_ms:.0f} ms cold (bare interpreter {bare:.0f} ms, budget {budget:.0f} ms)")
+    if start_ms > budget:
+        failures.append(f"scan --help took {start_ms:.0f} ms (budget {budget:.0f} ms)")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
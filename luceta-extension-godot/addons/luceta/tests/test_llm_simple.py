@@ -1,20 +1,16 @@
 #!/usr/bin/env python3
 """Simple LLM test - clean output"""
-import os, json, re
-from pathlib import Path
+import os, json
+
+import luceta_config
 
 # Load API key
-env_path = Path(__file__).parent.parent.parent.parent / '.env'
-content = env_path.read_text()
-for line in content.split('\n'):
-    if 'GROQ_API_KEY' in line:
-        match = re.search(r'["\'](gsk_[^"\']+)["\']', line)
-        if match:
-            os.environ['GROQ_API_KEY'] = match.group(1)
-            print(f"API key loaded")
-            break
-
-from groq import Groq
+api_key = luceta_config.groq_key()
+if not api_key:
+    print("ERROR: Could not load Groq API key")
+    exit(1)
+os.environ['GROQ_API_KEY'] = api_key
+print(f"API key loaded")
 
 prompt = '''You are analyzing a Godot game project to suggest sound effects.
 EVENTS:
@@ -30,6 +26,8 @@ Each with: name, description, why, context.
 Respond with ONLY valid JSON, no markdown formatting.'''
 
 print("Calling Groq API with openai/gpt-oss-120b...")
+from groq import Groq  # Imported only once a request is actually made
+
 client = Groq()
 completion = client.chat.completions.create(
     model='openai/gpt-oss-120b',
@@ -5,25 +5,19 @@ Tests the full workflow: Code Analysis -> Groq API -> Parse Response
 """
 
 import json
+import sys
 import urllib.request
-import re
 from pathlib import Path
 
+import luceta_config
+from local_suggestions import count_items, local_share, suggest_locally
+
 def load_api_key():
-    """Load Groq API key from .env file"""
-    env_path = Path(__file__).parent.parent.parent.parent / '.env'
-    if not env_path.exists():
-        print(f"ERROR: .env file not found at {env_path}")
-        return None
-    
-    content = env_path.read_text()
-    for line in content.split('\n'):
-        if 'GROQ_API_KEY' in line:
-            # Handle both formats: KEY="value" and KEY='value'
-            match = re.search(r'["\']([^"\']+)["\']', line)
-            if match:
-                return match.group(1)
-    return None
+    """Groq API key from the shared config (environment, .env, project settings)"""
+    api_key = luceta_config.groq_key()
+    if not api_key:
+        print(f"ERROR: GROQ_API_KEY not found in the environment or {luceta_config.PROJECT_ROOT / '.env'}")
+    return api_key
 
 def simulate_code_analysis():
     """Simulated code analysis results (what CodeAnalyzer would return)"""
@@ -143,56 +137,82 @@ def main():
     print("Agent SFX - LLM Analyzer Workflow Test")
     print("=" * 60)
     
-    # Step 1: Load API key
-    print("\n[Step 1] Loading API key...")
-    api_key = load_api_key()
-    if not api_key:
-        print("ERROR: Could not load Groq API key from .env")
-        return 1
-    print(f"API key loaded: {api_key[:15]}...")
-    
-    # Step 2: Simulate code analysis
-    print("\n[Step 2] Simulating code analysis...")
+    # Step 1: Simulate code analysis
+    print("\n[Step 1] Simulating code analysis...")
     code_results = simulate_code_analysis()
     print(f"  Events: {len(code_results['events'])}")
     print(f"  Actions: {len(code_results['actions'])}")
     print(f"  Interactions: {len(code_results['interactions'])}")
     
-    # Step 3: Build prompt
-    print("\n[Step 3] Building LLM prompt...")
-    prompt = build_prompt(code_results)
-    print(f"  Prompt length: {len(prompt)} characters")
-    
-    # Step 4: Call Groq API
-    print("\n[Step 4] Calling Groq API...")
-    print("  Model: openai/gpt-oss-120b")
-    print("  Waiting for response...")
-    
-    try:
-        response = call_groq_api(api_key, prompt)
-        print("  Response received!")
-    except Exception as e:
-        print(f"ERROR: API call failed - {e}")
-        return 1
-    
-    # Step 5: Parse response
-    print("\n[Step 5] Parsing LLM response...")
-    suggestions, error = parse_llm_response(response)
-    
-    if error:
-        print(f"ERROR: {error}")
-        return 1
+    # Step 2: Resolve well-known hints locally
+    print("\n[Step 2] Resolving known sound hints locally...")
+    suggestions, unresolved = suggest_locally(code_results)
+    print(f"  Local suggestions: {len(suggestions)}")
+    print(f"  Resolved locally: {local_share(code_results, unresolved):.0%} of events")
+    
+    if count_items(unresolved) == 0:
+        print("  All events resolved locally, skipping LLM")
+    else:
+        # Step 3: Load API key
+        print("\n[Step 3] Loading API key...")
+        api_key = load_api_key()
+        if not api_key:
+            print("ERROR: Could not load Groq API key from .env")
+            return 1
+        print(f"API key loaded: {api_key[:15]}...")
+        
+        # Step 4: Build prompt for the unresolved events only
+        print("\n[Step 4] Building LLM prompt...")
+        prompt = build_prompt(unresolved)
+        print(f"  Prompt length: {len(prompt)} characters")
+        
+        # Step 5: Call Groq API
+        print("\n[Step 5] Calling Groq API...")
+        print("  Model: openai/gpt-oss-120b")
+        print("  Waiting for response...")
+        
+        try:
+            if "--hedged" in sys.argv:
+                # Backup request once the first one is slower than the model's p95
+                from hedged_llm import LatencyHistogram, hedged_request
+                histogram = LatencyHistogram.for_project(Path(__file__).resolve().parent.parent.parent.parent)
+                _fx, response, report = hedged_request(api_key, prompt, histogram)
+                histogram.save()
+                print(f"  Answered by {report['model']} after {report['attempts']} request(s)")
+            else:
+                response = call_groq_api(api_key, prompt)
+            print("  Response received!")
+        except Exception as e:
+            print(f"ERROR: API call failed - {e}")
+            return 1
+        
+        # Step 6: Parse response
+        print("\n[Step 6] Parsing LLM response...")
+        llm_suggestions, error = parse_llm_response(response)
+        
+        if error:
+            print(f"ERROR: {error}")
+            return 1
+        suggestions += llm_suggestions
+    
+    # Step 7: Collapse near-duplicates before they reach generation
+    print("\n[Step 7] Collapsing near-duplicate suggestions...")
+    from sfx_dedup import dedupe_suggestions  # NumPy, only needed here
+    deduped = dedupe_suggestions(suggestions)
+    print(f"  {len(suggestions)} suggestions -> {len(deduped)} generations")
     
     # Display results
     print("\n" + "=" * 60)
     print("SOUND EFFECT SUGGESTIONS")
     print("=" * 60)
     
-    for i, fx in enumerate(suggestions, 1):
+    for i, fx in enumerate(deduped, 1):
         print(f"\n{i}. {fx.get('name', 'unnamed')}")
         print(f"   Description: {fx.get('description', 'N/A')}")
         print(f"   Why: {fx.get('why', 'N/A')}")
         print(f"   Context: {fx.get('context', 'N/A')}")
+        if fx.get('aliases'):
+            print(f"   Aliases: {', '.join(fx['aliases'])}")
     
     print("\n" + "=" * 60)
     print(f"SUCCESS! Generated {len(suggestions)} sound effect suggestions")
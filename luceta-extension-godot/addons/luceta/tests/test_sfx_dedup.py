@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Suggestion Deduplication Test
+Runs the default threshold and name weight over an LLM-style suggestion list:
+the overlapping footstep entries (player_footstep, footstep_grass, walk_step)
+must collapse into one generation aliased to all three, while distinct sounds -
+including a footstep on another surface - each keep their own.
+
+Usage:
+    test_sfx_dedup.py
+"""
+
+from sfx_dedup import cluster_suggestions, dedupe_suggestions, similarity_matrix
+
+SUGGESTIONS = [
+    {"name": "player_footstep", "description": "Soft footstep on grass, light crunch, short"},
+    {"name": "footstep_grass", "description": "Footsteps on grass, soft crunchy step, short"},
+    {"name": "walk_step", "description": "Single soft footstep on grass while walking, light crunch"},
+    {"name": "player_jump", "description": "Cartoon jump whoosh with a springy boing, quick"},
+    {"name": "coin_collect", "description": "Bright coin pickup chime, sparkly and short"},
+    {"name": "sword_hit", "description": "Metal sword slash hitting armor, sharp clang"},
+    {"name": "door_open", "description": "Wooden door creaking open slowly"},
+    {"name": "enemy_hurt", "description": "Slime enemy squelch when taking damage, short"},
+    {"name": "footstep_stone", "description": "Hard footstep on stone floor, echoing click, short"},
+    {"name": "rain_ambience", "description": "Steady rain ambience on leaves, looping background"},
+]
+
+DUPLICATES = {"player_footstep", "footstep_grass", "walk_step"}
+
+
+def main():
+    failures = []
+    names = [fx["name"] for fx in SUGGESTIONS]
+    sim = similarity_matrix(SUGGESTIONS)
+    for i, name in enumerate(names):
+        closest = max((j for j in range(len(names)) if j != i), key=lambda j: sim[i, j])
+        print(f"  {name}: closest {names[closest]} ({sim[i, closest]:.2f})")
+
+    clusters = [{names[i] for i in members} for members in cluster_suggestions(SUGGESTIONS)]
+    if DUPLICATES not in clusters:
+        failures.append(f"the footstep variants didn't merge: {clusters}")
+    for cluster in clusters:
+        if len(cluster) > 1 and cluster != DUPLICATES:
+            failures.append(f"distinct sounds merged: {sorted(cluster)}")
+
+    deduped = dedupe_suggestions(SUGGESTIONS)
+    print(f"\n  {len(SUGGESTIONS)} suggestions -> {len(deduped)} generations")
+    leader = next((fx for fx in deduped if fx["name"] == "player_footstep"), {})
+    if set(leader.get("aliases", [])) != DUPLICATES - {"player_footstep"}:
+        failures.append(f"player_footstep aliases are {leader.get('aliases')}")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
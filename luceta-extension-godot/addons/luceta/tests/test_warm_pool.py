@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Warm Pool Concurrent Save Test
+Opens the same pool twice, as the dock and a fill run would, changes each copy
+and saves both: the second save must keep the first one's new sound, its use
+counts and the credits it spent instead of writing its own stale snapshot over
+them.
+
+Usage:
+    test_warm_pool.py
+"""
+
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from dependency_graph import fx_digest
+from warm_pool import WarmPool
+
+JUMP = {"name": "jump_jump_1", "description": "Cartoon jump whoosh with a springy boing",
+        "loop": False, "hint": "jump", "style": "jump", "take": 1}
+COIN = {"name": "collect_coin_collect_1", "description": "Bright coin pickup chime, sparkly and short",
+        "loop": False, "hint": "collect", "style": "coin collect", "take": 1}
+
+
+class FakeGenerator:
+    def generate_sound_effect(self, fx):
+        return b"ID3" + bytes(200)
+
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        seed = WarmPool(tmp / "pool")
+        seed.audio_path(fx_digest(JUMP)).parent.mkdir(parents=True)
+        seed.audio_path(fx_digest(JUMP)).write_bytes(b"ID3" + bytes(200))
+        seed.entries[fx_digest(JUMP)] = {"hint": "jump", "style": "jump", "take": 1, "description": JUMP["description"],
+                                         "loop": False, "uses": 1, "created": 0.0}
+        seed.spent[date.today().isoformat()] = 10.0
+        seed.save()
+
+        dock = WarmPool(tmp / "pool")
+        filler = WarmPool(tmp / "pool")
+        dock.take(JUMP, tmp / "project" / "jump.mp3")
+        dock.record_accepted(JUMP, "/projects/castle")
+        filler.take(JUMP, tmp / "other" / "jump.mp3")
+        filler.spent[date.today().isoformat()] = 10.0 + 5.0
+        filler.entries[fx_digest(COIN)] = {"hint": "collect", "style": "coin collect", "take": 1,
+                                           "description": COIN["description"], "loop": False, "uses": 0, "created": 0.0}
+        filler.audio_path(fx_digest(COIN)).write_bytes(b"ID3" + bytes(200))
+        filler.save()
+        dock.save()
+
+        merged = WarmPool(tmp / "pool")
+        uses = {entry["style"]: entry["uses"] for entry in merged.entries.values()}
+        spent = merged.spent.get(date.today().isoformat())
+        print(f"  uses: {uses}, spent today: {spent}, accepted: {len(merged.accepted)}")
+        if uses != {"jump": 3, "coin collect": 0}:
+            failures.append(f"expected both sounds kept and both takes of the jump counted, got {uses}")
+        if spent != 15.0:
+            failures.append(f"expected 15 credits spent today, got {spent}")
+        if len(merged.accepted) != 1:
+            failures.append(f"the dock's accepted description was lost: {merged.accepted}")
+        if (tmp / "pool" / "index.json.lock").exists():
+            failures.append("the index lock was left behind")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nPASSED")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Warm Pool
+A user-level store of pre-generated sounds for the hints nearly every project
+needs (footstep, jump, attack, collect, interaction), shared by all projects on
+the machine. While the machine is idle and under a daily credit budget it
+generates a few takes of each hint in the styles the steering tables list
+(steering/game-sfx.md), plus descriptions that past projects accepted. A new
+project's first generation run then copies matching sounds out of the pool:
+an exact match on what the audio depends on (description + loop), or a near
+match on the description for the same hint and loop flag.
+
+Usage:
+    warm_pool.py status                      what the pool holds and would generate next
+    warm_pool.py fill [--budget C] [--dry-run]   generate missing sounds now
+    warm_pool.py learn <project> ...         record a project's generated sounds as accepted
+    warm_pool.py serve <project> ... [--interval S]   learn and fill whenever the machine is idle
+The pool lives in $XDG_CACHE_HOME/luceta/warm_pool unless luceta/warm_pool_dir is set.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import time
+import urllib.error
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+import luceta_config
+from adaptive_controller import CREDITS_PER_SECOND
+from dependency_graph import fx_digest
+from generation_journal import STATE_DONE, GenerationJournal
+from local_suggestions import load_steering_rows
+from sound_taxonomy import get_taxonomy, normalize
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+LOCK_TIMEOUT = 10.0  # Seconds to wait for another writer before giving up on a save
+LOCK_STALE = 60.0  # A lock older than this was left by a writer that died
+DEFAULT_BUDGET = 500.0  # Credits per day when luceta/warm_pool_budget isn't set
+DEFAULT_VARIANTS = 2  # Takes per hint and style
+MATCH_THRESHOLD = 0.6  # TF-IDF description similarity for a near match
+STYLE_DECAY = 0.6  # Later styles of a hint are worth less than the first
+IDLE_LOAD = 0.5  # 1-minute load average per CPU below which the machine counts as idle
+IDLE_SECONDS = 120  # ...and no watched project journal changed for this long
+DEFAULT_INTERVAL = 300
+
+# Common hints -> steering table rows, the first one being what local_suggestions emits
+HINT_STYLES = {
+    "footstep": ["footsteps grass", "footsteps stone", "footsteps wood"],
+    "jump": ["jump"],
+    "attack": ["sword hit", "punch", "magic attack"],
+    "collect": ["coin collect", "level up", "power up"],
+    "interaction": ["interaction", "door open", "button click"],
+}
+
+
+def default_pool_dir(project_path=luceta_config.PROJECT_ROOT):
+    configured = luceta_config.get("LUCETA_WARM_POOL_DIR", project_path)
+    if configured:
+        return Path(configured).expanduser()
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "luceta" / "warm_pool"
+
+
+def _hint(fx):
+    """Taxonomy hint, or a common hint named in the text (the taxonomy only knows signal names for some)"""
+    text = f"{fx.get('name', '')} {fx.get('description', '')}"
+    hint = get_taxonomy().classify(text)["hint"]
+    if hint not in HINT_STYLES:
+        hint = next((common for common in HINT_STYLES if common in normalize(text)), hint)
+    return hint
+
+
+def _credits(fx):
+    return get_taxonomy().classify(fx.get("description", ""))["duration"] * CREDITS_PER_SECOND
+
+
+class WarmPool:
+    """Content-addressed pool audio plus an index of what each file is and how often it was used"""
+
+    def __init__(self, pool_dir):
+        self.pool_dir = Path(pool_dir)
+        self.index_path = self.pool_dir / INDEX_FILE
+        self.entries = {}  # digest -> {"hint", "style", "take", "description", "loop", "uses", "created"}
+        self.accepted = {}  # digest -> {"description", "loop", "hint", "projects"}
+        self.spent = {}  # ISO date -> credits spent filling the pool
+        data = self._read_index()
+        self.entries = data.get("entries", {})
+        self.accepted = data.get("accepted", {})
+        self.spent = data.get("spent", {})
+        # An entry whose audio was deleted is just missing again
+        self.entries = {d: e for d, e in self.entries.items() if self.audio_path(d).exists()}
+        self._mark_saved()
+
+    @classmethod
+    def default(cls, project_path=luceta_config.PROJECT_ROOT):
+        return cls(default_pool_dir(project_path))
+
+    def audio_path(self, audio_digest):
+        return self.pool_dir / f"{audio_digest}.mp3"
+
+    def candidates(self, variants=DEFAULT_VARIANTS):
+        """[(score, fx)] worth having in the pool, best first"""
+        rows = load_steering_rows()
+        projects_per_hint = {}
+        for entry in self.accepted.values():
+            projects_per_hint[entry["hint"]] = projects_per_hint.get(entry["hint"], 0) + len(entry["projects"])
+
+        scored = {}
+        for hint, requests in HINT_STYLES.items():
+            hint_weight = 1.0 + projects_per_hint.get(hint, 0)
+            for style_index, request in enumerate(requests):
+                row = rows.get(request)
+                if row is None:
+                    continue
+                for take in range(1, variants + 1):
+                    description = row["prompt"] if take == 1 else f"{row['prompt']}, variation {take}"
+                    fx = {"name": f"{hint}_{request.replace(' ', '_')}_{take}", "description": description,
+                          "loop": row["loop"], "hint": hint, "style": request, "take": take}
+                    scored[fx_digest(fx)] = (hint_weight * STYLE_DECAY ** style_index / take, fx)
+
+        # Descriptions that several projects accepted are worth as much as a hint's first style
+        for audio_digest, entry in self.accepted.items():
+            if audio_digest not in scored:
+                fx = {"name": f"{entry['hint']}_accepted_{audio_digest[:6]}", "description": entry["description"],
+                      "loop": entry["loop"], "hint": entry["hint"], "style": "accepted", "take": 1}
+                scored[audio_digest] = (float(len(entry["projects"])), fx)
+
+        return sorted(scored.values(), key=lambda item: -item[0])
+
+    def missing(self, variants=DEFAULT_VARIANTS):
+        return [fx for _score, fx in self.candidates(variants) if fx_digest(fx) not in self.entries]
+
+    def remaining_budget(self, budget):
+        return max(0.0, budget - self.spent.get(date.today().isoformat(), 0.0))
+
+    def fill(self, generator, budget=DEFAULT_BUDGET, variants=DEFAULT_VARIANTS, dry_run=False):
+        """
+        Generate missing pool sounds, best first, while today's budget allows.
+        Returns {"generated": [names], "credits", "deferred", "errors": [(name, error)]}
+        """
+        remaining = self.remaining_budget(budget)
+        report = {"generated": [], "credits": 0.0, "deferred": 0, "errors": []}
+        for fx in self.missing(variants):
+            credits = _credits(fx)
+            if credits > remaining:
+                # A cheaper sound further down may still fit
+                report["deferred"] += 1
+                continue
+            if dry_run:
+                report["generated"].append(fx["name"])
+                report["credits"] += credits
+                remaining -= credits
+                continue
+            try:
+                body = generator.generate_sound_effect(fx)
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                report["errors"].append((fx["name"], str(e)))
+                continue
+
+            audio_digest = fx_digest(fx)
+            path = self.audio_path(audio_digest)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(path.name + ".part")
+            tmp_path.write_bytes(body)
+            os.replace(tmp_path, path)
+            self.entries[audio_digest] = {
+                "hint": fx["hint"], "style": fx["style"], "take": fx["take"],
+                "description": fx["description"], "loop": fx["loop"], "uses": 0, "created": time.time(),
+            }
+            today = date.today().isoformat()
+            self.spent[today] = self.spent.get(today, 0.0) + credits
+            remaining -= credits
+            report["generated"].append(fx["name"])
+            report["credits"] += credits
+            # Saved per sound, so an interrupted fill keeps what it paid for
+            self.save()
+        return report
+
+    def lookup(self, fx, threshold=MATCH_THRESHOLD):
+        """Pool audio for a suggestion: an exact match, else the closest same-hint take, else None"""
+        audio_digest = fx_digest(fx)
+        if audio_digest in self.entries:
+            return audio_digest
+        loop = bool(fx.get("loop", False))
+        hint = _hint(fx)
+        same_kind = [(d, e) for d, e in self.entries.items() if e["hint"] == hint and bool(e["loop"]) == loop]
+        if not same_kind:
+            return None
+
+        from sfx_dedup import tfidf_vectors
+
+        vectors = tfidf_vectors([fx.get("description", "")] + [e["description"] for _d, e in same_kind])
+        similarity = vectors[1:] @ vectors[0]
+        best = max(range(len(same_kind)), key=lambda i: (round(float(similarity[i]), 3), -same_kind[i][1]["uses"]))
+        return same_kind[best][0] if similarity[best] >= threshold else None
+
+    def take(self, fx, target_path, threshold=MATCH_THRESHOLD):
+        """Copy matching pool audio to target_path; True on a hit"""
+        audio_digest = self.lookup(fx, threshold)
+        if audio_digest is None:
+            return False
+        target_path = Path(target_path)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self.audio_path(audio_digest), target_path)
+        self.entries[audio_digest]["uses"] += 1
+        return True
+
+    def record_accepted(self, fx, project_name):
+        """Remember a generated suggestion for a common hint; each project (by path) counts once"""
+        hint = _hint(fx)
+        if hint not in HINT_STYLES or not fx.get("description"):
+            return
+        audio_digest = fx_digest(fx)
+        entry = self.accepted.setdefault(audio_digest, {
+            "description": fx["description"], "loop": bool(fx.get("loop", False)), "hint": hint, "projects": []})
+        if project_name not in entry["projects"]:
+            entry["projects"].append(project_name)
+
+    def learn(self, project_path):
+        """Record every sound a project's journal has as done; returns how many were seen"""
+        project_path = Path(project_path).resolve()
+        journal = GenerationJournal(project_path)
+        seen = 0
+        for sound_name, job in journal.jobs.items():
+            if job.get("state") == STATE_DONE:
+                self.record_accepted({"name": sound_name, "description": job.get("description", "")},
+                                     str(project_path))
+                seen += 1
+        return seen
+
+    def _read_index(self):
+        try:
+            data = json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) and data.get("version") == INDEX_VERSION else {}
+
+    def _mark_saved(self):
+        """Remember what the index held, so a save only adds what this process changed since"""
+        self._saved_uses = {d: e.get("uses", 0) for d, e in self.entries.items()}
+        self._saved_spent = dict(self.spent)
+
+    @contextmanager
+    def _index_lock(self):
+        """Directory lock around read-merge-write; mkdir is atomic and WarmPool.gd takes the same lock"""
+        lock_path = self.index_path.with_name(self.index_path.name + ".lock")
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                lock_path.mkdir()
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime > LOCK_STALE:
+                        lock_path.rmdir()
+                        continue
+                except OSError:
+                    continue  # Released between mkdir and stat
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{lock_path} held by another writer")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            lock_path.rmdir()
+
+    def save(self):
+        """
+        Merge this process's changes into the index on disk: other writers (the
+        dock, a generation run, the fill service) may have saved since we read it,
+        so entries and accepted projects are unioned and use counts and spent
+        credits add what changed here on top of what's on disk.
+        """
+        self.pool_dir.mkdir(parents=True, exist_ok=True)
+        with self._index_lock():
+            data = self._read_index()
+            entries = data.get("entries", {})
+            for audio_digest, entry in self.entries.items():
+                delta = entry.get("uses", 0) - self._saved_uses.get(audio_digest, 0)
+                if audio_digest in entries:
+                    entries[audio_digest]["uses"] = entries[audio_digest].get("uses", 0) + delta
+                else:
+                    entries[audio_digest] = entry
+            accepted = data.get("accepted", {})
+            for audio_digest, entry in self.accepted.items():
+                merged = accepted.setdefault(audio_digest, {**entry, "projects": []})
+                merged["projects"] += [p for p in entry["projects"] if p not in merged["projects"]]
+            spent = data.get("spent", {})
+            for day, credits in self.spent.items():
+                spent[day] = spent.get(day, 0.0) + credits - self._saved_spent.get(day, 0.0)
+
+            tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+            tmp_path.write_text(json.dumps({"version": INDEX_VERSION, "entries": entries,
+                                            "accepted": accepted, "spent": spent}, indent=1),
+                                encoding='utf-8')
+            os.replace(tmp_path, self.index_path)
+
+        self.entries = {d: e for d, e in entries.items() if self.audio_path(d).exists()}
+        self.accepted = accepted
+        self.spent = spent
+        self._mark_saved()
+
+
+def is_idle(project_paths):
+    """Low load and no generation activity in any watched project recently"""
+    if hasattr(os, "getloadavg") and os.getloadavg()[0] / (os.cpu_count() or 1) > IDLE_LOAD:
+        return False
+    for project_path in project_paths:
+        journal = GenerationJournal(project_path)
+        if journal.journal_path.exists() and time.time() - journal.journal_path.stat().st_mtime < IDLE_SECONDS:
+            return False
+    return True
+
+
+def _generator(pool, project_path):
+    from sfx_generator import ElevenLabsGenerator
+
+    api_key = luceta_config.elevenlabs_key(project_path)
+    if not api_key:
+        return None
+    return ElevenLabsGenerator(api_key, pool.pool_dir, luceta_config.base_url("elevenlabs", project_path))
+
+
+def _budget(args):
+    if args.budget is not None:
+        return args.budget
+    try:
+        return float(luceta_config.get("LUCETA_WARM_POOL_BUDGET", luceta_config.PROJECT_ROOT) or DEFAULT_BUDGET)
+    except ValueError:
+        return DEFAULT_BUDGET
+
+
+def _print_report(report):
+    print(f"Generated {len(report['generated'])} pool sounds for ~{report['credits']:.0f} credits, "
+          f"{report['deferred']} deferred by the budget")
+    for name, error in report["errors"]:
+        print(f"  ERROR {name}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generated sounds shared across projects")
+    parser.add_argument("--pool", type=Path, help="pool directory (default: luceta/warm_pool_dir or the user cache)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status")
+    fill = commands.add_parser("fill")
+    fill.add_argument("--budget", type=float, help=f"credits per day (default: luceta/warm_pool_budget or {DEFAULT_BUDGET:.0f})")
+    fill.add_argument("--variants", type=int, default=DEFAULT_VARIANTS)
+    fill.add_argument("--dry-run", action="store_true")
+    learn = commands.add_parser("learn")
+    learn.add_argument("projects", nargs="+", type=Path)
+    serve = commands.add_parser("serve")
+    serve.add_argument("projects", nargs="*", type=Path)
+    serve.add_argument("--budget", type=float)
+    serve.add_argument("--variants", type=int, default=DEFAULT_VARIANTS)
+    serve.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    args = parser.parse_args()
+
+    pool = WarmPool(args.pool) if args.pool else WarmPool.default()
+
+    if args.command == "status":
+        uses = sum(entry["uses"] for entry in pool.entries.values())
+        print(f"Pool: {pool.pool_dir}")
+        print(f"  {len(pool.entries)} sounds, used {uses} times; {len(pool.accepted)} accepted descriptions learned")
+        print(f"  spent today: {pool.spent.get(date.today().isoformat(), 0.0):.0f} credits")
+        missing = pool.missing()
+        print(f"  {len(missing)} missing, next up:")
+        for fx in missing[:10]:
+            print(f"    {fx['name']:<36} {fx['description'][:50]}")
+        return 0
+
+    if args.command == "learn":
+        for project_path in args.projects:
+            print(f"{project_path}: {pool.learn(project_path)} generated sounds")
+        pool.save()
+        return 0
+
+    generator = _generator(pool, luceta_config.PROJECT_ROOT)
+    if args.command == "fill":
+        if generator is None and not args.dry_run:
+            print("ERROR: Could not find ELEVEN_LABS_API_KEY")
+            return 1
+        report = pool.fill(generator, _budget(args), args.variants, args.dry_run)
+        _print_report(report)
+        return 0 if not report["errors"] else 1
+
+    if generator is None:
+        print("ERROR: Could not find ELEVEN_LABS_API_KEY")
+        return 1
+    print(f"Warm pool service: {pool.pool_dir}, checking every {args.interval:.0f}s (Ctrl+C to stop)")
+    try:
+        while True:
+            for project_path in args.projects:
+                pool.learn(project_path)
+            if pool.missing(args.variants) and is_idle(args.projects):
+                _print_report(pool.fill(generator, _budget(args), args.variants))
+            pool.save()
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pool.save()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,219 @@
+@tool
+extends RefCounted
+class_name WarmPool
+
+# Read side of the user-level warm pool that tests/warm_pool.py fills while the
+# machine is idle. Before the dock queues a sound it asks the pool for an exact
+# match on what the audio depends on (description + loop), else for the closest
+# take of the same hint and loop flag by TF-IDF description similarity, the same
+# rule WarmPool.lookup uses. Filling the pool and learning accepted descriptions
+# stay in Python; `warm_pool.py learn` picks up what the dock generated from the
+# generation journal.
+
+const INDEX_FILE = "index.json"
+const INDEX_VERSION = 1
+const LOCK_TIMEOUT_MS = 10000  # Wait this long for another writer before giving up on a save
+const LOCK_STALE_SECONDS = 60  # A lock older than this was left by a writer that died
+const MATCH_THRESHOLD = 0.6
+const NGRAM_SIZE = 3
+# Common hints the pool holds takes of (HINT_STYLES in tests/warm_pool.py)
+const COMMON_HINTS = ["footstep", "jump", "attack", "collect", "interaction"]
+
+var pool_dir: String
+var index: Dictionary = {}
+var entries: Dictionary = {}  # digest -> {"hint", "style", "take", "description", "loop", "uses", "created"}
+var _saved_uses: Dictionary = {}  # digest -> uses when the index was read, so save() adds only our takes
+
+func _init(dir_path: String = ""):
+	pool_dir = dir_path if not dir_path.is_empty() else default_pool_dir()
+	index = _read_index()
+	# An entry whose audio was deleted is just missing again
+	for audio_digest in index.get("entries", {}):
+		if FileAccess.file_exists(audio_path(audio_digest)):
+			entries[audio_digest] = index.entries[audio_digest]
+			_saved_uses[audio_digest] = int(entries[audio_digest].get("uses", 0))
+
+func _read_index() -> Dictionary:
+	var index_path = pool_dir.path_join(INDEX_FILE)
+	if not FileAccess.file_exists(index_path):
+		return {}
+	var file = FileAccess.open(index_path, FileAccess.READ)
+	if not file:
+		return {}
+	var data = JSON.parse_string(file.get_as_text())
+	file.close()
+	if not (data is Dictionary) or int(data.get("version", 0)) != INDEX_VERSION:
+		return {}
+	return data
+
+static func default_pool_dir() -> String:
+	var configured = OS.get_environment("LUCETA_WARM_POOL_DIR")
+	if configured.is_empty():
+		configured = str(ProjectSettings.get_setting("luceta/warm_pool_dir", ""))
+	if not configured.is_empty():
+		if configured.begins_with("~"):
+			configured = _home_dir() + configured.substr(1)
+		return configured
+	var cache_home = OS.get_environment("XDG_CACHE_HOME")
+	if cache_home.is_empty():
+		cache_home = _home_dir().path_join(".cache")
+	return cache_home.path_join("luceta").path_join("warm_pool")
+
+static func _home_dir() -> String:
+	var home = OS.get_environment("HOME")
+	return home if not home.is_empty() else OS.get_environment("USERPROFILE")
+
+func audio_path(audio_digest: String) -> String:
+	return pool_dir.path_join(audio_digest + ".mp3")
+
+func lookup(fx: Dictionary, threshold: float = MATCH_THRESHOLD) -> String:
+	"""Pool digest for a suggestion: an exact match, else the closest same-hint take, else ''"""
+	var description = str(fx.get("description", ""))
+	var loop = bool(fx.get("loop", false))
+	for audio_digest in entries:
+		var entry = entries[audio_digest]
+		if entry.get("description", "") == description and bool(entry.get("loop", false)) == loop:
+			return audio_digest
+
+	var hint = _hint(fx)
+	var same_kind = []
+	for audio_digest in entries:
+		var entry = entries[audio_digest]
+		if entry.get("hint", "") == hint and bool(entry.get("loop", false)) == loop:
+			same_kind.append(audio_digest)
+	if same_kind.is_empty():
+		return ""
+
+	var texts = [description]
+	for audio_digest in same_kind:
+		texts.append(str(entries[audio_digest].get("description", "")))
+	var vectors = _tfidf_vectors(texts)
+	# Most similar first, then the least used take
+	var best = -1
+	var best_similarity = 0.0
+	var best_rounded = -1.0
+	var best_uses = 0
+	for i in range(same_kind.size()):
+		var similarity = _dot(vectors[i + 1], vectors[0])
+		var rounded = snappedf(similarity, 0.001)
+		var uses = int(entries[same_kind[i]].get("uses", 0))
+		if rounded > best_rounded or (rounded == best_rounded and uses < best_uses):
+			best = i
+			best_similarity = similarity
+			best_rounded = rounded
+			best_uses = uses
+	return same_kind[best] if best_similarity >= threshold else ""
+
+func take(fx: Dictionary, target_path: String, threshold: float = MATCH_THRESHOLD) -> bool:
+	"""Copy matching pool audio to target_path; true on a hit"""
+	var audio_digest = lookup(fx, threshold)
+	if audio_digest.is_empty():
+		return false
+	var target = ProjectSettings.globalize_path(target_path)
+	DirAccess.make_dir_recursive_absolute(target.get_base_dir())
+	if DirAccess.copy_absolute(audio_path(audio_digest), target) != OK:
+		push_error("[WarmPool] Could not copy " + audio_path(audio_digest) + " to " + target_path)
+		return false
+	entries[audio_digest]["uses"] = int(entries[audio_digest].get("uses", 0)) + 1
+	return true
+
+func save():
+	"""Add our takes to the use counts of the index as it is on disk now"""
+	if index.is_empty():
+		return
+	# warm_pool.py may have added sounds or spent credits since we read the index,
+	# so re-read it under the same directory lock WarmPool.save takes there
+	var index_path = pool_dir.path_join(INDEX_FILE)
+	if not _lock(index_path + ".lock"):
+		push_error("[WarmPool] " + index_path + " is locked by another writer, use counts not saved")
+		return
+	var data = _read_index()
+	if data.is_empty():
+		# Deleted meanwhile; a copy, since index shares its entries with ours
+		data = index.duplicate(true)
+	var on_disk = data.get("entries", {})
+	for audio_digest in entries:
+		var delta = int(entries[audio_digest].get("uses", 0)) - int(_saved_uses.get(audio_digest, 0))
+		if on_disk.has(audio_digest):
+			on_disk[audio_digest]["uses"] = int(on_disk[audio_digest].get("uses", 0)) + delta
+		_saved_uses[audio_digest] = int(entries[audio_digest].get("uses", 0))
+
+	# Write next to the index and rename so a crash never leaves it half-written
+	var file = FileAccess.open(index_path + ".tmp", FileAccess.WRITE)
+	if file:
+		file.store_string(JSON.stringify(data, " "))
+		file.close()
+		DirAccess.rename_absolute(index_path + ".tmp", index_path)
+	else:
+		push_error("[WarmPool] Could not write " + index_path)
+	DirAccess.remove_absolute(index_path + ".lock")
+
+static func _lock(lock_path: String) -> bool:
+	"""Take the index lock; creating a directory is atomic, so only one writer gets it"""
+	var deadline = Time.get_ticks_msec() + LOCK_TIMEOUT_MS
+	while DirAccess.make_dir_absolute(lock_path) != OK:
+		var modified = FileAccess.get_modified_time(lock_path)
+		if modified > 0 and Time.get_unix_time_from_system() - modified > LOCK_STALE_SECONDS:
+			DirAccess.remove_absolute(lock_path)
+			continue
+		if Time.get_ticks_msec() > deadline:
+			return false
+		OS.delay_msec(50)
+	return true
+
+static func _hint(fx: Dictionary) -> String:
+	"""Taxonomy hint, or a common hint named in the text (the taxonomy only knows signal names for some)"""
+	var text = str(fx.get("name", "")) + " " + str(fx.get("description", ""))
+	var hint = SoundTaxonomy.classify(text).hint
+	if not (hint in COMMON_HINTS):
+		var normalized = SoundTaxonomy.normalize(text)
+		for common in COMMON_HINTS:
+			if common in normalized:
+				return common
+	return hint
+
+static func _char_ngrams(text: String) -> Array:
+	"""Character n-grams of each word, padded so short words still count (sfx_dedup.char_ngrams)"""
+	var normalized = text.to_lower().replace("_", " ").replace("-", " ")
+	var cleaned = ""
+	for c in normalized:
+		cleaned += c if (c >= "a" and c <= "z") or (c >= "0" and c <= "9") else " "
+	var grams = []
+	for word in cleaned.split(" ", false):
+		var padded = " " + word + " "
+		if padded.length() <= NGRAM_SIZE:
+			grams.append(padded)
+			continue
+		for i in range(padded.length() - NGRAM_SIZE + 1):
+			grams.append(padded.substr(i, NGRAM_SIZE))
+	return grams
+
+static func _tfidf_vectors(texts: Array) -> Array:
+	"""L2-normalized TF-IDF vectors over character n-grams, as gram -> weight"""
+	var rows = []
+	var doc_freq = {}
+	for text in texts:
+		var counts = {}
+		for gram in _char_ngrams(text):
+			counts[gram] = counts.get(gram, 0.0) + 1.0
+		for gram in counts:
+			doc_freq[gram] = doc_freq.get(gram, 0) + 1
+		rows.append(counts)
+
+	for counts in rows:
+		var norm = 0.0
+		for gram in counts:
+			counts[gram] *= log((1.0 + texts.size()) / (1.0 + doc_freq[gram])) + 1.0
+			norm += counts[gram] * counts[gram]
+		norm = sqrt(norm)
+		if norm > 0.0:
+			for gram in counts:
+				counts[gram] /= norm
+	return rows
+
+static func _dot(a: Dictionary, b: Dictionary) -> float:
+	var total = 0.0
+	for gram in a:
+		if b.has(gram):
+			total += a[gram] * b[gram]
+	return total